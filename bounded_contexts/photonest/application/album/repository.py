@@ -44,6 +44,10 @@ class AlbumRepository(ABC):
     def media_rows(self, album_id: int) -> list[tuple[Any, int]]:
         """(Media, sort_index) を並び順で返す."""
 
+    @abstractmethod
+    def refresh_stats(self, album_id: int) -> None:
+        """集計列（件数・表紙・撮影日の範囲）を収録メディアから再計算する."""
+
     @abstractmethod
     def flush(self) -> None:
         """保留中の変更を DB へ送る（採番のため等）."""
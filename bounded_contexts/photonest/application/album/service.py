@@ -87,6 +87,7 @@ class AlbumApplicationService:
             album.cover_media_id = media_ids[0]
         album.updated_at = now
 
+        self._repository.refresh_stats(album.id)
         self._repository.commit()
         return album
 
@@ -143,6 +144,7 @@ class AlbumApplicationService:
         if has_changes:
             album.updated_at = self._now()
 
+        self._repository.refresh_stats(album.id)
         self._repository.commit()
         return album, has_changes
 
@@ -178,6 +180,8 @@ class AlbumApplicationService:
 
         self._repository.update_sort_indexes(album.id, normalized_ids)
         album.updated_at = self._now()
+        # 表紙が未設定なら先頭のメディアが変わる
+        self._repository.refresh_stats(album.id)
         self._repository.commit()
         return album, True
 
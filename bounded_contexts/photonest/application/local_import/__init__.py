@@ -12,6 +12,7 @@ from typing import Any, Dict, Tuple
 
 __all__ = (
     "ImportDirectoryScanner",
+    "ImportScanStream",
     "LocalImportFileImporter",
     "LocalImportQueueProcessor",
     "LocalImportTaskLogger",
@@ -22,6 +23,7 @@ __all__ = (
 
 _MODULE_MAP: Dict[str, Tuple[str, str]] = {
     "ImportDirectoryScanner": ("scanner", "ImportDirectoryScanner"),
+    "ImportScanStream": ("scanner", "ImportScanStream"),
     "LocalImportFileImporter": ("file_importer", "LocalImportFileImporter"),
     "LocalImportQueueProcessor": ("queue", "LocalImportQueueProcessor"),
     "LocalImportTaskLogger": ("logger", "LocalImportTaskLogger"),
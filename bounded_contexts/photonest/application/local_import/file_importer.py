@@ -1,13 +1,17 @@
 """ローカルファイル取り込みのアプリケーションサービス."""
 from __future__ import annotations
 
+import os
 import shutil
 from dataclasses import dataclass
 from pathlib import Path
 from typing import Any, Dict, Iterable, List, Optional, Protocol
 
 from bounded_contexts.photonest.infrastructure.photo_models import Media, MediaPlayback, Tag
-from bounded_contexts.storage.infrastructure.filesystem import StorageService
+from bounded_contexts.storage.infrastructure.filesystem import (
+    LocalFilesystemStorageService,
+    StorageService,
+)
 from bounded_contexts.photonest.domain.local_import.entities import ImportFile, ImportOutcome
 from bounded_contexts.photonest.domain.local_import.logging import existing_media_destination_context, file_log_context
 from bounded_contexts.photonest.domain.local_import.media_entities import (
@@ -85,6 +89,24 @@ class TagResolver(Protocol):
         ...
 
 
+class StagedSourcePredicate(Protocol):
+    def __call__(self, file_path: str) -> bool:
+        ...
+
+
+class BlobStore(Protocol):
+    def place(self, source: str, destination: str, digest: str) -> str:
+        ...
+
+    def release(self, digest: Optional[str], *, still_referenced: bool) -> bool:
+        ...
+
+
+class BlobStoreResolver(Protocol):
+    def __call__(self, originals_dir: str) -> Optional[BlobStore]:
+        ...
+
+
 class Logger(Protocol):
     def info(self, event: str, message: str, *, session_id: Optional[str] = None, status: Optional[str] = None, **details: Any) -> None:
         ...
@@ -139,6 +161,8 @@ class LocalImportFileImporter:
         destination_storage: StorageService,
         playback_policy: Optional[PlaybackFailurePolicy] = None,
         tag_resolver: Optional[TagResolver] = None,
+        staged_source_predicate: Optional[StagedSourcePredicate] = None,
+        blob_store_resolver: Optional[BlobStoreResolver] = None,
     ) -> None:
         self._db = db
         self._logger = logger
@@ -154,16 +178,79 @@ class LocalImportFileImporter:
         self._source_storage = source_storage
         self._destination_storage = destination_storage
         self._tag_resolver = tag_resolver
+        self._staged_source_predicate = staged_source_predicate
+        self._blob_store_resolver = blob_store_resolver
+
+    def _can_relocate(self, source_path: str) -> bool:
+        return (
+            self._staged_source_predicate is not None
+            and isinstance(self._source_storage, LocalFilesystemStorageService)
+            and isinstance(self._destination_storage, LocalFilesystemStorageService)
+            and self._staged_source_predicate(source_path)
+        )
+
+    def _blob_store_for(self, originals_dir: str) -> Optional[BlobStore]:
+        if (
+            self._blob_store_resolver is None
+            or not isinstance(self._source_storage, LocalFilesystemStorageService)
+            or not isinstance(self._destination_storage, LocalFilesystemStorageService)
+        ):
+            return None
+        return self._blob_store_resolver(originals_dir)
+
+    def _place_in_blob_store(
+        self,
+        blob_store: BlobStore,
+        source_path: str,
+        destination_path: str,
+        digest: str,
+        file_context: Dict[str, Any],
+        session_id: Optional[str],
+    ) -> Optional[str]:
+        """内容を blob 経由で保存先へ配置し、配置方法（hardlink 等）を返す.
+
+        blob ストアが使えない（権限・容量など）場合は ``None`` を返し、従来の
+        コピーに任せる。
+        """
+
+        try:
+            return blob_store.place(source_path, destination_path, digest)
+        except OSError as exc:
+            self._logger.warning(
+                "local_import.file.blob_store_failed",
+                "blob ストアへの配置に失敗したためコピーで保存します",
+                **file_context,
+                destination=destination_path,
+                error_type=type(exc).__name__,
+                error_message=str(exc),
+                session_id=session_id,
+                status="warning",
+            )
+            return None
+
+    def _copy_to_destination(self, source_path: str, destination_path: str) -> bool:
+        """*source_path* を保存先へ配置し、移動（rename）で済ませた場合は ``True`` を返す.
+
+        ZIP から保存先と同じファイルシステムへ直接書き出したメンバーは
+        コピーせずに rename する。別デバイスなどで rename できなければコピーする。
+        """
+
+        if self._can_relocate(source_path):
+            try:
+                os.replace(source_path, destination_path)
+                return True
+            except OSError:
+                pass
 
-    def _copy_to_destination(self, source_path: str, destination_path: str) -> None:
         if self._source_storage is self._destination_storage:
             self._destination_storage.copy(source_path, destination_path)
-            return
+            return False
 
         with self._source_storage.open(source_path, "rb") as src, self._destination_storage.open(
             destination_path, "wb"
         ) as dst:
             shutil.copyfileobj(src, dst)
+        return False
 
     def import_file(
         self,
@@ -530,7 +617,13 @@ class LocalImportFileImporter:
         dest_path = self._destination_storage.join(originals_dir, rel_path)
 
         self._destination_storage.ensure_parent(dest_path)
-        self._copy_to_destination(file_path, dest_path)
+        blob_store = self._blob_store_for(originals_dir)
+        placement = None
+        if blob_store is not None:
+            placement = self._place_in_blob_store(
+                blob_store, file_path, dest_path, analysis.file_hash, file_context, session_id
+            )
+        relocated = False if placement else self._copy_to_destination(file_path, dest_path)
         self._logger.info(
             "local_import.file.copied",
             "ファイルを保存先にコピーしました",
@@ -540,36 +633,26 @@ class LocalImportFileImporter:
             imported_filename=imported_filename,
             session_id=session_id,
             status="copied",
+            relocated=relocated,
+            placement=placement,
         )
-
-        aggregate = build_media_item_from_analysis(analysis)
-        self._db.session.add(aggregate.media_item)
-        if aggregate.photo_metadata is not None:
-            self._db.session.add(aggregate.photo_metadata)
-        if aggregate.video_metadata is not None:
-            self._db.session.add(aggregate.video_metadata)
-        self._db.session.flush()
-
-        media = build_media_from_analysis(
-            analysis,
-            google_media_id=aggregate.media_item.id,
-            relative_path=rel_path,
-        )
-        self._db.session.add(media)
-        self._db.session.flush()
-
-        exif_model = ensure_exif_for_media(media, analysis)
-        if exif_model is not None:
-            self._db.session.add(exif_model)
-
-        directory_tags = self._resolve_directory_tags(file_path)
-        if directory_tags:
-            for tag in directory_tags:
-                if tag not in media.tags:
-                    media.tags.append(tag)
-            self._db.session.flush()
-
-        self._db.session.commit()
+        try:
+            media = self._persist_new_media(analysis, file_path, rel_path)
+        except Exception:
+            if relocated:
+                # コミット前に失敗した場合は移動した元ファイルを戻し、再試行できるようにする
+                try:
+                    os.replace(dest_path, file_path)
+                except OSError:
+                    pass
+            elif placement:
+                # 元ファイルは残っているので、作ったリンクと参照の無い blob を片付ける
+                try:
+                    os.remove(dest_path)
+                    blob_store.release(analysis.file_hash, still_referenced=False)
+                except OSError:
+                    pass
+            raise
 
         post_process_result = self._post_process_service(
             media,
@@ -587,7 +670,8 @@ class LocalImportFileImporter:
                 media, post_process_result or {}, outcome, file_context, session_id
             )
 
-        self._remove_source_file(file_path, file_context, session_id)
+        if not relocated:
+            self._remove_source_file(file_path, file_context, session_id)
 
         outcome.details.update(
             {
@@ -625,6 +709,37 @@ class LocalImportFileImporter:
         )
         return outcome.as_dict()
 
+    def _persist_new_media(self, analysis, file_path: str, rel_path: str) -> Media:
+        aggregate = build_media_item_from_analysis(analysis)
+        self._db.session.add(aggregate.media_item)
+        if aggregate.photo_metadata is not None:
+            self._db.session.add(aggregate.photo_metadata)
+        if aggregate.video_metadata is not None:
+            self._db.session.add(aggregate.video_metadata)
+        self._db.session.flush()
+
+        media = build_media_from_analysis(
+            analysis,
+            google_media_id=aggregate.media_item.id,
+            relative_path=rel_path,
+        )
+        self._db.session.add(media)
+        self._db.session.flush()
+
+        exif_model = ensure_exif_for_media(media, analysis)
+        if exif_model is not None:
+            self._db.session.add(exif_model)
+
+        directory_tags = self._resolve_directory_tags(file_path)
+        if directory_tags:
+            for tag in directory_tags:
+                if tag not in media.tags:
+                    media.tags.append(tag)
+            self._db.session.flush()
+
+        self._db.session.commit()
+        return media
+
     def _validate_playback(
         self,
         media: Media,
@@ -4,7 +4,7 @@ from __future__ import annotations
 import os
 import uuid
 from datetime import datetime, timezone
-from typing import Any, Dict, Iterable, Optional
+from typing import Any, Dict, Iterable, Iterator, List, Optional
 
 from bounded_contexts.photonest.infrastructure.photo_models import (
     Media,
@@ -17,6 +17,20 @@ from bounded_contexts.photonest.domain.local_import.logging import file_log_cont
 from bounded_contexts.photonest.domain.local_import.import_result import ImportTaskResult
 
 
+_ENQUEUE_CHUNK_SIZE = 500
+
+
+def _chunked(items: Iterable[str], size: int) -> Iterator[List[str]]:
+    chunk: List[str] = []
+    for item in items:
+        chunk.append(item)
+        if len(chunk) >= size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
 class LocalImportQueueProcessor:
     """Selection キューを処理するアプリケーションサービス."""
 
@@ -48,11 +62,42 @@ class LocalImportQueueProcessor:
         active_session_id: Optional[str],
         celery_task_id: Optional[str],
     ) -> int:
-        if not session or not file_paths:
+        if not session or file_paths is None:
             return 0
 
         now = datetime.now(timezone.utc)
-        paths = list(file_paths)
+        enqueued = 0
+        # 走査結果はストリームで受け取り、既存 Selection の照会を
+        # ``_ENQUEUE_CHUNK_SIZE`` 件ずつにまとめる（全件をリスト化しない）。
+        for paths in _chunked(file_paths, _ENQUEUE_CHUNK_SIZE):
+            enqueued += self._enqueue_chunk(
+                session,
+                paths,
+                now=now,
+                active_session_id=active_session_id,
+                celery_task_id=celery_task_id,
+            )
+
+        self._logger.commit_with_error_logging(
+            self._db,
+            "local_import.selection.commit_failed",
+            "Selectionの状態保存に失敗",
+            session_id=active_session_id,
+            celery_task_id=celery_task_id,
+            session_db_id=getattr(session, "id", None),
+            enqueued=enqueued,
+        )
+        return enqueued
+
+    def _enqueue_chunk(
+        self,
+        session,
+        paths: List[str],
+        *,
+        now: datetime,
+        active_session_id: Optional[str],
+        celery_task_id: Optional[str],
+    ) -> int:
         existing: Dict[str, PickerSelection] = {}
         selections = (
             PickerSelection.query.filter(
@@ -125,15 +170,6 @@ class LocalImportQueueProcessor:
                     celery_task_id=celery_task_id,
                 )
 
-        self._logger.commit_with_error_logging(
-            self._db,
-            "local_import.selection.commit_failed",
-            "Selectionの状態保存に失敗",
-            session_id=active_session_id,
-            celery_task_id=celery_task_id,
-            session_db_id=getattr(session, "id", None),
-            enqueued=enqueued,
-        )
         return enqueued
 
     def pending_query(self, session):
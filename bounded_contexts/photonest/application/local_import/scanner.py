@@ -1,11 +1,110 @@
 """ローカルインポートの入力ディレクトリを走査するサービス."""
 from __future__ import annotations
 
-from pathlib import Path
-from typing import Iterable, List, Optional
+import os
+import time
+from typing import Callable, Iterable, Iterator, List, Optional, Tuple
 
-from bounded_contexts.storage.infrastructure.filesystem import StorageService
-from bounded_contexts.photonest.domain.local_import.logging import file_log_context
+from bounded_contexts.storage.infrastructure.filesystem import (
+    LocalFilesystemStorageService,
+    StorageService,
+)
+from bounded_contexts.photonest.infrastructure.local_import.scan_manifest import (
+    ScanManifestEntry,
+    SqliteScanManifest,
+)
+
+_SAMPLE_LIMIT = 5
+
+
+class ImportScanStream:
+    """走査結果のファイルパスを逐次返すイテラブル.
+
+    反復の進行に合わせて件数を集計し、反復を終えた時点で
+    ``local_import.scan.summary`` を 1 件だけ記録する。反復は 1 回のみ。
+
+    マニフェストの更新は反復を終えても確定しない。呼び出し側が走査結果の
+    キュー登録をコミットした後に :meth:`commit_manifest` を呼ぶ。途中で終わった
+    反復・確定しなかった走査の更新は :meth:`discard_manifest` で捨てる。
+    """
+
+    def __init__(
+        self,
+        scanner: "ImportDirectoryScanner",
+        import_dir: str,
+        *,
+        session_id: Optional[str],
+        manifest: Optional[SqliteScanManifest],
+    ) -> None:
+        self._scanner = scanner
+        self._import_dir = import_dir
+        self._session_id = session_id
+        self._manifest = manifest
+        self._consumed = False
+        self._scanned = False
+        self.yielded = 0
+        self.unchanged = 0
+        self.unsupported = 0
+        self.archives = 0
+        self.samples: List[str] = []
+        self.elapsed_ms = 0
+
+    @property
+    def session_id(self) -> Optional[str]:
+        return self._session_id
+
+    @property
+    def manifest(self) -> Optional[SqliteScanManifest]:
+        return self._manifest
+
+    def commit_manifest(self) -> None:
+        """最後まで走査していればマニフェストの更新を確定する（キュー登録の確定後に呼ぶ）."""
+
+        if self._manifest is not None:
+            self._manifest.finish(complete=self._scanned)
+
+    def discard_manifest(self) -> None:
+        """未確定のマニフェスト更新を捨てる（確定済みなら何もしない）."""
+
+        if self._manifest is not None:
+            self._manifest.finish(complete=False)
+
+    def __iter__(self) -> Iterator[str]:
+        if self._consumed:
+            raise RuntimeError("ImportScanStream can only be iterated once")
+        self._consumed = True
+        return self._iterate()
+
+    def _iterate(self) -> Iterator[str]:
+        started = time.monotonic()
+        complete = False
+        if self._manifest is not None:
+            self._manifest.begin()
+        try:
+            for path in self._scanner._iter_targets(self._import_dir, self):
+                self.yielded += 1
+                if len(self.samples) < _SAMPLE_LIMIT:
+                    self.samples.append(path)
+                yield path
+            complete = True
+            self._scanned = True
+        finally:
+            if not complete:
+                self.discard_manifest()
+            self.elapsed_ms = int((time.monotonic() - started) * 1000)
+            self._scanner._logger.info(
+                "local_import.scan.summary",
+                "取り込みディレクトリの走査結果",
+                session_id=self._session_id,
+                status="scanned" if complete else "interrupted",
+                import_dir=self._import_dir,
+                total=self.yielded,
+                unchanged=self.unchanged,
+                unsupported=self.unsupported,
+                archives=self.archives,
+                incremental=self._manifest is not None,
+                elapsed_ms=self.elapsed_ms,
+            )
 
 
 class ImportDirectoryScanner:
@@ -18,56 +117,117 @@ class ImportDirectoryScanner:
         zip_service,
         supported_extensions: Iterable[str],
         storage_service: StorageService,
+        manifest_factory: Optional[Callable[[str], SqliteScanManifest]] = None,
     ) -> None:
         self._logger = logger
         self._zip_service = zip_service
         self._supported_extensions = {ext.lower() for ext in supported_extensions}
         self._source_storage = storage_service
+        self._manifest_factory = manifest_factory
 
     def scan(self, import_dir: str, *, session_id: Optional[str] = None) -> List[str]:
-        files: List[str] = []
-        if not self._source_storage.exists(import_dir):
-            return files
-
-        for root, _, filenames in self._source_storage.walk(import_dir):
-            for filename in filenames:
-                file_path = self._source_storage.join(root, filename)
-                file_extension = Path(filename).suffix.lower()
-                file_context = file_log_context(file_path, filename)
-
-                if file_extension in self._supported_extensions:
-                    files.append(file_path)
-                    self._logger.info(
-                        "local_import.scan.file_added",
-                        "取り込み対象ファイルを検出",
-                        session_id=session_id,
-                        status="scanning",
-                        **file_context,
-                        extension=file_extension,
-                    )
-                elif file_extension == ".zip":
-                    self._logger.info(
-                        "local_import.scan.zip_detected",
-                        "ZIPファイルを検出",
-                        session_id=session_id,
-                        status="processing",
-                        zip_path=file_path,
-                    )
-                    extracted = self._zip_service.extract(
-                        file_path, session_id=session_id
-                    )
-                    files.extend(extracted)
-                else:
-                    self._logger.info(
-                        "local_import.scan.unsupported",
-                        "サポート対象外のファイルをスキップ",
-                        session_id=session_id,
-                        status="skipped",
-                        **file_context,
-                        extension=file_extension,
-                    )
+        """全ファイルを対象に走査し、結果をリストで返す（マニフェストは使わない）."""
+
+        return list(self.stream(import_dir, session_id=session_id, incremental=False))
 
-        return files
+    def stream(
+        self,
+        import_dir: str,
+        *,
+        session_id: Optional[str] = None,
+        incremental: bool = True,
+    ) -> ImportScanStream:
+        """取り込み対象を逐次返すストリームを作る.
+
+        *incremental* が真でマニフェストが構成されていれば、前回走査から
+        変化していないファイル（ZIP を含む）を読み飛ばす。
+        """
+
+        manifest = None
+        if incremental and self._manifest_factory is not None and self._supports_stat():
+            manifest = self._manifest_factory(import_dir)
+        return ImportScanStream(self, import_dir, session_id=session_id, manifest=manifest)
 
     def cleanup(self) -> None:
         self._zip_service.cleanup()
+
+    # ------------------------------------------------------------------
+    # 内部処理
+    # ------------------------------------------------------------------
+    def _supports_stat(self) -> bool:
+        return isinstance(self._source_storage, LocalFilesystemStorageService)
+
+    def _iter_targets(self, import_dir: str, stream: ImportScanStream) -> Iterator[str]:
+        if not self._source_storage.exists(import_dir):
+            return
+
+        manifest = stream.manifest
+        # ストリーミング展開では ZIP を走査後にまとめて渡し、複数アーカイブを並行処理する
+        streaming_zips = self._zip_service.streaming_enabled
+        deferred_archives: List[str] = []
+        for file_path, filename, stat_result in self._iter_files(import_dir):
+            file_extension = os.path.splitext(filename)[1].lower()
+            is_archive = file_extension == ".zip"
+            if file_extension not in self._supported_extensions and not is_archive:
+                stream.unsupported += 1
+                continue
+
+            if manifest is not None and stat_result is not None:
+                if manifest.is_unchanged(file_path, ScanManifestEntry.from_stat(stat_result)):
+                    stream.unchanged += 1
+                    continue
+
+            if is_archive:
+                stream.archives += 1
+                self._logger.info(
+                    "local_import.scan.zip_detected",
+                    "ZIPファイルを検出",
+                    session_id=stream.session_id,
+                    status="processing",
+                    zip_path=file_path,
+                )
+                if streaming_zips:
+                    deferred_archives.append(file_path)
+                else:
+                    yield from self._zip_service.extract(file_path, session_id=stream.session_id)
+            else:
+                yield file_path
+
+        if deferred_archives:
+            yield from self._zip_service.stream_extract(
+                deferred_archives, session_id=stream.session_id
+            )
+
+    def _iter_files(
+        self, import_dir: str
+    ) -> Iterator[Tuple[str, str, Optional[os.stat_result]]]:
+        """``(path, filename, stat)`` を深さ優先で逐次返す."""
+
+        if not self._supports_stat():
+            for root, _, filenames in self._source_storage.walk(import_dir):
+                for filename in filenames:
+                    yield self._source_storage.join(root, filename), filename, None
+            return
+
+        pending = [import_dir]
+        while pending:
+            directory = pending.pop()
+            try:
+                with os.scandir(directory) as entries:
+                    for entry in entries:
+                        try:
+                            if entry.is_dir(follow_symlinks=False):
+                                pending.append(entry.path)
+                            elif entry.is_file():
+                                yield entry.path, entry.name, entry.stat()
+                        except OSError:
+                            # 走査中に削除・移動されたエントリは無視する
+                            continue
+            except OSError as exc:
+                self._logger.warning(
+                    "local_import.scan.directory_unreadable",
+                    "ディレクトリを読み取れないためスキップ",
+                    directory=directory,
+                    error_type=type(exc).__name__,
+                    error_message=str(exc),
+                )
@@ -91,6 +91,7 @@ class LocalImportUseCase:
             status="running",
         )
 
+        scan_stream = None
         try:
             if not self._ensure_directory_exists(
                 import_dir,
@@ -120,19 +121,30 @@ class LocalImportUseCase:
             ):
                 return result.to_dict()
 
-            files = self._scanner.scan(import_dir, session_id=active_session_id)
+            # 走査結果はリスト化せずにキュー登録へ流し込む（増分走査で未変更の
+            # ファイルはマニフェストにより読み飛ばされる）。マニフェストは
+            # キュー登録のコミット後に確定する（失敗時は finally で破棄）。
+            scan_stream = self._scanner.stream(import_dir, session_id=active_session_id)
+            enqueued_count = self._queue_processor.enqueue(
+                session,
+                scan_stream,
+                active_session_id=active_session_id,
+                celery_task_id=celery_task_id,
+            )
+            scan_stream.commit_manifest()
             self._logger.info(
                 "local_import.scan.complete",
                 "取り込み対象ファイルのスキャンが完了",
                 import_dir=import_dir,
-                total=len(files),
-                samples=files[:5],
+                total=scan_stream.yielded,
+                unchanged=scan_stream.unchanged,
+                samples=scan_stream.samples,
                 session_id=active_session_id,
                 celery_task_id=celery_task_id,
                 status="scanned",
             )
 
-            total_files = len(files)
+            total_files = scan_stream.yielded
             if total_files == 0:
                 self._handle_no_files(
                     result,
@@ -143,13 +155,6 @@ class LocalImportUseCase:
                 )
                 return result.to_dict()
 
-            enqueued_count = self._queue_processor.enqueue(
-                session,
-                files,
-                active_session_id=active_session_id,
-                celery_task_id=celery_task_id,
-            )
-
             pending_total = 0
             if session:
                 pending_total = self._queue_processor.pending_query(session).count()
@@ -215,6 +220,8 @@ class LocalImportUseCase:
                 exc_info=True,
             )
         finally:
+            if scan_stream is not None:
+                scan_stream.discard_manifest()
             try:
                 self._scanner.cleanup()
             except Exception:
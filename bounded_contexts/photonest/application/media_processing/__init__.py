@@ -6,6 +6,7 @@ from .post_processing_service import MediaPostProcessingService
 from .retry_monitor import ThumbnailRetryMonitorService
 from .retry_service import ThumbnailRetryService
 from .thumbnail_service import ThumbnailGenerationService
+from .transcode_scheduler import TranscodeProgressTracker, TranscodeScheduler
 
 __all__ = [
     "MediaPlaybackService",
@@ -14,4 +15,6 @@ __all__ = [
     "ThumbnailGenerationService",
     "ThumbnailRetryMonitorService",
     "ThumbnailRetryService",
+    "TranscodeProgressTracker",
+    "TranscodeScheduler",
 ]
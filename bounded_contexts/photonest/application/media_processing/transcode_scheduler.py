@@ -0,0 +1,128 @@
+"""動画変換ジョブのスレッド予算割り当てと区間並列実行を調停する."""
+
+from __future__ import annotations
+
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Callable, Iterator, List, Optional, Sequence, TypeVar
+
+from bounded_contexts.photonest.domain.media_processing import (
+    TranscodeBudgetPolicy,
+    TranscodeJobProfile,
+    TranscodePlan,
+)
+from bounded_contexts.photonest.infrastructure.media_processing.transcode_runtime import (
+    HostTranscodeSlotRegistry,
+    detect_host_cores,
+)
+from shared.kernel.settings.settings import ApplicationSettings, settings
+
+T = TypeVar("T")
+
+
+class TranscodeProgressTracker:
+    """区間ごとの ffmpeg 進捗を集約し、一定刻みで通知する.
+
+    ``report`` はセグメントを並列エンコードするスレッドから呼ばれるため
+    内部状態はロックで保護する。通知は ``step_percent`` を跨いだときだけ
+    行い、DB ログ（worker_log）の行数が進捗で膨らまないようにする。
+    """
+
+    def __init__(
+        self,
+        *,
+        total_ms: Optional[int],
+        segments: int = 1,
+        notify: Callable[[int, int], None],
+        step_percent: int = 10,
+    ) -> None:
+        self._total_ms = total_ms if total_ms and total_ms > 0 else None
+        self._positions: List[int] = [0] * max(1, segments)
+        self._notify = notify
+        self._step = max(1, step_percent)
+        self._last_bucket = 0
+        self._lock = threading.Lock()
+
+    def reporter(self, segment_index: int = 0) -> Callable[[int], None]:
+        """*segment_index* 番目の区間用の ``on_progress`` コールバックを返す."""
+
+        def _report(out_time_ms: int) -> None:
+            self.report(segment_index, out_time_ms)
+
+        return _report
+
+    def report(self, segment_index: int, out_time_ms: int) -> None:
+        if self._total_ms is None:
+            return
+        with self._lock:
+            self._positions[segment_index] = max(0, out_time_ms)
+            done_ms = min(sum(self._positions), self._total_ms)
+            percent = int(done_ms * 100 / self._total_ms)
+            bucket = percent - percent % self._step
+            if bucket <= self._last_bucket:
+                return
+            self._last_bucket = bucket
+        self._notify(bucket, done_ms)
+
+
+class TranscodeScheduler:
+    """ホスト全体の変換負荷を考慮して ffmpeg のスレッド数と並列度を決める."""
+
+    def __init__(
+        self,
+        *,
+        policy: TranscodeBudgetPolicy,
+        registry: HostTranscodeSlotRegistry,
+        fixed_threads: Optional[int] = None,
+    ) -> None:
+        self._policy = policy
+        self._registry = registry
+        self._fixed_threads = fixed_threads if fixed_threads and fixed_threads > 0 else None
+
+    @classmethod
+    def from_settings(cls, config: ApplicationSettings = settings) -> "TranscodeScheduler":
+        policy = TranscodeBudgetPolicy(
+            host_cores=detect_host_cores(),
+            max_parallel_jobs=max(1, config.transcode_max_parallel_jobs),
+            segment_threshold_ms=config.transcode_segment_threshold_seconds * 1000,
+        )
+        registry = HostTranscodeSlotRegistry(Path(config.tmp_directory) / "transcode_slots")
+        return cls(
+            policy=policy,
+            registry=registry,
+            fixed_threads=config.transcode_threads,
+        )
+
+    @contextmanager
+    def reserve(self, *, key: str, profile: TranscodeJobProfile) -> Iterator[TranscodePlan]:
+        """実行計画を決めてスレッド枠を確保し、ブロックを抜けると解放する."""
+
+        chosen: List[TranscodePlan] = []
+
+        def _decide(reserved_by_others: int) -> int:
+            if self._fixed_threads is not None:
+                plan = TranscodePlan(threads=self._fixed_threads)
+            else:
+                plan = self._policy.plan(profile, reserved_by_others=reserved_by_others)
+            chosen.append(plan)
+            return plan.reserved_threads
+
+        lease = self._registry.reserve(key, _decide)
+        try:
+            yield chosen[-1]
+        finally:
+            lease.release()
+
+    @staticmethod
+    def run_segments(plan: TranscodePlan, encode: Callable[[int], T]) -> Sequence[T]:
+        """``encode(segment_index)`` を区間数ぶん並列に実行し、順序通りに返す."""
+
+        if not plan.is_segmented:
+            return [encode(0)]
+        with ThreadPoolExecutor(
+            max_workers=plan.segments, thread_name_prefix="transcode-segment"
+        ) as pool:
+            return list(pool.map(encode, range(plan.segments)))
+
@@ -2,7 +2,6 @@
 
 from __future__ import annotations
 
-import hashlib
 import io
 import json
 import math
@@ -14,6 +13,7 @@ from typing import Any, Dict, Optional, Tuple
 from PIL import Image
 from PIL.ExifTags import TAGS
 
+from shared.kernel.file_hash import sha256_file
 from shared.kernel.utils import open_image_compat, register_heif_support
 
 register_heif_support()
@@ -25,17 +25,9 @@ except AttributeError:  # pragma: no cover - fallback for older Pillow
 
 
 def calculate_file_hash(file_path: str) -> str:
-    """ファイルのSHA-256ハッシュを計算"""
-
-    with open(file_path, "rb") as f:
-        # Python 3.11+ は C レベルループの file_digest を使う。
-        # pyproject.toml は >=3.10 を許容するため 3.10 では 1MiB チャンクで代替。
-        if hasattr(hashlib, "file_digest"):
-            return hashlib.file_digest(f, "sha256").hexdigest()
-        sha256_hash = hashlib.sha256()
-        while chunk := f.read(1024 * 1024):
-            sha256_hash.update(chunk)
-        return sha256_hash.hexdigest()
+    """ファイルのSHA-256ハッシュを計算（stat が変わっていなければキャッシュを使う）"""
+
+    return sha256_file(file_path)
 
 
 def get_image_dimensions(file_path: str) -> Tuple[Optional[int], Optional[int], Optional[int]]:
@@ -2,15 +2,24 @@
 
 from __future__ import annotations
 
+import hashlib
+import queue
 import shutil
 import tempfile
+import threading
 import uuid
 import zipfile
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path, PurePosixPath
-from typing import Callable, Dict, Iterable, List, Optional, Set
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Set, Tuple, cast
 
 from bounded_contexts.storage.infrastructure.filesystem import StorageService
 from bounded_contexts.storage import StorageDomain
+from shared.kernel.file_hash import record_sha256
+
+_STREAM_CHUNK_SIZE = 1024 * 1024
+_STREAM_QUEUE_DEPTH = 4
+
 
 class ZipExtractionError(Exception):
     """ZIP展開処理で致命的なエラーが発生した場合に送出。"""
@@ -26,6 +35,9 @@ class ZipArchiveService:
         log_error: Callable[..., None],
         supported_extensions: Iterable[str],
         storage_service: StorageService,
+        *,
+        staging_directory_resolver: Optional[Callable[[], Optional[str]]] = None,
+        stream_workers_resolver: Optional[Callable[[], int]] = None,
     ) -> None:
         self._log_info = log_info
         self._log_warning = log_warning
@@ -36,6 +48,10 @@ class ZipArchiveService:
         self._base_directory: Optional[Path] = None
         self._tags_by_extracted_path: Dict[str, List[str]] = {}
         self._files_by_directory: Dict[str, Set[str]] = {}
+        self._hashes_by_extracted_path: Dict[str, str] = {}
+        self._staging_directory_resolver = staging_directory_resolver
+        self._stream_workers_resolver = stream_workers_resolver
+        self._lock = threading.Lock()
 
     def _zip_extraction_base_dir(self) -> Path:
         if self._base_directory is not None:
@@ -58,10 +74,16 @@ class ZipArchiveService:
         self._base_directory = extraction_root
         return extraction_root
 
+    def _stream_workers(self) -> int:
+        if self._stream_workers_resolver is None:
+            return 1
+        return max(1, self._stream_workers_resolver())
+
     def _register_extracted_directory(self, path: Path) -> None:
         directory = str(path)
-        self._extracted_directories.append(directory)
-        self._files_by_directory.setdefault(directory, set())
+        with self._lock:
+            self._extracted_directories.append(directory)
+            self._files_by_directory.setdefault(directory, set())
 
     def cleanup(self) -> None:
         while self._extracted_directories:
@@ -82,6 +104,7 @@ class ZipArchiveService:
                 extracted = self._files_by_directory.pop(str(dir_path), set())
                 for file_path in extracted:
                     self._tags_by_extracted_path.pop(file_path, None)
+                    self._hashes_by_extracted_path.pop(file_path, None)
 
     def extract(self, zip_path: str, *, session_id: Optional[str] = None) -> List[str]:
         extracted_files: List[str] = []
@@ -101,9 +124,8 @@ class ZipArchiveService:
                     if member.is_dir():
                         continue
 
-                    normalized_name = (member.filename or "").replace("\\", "/")
-                    member_path = PurePosixPath(normalized_name)
-                    if member_path.is_absolute() or any(part == ".." for part in member_path.parts):
+                    member_path = _normalized_member_path(member)
+                    if member_path is None:
                         self._log_warning(
                             "local_import.zip.unsafe_member",
                             "ZIP内の危険なパスをスキップ",
@@ -126,26 +148,7 @@ class ZipArchiveService:
 
                     extracted_file = str(target_path)
                     extracted_files.append(extracted_file)
-                    self._files_by_directory[str(extraction_dir)].add(extracted_file)
-
-                    raw_tags = [
-                        part.strip()
-                        for part in member_path.parts[:-1]
-                        if part and part not in {".", ".."}
-                    ]
-                    seen: Set[str] = set()
-                    ordered_tags: List[str] = []
-                    for tag in raw_tags:
-                        normalized = tag.strip()
-                        if not normalized:
-                            continue
-                        key = normalized.lower()
-                        if key in seen:
-                            continue
-                        seen.add(key)
-                        ordered_tags.append(normalized)
-                    if ordered_tags:
-                        self._tags_by_extracted_path[extracted_file] = ordered_tags
+                    self._register_member(extraction_dir, extracted_file, member_path)
 
                     self._log_info(
                         "local_import.zip.member_extracted",
@@ -196,29 +199,239 @@ class ZipArchiveService:
                     status="skipped",
                 )
 
-        if should_remove_archive and self._storage.exists(zip_path):
-            try:
-                self._storage.remove(zip_path)
-                self._log_info(
-                    "local_import.zip.removed",
-                    "ZIPファイルを削除",
-                    zip_path=zip_path,
-                    session_id=session_id,
-                    status="cleaned",
-                )
-            except OSError as exc:
-                self._log_warning(
-                    "local_import.zip.remove_failed",
-                    "ZIPファイルの削除に失敗",
-                    zip_path=zip_path,
-                    error_type=type(exc).__name__,
-                    error_message=str(exc),
-                    session_id=session_id,
-                    status="warning",
-                )
+        if should_remove_archive:
+            self._remove_archive(zip_path, session_id=session_id)
 
         return extracted_files
 
+    def _remove_archive(self, zip_path: str, *, session_id: Optional[str]) -> None:
+        if not self._storage.exists(zip_path):
+            return
+        try:
+            self._storage.remove(zip_path)
+            self._log_info(
+                "local_import.zip.removed",
+                "ZIPファイルを削除",
+                zip_path=zip_path,
+                session_id=session_id,
+                status="cleaned",
+            )
+        except OSError as exc:
+            self._log_warning(
+                "local_import.zip.remove_failed",
+                "ZIPファイルの削除に失敗",
+                zip_path=zip_path,
+                error_type=type(exc).__name__,
+                error_message=str(exc),
+                session_id=session_id,
+                status="warning",
+            )
+
+    def _register_member(
+        self, extraction_dir: Path, extracted_file: str, member_path: PurePosixPath
+    ) -> None:
+        ordered_tags = _tags_from_member_path(member_path)
+        with self._lock:
+            self._files_by_directory[str(extraction_dir)].add(extracted_file)
+            if ordered_tags:
+                self._tags_by_extracted_path[extracted_file] = ordered_tags
+
+    # ------------------------------------------------------------------
+    # ストリーミング取り込み
+    # ------------------------------------------------------------------
+    @property
+    def streaming_enabled(self) -> bool:
+        """メンバーを保存先ファイルシステムへ直接書き出すモードが有効か."""
+
+        return self._staging_directory() is not None
+
+    def _staging_directory(self) -> Optional[Path]:
+        if self._staging_directory_resolver is None:
+            return None
+        staging = self._staging_directory_resolver()
+        return Path(staging) if staging else None
+
+    def stream_extract(
+        self,
+        zip_paths: Iterable[str],
+        *,
+        session_id: Optional[str] = None,
+    ) -> Iterator[str]:
+        """複数の ZIP からサポート対象メンバーを並行して書き出し、書き出した順に返す.
+
+        ``_zip`` への一時展開を経由せず、メンバーを保存先（originals）と同じ
+        ファイルシステム上のステージング領域へ 1 回だけ書き出す。書き出しと
+        同時に SHA-256 を計算して :meth:`hash_for` で参照できるようにするため、
+        取り込み側は再読込みせずにハッシュを得て、コピーではなく rename で
+        最終位置へ移動できる。ワーカーはログを出さず、ログ出力は呼び出し元
+        スレッドでまとめて行う。
+        """
+
+        archives = list(zip_paths)
+        staging_root = self._staging_directory()
+        if staging_root is None:
+            for zip_path in archives:
+                yield from self.extract(zip_path, session_id=session_id)
+            return
+        if not archives:
+            return
+
+        self._storage.ensure_directory(str(staging_root))
+        workers = max(1, min(len(archives), self._stream_workers()))
+        results: "queue.Queue[object]" = queue.Queue(maxsize=workers * _STREAM_QUEUE_DEPTH)
+        stop = threading.Event()
+
+        def _produce(zip_path: str) -> None:
+            outcome = _StreamedArchive(zip_path)
+            try:
+                if not stop.is_set():
+                    self._stream_archive(zip_path, staging_root, outcome, results, stop)
+            except Exception as exc:  # 呼び出し元でログに残す
+                outcome.error = exc
+            finally:
+                _offer(results, outcome, stop)
+
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="zip-stream") as pool:
+            for zip_path in archives:
+                pool.submit(_produce, zip_path)
+            remaining = len(archives)
+            try:
+                while remaining:
+                    item = results.get()
+                    if isinstance(item, _StreamedArchive):
+                        remaining -= 1
+                        self._finish_streamed_archive(item, session_id=session_id)
+                        continue
+                    extracted_file, zip_path, member_name = cast(Tuple[str, str, str], item)
+                    self._log_info(
+                        "local_import.zip.member_extracted",
+                        "ZIP内のファイルを抽出",
+                        session_id=session_id,
+                        status="extracted",
+                        zip_path=zip_path,
+                        member=member_name,
+                        extracted_path=extracted_file,
+                        streamed=True,
+                    )
+                    yield extracted_file
+            finally:
+                stop.set()
+
+    def _stream_archive(
+        self,
+        zip_path: str,
+        staging_root: Path,
+        outcome: "_StreamedArchive",
+        results: "queue.Queue[object]",
+        stop: threading.Event,
+    ) -> None:
+        extraction_dir = staging_root / f"{Path(zip_path).stem}_{uuid.uuid4().hex}"
+        self._storage.ensure_directory(str(extraction_dir))
+        self._register_extracted_directory(extraction_dir)
+
+        with zipfile.ZipFile(zip_path) as archive:
+            outcome.opened = True
+            for member in archive.infolist():
+                if stop.is_set():
+                    outcome.interrupted = True
+                    return
+                if member.is_dir():
+                    continue
+
+                member_path = _normalized_member_path(member)
+                if member_path is None:
+                    outcome.unsafe_members.append(member.filename)
+                    continue
+                if member_path.suffix.lower() not in self._supported_extensions:
+                    continue
+
+                target_path = extraction_dir.joinpath(*member_path.parts)
+                self._storage.ensure_directory(str(target_path.parent))
+                digest = hashlib.sha256()
+                with archive.open(member) as src, self._storage.open(
+                    str(target_path), "wb"
+                ) as dst:
+                    while chunk := src.read(_STREAM_CHUNK_SIZE):
+                        digest.update(chunk)
+                        dst.write(chunk)
+
+                extracted_file = str(target_path)
+                self._register_member(extraction_dir, extracted_file, member_path)
+                record_sha256(extracted_file, digest.hexdigest())
+                with self._lock:
+                    self._hashes_by_extracted_path[extracted_file] = digest.hexdigest()
+                outcome.extracted += 1
+                if not _offer(results, (extracted_file, zip_path, member.filename), stop):
+                    outcome.interrupted = True
+                    return
+
+    def _finish_streamed_archive(
+        self, outcome: "_StreamedArchive", *, session_id: Optional[str]
+    ) -> None:
+        zip_path = outcome.zip_path
+        for member_name in outcome.unsafe_members:
+            self._log_warning(
+                "local_import.zip.unsafe_member",
+                "ZIP内の危険なパスをスキップ",
+                zip_path=zip_path,
+                member=member_name,
+                session_id=session_id,
+            )
+
+        if isinstance(outcome.error, zipfile.BadZipFile):
+            self._log_error(
+                "local_import.zip.invalid",
+                "ZIPファイルの展開に失敗",
+                zip_path=zip_path,
+                error_type=type(outcome.error).__name__,
+                error_message=str(outcome.error),
+                session_id=session_id,
+            )
+        elif outcome.error is not None:
+            self._log_error(
+                "local_import.zip.extract_failed",
+                "ZIPファイル展開中にエラーが発生",
+                zip_path=zip_path,
+                error_type=type(outcome.error).__name__,
+                error_message=str(outcome.error),
+                session_id=session_id,
+            )
+        elif outcome.extracted:
+            self._log_info(
+                "local_import.zip.extracted",
+                "ZIPファイルを展開",
+                zip_path=zip_path,
+                extracted_count=outcome.extracted,
+                session_id=session_id,
+                status="extracted",
+                streamed=True,
+            )
+        elif not outcome.interrupted:
+            self._log_warning(
+                "local_import.zip.no_supported_files",
+                "ZIPファイルに取り込み対象ファイルがありません",
+                zip_path=zip_path,
+                session_id=session_id,
+                status="skipped",
+            )
+
+        # 途中で打ち切った ZIP は未処理のメンバーが残るため削除しない
+        if outcome.opened and not outcome.interrupted:
+            self._remove_archive(zip_path, session_id=session_id)
+
+    def hash_for(self, extracted_path: str) -> Optional[str]:
+        """ストリーミング書き出し時に計算した SHA-256 を返す（無ければ ``None``）."""
+
+        if not extracted_path:
+            return None
+        with self._lock:
+            return self._hashes_by_extracted_path.get(str(Path(extracted_path)))
+
+    def is_streamed_member(self, extracted_path: str) -> bool:
+        """*extracted_path* がステージング領域へ書き出したメンバーかどうか."""
+
+        return self.hash_for(extracted_path) is not None
+
     def tags_for(self, extracted_path: str) -> List[str]:
         """Return tag candidates derived from ZIP member directories."""
 
@@ -232,5 +445,61 @@ class ZipArchiveService:
         return list(tags)
 
 
+class _StreamedArchive:
+    """ストリーミング書き出しワーカーから呼び出し元へ返す ZIP 単位の結果."""
+
+    __slots__ = ("zip_path", "opened", "interrupted", "extracted", "unsafe_members", "error")
+
+    def __init__(self, zip_path: str) -> None:
+        self.zip_path = zip_path
+        self.opened = False
+        self.interrupted = False
+        self.extracted = 0
+        self.unsafe_members: List[str] = []
+        self.error: Optional[BaseException] = None
+
+
+def _offer(results: "queue.Queue[object]", item: object, stop: threading.Event) -> bool:
+    """呼び出し元が反復をやめていれば諦める ``put``."""
+
+    while True:
+        try:
+            results.put(item, timeout=0.1)
+            return True
+        except queue.Full:
+            if stop.is_set():
+                return False
+
+
+def _normalized_member_path(member: zipfile.ZipInfo) -> Optional[PurePosixPath]:
+    """メンバー名を POSIX パスへ正規化する（絶対パス・``..`` を含む場合は ``None``）."""
+
+    normalized_name = (member.filename or "").replace("\\", "/")
+    member_path = PurePosixPath(normalized_name)
+    if member_path.is_absolute() or any(part == ".." for part in member_path.parts):
+        return None
+    return member_path
+
+
+def _tags_from_member_path(member_path: PurePosixPath) -> List[str]:
+    raw_tags = [
+        part.strip()
+        for part in member_path.parts[:-1]
+        if part and part not in {".", ".."}
+    ]
+    seen: Set[str] = set()
+    ordered_tags: List[str] = []
+    for tag in raw_tags:
+        normalized = tag.strip()
+        if not normalized:
+            continue
+        key = normalized.lower()
+        if key in seen:
+            continue
+        seen.add(key)
+        ordered_tags.append(normalized)
+    return ordered_tags
+
+
 __all__ = ["ZipArchiveService", "ZipExtractionError"]
 
@@ -1,10 +1,35 @@
 """Media processing domain objects."""
 
+from .blurhash import BLURHASH_COMPONENTS, encode_blurhash
+from .hls_ladder import (
+    DEFAULT_HLS_LADDER,
+    HLS_INIT_SEGMENT,
+    HLS_MASTER_PLAYLIST,
+    HLS_SEGMENT_SECONDS,
+    HlsRendition,
+    select_hls_renditions,
+)
 from .retry_policy import ThumbnailRetryDecision, ThumbnailRetryPolicy
+from .thumbnail_manifest import ThumbnailManifest, ThumbnailVariant, thumbnail_format_for
+from .transcode_budget import TranscodeBudgetPolicy, TranscodeJobProfile, TranscodePlan
 from .value_objects import RetryBlockers
 
 __all__ = [
+    "BLURHASH_COMPONENTS",
+    "DEFAULT_HLS_LADDER",
+    "HLS_INIT_SEGMENT",
+    "HLS_MASTER_PLAYLIST",
+    "HLS_SEGMENT_SECONDS",
+    "HlsRendition",
     "RetryBlockers",
+    "ThumbnailManifest",
     "ThumbnailRetryDecision",
     "ThumbnailRetryPolicy",
+    "ThumbnailVariant",
+    "TranscodeBudgetPolicy",
+    "TranscodeJobProfile",
+    "TranscodePlan",
+    "encode_blurhash",
+    "select_hls_renditions",
+    "thumbnail_format_for",
 ]
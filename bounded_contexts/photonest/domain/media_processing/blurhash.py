@@ -0,0 +1,103 @@
+"""サムネイル読み込み前に表示するプレースホルダー（BlurHash）のエンコード.
+
+一覧・アルバムの JSON に 1 件あたり数十バイトの BlurHash 文字列を含め、
+クライアントはサムネイルが届くまでそれをぼかし画像として描画する。
+エンコードは https://github.com/woltapp/blurhash の仕様どおり（4×3 成分で
+28 文字）。入力は縮小済みの RGB 画素列で、画像ライブラリには依存しない。
+"""
+
+from __future__ import annotations
+
+import math
+from typing import List, Sequence, Tuple
+
+_BASE83 = "0123456789ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz#$%*+,-.:;=?@[]^_{|}~"
+
+BLURHASH_COMPONENTS = (4, 3)
+
+
+def _encode83(value: int, length: int) -> str:
+    return "".join(
+        _BASE83[(value // 83 ** (length - index - 1)) % 83] for index in range(length)
+    )
+
+
+def _srgb_to_linear(value: int) -> float:
+    v = value / 255.0
+    return v / 12.92 if v <= 0.04045 else ((v + 0.055) / 1.055) ** 2.4
+
+
+def _linear_to_srgb(value: float) -> int:
+    v = max(0.0, min(1.0, value))
+    if v <= 0.0031308:
+        return int(v * 12.92 * 255 + 0.5)
+    return int((1.055 * v ** (1 / 2.4) - 0.055) * 255 + 0.5)
+
+
+def _sign_pow(value: float, exponent: float) -> float:
+    return math.copysign(abs(value) ** exponent, value)
+
+
+def encode_blurhash(
+    pixels: bytes,
+    width: int,
+    height: int,
+    components: Tuple[int, int] = BLURHASH_COMPONENTS,
+) -> str:
+    """RGB 画素列（``width * height * 3`` バイト）を BlurHash 文字列にする.
+
+    計算量は画素数 × 成分数に比例するため、呼び出し側で 32px 程度に
+    縮小してから渡す。
+    """
+
+    x_components, y_components = components
+    if not (1 <= x_components <= 9 and 1 <= y_components <= 9):
+        raise ValueError("BlurHash components must be between 1 and 9")
+    if width <= 0 or height <= 0 or len(pixels) < width * height * 3:
+        raise ValueError("pixel data does not match the given size")
+
+    linear = [_srgb_to_linear(value) for value in range(256)]
+    cos_x = [[math.cos(math.pi * i * x / width) for x in range(width)] for i in range(x_components)]
+    cos_y = [[math.cos(math.pi * j * y / height) for y in range(height)] for j in range(y_components)]
+
+    factors: List[Tuple[float, float, float]] = []
+    for j in range(y_components):
+        for i in range(x_components):
+            r = g = b = 0.0
+            for y in range(height):
+                row = y * width * 3
+                basis_y = cos_y[j][y]
+                for x in range(width):
+                    basis = cos_x[i][x] * basis_y
+                    offset = row + x * 3
+                    r += basis * linear[pixels[offset]]
+                    g += basis * linear[pixels[offset + 1]]
+                    b += basis * linear[pixels[offset + 2]]
+            scale = (1 if i == 0 and j == 0 else 2) / (width * height)
+            factors.append((r * scale, g * scale, b * scale))
+
+    dc, ac = factors[0], factors[1:]
+    result = _encode83((x_components - 1) + (y_components - 1) * 9, 1)
+
+    if ac:
+        actual_max = max(abs(channel) for factor in ac for channel in factor)
+        quantised_max = max(0, min(82, int(math.floor(actual_max * 166 - 0.5))))
+        maximum = (quantised_max + 1) / 166
+        result += _encode83(quantised_max, 1)
+    else:
+        maximum = 1.0
+        result += _encode83(0, 1)
+
+    result += _encode83(
+        (_linear_to_srgb(dc[0]) << 16) + (_linear_to_srgb(dc[1]) << 8) + _linear_to_srgb(dc[2]), 4
+    )
+    for factor in ac:
+        quantised: Sequence[int] = [
+            max(0, min(18, int(math.floor(_sign_pow(channel / maximum, 0.5) * 9 + 9.5))))
+            for channel in factor
+        ]
+        result += _encode83(quantised[0] * 19 * 19 + quantised[1] * 19 + quantised[2], 2)
+    return result
+
+
+__all__ = ["BLURHASH_COMPONENTS", "encode_blurhash"]
@@ -0,0 +1,66 @@
+"""HLS（fMP4 セグメント）配信用の画質ラダーに関するドメイン定義."""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Optional, Sequence, Tuple
+
+
+@dataclass(frozen=True)
+class HlsRendition:
+    """HLS のバリアント（1 画質分のレンディション）を表す値オブジェクト.
+
+    ``max_height`` は縮小時の上限であり、元動画がそれより小さい場合に
+    拡大はしない。ビットレートは kbps 単位。
+    """
+
+    name: str
+    max_height: int
+    video_bitrate_kbps: int
+    audio_bitrate_kbps: int = 128
+
+    @property
+    def max_bitrate_kbps(self) -> int:
+        """VBV の上限ビットレート（平均の 1.07 倍、Apple の推奨範囲内）."""
+
+        return self.video_bitrate_kbps * 107 // 100
+
+    @property
+    def buffer_size_kbps(self) -> int:
+        return self.video_bitrate_kbps * 2
+
+
+DEFAULT_HLS_LADDER: Tuple[HlsRendition, ...] = (
+    HlsRendition(name="1080p", max_height=1080, video_bitrate_kbps=5000),
+    HlsRendition(name="720p", max_height=720, video_bitrate_kbps=2800),
+    HlsRendition(name="480p", max_height=480, video_bitrate_kbps=1200, audio_bitrate_kbps=96),
+)
+
+HLS_SEGMENT_SECONDS = 6
+HLS_MASTER_PLAYLIST = "master.m3u8"
+HLS_INIT_SEGMENT = "init.mp4"
+
+
+def select_hls_renditions(
+    source_height: Optional[int],
+    *,
+    ladder: Sequence[HlsRendition] = DEFAULT_HLS_LADDER,
+    minimum: int = 2,
+) -> Tuple[HlsRendition, ...]:
+    """元動画の高さに対して意味のあるレンディションを高画質順に返す.
+
+    元動画より高い解像度のレンディションは除外するが、帯域に応じた切り替えが
+    できるよう最低 *minimum* 本は残す（その場合は低画質側から補い、縮小上限で
+    頭打ちになるためビットレートだけが異なるレンディションになる）。
+    """
+
+    ordered = tuple(sorted(ladder, key=lambda r: r.max_height, reverse=True))
+    if not ordered:
+        raise ValueError("ladder must not be empty")
+    if not source_height or source_height <= 0:
+        return ordered
+
+    fitting = tuple(r for r in ordered if r.max_height <= source_height)
+    if len(fitting) >= minimum:
+        return fitting
+    return ordered[-max(minimum, 1):]
@@ -0,0 +1,155 @@
+"""メディアごとの生成済みサムネイル一覧（マニフェスト）に関するドメイン定義."""
+
+from __future__ import annotations
+
+from dataclasses import dataclass, field, replace
+from typing import Any, Dict, Iterable, Mapping, Optional
+
+_FORMAT_BY_SUFFIX = {
+    ".avif": "avif",
+    ".jpg": "jpeg",
+    ".jpeg": "jpeg",
+    ".png": "png",
+    ".webp": "webp",
+}
+
+
+def thumbnail_format_for(rel_path: str) -> str:
+    """サムネイルの相対パスの拡張子から形式名を返す."""
+
+    dot = rel_path.rfind(".")
+    suffix = rel_path[dot:].lower() if dot >= 0 else ""
+    return _FORMAT_BY_SUFFIX.get(suffix, suffix.lstrip(".") or "unknown")
+
+
+@dataclass(frozen=True)
+class ThumbnailVariant:
+    """1 サイズ分のサムネイル（形式とバイト数）.
+
+    パックファイルに格納されたものは ``pack``（``.packs`` からの相対パス）と
+    ``offset`` を持ち、バイト列はパック内の ``[offset, offset + bytes)`` にある。
+    """
+
+    format: str
+    bytes: int
+    pack: Optional[str] = None
+    offset: Optional[int] = None
+
+    @property
+    def packed(self) -> bool:
+        return self.pack is not None and self.offset is not None
+
+
+@dataclass(frozen=True)
+class ThumbnailManifest:
+    """メディアの生成済みサムネイルを表す不変値オブジェクト.
+
+    全サイズが ``<MEDIA_THUMBNAILS>/<size>/<rel_path>`` に置かれる前提で、
+    存在するサイズだけを ``variants`` に持つ。マニフェストがあるメディアは
+    ファイルシステムを調べずにサムネイルの有無とパスを決められる。
+    ``media.thumbnail_manifest`` には :meth:`to_raw` の辞書を JSON で保存する
+    （``None`` は未記録で、呼び出し側は従来どおりファイルを探す）。
+    """
+
+    rel_path: Optional[str]
+    variants: Mapping[int, ThumbnailVariant] = field(default_factory=dict)
+
+    @classmethod
+    def empty(cls) -> "ThumbnailManifest":
+        return cls(rel_path=None, variants={})
+
+    @classmethod
+    def from_raw(cls, raw: Any) -> Optional["ThumbnailManifest"]:
+        """``media.thumbnail_manifest`` の値から生成する（未記録・不正なら ``None``）."""
+
+        if not isinstance(raw, dict):
+            return None
+        sizes = raw.get("sizes")
+        if not isinstance(sizes, dict):
+            return None
+        variants: Dict[int, ThumbnailVariant] = {}
+        for key, value in sizes.items():
+            try:
+                size = int(key)
+                pack = value.get("pack")
+                variants[size] = ThumbnailVariant(
+                    format=str(value["fmt"]),
+                    bytes=int(value["bytes"]),
+                    pack=str(pack) if pack else None,
+                    offset=int(value["off"]) if pack else None,
+                )
+            except (KeyError, TypeError, ValueError):
+                continue
+        rel_path = raw.get("rel")
+        return cls(rel_path=str(rel_path) if rel_path and variants else None, variants=variants)
+
+    @classmethod
+    def from_sizes(cls, rel_path: str, byte_sizes: Mapping[int, int]) -> "ThumbnailManifest":
+        """相対パスとサイズごとのバイト数から生成する."""
+
+        fmt = thumbnail_format_for(rel_path)
+        variants = {int(size): ThumbnailVariant(format=fmt, bytes=int(n)) for size, n in byte_sizes.items()}
+        return cls(rel_path=rel_path if variants else None, variants=variants)
+
+    def to_raw(self) -> Dict[str, Any]:
+        sizes: Dict[str, Any] = {}
+        for size, variant in sorted(self.variants.items()):
+            entry: Dict[str, Any] = {"fmt": variant.format, "bytes": variant.bytes}
+            if variant.packed:
+                entry["pack"] = variant.pack
+                entry["off"] = variant.offset
+            sizes[str(size)] = entry
+        return {"rel": self.rel_path, "sizes": sizes}
+
+    def has(self, size: int) -> bool:
+        return self.rel_path is not None and size in self.variants
+
+    def largest(self, sizes: Iterable[int]) -> Optional[int]:
+        """*sizes* のうち生成済みで最大のものを返す."""
+
+        available = [size for size in sizes if self.has(size)]
+        return max(available) if available else None
+
+    def path_for(self, size: int) -> Optional[str]:
+        """``MEDIA_THUMBNAILS`` からの相対パス（``<size>/<rel_path>``）を返す.
+
+        パックに格納されたサイズは個別ファイルが無いため ``None``。
+        """
+
+        if not self.has(size) or self.variants[size].packed:
+            return None
+        return f"{size}/{self.rel_path}"
+
+    def packed_variant(self, size: int) -> Optional[ThumbnailVariant]:
+        """*size* がパックに格納されていればその ``ThumbnailVariant`` を返す."""
+
+        if not self.has(size) or not self.variants[size].packed:
+            return None
+        return self.variants[size]
+
+    def with_variant(
+        self,
+        rel_path: str,
+        size: int,
+        byte_size: int,
+        *,
+        pack: Optional[str] = None,
+        offset: Optional[int] = None,
+    ) -> "ThumbnailManifest":
+        """*size* を追加したマニフェストを返す（*rel_path* が変われば他のサイズは捨てる）."""
+
+        variants = dict(self.variants) if rel_path == self.rel_path else {}
+        variants[int(size)] = ThumbnailVariant(
+            format=thumbnail_format_for(rel_path),
+            bytes=int(byte_size),
+            pack=pack,
+            offset=offset if pack else None,
+        )
+        return replace(self, rel_path=rel_path, variants=variants)
+
+
+__all__ = [
+    "ThumbnailManifest",
+    "ThumbnailVariant",
+    "thumbnail_format_for",
+]
@@ -0,0 +1,115 @@
+"""動画変換のスレッド予算に関するドメインポリシー."""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Optional
+
+
+@dataclass(frozen=True)
+class TranscodeJobProfile:
+    """変換対象動画の規模（再生時間）を表す値オブジェクト."""
+
+    duration_ms: Optional[int] = None
+
+
+@dataclass(frozen=True)
+class TranscodePlan:
+    """1件の変換ジョブに割り当てる ffmpeg の実行計画.
+
+    ``threads`` は ffmpeg プロセス1本あたりの ``-threads`` 値、``segments`` は
+    並列にエンコードする区間数（1 なら分割しない）。ジョブ全体が確保する
+    コア数は ``threads * segments`` となる。
+    """
+
+    threads: int
+    segments: int = 1
+    segment_duration_ms: Optional[int] = None
+
+    @property
+    def reserved_threads(self) -> int:
+        return self.threads * self.segments
+
+    @property
+    def is_segmented(self) -> bool:
+        return self.segments > 1
+
+
+class TranscodeBudgetPolicy:
+    """ホストのコア数と同時実行数から変換ジョブのスレッド数を決定する.
+
+    - 通常ジョブは「コア数 ÷ 同時変換数」の公平分を上限に、空きコアの範囲で
+      スレッドを割り当てる（空きが無くても最低 1 スレッドで実行する）。
+    - 長尺（``segment_threshold_ms`` 以上）の動画は、ホストに空きコアがあれば
+      区間分割して複数プロセスで並列エンコードし、空いているワーカー枠を使う。
+    """
+
+    def __init__(
+        self,
+        *,
+        host_cores: int,
+        max_parallel_jobs: int,
+        segment_threshold_ms: int,
+        min_segment_ms: int = 60_000,
+        max_segments: int = 8,
+        max_threads_per_process: int = 16,
+    ) -> None:
+        if host_cores < 1:
+            raise ValueError("host_cores must be positive")
+        if max_parallel_jobs < 1:
+            raise ValueError("max_parallel_jobs must be positive")
+        if min_segment_ms < 1:
+            raise ValueError("min_segment_ms must be positive")
+        self._host_cores = host_cores
+        self._max_parallel_jobs = max_parallel_jobs
+        self._segment_threshold_ms = max(0, segment_threshold_ms)
+        self._min_segment_ms = min_segment_ms
+        self._max_segments = max(1, max_segments)
+        self._max_threads_per_process = max(1, max_threads_per_process)
+
+    @property
+    def host_cores(self) -> int:
+        return self._host_cores
+
+    @property
+    def fair_share(self) -> int:
+        """全変換枠が埋まっているときに1ジョブへ保証するスレッド数."""
+
+        return max(1, self._host_cores // self._max_parallel_jobs)
+
+    def plan(self, profile: TranscodeJobProfile, *, reserved_by_others: int = 0) -> TranscodePlan:
+        """*profile* と他ジョブの確保済みスレッド数から実行計画を返す."""
+
+        if reserved_by_others < 0:
+            raise ValueError("reserved_by_others must be >= 0")
+
+        free = max(0, self._host_cores - reserved_by_others)
+        fair = self.fair_share
+
+        if not self._is_large(profile) or free <= fair:
+            threads = min(fair, free, self._max_threads_per_process) or 1
+            return TranscodePlan(threads=threads)
+
+        duration_ms = int(profile.duration_ms or 0)
+        per_segment = min(fair, self._max_threads_per_process)
+        segments = min(
+            self._max_segments,
+            free // per_segment,
+            duration_ms // self._min_segment_ms,
+        )
+        if segments <= 1:
+            threads = min(free, self._max_threads_per_process)
+            return TranscodePlan(threads=max(1, threads))
+
+        threads = min(free // segments, self._max_threads_per_process)
+        segment_duration_ms = -(-duration_ms // segments)
+        return TranscodePlan(
+            threads=max(1, threads),
+            segments=segments,
+            segment_duration_ms=segment_duration_ms,
+        )
+
+    def _is_large(self, profile: TranscodeJobProfile) -> bool:
+        if not profile.duration_ms or self._segment_threshold_ms <= 0:
+            return False
+        return profile.duration_ms >= self._segment_threshold_ms
@@ -2,5 +2,6 @@
 from __future__ import annotations
 
 from .repository import SqlAlchemyAlbumRepository
+from .stats import album_ids_for_media, refresh_album_stats
 
-__all__ = ["SqlAlchemyAlbumRepository"]
+__all__ = ["SqlAlchemyAlbumRepository", "album_ids_for_media", "refresh_album_stats"]
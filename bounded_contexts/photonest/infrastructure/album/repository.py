@@ -12,6 +12,8 @@ from sqlalchemy.orm import selectinload
 from bounded_contexts.photonest.application.album.repository import AlbumRepository
 from bounded_contexts.photonest.infrastructure.photo_models import Album, Media, album_item
 
+from .stats import refresh_album_stats
+
 
 class SqlAlchemyAlbumRepository(AlbumRepository):
     """Flask-SQLAlchemy のセッションを用いた Album リポジトリ."""
@@ -88,6 +90,9 @@ class SqlAlchemyAlbumRepository(AlbumRepository):
             .all()
         )
 
+    def refresh_stats(self, album_id: int) -> None:
+        refresh_album_stats(self._session, [album_id])
+
     def flush(self) -> None:
         self._session.flush()
 
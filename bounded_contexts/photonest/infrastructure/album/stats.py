@@ -0,0 +1,97 @@
+"""アルバムの集計列（件数・表紙・撮影日の範囲）の再計算.
+
+アルバム一覧は以前、呼び出しのたびに ``album_item`` を全件 ``GROUP BY`` して
+件数と先頭メディアを求めていた。集計値は ``album`` 行に持たせ、収録メディアを
+変える処理（アルバムのユースケース・メディアの論理削除・復元）が同じ
+トランザクション内で :func:`refresh_album_stats` を呼んで更新する。
+取りこぼしや手作業の変更は ``albums.repair_stats`` タスクが定期的に直す。
+"""
+from __future__ import annotations
+
+from typing import Any, Iterable
+
+from sqlalchemy import func, select
+
+from bounded_contexts.photonest.infrastructure.photo_models import Album, Media, album_item
+
+
+def refresh_album_stats(session: Any, album_ids: Iterable[int]) -> int:
+    """*album_ids* の件数・表紙・撮影日の範囲を再計算し、変わったアルバム数を返す.
+
+    表紙が収録メディアに無い（未設定・外された）場合は並び順が先頭のメディアにする。
+    ``updated_at`` は変えない（集計値はユーザーの編集ではない）。
+    """
+
+    ids = sorted({int(album_id) for album_id in album_ids if album_id is not None})
+    if not ids:
+        return 0
+    session.flush()
+
+    stats = {
+        album_id: (count, shot_min, shot_max)
+        for album_id, count, shot_min, shot_max in session.execute(
+            select(
+                album_item.c.album_id,
+                func.count(album_item.c.media_id),
+                func.min(Media.shot_at),
+                func.max(Media.shot_at),
+            )
+            .select_from(album_item.join(Media, Media.id == album_item.c.media_id))
+            .where(album_item.c.album_id.in_(ids))
+            .group_by(album_item.c.album_id)
+        )
+    }
+    albums = session.query(Album).filter(Album.id.in_(ids)).all()
+    covers = {album.cover_media_id for album in albums if album.cover_media_id is not None}
+    valid_covers = (
+        set(
+            session.execute(
+                select(album_item.c.album_id, album_item.c.media_id).where(
+                    album_item.c.album_id.in_(ids), album_item.c.media_id.in_(covers)
+                )
+            ).all()
+        )
+        if covers
+        else set()
+    )
+
+    changed = 0
+    for album in albums:
+        count, shot_min, shot_max = stats.get(album.id, (0, None, None))
+        cover_id = album.cover_media_id
+        if not count:
+            cover_id = None
+        elif (album.id, cover_id) not in valid_covers:
+            cover_id = session.execute(
+                select(album_item.c.media_id)
+                .where(album_item.c.album_id == album.id)
+                .order_by(album_item.c.sort_index.asc(), album_item.c.media_id.asc())
+                .limit(1)
+            ).scalar()
+        values = {
+            "media_count": int(count),
+            "cover_media_id": cover_id,
+            "shot_at_min": shot_min,
+            "shot_at_max": shot_max,
+        }
+        if any(getattr(album, name) != value for name, value in values.items()):
+            for name, value in values.items():
+                setattr(album, name, value)
+            changed += 1
+    return changed
+
+
+def album_ids_for_media(session: Any, media_ids: Iterable[int]) -> list[int]:
+    """*media_ids* のいずれかを収録しているアルバムの ID を返す."""
+
+    ids = [int(media_id) for media_id in media_ids]
+    if not ids:
+        return []
+    return list(
+        session.execute(
+            select(album_item.c.album_id).where(album_item.c.media_id.in_(ids)).distinct()
+        ).scalars()
+    )
+
+
+__all__ = ["album_ids_for_media", "refresh_album_stats"]
@@ -0,0 +1,132 @@
+"""ライブラリ変更カウンタ（一覧 API の条件付き GET 用）。
+
+SPA はフォーカス復帰やポーリングのたびに ``GET /api/media``・``/api/albums``・
+``/api/tags``・``/api/media/duplicates`` を呼び、そのたびに ORM で集計・
+シリアライズし直していた。ここではメディア・タグ・アルバム（と中間テーブル）を
+変更したトランザクションのコミット時に Redis のカウンタ ``library_version`` を
+INCR する。一覧 API はこの値・クエリ・権限から ETag を作り、``If-None-Match``
+が一致すれば ORM に触れる前に 304 を返す。
+
+* 検知: ``after_flush`` で新規・変更・削除されたオブジェクトを、
+  ``do_orm_execute`` で ``update()`` / ``delete()`` / 中間テーブルへの
+  INSERT などの一括文を見る。生 SQL（``text()``）は対象外。
+* カウンタはワーカー（インポート）と API の全プロセスで共有する必要があるため
+  Redis に置く。``REDIS_URL`` が未設定・接続できない場合は ``None`` を返し、
+  一覧 API は ETag を付けず従来どおり毎回応答する（古い 304 を返さない）。
+"""
+from __future__ import annotations
+
+from typing import Any, Optional
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from shared.infrastructure.redis_client import LazyRedisClient
+
+LIBRARY_VERSION_KEY = "library_version"
+
+# 変更を監視するテーブル。一覧 API の応答に含まれるものだけ
+# （メディア一覧のアカウントのメールアドレスのため ``google_account`` も含む）。
+TRACKED_TABLES = frozenset({"media", "tag", "album", "media_tag", "album_item", "google_account"})
+
+_CHANGED_KEY = "library_version.changed"
+
+_redis = LazyRedisClient(
+    "Library version counter is unavailable",
+    event="library_version.redis_unavailable",
+)
+
+
+def current_library_version() -> Optional[int]:
+    """現在のライブラリ変更カウンタを返す（Redis を使えなければ ``None``）。"""
+    from redis.exceptions import RedisError
+
+    client = _redis.client()
+    if client is None:
+        return None
+    try:
+        raw = client.get(LIBRARY_VERSION_KEY)
+    except RedisError as exc:
+        _redis.mark_unavailable(exc)
+        return None
+    return int(raw or 0)
+
+
+def bump_library_version() -> Optional[int]:
+    """カウンタを 1 進めて新しい値を返す（Redis を使えなければ ``None``）。"""
+    from redis.exceptions import RedisError
+
+    client = _redis.client()
+    if client is None:
+        return None
+    try:
+        return int(client.incr(LIBRARY_VERSION_KEY))
+    except RedisError as exc:
+        # INCR に失敗したまま古い版で 304 を返さないよう、復旧まで ETag を止める
+        _redis.mark_unavailable(exc)
+        return None
+
+
+# ---------------------------------------------------------------------------
+# SQLAlchemy フック
+# ---------------------------------------------------------------------------
+
+
+def _is_tracked(obj: Any) -> bool:
+    table = getattr(obj, "__table__", None)
+    return table is not None and table.name in TRACKED_TABLES
+
+
+def _collect_changes(session: Session, flush_context: Any) -> None:
+    if session.info.get(_CHANGED_KEY):
+        return
+    for obj in list(session.new) + list(session.deleted):
+        if _is_tracked(obj):
+            session.info[_CHANGED_KEY] = True
+            return
+    for obj in session.dirty:
+        if _is_tracked(obj) and session.is_modified(obj):
+            session.info[_CHANGED_KEY] = True
+            return
+
+
+def _collect_bulk_changes(orm_execute_state: Any) -> None:
+    if orm_execute_state.is_select:
+        return
+    table = getattr(orm_execute_state.statement, "table", None)
+    if getattr(table, "name", None) in TRACKED_TABLES:
+        orm_execute_state.session.info[_CHANGED_KEY] = True
+
+
+def _bump_on_commit(session: Session) -> None:
+    if session.info.pop(_CHANGED_KEY, False):
+        bump_library_version()
+
+
+def _discard_changes(session: Session, *args: Any) -> None:
+    session.info.pop(_CHANGED_KEY, None)
+
+
+_listeners_registered = False
+
+
+def register_library_version_listeners() -> None:
+    """全 Session にカウンタ更新フックを登録する（多重登録しない）。"""
+    global _listeners_registered
+
+    if _listeners_registered:
+        return
+    event.listen(Session, "after_flush", _collect_changes)
+    event.listen(Session, "do_orm_execute", _collect_bulk_changes)
+    event.listen(Session, "after_commit", _bump_on_commit)
+    event.listen(Session, "after_rollback", _discard_changes)
+    _listeners_registered = True
+
+
+__all__ = [
+    "LIBRARY_VERSION_KEY",
+    "TRACKED_TABLES",
+    "bump_library_version",
+    "current_library_version",
+    "register_library_version_listeners",
+]
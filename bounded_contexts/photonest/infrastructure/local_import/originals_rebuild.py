@@ -0,0 +1,146 @@
+"""originals 再構築（``rebuild_media_from_originals``）用のファイル走査とチェックポイント.
+
+30 万件規模の originals を ``rglob`` + ``sorted`` で全件リスト化してから処理すると、
+走査が終わるまで 1 件も処理が始まらずメモリも件数に比例する。ここではディレクトリ
+単位で名前順に走査して 1 件ずつ返す（全体としてもパス成分の辞書順になる）。
+
+順序が決まっているため、確定済みの最後の相対パスだけを記録しておけば、中断後の
+再実行でそこまでのファイル（ディレクトリごと）を読み飛ばせる。チェックポイントは
+originals ディレクトリごとに 1 ファイルの SQLite に保存する。
+"""
+
+from __future__ import annotations
+
+import hashlib
+import os
+import sqlite3
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Collection, Iterator, Optional, Tuple
+
+
+def _path_key(rel_path: str) -> Tuple[str, ...]:
+    return tuple(rel_path.split("/"))
+
+
+def iter_original_files(
+    root: str | os.PathLike[str],
+    *,
+    extensions: Collection[str],
+    excluded_dirnames: Collection[str] = (),
+    resume_after: Optional[str] = None,
+) -> Iterator[Tuple[str, str]]:
+    """*root* 配下の対象ファイルを ``(相対パス, 絶対パス)`` でパス順に返す.
+
+    ``resume_after`` を指定すると、その相対パス以前のファイルは返さず、丸ごと
+    それ以前に並ぶディレクトリは中に入らない。``excluded_dirnames`` は
+    *root* 直下のディレクトリ名で、配下を走査しない。
+    """
+
+    resume_key = _path_key(resume_after) if resume_after else None
+    suffixes = {ext.lower() for ext in extensions}
+
+    def _walk(directory: str, prefix: Tuple[str, ...]) -> Iterator[Tuple[str, str]]:
+        try:
+            with os.scandir(directory) as iterator:
+                entries = sorted(iterator, key=lambda entry: entry.name)
+        except FileNotFoundError:
+            return
+
+        for entry in entries:
+            key = prefix + (entry.name,)
+            try:
+                is_dir = entry.is_dir(follow_symlinks=False)
+            except OSError:
+                continue
+
+            if is_dir:
+                if not prefix and entry.name in excluded_dirnames:
+                    continue
+                # 再開位置より前に並ぶディレクトリは中身もすべて処理済み
+                if resume_key is not None and key < resume_key[: len(key)]:
+                    continue
+                yield from _walk(entry.path, key)
+                continue
+
+            if resume_key is not None and key <= resume_key:
+                continue
+            if os.path.splitext(entry.name)[1].lower() not in suffixes:
+                continue
+            try:
+                if not entry.is_file():
+                    continue
+            except OSError:
+                continue
+            yield "/".join(key), entry.path
+
+    yield from _walk(os.fspath(root), ())
+
+
+class SqliteRebuildCheckpoint:
+    """originals 再構築の確定済み位置（最後にコミットした相対パス）を保存する.
+
+    :meth:`save` はバッチのコミット後に呼ぶ。走査を最後まで終えたら
+    :meth:`clear` で消し、次回は先頭から走査する。
+    """
+
+    _SCHEMA = (
+        "CREATE TABLE IF NOT EXISTS rebuild_checkpoint ("
+        " id INTEGER PRIMARY KEY CHECK (id = 1),"
+        " originals_dir TEXT NOT NULL,"
+        " last_rel_path TEXT NOT NULL,"
+        " updated_at REAL NOT NULL"
+        ")"
+    )
+
+    def __init__(self, path: Path, originals_dir: str) -> None:
+        self._path = Path(path)
+        self._originals_dir = os.path.abspath(originals_dir)
+
+    @classmethod
+    def for_directory(cls, checkpoint_dir: Path, originals_dir: str) -> "SqliteRebuildCheckpoint":
+        """*originals_dir* 用のチェックポイントを *checkpoint_dir* 配下に割り当てる."""
+
+        digest = hashlib.sha1(os.path.abspath(originals_dir).encode("utf-8")).hexdigest()
+        return cls(Path(checkpoint_dir) / f"{digest}.sqlite3", originals_dir)
+
+    @property
+    def path(self) -> Path:
+        return self._path
+
+    def load(self) -> Optional[str]:
+        """前回中断時の確定済み相対パスを返す（無ければ ``None``）."""
+
+        if not self._path.exists():
+            return None
+        with self._connect() as conn:
+            row = conn.execute(
+                "SELECT last_rel_path FROM rebuild_checkpoint WHERE id = 1 AND originals_dir = ?",
+                (self._originals_dir,),
+            ).fetchone()
+        return row[0] if row else None
+
+    def save(self, last_rel_path: str) -> None:
+        with self._connect() as conn:
+            conn.execute(
+                "INSERT INTO rebuild_checkpoint (id, originals_dir, last_rel_path, updated_at)"
+                " VALUES (1, ?, ?, ?)"
+                " ON CONFLICT(id) DO UPDATE SET originals_dir = excluded.originals_dir,"
+                " last_rel_path = excluded.last_rel_path, updated_at = excluded.updated_at",
+                (self._originals_dir, last_rel_path, time.time()),
+            )
+
+    def clear(self) -> None:
+        self._path.unlink(missing_ok=True)
+
+    @contextmanager
+    def _connect(self) -> Iterator[sqlite3.Connection]:
+        self._path.parent.mkdir(parents=True, exist_ok=True)
+        conn = sqlite3.connect(str(self._path))
+        try:
+            conn.execute(self._SCHEMA)
+            yield conn
+            conn.commit()
+        finally:
+            conn.close()
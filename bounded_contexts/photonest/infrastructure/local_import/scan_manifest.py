@@ -0,0 +1,152 @@
+"""取り込みディレクトリ走査結果のマニフェスト（前回走査時のファイル署名）.
+
+増分走査で「前回から変化していないファイル」を読み飛ばすため、パスごとに
+``(size, mtime_ns, inode)`` を記録する。取り込み成功・重複のファイルは
+取り込み元から削除されるため、ここに残り続けるのは失敗・未処理のファイルと
+ZIP である。一時的な失敗を永久に放置しないよう、記録から
+``rescan_after_seconds`` を過ぎたエントリは変化が無くても再度対象に戻す。
+
+1 取り込みディレクトリにつき 1 ファイルの SQLite に保存し、件数が多くても
+メモリへ全件を展開しない。
+"""
+
+from __future__ import annotations
+
+import hashlib
+import os
+import sqlite3
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Optional
+
+
+@dataclass(frozen=True)
+class ScanManifestEntry:
+    """ファイル変化の判定に使う署名."""
+
+    size: int
+    mtime_ns: int
+    inode: int
+
+    @classmethod
+    def from_stat(cls, stat_result: os.stat_result) -> "ScanManifestEntry":
+        return cls(
+            size=stat_result.st_size,
+            mtime_ns=stat_result.st_mtime_ns,
+            inode=stat_result.st_ino,
+        )
+
+
+class SqliteScanManifest:
+    """走査 1 回分のマニフェスト更新を SQLite ファイルへ反映する.
+
+    :meth:`begin` で世代を進め、走査中に見つかったパスへ現在の世代を付ける。
+    更新は 1 トランザクションにまとめ、走査結果のキュー登録まで確定した場合のみ
+    :meth:`finish` で今回見つからなかったエントリ（削除・取り込み済みのファイル）
+    を消してコミットする。途中で終わった走査の記録は捨てる（キューに載らなかった
+    ファイルを「変化なし」として読み飛ばさないため）。
+    """
+
+    _SCHEMA = (
+        "CREATE TABLE IF NOT EXISTS scan_manifest ("
+        " path TEXT PRIMARY KEY,"
+        " size INTEGER NOT NULL,"
+        " mtime_ns INTEGER NOT NULL,"
+        " inode INTEGER NOT NULL,"
+        " recorded_at REAL NOT NULL,"
+        " generation INTEGER NOT NULL"
+        ")"
+    )
+
+    def __init__(self, path: Path, *, rescan_after_seconds: int = 24 * 3600) -> None:
+        self._path = Path(path)
+        self._rescan_after = max(0, rescan_after_seconds)
+        self._conn: Optional[sqlite3.Connection] = None
+        self._generation = 0
+        self._started_at = 0.0
+
+    @classmethod
+    def for_directory(
+        cls,
+        manifest_dir: Path,
+        import_dir: str,
+        *,
+        rescan_after_seconds: int = 24 * 3600,
+    ) -> "SqliteScanManifest":
+        """*import_dir* 用のマニフェストを *manifest_dir* 配下に割り当てる."""
+
+        digest = hashlib.sha1(os.path.abspath(import_dir).encode("utf-8")).hexdigest()
+        return cls(
+            Path(manifest_dir) / f"{digest}.sqlite3",
+            rescan_after_seconds=rescan_after_seconds,
+        )
+
+    @property
+    def path(self) -> Path:
+        return self._path
+
+    def begin(self) -> None:
+        self._path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(str(self._path))
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(self._SCHEMA)
+        self._generation = time.time_ns()
+        self._started_at = time.time()
+
+    def is_unchanged(self, path: str, entry: ScanManifestEntry) -> bool:
+        """前回から変化が無く再走査期限内なら ``True`` を返し、世代を更新する.
+
+        変化していた（または未記録・期限切れの）場合は現在の署名で記録し直して
+        ``False`` を返す。
+        """
+
+        conn = self._require_connection()
+        row = conn.execute(
+            "SELECT size, mtime_ns, inode, recorded_at FROM scan_manifest WHERE path = ?",
+            (path,),
+        ).fetchone()
+        if (
+            row is not None
+            and (row[0], row[1], row[2]) == (entry.size, entry.mtime_ns, entry.inode)
+            and self._started_at - row[3] < self._rescan_after
+        ):
+            conn.execute(
+                "UPDATE scan_manifest SET generation = ? WHERE path = ?",
+                (self._generation, path),
+            )
+            return True
+
+        conn.execute(
+            "INSERT INTO scan_manifest (path, size, mtime_ns, inode, recorded_at, generation)"
+            " VALUES (?, ?, ?, ?, ?, ?)"
+            " ON CONFLICT(path) DO UPDATE SET size = excluded.size,"
+            " mtime_ns = excluded.mtime_ns, inode = excluded.inode,"
+            " recorded_at = excluded.recorded_at, generation = excluded.generation",
+            (path, entry.size, entry.mtime_ns, entry.inode, self._started_at, self._generation),
+        )
+        return False
+
+    def finish(self, *, complete: bool) -> None:
+        """接続を閉じる. *complete* なら未検出分を削除して確定し、そうでなければ破棄する."""
+
+        conn, self._conn = self._conn, None
+        if conn is None:
+            return
+        try:
+            if complete:
+                conn.execute(
+                    "DELETE FROM scan_manifest WHERE generation <> ?",
+                    (self._generation,),
+                )
+                conn.commit()
+            else:
+                conn.rollback()
+        finally:
+            conn.close()
+
+    def _require_connection(self) -> sqlite3.Connection:
+        if self._conn is None:
+            raise RuntimeError("scan manifest is not open; call begin() first")
+        return self._conn
@@ -0,0 +1,187 @@
+"""originals 配下の SHA-256 コンテンツアドレス blob ストア.
+
+同じ内容のファイルを取り込むたびに originals へバイト列をコピーしていたため、
+同じ Takeout の再取り込みや Picker とローカル取り込みの重複でディスクと I/O を
+消費していた。内容は ``originals/.blobs/ab/cd/<sha256>`` に 1 つだけ置き、
+日付ベースの論理パス（``local_rel_path``）は blob へのハードリンクまたは
+reflink（``FICLONE``、対応ファイルシステムのみ）として作る。取り込み元が同じ
+ファイルシステムにあれば blob 自体もリンクで作るため、取り込みはメタデータ操作だけ
+になる。
+
+参照数はハードリンクなら blob の ``st_nlink`` で分かる。reflink は独立した inode に
+なるため、呼び出し側が DB 上の参照有無を :meth:`ContentAddressedBlobStore.release`
+に渡す。blob を消しても論理パス側のデータは失われない（ハードリンクの他の名前・
+reflink のクローンはそれぞれ独立して残る）。
+"""
+from __future__ import annotations
+
+import errno
+import os
+import shutil
+import uuid
+from pathlib import Path
+from typing import Optional
+
+from shared.kernel.settings.settings import settings
+
+try:  # pragma: no cover - Windows には fcntl が無い
+    import fcntl
+except ImportError:  # pragma: no cover
+    fcntl = None  # type: ignore[assignment]
+
+BLOB_DIRNAME = ".blobs"
+
+LINK_MODE_HARDLINK = "hardlink"
+LINK_MODE_REFLINK = "reflink"
+
+PLACEMENT_HARDLINK = "hardlink"
+PLACEMENT_REFLINK = "reflink"
+PLACEMENT_COPY = "copy"
+
+# linux/fs.h: _IOW(0x94, 9, int)
+_FICLONE = 0x40049409
+
+
+def _temporary_sibling(path: Path) -> Path:
+    return path.with_name(f".{path.name}.{uuid.uuid4().hex}.tmp")
+
+
+def _reflink(source: Path, destination: Path) -> bool:
+    """*source* の reflink クローンを *destination* に作る（非対応なら ``False``）."""
+
+    if fcntl is None:
+        return False
+    try:
+        with open(source, "rb") as src, open(destination, "wb") as dst:
+            fcntl.ioctl(dst.fileno(), _FICLONE, src.fileno())
+        return True
+    except OSError:
+        destination.unlink(missing_ok=True)
+        return False
+
+
+def _hardlink(source: Path, destination: Path) -> bool:
+    try:
+        os.link(source, destination)
+        return True
+    except OSError as exc:
+        if exc.errno == errno.ENOENT and not source.exists():
+            raise
+        return False
+
+
+class ContentAddressedBlobStore:
+    """originals ルート配下の blob ディレクトリを管理する.
+
+    Args:
+        originals_dir: originals のルート。blob は ``<originals_dir>/.blobs`` に置く。
+        link_mode: 論理パスの作り方。``"reflink"`` は非対応ならハードリンクに落とす。
+    """
+
+    def __init__(self, originals_dir: str | os.PathLike[str], *, link_mode: str = LINK_MODE_HARDLINK) -> None:
+        self._root = Path(originals_dir) / BLOB_DIRNAME
+        self._link_mode = link_mode
+
+    @property
+    def root(self) -> Path:
+        return self._root
+
+    def blob_path(self, digest: str) -> Path:
+        digest = digest.lower()
+        return self._root / digest[:2] / digest[2:4] / digest
+
+    def place(self, source: str | os.PathLike[str], destination: str | os.PathLike[str], digest: str) -> str:
+        """*source*（SHA-256 が *digest*）の内容を *destination* に配置する.
+
+        blob が無ければ *source* から作り、*destination* は blob から作る。
+        *source* は変更・削除しない（取り込み元の削除は呼び出し側の責務）。
+
+        Returns:
+            ``"hardlink"`` / ``"reflink"`` / ``"copy"`` のいずれか（*destination* の作り方）。
+        """
+
+        source_path = Path(source)
+        destination_path = Path(destination)
+        blob = self.blob_path(digest)
+        # 別の取り込みが blob を解放した直後に当たった場合は作り直して 1 回だけやり直す
+        for attempt in range(2):
+            if not blob.exists():
+                self._ingest(source_path, blob)
+            try:
+                return self._materialize(blob, destination_path)
+            except FileNotFoundError:
+                if attempt:
+                    raise
+        raise AssertionError("unreachable")  # pragma: no cover
+
+    def release(self, digest: Optional[str], *, still_referenced: bool) -> bool:
+        """論理パスを消した後に呼び、参照が無くなった blob を削除して ``True`` を返す.
+
+        ``st_nlink`` が 2 以上（他の論理パスがハードリンク）または
+        *still_referenced*（DB 上に同じ内容の Media が残る）なら残す。
+        """
+
+        if not digest:
+            return False
+        blob = self.blob_path(digest)
+        try:
+            if still_referenced or blob.stat().st_nlink > 1:
+                return False
+            blob.unlink()
+        except FileNotFoundError:
+            return False
+        for directory in (blob.parent, blob.parent.parent):
+            try:
+                directory.rmdir()
+            except OSError:
+                break
+        return True
+
+    def _ingest(self, source: Path, blob: Path) -> None:
+        blob.parent.mkdir(parents=True, exist_ok=True)
+        temporary = _temporary_sibling(blob)
+        try:
+            if not (
+                (self._link_mode == LINK_MODE_REFLINK and _reflink(source, temporary))
+                or _hardlink(source, temporary)
+            ):
+                shutil.copyfile(source, temporary)
+            os.replace(temporary, blob)
+        finally:
+            temporary.unlink(missing_ok=True)
+
+    def _materialize(self, blob: Path, destination: Path) -> str:
+        destination.parent.mkdir(parents=True, exist_ok=True)
+        temporary = _temporary_sibling(destination)
+        try:
+            if self._link_mode == LINK_MODE_REFLINK and _reflink(blob, temporary):
+                placement = PLACEMENT_REFLINK
+            elif _hardlink(blob, temporary):
+                placement = PLACEMENT_HARDLINK
+            else:
+                shutil.copyfile(blob, temporary)
+                placement = PLACEMENT_COPY
+            os.replace(temporary, destination)
+            return placement
+        finally:
+            temporary.unlink(missing_ok=True)
+
+
+def blob_store_for(originals_dir: str | os.PathLike[str]) -> Optional[ContentAddressedBlobStore]:
+    """設定で有効なときだけ *originals_dir* の blob ストアを返す."""
+
+    if not settings.originals_blob_store_enabled:
+        return None
+    return ContentAddressedBlobStore(originals_dir, link_mode=settings.originals_blob_link_mode)
+
+
+__all__ = [
+    "BLOB_DIRNAME",
+    "ContentAddressedBlobStore",
+    "blob_store_for",
+    "LINK_MODE_HARDLINK",
+    "LINK_MODE_REFLINK",
+    "PLACEMENT_COPY",
+    "PLACEMENT_HARDLINK",
+    "PLACEMENT_REFLINK",
+]
@@ -2,8 +2,20 @@
 
 from .repositories import SqlAlchemyThumbnailRetryRepository
 from .scheduler import CeleryThumbnailRetryScheduler
+from .transcode_runtime import (
+    FfmpegRunResult,
+    HostTranscodeSlotRegistry,
+    TranscodeSlotLease,
+    detect_host_cores,
+    run_ffmpeg_with_progress,
+)
 
 __all__ = [
     "CeleryThumbnailRetryScheduler",
+    "FfmpegRunResult",
+    "HostTranscodeSlotRegistry",
     "SqlAlchemyThumbnailRetryRepository",
+    "TranscodeSlotLease",
+    "detect_host_cores",
+    "run_ffmpeg_with_progress",
 ]
@@ -0,0 +1,200 @@
+"""任意幅・形式の画像派生（レスポンシブ画像）の生成とディスク LRU キャッシュ.
+
+サムネイルは固定の 4 サイズ・AVIF だけのため、384px のタイルが欲しい
+クライアントは 512/1024 を取り寄せて縮小し、AVIF をデコードできない
+クライアントは表示できなかった。派生画像は原本ではなく、要求幅以上で
+最小の生成済みサムネイルから作る（原本より桁違いに小さく、向きの補正も
+済んでいる）。
+
+生成結果は容量上限付きのディスクキャッシュに置き、SQLite の索引で
+最終アクセス時刻を管理して上限を超えたら古いものから消す。索引と実ファイルが
+食い違っても（手動削除・書き込み途中の停止）、読み取り時に欠けた行を捨てて
+作り直すだけで済む。
+"""
+
+from __future__ import annotations
+
+import io
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from pathlib import Path
+from typing import BinaryIO, Dict, Optional, Tuple, Union
+
+from PIL import Image, ImageOps
+
+from bounded_contexts.photonest.tasks.thumbs_generate import AVIF_QUALITY
+from shared.kernel.settings.settings import settings
+from shared.kernel.utils import open_image_compat
+
+# 形式名 → (Content-Type, 拡張子, 既定の品質)
+IMAGE_FORMATS: Dict[str, Tuple[str, str, int]] = {
+    "avif": ("image/avif", ".avif", AVIF_QUALITY),
+    "webp": ("image/webp", ".webp", 80),
+    "jpeg": ("image/jpeg", ".jpg", 85),
+}
+MAX_DERIVATIVE_WIDTH = 2048
+QUALITY_RANGE = (30, 95)
+
+_INDEX_FILENAME = "index.sqlite3"
+
+
+def render_derivative(source: Union[Path, BinaryIO], width: int, fmt: str, quality: int) -> bytes:
+    """*source* を幅 *width* 以下に縮小し、*fmt* でエンコードしたバイト列を返す.
+
+    拡大はしない（ソースより大きい幅はソースの幅のまま再エンコードする）。
+    パックに格納されたサムネイルはファイルオブジェクトで渡す。
+    """
+
+    with open_image_compat(source) as opened:
+        opened = ImageOps.exif_transpose(opened)
+        has_alpha = opened.mode in ("RGBA", "LA") or (
+            opened.mode == "P" and "transparency" in opened.info
+        )
+        image = opened.convert("RGBA" if has_alpha and fmt != "jpeg" else "RGB")
+
+    if image.width > width:
+        height = max(1, round(image.height * width / image.width))
+        image = image.resize((width, height), Image.Resampling.LANCZOS)
+
+    buffer = io.BytesIO()
+    if fmt == "avif":
+        image.save(buffer, "AVIF", quality=quality)
+    elif fmt == "webp":
+        image.save(buffer, "WEBP", quality=quality, method=4)
+    else:
+        image.save(buffer, "JPEG", quality=quality, progressive=True, optimize=True)
+    return buffer.getvalue()
+
+
+class DerivativeCache:
+    """容量上限付きのディスク LRU キャッシュ.
+
+    ファイルは ``<root>/<key[:2]>/<key><suffix>`` に置き、``<root>/index.sqlite3``
+    にキー・パス・バイト数・最終アクセス時刻を記録する。接続はスレッドごと・
+    プロセスごとに開く（``shared.kernel.file_hash`` と同じ）。
+
+    Args:
+        root: キャッシュディレクトリ。
+        max_bytes: 合計サイズの上限。書き込みで超えたら最終アクセスが古い順に消す。
+    """
+
+    _SCHEMA = (
+        "CREATE TABLE IF NOT EXISTS derivative ("
+        " key TEXT PRIMARY KEY,"
+        " rel_path TEXT NOT NULL,"
+        " bytes INTEGER NOT NULL,"
+        " accessed_at REAL NOT NULL"
+        ")",
+        "CREATE INDEX IF NOT EXISTS ix_derivative_accessed_at ON derivative (accessed_at)",
+    )
+
+    def __init__(self, root: Path, *, max_bytes: int) -> None:
+        self._root = Path(root)
+        self._max_bytes = max(0, int(max_bytes))
+        self._local = threading.local()
+
+    @property
+    def root(self) -> Path:
+        return self._root
+
+    def get(self, key: str) -> Optional[Path]:
+        """*key* のファイルを返し、最終アクセス時刻を更新する（無ければ ``None``）."""
+
+        conn = self._connection()
+        row = conn.execute("SELECT rel_path FROM derivative WHERE key = ?", (key,)).fetchone()
+        if row is None:
+            return None
+        path = self._root / row[0]
+        if not path.is_file():
+            conn.execute("DELETE FROM derivative WHERE key = ?", (key,))
+            return None
+        conn.execute(
+            "UPDATE derivative SET accessed_at = ? WHERE key = ?", (time.time(), key)
+        )
+        return path
+
+    def put(self, key: str, data: bytes, suffix: str) -> Path:
+        """*data* を *key* として保存し、上限を超えた分を追い出してからパスを返す."""
+
+        rel_path = f"{key[:2]}/{key}{suffix}"
+        path = self._root / rel_path
+        path.parent.mkdir(parents=True, exist_ok=True)
+        temporary = path.with_name(f".{path.name}.{uuid.uuid4().hex}.tmp")
+        try:
+            temporary.write_bytes(data)
+            os.replace(temporary, path)
+        finally:
+            temporary.unlink(missing_ok=True)
+        self._connection().execute(
+            "INSERT INTO derivative (key, rel_path, bytes, accessed_at) VALUES (?, ?, ?, ?)"
+            " ON CONFLICT(key) DO UPDATE SET rel_path = excluded.rel_path,"
+            " bytes = excluded.bytes, accessed_at = excluded.accessed_at",
+            (key, rel_path, len(data), time.time()),
+        )
+        self.evict()
+        return path
+
+    def total_bytes(self) -> int:
+        row = self._connection().execute("SELECT COALESCE(SUM(bytes), 0) FROM derivative").fetchone()
+        return int(row[0])
+
+    def evict(self) -> int:
+        """合計が上限以下になるまで最終アクセスが古いものを消し、消した件数を返す."""
+
+        conn = self._connection()
+        excess = self.total_bytes() - self._max_bytes
+        if excess <= 0:
+            return 0
+        evicted = 0
+        for key, rel_path, size in conn.execute(
+            "SELECT key, rel_path, bytes FROM derivative ORDER BY accessed_at"
+        ).fetchall():
+            if excess <= 0:
+                break
+            (self._root / rel_path).unlink(missing_ok=True)
+            conn.execute("DELETE FROM derivative WHERE key = ?", (key,))
+            excess -= size
+            evicted += 1
+        return evicted
+
+    def _connection(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is not None and self._local.pid == os.getpid():
+            return conn
+        self._root.mkdir(parents=True, exist_ok=True)
+        conn = sqlite3.connect(str(self._root / _INDEX_FILENAME), timeout=5, isolation_level=None)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        for statement in self._SCHEMA:
+            conn.execute(statement)
+        self._local.conn = conn
+        self._local.pid = os.getpid()
+        return conn
+
+
+_caches: Dict[Path, DerivativeCache] = {}
+_caches_lock = threading.Lock()
+
+
+def get_derivative_cache() -> DerivativeCache:
+    """設定のディレクトリ（未設定なら ``MEDIA_TEMP_DIRECTORY/image_cache``）のキャッシュを返す."""
+
+    root = Path(settings.media_image_cache_directory or Path(settings.tmp_directory) / "image_cache")
+    with _caches_lock:
+        cache = _caches.get(root)
+        if cache is None:
+            cache = _caches[root] = DerivativeCache(root, max_bytes=settings.media_image_cache_max_bytes)
+    return cache
+
+
+__all__ = [
+    "DerivativeCache",
+    "IMAGE_FORMATS",
+    "MAX_DERIVATIVE_WIDTH",
+    "QUALITY_RANGE",
+    "get_derivative_cache",
+    "render_derivative",
+]
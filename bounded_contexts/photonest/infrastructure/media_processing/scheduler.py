@@ -6,6 +6,7 @@ import logging
 from typing import Optional
 
 from bounded_contexts.photonest.application.media_processing.interfaces import ThumbnailRetryScheduler
+from shared.kernel.celery_queues import TaskPriority
 from shared.kernel.logging.logging_config import setup_task_logging
 
 
@@ -35,6 +36,7 @@ class CeleryThumbnailRetryScheduler(ThumbnailRetryScheduler):
             async_result = thumbs_generate_task.apply_async(
                 kwargs={"media_id": media_id, "force": force},
                 countdown=countdown_seconds,
+                priority=int(TaskPriority.LOW),
             )
         except Exception as exc:  # pragma: no cover - Celery 呼び出し失敗時
             self._logger.warning(
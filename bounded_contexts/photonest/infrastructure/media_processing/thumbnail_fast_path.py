@@ -0,0 +1,136 @@
+"""サムネイル API から使う同期生成（ファストパス）の実行基盤.
+
+サムネイルが未生成のとき API は Celery ジョブを投入して 404 を返していたため、
+ワーカーが追いつくまでタイルが欠け、クライアントの再試行がさらに 404 と
+ジョブ投入を生んでいた。小さいサイズ（256/512）は API プロセス内の固定長
+スレッドプールでその場で生成し、``MEDIA_THUMBNAILS`` に書き込んでから返す。
+
+同じ ``(media_id, size)`` への同時リクエストは 1 回の生成結果を共有する
+（single-flight）。実行中と待機中の生成数が上限に達したら ``submit`` は
+``None`` を返し、呼び出し側は従来どおり非同期ジョブに回す。
+"""
+
+from __future__ import annotations
+
+import os
+import threading
+import uuid
+from concurrent.futures import Future, ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, Callable, Dict, Hashable, Optional
+
+from PIL import Image, ImageOps
+
+from bounded_contexts.photonest.tasks.thumbs_generate import AVIF_QUALITY
+from shared.kernel.settings.settings import settings
+from shared.kernel.utils import open_image_compat
+
+FAST_PATH_SIZES = (256, 512)
+
+
+def render_thumbnail(source: Path, destination: Path, size: int) -> Path:
+    """*source* を長辺 *size* に縮小して *destination* に書き込む.
+
+    縮小・エンコードは ``thumbs_generate`` と同じ（LANCZOS、拡張子で形式を選択）。
+    JPEG は ``draft`` で縮小デコードするため大きな原本でも読み込みが軽い。
+    Celery ワーカーや他の API プロセスが同じパスへ同時に書いても壊れないよう、
+    一意な一時ファイルに書いてから ``os.replace`` で置き換える。
+    """
+
+    with open_image_compat(source) as opened:
+        if opened.format == "JPEG":
+            opened.draft("RGB", (size, size))
+        opened = ImageOps.exif_transpose(opened)
+        has_alpha = opened.mode in ("RGBA", "LA") or (
+            opened.mode == "P" and "transparency" in opened.info
+        )
+        image = opened.convert("RGBA" if has_alpha else "RGB")
+
+    long_side = max(image.size)
+    if long_side > size:
+        scale = size / float(long_side)
+        new_size = (max(1, int(image.size[0] * scale)), max(1, int(image.size[1] * scale)))
+        image = image.resize(new_size, Image.Resampling.LANCZOS)
+
+    destination.parent.mkdir(parents=True, exist_ok=True)
+    temporary = destination.with_name(f".{destination.name}.{uuid.uuid4().hex}.tmp")
+    suffix = destination.suffix.lower()
+    try:
+        if suffix == ".avif":
+            image.save(temporary, "AVIF", quality=AVIF_QUALITY)
+        elif suffix == ".jpg":
+            image.convert("RGB").save(temporary, "JPEG", quality=85, progressive=True)
+        else:
+            image.save(temporary, "PNG")
+        os.replace(temporary, destination)
+    finally:
+        temporary.unlink(missing_ok=True)
+    return destination
+
+
+class SingleFlightRenderPool:
+    """キーごとに 1 つだけ実行する固定長スレッドプール.
+
+    Args:
+        max_workers: 生成に使うスレッド数。
+        max_pending: スレッドの空きを待てる生成数。実行中と合わせてこれを超える
+            新規キーは受け付けない（同じキーの待ち合わせは常に受け付ける）。
+    """
+
+    def __init__(self, *, max_workers: int, max_pending: int) -> None:
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="thumb-fast-path")
+        self._capacity = max_workers + max(0, max_pending)
+        self._lock = threading.Lock()
+        self._in_flight: Dict[Hashable, Future] = {}
+
+    @property
+    def in_flight(self) -> int:
+        with self._lock:
+            return len(self._in_flight)
+
+    def submit(self, key: Hashable, fn: Callable[..., Any], *args: Any) -> Optional[Future]:
+        """*key* の実行中 Future を返す。無ければ *fn* を投入し、満杯なら ``None``."""
+
+        with self._lock:
+            future = self._in_flight.get(key)
+            if future is not None:
+                return future
+            if len(self._in_flight) >= self._capacity:
+                return None
+            future = self._executor.submit(fn, *args)
+            self._in_flight[key] = future
+        future.add_done_callback(lambda _done: self._forget(key, future))
+        return future
+
+    def shutdown(self) -> None:
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+    def _forget(self, key: Hashable, future: Future) -> None:
+        with self._lock:
+            if self._in_flight.get(key) is future:
+                del self._in_flight[key]
+
+
+_pool: Optional[SingleFlightRenderPool] = None
+_pool_lock = threading.Lock()
+
+
+def get_render_pool() -> SingleFlightRenderPool:
+    """プロセス共通のプールを返す（初回呼び出し時の設定で作成する）."""
+
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = SingleFlightRenderPool(
+                max_workers=settings.thumbnail_fast_path_workers,
+                max_pending=settings.thumbnail_fast_path_max_pending,
+            )
+        return _pool
+
+
+__all__ = [
+    "FAST_PATH_SIZES",
+    "SingleFlightRenderPool",
+    "get_render_pool",
+    "render_thumbnail",
+]
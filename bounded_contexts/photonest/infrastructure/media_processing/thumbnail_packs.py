@@ -0,0 +1,225 @@
+"""サムネイルを大きな追記専用パックファイルにまとめて格納するストア.
+
+サムネイルは ``MEDIA_THUMBNAILS/<size>/<rel>`` の個別ファイルで、30 万件の
+ライブラリでは 120 万個の小さなファイルになる。ディレクトリ一覧・バックアップ・
+rsync・NAS の inode キャッシュが重くなり、20KB 程度のファイルのコールド読み込みは
+メタデータの参照が大半を占めていた。
+
+``THUMBNAIL_PACK_ENABLED`` のとき、サムネイルは撮影日のバケット（``rel`` の
+先頭 2 階層、例: ``2024/01``）ごとの ``MEDIA_THUMBNAILS/.packs/<bucket>/<seq>.pack``
+に追記する。オフセットと長さは ``media.thumbnail_manifest`` に記録し（これが
+索引になる）、読み取りは ``os.pread`` で該当範囲だけを読む。
+
+パックは追記専用で、削除されたメディアや再生成で置き換わったサムネイルの領域は
+そのまま残る。:func:`compact_thumbnail_packs` が DB 上で参照されている範囲だけを
+新しいパックへ移し、古いパックを削除して領域を回収する。
+"""
+
+from __future__ import annotations
+
+import os
+import threading
+from dataclasses import dataclass
+from pathlib import Path, PurePosixPath
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from shared.kernel.settings.settings import settings
+
+try:  # pragma: no cover - Windows には fcntl が無い
+    import fcntl
+except ImportError:  # pragma: no cover
+    fcntl = None  # type: ignore[assignment]
+
+PACK_DIRNAME = ".packs"
+PACK_SUFFIX = ".pack"
+_LOCK_FILENAME = ".lock"
+_SEQUENCE_WIDTH = 6
+_FALLBACK_BUCKET = "misc"
+
+
+def pack_bucket_for(rel_path: str) -> str:
+    """サムネイルの相対パスから格納先のバケット（日付ディレクトリ）を決める."""
+
+    parts = PurePosixPath(rel_path).parts[:-1]
+    bucket = "/".join(parts[:2])
+    return bucket or _FALLBACK_BUCKET
+
+
+@dataclass(frozen=True)
+class PackLocation:
+    """パック内の 1 エントリの位置（``pack`` は ``.packs`` からの相対パス）."""
+
+    pack: str
+    offset: int
+    length: int
+
+
+class ThumbnailPackStore:
+    """``<thumbs>/.packs`` 配下のパックファイルへの追記と範囲読み取り.
+
+    同じバケットへの追記はバケットごとのロックファイル（``flock``）で直列化する
+    ため、Celery ワーカーと API プロセスが同時に書いても範囲は重ならない。
+
+    Args:
+        base_dir: ``MEDIA_THUMBNAILS`` のディレクトリ。
+        max_pack_bytes: 1 パックの上限。超えたら次の連番のパックに切り替える。
+    """
+
+    def __init__(self, base_dir: str | os.PathLike[str], *, max_pack_bytes: int) -> None:
+        self._root = Path(base_dir) / PACK_DIRNAME
+        self._max_pack_bytes = max(1, int(max_pack_bytes))
+        self._local_lock = threading.Lock()
+
+    @property
+    def root(self) -> Path:
+        return self._root
+
+    def path_of(self, pack: str) -> Path:
+        parts = PurePosixPath(pack).parts
+        if not parts or any(part in ("", ".", "..") for part in parts) or not pack.endswith(PACK_SUFFIX):
+            raise ValueError(f"invalid pack path: {pack!r}")
+        return self._root.joinpath(*parts)
+
+    def append(self, bucket: str, data: bytes) -> PackLocation:
+        """*data* を *bucket* の現在のパック末尾に追記し、その位置を返す."""
+
+        directory = self._root / bucket
+        directory.mkdir(parents=True, exist_ok=True)
+        with self._local_lock, open(directory / _LOCK_FILENAME, "a+b") as lock:
+            if fcntl is not None:
+                fcntl.flock(lock.fileno(), fcntl.LOCK_EX)
+            try:
+                sequence = self._active_sequence(directory)
+                path = directory / self._pack_name(sequence)
+                if path.exists() and path.stat().st_size + len(data) > self._max_pack_bytes:
+                    sequence += 1
+                    path = directory / self._pack_name(sequence)
+                with open(path, "ab") as pack:
+                    offset = pack.seek(0, os.SEEK_END)
+                    pack.write(data)
+                    pack.flush()
+                    os.fsync(pack.fileno())
+            finally:
+                if fcntl is not None:
+                    fcntl.flock(lock.fileno(), fcntl.LOCK_UN)
+        return PackLocation(pack=f"{bucket}/{path.name}", offset=offset, length=len(data))
+
+    def read(self, pack: str, offset: int, length: int, *, start: int = 0, end: Optional[int] = None) -> bytes:
+        """エントリ（``offset`` から ``length`` バイト）の ``[start, end]`` を ``pread`` で読む."""
+
+        last = length - 1 if end is None else min(end, length - 1)
+        count = max(0, last - start + 1)
+        fd = os.open(self.path_of(pack), os.O_RDONLY)
+        try:
+            data = os.pread(fd, count, offset + start)
+        finally:
+            os.close(fd)
+        if len(data) != count:
+            raise FileNotFoundError(f"pack entry truncated: {pack}@{offset}")
+        return data
+
+    def packs(self) -> Iterator[Tuple[str, int, bool]]:
+        """``(pack, サイズ, 追記中か)`` を列挙する（各バケットの最新パックが追記中）."""
+
+        if not self._root.is_dir():
+            return
+        for directory in sorted(p for p in self._root.rglob("*") if p.is_dir()):
+            names = sorted(p.name for p in directory.iterdir() if p.suffix == PACK_SUFFIX)
+            for name in names:
+                path = directory / name
+                rel = path.relative_to(self._root).as_posix()
+                yield rel, path.stat().st_size, name == names[-1]
+
+    def remove(self, pack: str) -> None:
+        self.path_of(pack).unlink(missing_ok=True)
+
+    @staticmethod
+    def _pack_name(sequence: int) -> str:
+        return f"{sequence:0{_SEQUENCE_WIDTH}d}{PACK_SUFFIX}"
+
+    @staticmethod
+    def _active_sequence(directory: Path) -> int:
+        sequences = [
+            int(p.stem) for p in directory.iterdir() if p.suffix == PACK_SUFFIX and p.stem.isdigit()
+        ]
+        return max(sequences, default=1)
+
+
+def thumbnail_pack_store_for(base_dir: str | os.PathLike[str]) -> Optional[ThumbnailPackStore]:
+    """設定で有効なときだけ *base_dir* のパックストアを返す."""
+
+    if not settings.thumbnail_pack_enabled:
+        return None
+    return ThumbnailPackStore(base_dir, max_pack_bytes=settings.thumbnail_pack_max_bytes)
+
+
+def compact_thumbnail_packs(*, min_dead_ratio: float = 0.5, limit: int = 10) -> Dict[str, object]:
+    """不要領域の割合が *min_dead_ratio* 以上のパックを最大 *limit* 個詰め直す.
+
+    DB の ``thumbnail_manifest`` から参照されている範囲だけを各バケットの追記中の
+    パックへ移し、マニフェストを書き換えてから古いパックを削除する。追記中の
+    パック（各バケットの最新）は対象外。パックが無効でも既存パックは詰め直す。
+    """
+
+    from bounded_contexts.photonest.domain.media_processing import ThumbnailManifest
+    from bounded_contexts.photonest.infrastructure.photo_models import Media
+    from bounded_contexts.photonest.tasks.thumbs_generate import _thumb_base_dir
+    from shared.kernel.database.db import db
+
+    store = ThumbnailPackStore(_thumb_base_dir(), max_pack_bytes=settings.thumbnail_pack_max_bytes)
+    candidates = {pack: size for pack, size, active in store.packs() if not active}
+    if not candidates:
+        return {"ok": True, "compacted": 0, "reclaimed_bytes": 0}
+
+    live: Dict[str, List[Tuple[int, int]]] = {pack: [] for pack in candidates}
+    live_bytes: Dict[str, int] = dict.fromkeys(candidates, 0)
+    query = (
+        db.session.query(Media.id, Media.thumbnail_manifest)
+        .filter(Media.thumbnail_manifest.isnot(None), Media.is_deleted.is_(False))
+        .yield_per(1000)
+    )
+    for media_id, raw in query:
+        manifest = ThumbnailManifest.from_raw(raw)
+        if manifest is None:
+            continue
+        for size, variant in manifest.variants.items():
+            if variant.packed and variant.pack in live:
+                live[variant.pack].append((media_id, size))
+                live_bytes[variant.pack] += variant.bytes
+
+    targets = sorted(
+        (pack for pack, size in candidates.items() if size and 1 - live_bytes[pack] / size >= min_dead_ratio),
+        key=lambda pack: live_bytes[pack] / candidates[pack],
+    )[:limit]
+
+    reclaimed = 0
+    for pack in targets:
+        for media_id in sorted({media_id for media_id, _ in live[pack]}):
+            media = db.session.get(Media, media_id)
+            manifest = ThumbnailManifest.from_raw(media.thumbnail_manifest) if media else None
+            if manifest is None or manifest.rel_path is None:
+                continue
+            for size, variant in sorted(manifest.variants.items()):
+                if variant.pack != pack:
+                    continue
+                data = store.read(variant.pack, variant.offset, variant.bytes)
+                moved = store.append(pack_bucket_for(manifest.rel_path), data)
+                manifest = manifest.with_variant(
+                    manifest.rel_path, size, moved.length, pack=moved.pack, offset=moved.offset
+                )
+            media.thumbnail_manifest = manifest.to_raw()
+            db.session.commit()
+        store.remove(pack)
+        reclaimed += candidates[pack] - live_bytes[pack]
+
+    return {"ok": True, "compacted": len(targets), "reclaimed_bytes": reclaimed}
+
+
+__all__ = [
+    "PACK_DIRNAME",
+    "PackLocation",
+    "ThumbnailPackStore",
+    "compact_thumbnail_packs",
+    "pack_bucket_for",
+    "thumbnail_pack_store_for",
+]
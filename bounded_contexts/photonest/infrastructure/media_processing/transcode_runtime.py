@@ -0,0 +1,199 @@
+"""動画変換プロセスの実行基盤（ホスト内スロット管理・ffmpeg 進捗取得）."""
+
+from __future__ import annotations
+
+import os
+import subprocess
+import threading
+from collections import deque
+from contextlib import contextmanager
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Callable, Dict, Iterable, Iterator, Optional, Sequence
+
+try:  # pragma: no cover - Windows などの非 POSIX 環境
+    import fcntl
+except ImportError:  # pragma: no cover
+    fcntl = None  # type: ignore[assignment]
+
+
+class HostTranscodeSlotRegistry:
+    """同一ホスト上で実行中の変換ジョブが確保したスレッド数を共有する.
+
+    Celery の prefork ワーカーは別プロセスのため、確保状況は *directory*
+    配下のリースファイルで共有する。各リースファイルは保持プロセスが
+    ``flock`` したままにしておき、ロックを取得できたファイルは保持者が
+    異常終了した残骸とみなして回収する。``fcntl`` が使えない環境では
+    常に「他ジョブ無し」として振る舞う。
+    """
+
+    _REGISTRY_LOCK_NAME = ".registry.lock"
+    _LEASE_SUFFIX = ".lease"
+
+    def __init__(self, directory: Path) -> None:
+        self._directory = Path(directory)
+
+    def reserve(self, key: str, decide: Callable[[int], int]) -> "TranscodeSlotLease":
+        """他ジョブの確保数を *decide* に渡し、戻り値のスレッド数を確保する."""
+
+        if fcntl is None:
+            return TranscodeSlotLease(path=None, handle=None, threads=max(1, int(decide(0))))
+
+        with self._registry_locked():
+            threads = max(1, int(decide(self._reserved_threads())))
+            lease_path = self._directory / f"{os.getpid()}-{key}{self._LEASE_SUFFIX}"
+            handle = open(lease_path, "w")
+            fcntl.flock(handle.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+            handle.write(str(threads))
+            handle.flush()
+        return TranscodeSlotLease(path=lease_path, handle=handle, threads=threads)
+
+    def active_leases(self) -> int:
+        """現在生存しているリース数を返す."""
+
+        if fcntl is None:
+            return 0
+        with self._registry_locked():
+            return sum(1 for _ in self._iter_live_leases())
+
+    @contextmanager
+    def _registry_locked(self) -> Iterator[None]:
+        self._directory.mkdir(parents=True, exist_ok=True)
+        with open(self._directory / self._REGISTRY_LOCK_NAME, "a+") as registry_lock:
+            fcntl.flock(registry_lock.fileno(), fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(registry_lock.fileno(), fcntl.LOCK_UN)
+
+    def _reserved_threads(self) -> int:
+        return sum(threads for threads in self._iter_live_leases())
+
+    def _iter_live_leases(self) -> Iterable[int]:
+        for lease_path in self._directory.glob(f"*{self._LEASE_SUFFIX}"):
+            try:
+                with open(lease_path, "r+") as probe:
+                    try:
+                        fcntl.flock(probe.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+                    except OSError:
+                        raw = probe.read().strip()
+                        yield int(raw) if raw.isdigit() else 1
+                        continue
+                    # ロックが取れた = 保持プロセスが存在しない残骸
+                    lease_path.unlink(missing_ok=True)
+            except FileNotFoundError:
+                continue
+
+
+@dataclass
+class TranscodeSlotLease:
+    """:class:`HostTranscodeSlotRegistry` で確保したスレッド枠."""
+
+    path: Optional[Path]
+    handle: Optional[object]
+    threads: int
+
+    def release(self) -> None:
+        handle, self.handle = self.handle, None
+        if handle is None:
+            return
+        try:
+            if self.path is not None:
+                self.path.unlink(missing_ok=True)
+        finally:
+            handle.close()  # type: ignore[attr-defined]
+
+    def __enter__(self) -> "TranscodeSlotLease":
+        return self
+
+    def __exit__(self, *_exc: object) -> None:
+        self.release()
+
+
+@dataclass(frozen=True)
+class FfmpegRunResult:
+    """``-progress`` 付きで実行した ffmpeg の結果."""
+
+    returncode: int
+    stderr: str
+    out_time_ms: int = 0
+
+
+def _parse_out_time_ms(fields: Dict[str, str]) -> Optional[int]:
+    # ffmpeg の ``out_time_ms`` は歴史的経緯でマイクロ秒単位
+    for key in ("out_time_us", "out_time_ms"):
+        raw = fields.get(key)
+        if raw and raw.lstrip("-").isdigit():
+            return max(0, int(raw) // 1000)
+    return None
+
+
+def run_ffmpeg_with_progress(
+    cmd: Sequence[str],
+    *,
+    on_progress: Optional[Callable[[int], None]] = None,
+    stderr_tail_lines: int = 200,
+    popen: Callable[..., subprocess.Popen] = subprocess.Popen,
+) -> FfmpegRunResult:
+    """*cmd* に ``-progress pipe:1`` を付与して実行し、進捗を逐次通知する.
+
+    ``on_progress`` には出力済みの再生位置（ミリ秒）が ``progress=`` ブロック
+    ごとに渡される。stderr はデッドロックを避けるため別スレッドで読み捨て、
+    末尾 *stderr_tail_lines* 行のみ保持する。
+    """
+
+    full_cmd = [cmd[0], "-nostats", "-progress", "pipe:1", *cmd[1:]]
+    proc = popen(
+        full_cmd,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.PIPE,
+        text=True,
+        bufsize=1,
+    )
+
+    stderr_tail: deque[str] = deque(maxlen=stderr_tail_lines)
+
+    def _drain_stderr() -> None:
+        assert proc.stderr is not None
+        for line in proc.stderr:
+            stderr_tail.append(line)
+
+    drainer = threading.Thread(target=_drain_stderr, daemon=True)
+    drainer.start()
+
+    last_out_time_ms = 0
+    block: Dict[str, str] = {}
+    assert proc.stdout is not None
+    for line in proc.stdout:
+        key, sep, value = line.strip().partition("=")
+        if not sep:
+            continue
+        block[key] = value
+        if key != "progress":
+            continue
+        out_time_ms = _parse_out_time_ms(block)
+        if out_time_ms is not None:
+            last_out_time_ms = out_time_ms
+            if on_progress is not None:
+                try:
+                    on_progress(out_time_ms)
+                except Exception:  # pragma: no cover - 進捗通知の失敗で変換を止めない
+                    pass
+        block = {}
+
+    returncode = proc.wait()
+    drainer.join(timeout=5)
+    return FfmpegRunResult(
+        returncode=returncode,
+        stderr="".join(stderr_tail),
+        out_time_ms=last_out_time_ms,
+    )
+
+
+def detect_host_cores() -> int:
+    """このプロセスが利用可能な CPU コア数を返す（cgroup の affinity を考慮）."""
+
+    try:
+        return max(1, len(os.sched_getaffinity(0)))
+    except (AttributeError, OSError):  # pragma: no cover - 非 Linux
+        return max(1, os.cpu_count() or 1)
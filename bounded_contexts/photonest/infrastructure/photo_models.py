@@ -67,6 +67,10 @@ class Media(db.Model):
     # ファイル情報
     local_rel_path: Mapped[str | None] = mapped_column(db.String(255), nullable=True)
     thumbnail_rel_path: Mapped[str | None] = mapped_column(db.String(255), nullable=True)
+    # 生成済みサムネイルのサイズ・形式・バイト数（ThumbnailManifest.to_raw()）。NULL は未記録
+    thumbnail_manifest: Mapped[dict | None] = mapped_column(db.JSON(none_as_null=True), nullable=True)
+    # サムネイル読み込み前のプレースホルダー（BlurHash）。NULL は未計算、空文字はサムネイル無し
+    blurhash: Mapped[str | None] = mapped_column(db.String(32), nullable=True)
     filename: Mapped[str | None] = mapped_column(db.String(255), nullable=True)
     hash_sha256: Mapped[str | None] = mapped_column(db.CHAR(64), nullable=True)
     phash: Mapped[str | None] = mapped_column(db.String(64), nullable=True)
@@ -245,6 +249,10 @@ class Album(db.Model):
         nullable=False,
     )
     display_order: Mapped[int | None] = mapped_column(db.Integer, nullable=True)
+    # 収録メディアからの集計値（``refresh_album_stats`` が更新する。一覧はこれだけを読む）
+    media_count: Mapped[int] = mapped_column(db.Integer, nullable=False, default=0, server_default="0")
+    shot_at_min: Mapped[datetime | None] = mapped_column(db.DateTime, nullable=True)
+    shot_at_max: Mapped[datetime | None] = mapped_column(db.DateTime, nullable=True)
     created_at: Mapped[datetime] = mapped_column(
         db.DateTime,
         default=lambda: datetime.now(timezone.utc),
@@ -256,6 +264,8 @@ class Album(db.Model):
         nullable=False,
     )
 
+    __table_args__ = (db.Index("ix_album_created_at_id", "created_at", "id"),)
+
     media: Mapped[list[Media]] = relationship(
         "Media",
         secondary=album_item,
@@ -308,7 +318,7 @@ class MediaPlayback(db.Model):
     id: Mapped[int] = mapped_column(BigInt, primary_key=True, autoincrement=True)
     media_id: Mapped[int] = mapped_column(BigInt, db.ForeignKey("media.id"), nullable=False)
     preset: Mapped[str] = mapped_column(
-        db.Enum("original", "preview", "mobile", "std1080p", name="media_playback_preset", native_enum=False),
+        db.Enum("original", "preview", "mobile", "std1080p", "hls", name="media_playback_preset", native_enum=False),
         nullable=False,
     )
     rel_path: Mapped[str | None] = mapped_column(db.String(255), nullable=True)
@@ -367,6 +377,44 @@ class MediaPlayback(db.Model):
         self.updated_at = datetime.now(timezone.utc)
 
 
+class MediaFileDeletion(db.Model):
+    """削除済みメディアのファイル削除待ち（トゥームストーン）.
+
+    メディア削除リクエストはこの行を記録してすぐ返し、実ファイルの削除は
+    ``media_files.delete_pending`` タスクがまとめて行う。``kind`` は
+    ``file``（1 ファイル）/ ``tree``（HLS などのディレクトリ）/ ``blob``
+    （``rel_path`` に SHA-256 を持つ originals の内容 blob の解放）。
+    """
+
+    __tablename__ = "media_file_deletion"
+    __table_args__ = (
+        db.Index("ix_media_file_deletion_not_before", "not_before"),
+        db.Index("ix_media_file_deletion_media_id", "media_id"),
+    )
+
+    id: Mapped[int] = mapped_column(BigInt, primary_key=True, autoincrement=True)
+    media_id: Mapped[int] = mapped_column(BigInt, db.ForeignKey("media.id"), nullable=False)
+    storage_domain: Mapped[str] = mapped_column(db.String(32), nullable=False)
+    rel_path: Mapped[str] = mapped_column(db.String(1024), nullable=False)
+    kind: Mapped[str] = mapped_column(
+        db.Enum("file", "tree", "blob", name="media_file_deletion_kind", native_enum=False),
+        nullable=False,
+        default="file",
+    )
+    attempts: Mapped[int] = mapped_column(db.Integer, nullable=False, default=0)
+    last_error: Mapped[str | None] = mapped_column(db.Text, nullable=True)
+    not_before: Mapped[datetime] = mapped_column(
+        db.DateTime,
+        default=lambda: datetime.now(timezone.utc),
+        nullable=False,
+    )
+    created_at: Mapped[datetime] = mapped_column(
+        db.DateTime,
+        default=lambda: datetime.now(timezone.utc),
+        nullable=False,
+    )
+
+
 class MediaItem(db.Model):
     __tablename__ = "media_item"
 
@@ -525,3 +573,12 @@ class VideoMetadata(db.Model):
         "MediaItem",
         back_populates="video_metadata",
     )
+
+
+def _register_library_version_listeners() -> None:
+    from .library_version import register_library_version_listeners
+
+    register_library_version_listeners()
+
+
+_register_library_version_listeners()
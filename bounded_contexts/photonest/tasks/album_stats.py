@@ -0,0 +1,49 @@
+"""アルバムの集計列（件数・表紙・撮影日の範囲）の定期修復.
+
+集計列は収録メディアを変える処理が同じトランザクションで更新するが、
+撮影日時の再取得（メタデータ更新）や DB の手作業の変更では更新されない。
+このタスクが全アルバムを一定件数ずつ再計算し、ずれていた行だけを書き換える。
+"""
+
+from __future__ import annotations
+
+from typing import Dict
+
+from sqlalchemy import select
+
+from bounded_contexts.photonest.infrastructure.album import refresh_album_stats
+from bounded_contexts.photonest.infrastructure.photo_models import Album
+from shared.kernel.database.db import db
+from shared.kernel.logging.logging_config import setup_task_logging
+
+_logger = setup_task_logging(__name__)
+
+
+def repair_album_stats(*, batch_size: int = 200) -> Dict[str, object]:
+    """全アルバムの集計列を *batch_size* 件ずつ再計算し、修復件数を返す."""
+
+    batch_size = max(1, int(batch_size))
+    checked = repaired = 0
+    last_id = 0
+    while True:
+        album_ids = list(
+            db.session.execute(
+                select(Album.id).where(Album.id > last_id).order_by(Album.id).limit(batch_size)
+            ).scalars()
+        )
+        if not album_ids:
+            break
+        repaired += refresh_album_stats(db.session, album_ids)
+        db.session.commit()
+        checked += len(album_ids)
+        last_id = album_ids[-1]
+
+    result = {"ok": True, "checked": checked, "repaired": repaired}
+    _logger.info(
+        "album_stats.repair",
+        extra={"event": "album_stats.repair", **result},
+    )
+    return result
+
+
+__all__ = ["repair_album_stats"]
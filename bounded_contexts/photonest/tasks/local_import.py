@@ -1,11 +1,15 @@
 """ローカルファイル取り込みタスク."""
 
 import logging
+import multiprocessing
 import os
 import shutil
+import time
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
 from datetime import datetime, timezone
 from pathlib import Path
-from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple, cast
+from typing import Any, Callable, Deque, Dict, Iterable, Iterator, List, Optional, Tuple, cast
 
 from shared.kernel.database.db import db
 from bounded_contexts.photonest.infrastructure.photo_models import (
@@ -38,6 +42,15 @@ from bounded_contexts.photonest.application.local_import.logger import (
 )
 from bounded_contexts.photonest.application.local_import.queue import LocalImportQueueProcessor
 from bounded_contexts.photonest.application.local_import.scanner import ImportDirectoryScanner
+from bounded_contexts.photonest.infrastructure.local_import.originals_rebuild import (
+    SqliteRebuildCheckpoint,
+    iter_original_files,
+)
+from bounded_contexts.photonest.infrastructure.local_import.scan_manifest import SqliteScanManifest
+from bounded_contexts.photonest.infrastructure.local_import.storage.blob_store import (
+    BLOB_DIRNAME,
+    blob_store_for,
+)
 from bounded_contexts.photonest.application.local_import.use_case import LocalImportUseCase
 from bounded_contexts.photonest.application.local_import.results import build_thumbnail_task_snapshot as _build_thumbnail_task_snapshot
 from bounded_contexts.photonest.domain.local_import.media_entities import (
@@ -51,6 +64,7 @@ from bounded_contexts.photonest.domain.local_import.media_file import (
     DefaultMediaMetadataProvider,
     MediaFileAnalysis,
     MediaFileAnalyzer,
+    analyze_media_file,
 )
 from bounded_contexts.photonest.domain.local_import.media_metadata import (
     calculate_file_hash,
@@ -474,20 +488,44 @@ _STORAGE_SERVICE_MAP = {
 
 def _storage_for_config_key(config_key: str) -> StorageService:
     return _STORAGE_SERVICE_MAP.get(config_key, _import_destination_storage)
+
+
+_ZIP_STAGING_DIRNAME = ".zip_staging"
+
+
+def _zip_staging_directory() -> Optional[str]:
+    """ZIP ストリーミング取り込みの書き出し先（originals と同じボリューム）を返す."""
+
+    if not settings.local_import_zip_streaming:
+        return None
+    return os.path.join(_resolve_directory("MEDIA_ORIGINALS_DIRECTORY"), _ZIP_STAGING_DIRNAME)
+
+
 _zip_service = ZipArchiveService(
     _log_info,
     _log_warning,
     _log_error,
     SUPPORTED_EXTENSIONS,
     storage_service=_import_source_storage,
+    staging_directory_resolver=_zip_staging_directory,
+    stream_workers_resolver=lambda: settings.local_import_zip_workers,
 )
 
 
+def _scan_manifest_for(import_dir: str) -> SqliteScanManifest:
+    """取り込みディレクトリごとの増分走査マニフェストを返す."""
+
+    return SqliteScanManifest.for_directory(
+        Path(settings.tmp_directory) / "local_import_manifests", import_dir
+    )
+
+
 _scanner = ImportDirectoryScanner(
     logger=_task_logger,
     zip_service=_zip_service,
     supported_extensions=SUPPORTED_EXTENSIONS,
     storage_service=_import_source_storage,
+    manifest_factory=_scan_manifest_for,
 )
 
 
@@ -495,6 +533,9 @@ class _LocalImportMetadataProvider(DefaultMediaMetadataProvider):
     """テストでのモンキーパッチを尊重するためのメタデータプロバイダ."""
 
     def calculate_file_hash(self, file_path: str) -> str:
+        streamed_hash = _zip_service.hash_for(file_path)
+        if streamed_hash:
+            return streamed_hash
         return calculate_file_hash(file_path)
 
     def extract_exif_data(self, file_path: str):
@@ -1139,6 +1180,8 @@ _file_importer = LocalImportFileImporter(
     source_storage=_import_source_storage,
     destination_storage=_import_destination_storage,
     tag_resolver=_zip_service.tags_for,
+    staged_source_predicate=_zip_service.is_streamed_member,
+    blob_store_resolver=blob_store_for,
 )
 
 def _invoke_current_import_single_file(
@@ -1267,13 +1310,75 @@ def local_import_task(task_instance=None, session_id=None) -> Dict:
     return result
 
 
+_REBUILD_BATCH_SIZE = 200
+_REBUILD_PROGRESS_INTERVAL_SECONDS = 30.0
+
+
+def _rebuild_checkpoint_for(originals_dir: str) -> SqliteRebuildCheckpoint:
+    """originals ディレクトリごとの再構築チェックポイントを返す."""
+
+    return SqliteRebuildCheckpoint.for_directory(
+        Path(settings.tmp_directory) / "rebuild_checkpoints", originals_dir
+    )
+
+
+_RebuildAnalysis = Tuple[str, str, Optional[MediaFileAnalysis], Optional[BaseException]]
+
+
+def _analyze_originals_in_order(
+    items: Iterable[Tuple[str, str]],
+    *,
+    workers: int,
+) -> Iterator[_RebuildAnalysis]:
+    """``(rel_path, path)`` を解析し、入力と同じ順序で結果（または例外）を返す.
+
+    ``workers`` が 2 以上のときはプロセスプールで並列に解析する。先読みは
+    ``workers * 4`` 件までに抑え、走査結果を全件メモリに溜めない。
+    """
+
+    if workers <= 1:
+        for rel_path, path in items:
+            try:
+                yield rel_path, path, _media_analyzer.analyze(path), None
+            except Exception as exc:  # noqa: BLE001 - 呼び出し側で1件のエラーとして扱う
+                yield rel_path, path, None, exc
+        return
+
+    def _result(entry: Tuple[str, str, Future]) -> _RebuildAnalysis:
+        rel_path, path, future = entry
+        try:
+            return rel_path, path, future.result(), None
+        except Exception as exc:  # noqa: BLE001 - 呼び出し側で1件のエラーとして扱う
+            return rel_path, path, None, exc
+
+    # ワーカーは DB・ロガーを使わない解析関数だけを実行する。親プロセスの
+    # DB 接続やスレッドを引き継がないよう spawn で起動する。
+    pool = ProcessPoolExecutor(
+        max_workers=workers,
+        mp_context=multiprocessing.get_context("spawn"),
+    )
+    in_flight: Deque[Tuple[str, str, Future]] = deque()
+    try:
+        for rel_path, path in items:
+            in_flight.append((rel_path, path, pool.submit(analyze_media_file, path)))
+            if len(in_flight) >= workers * 4:
+                yield _result(in_flight.popleft())
+        while in_flight:
+            yield _result(in_flight.popleft())
+    finally:
+        pool.shutdown(wait=True, cancel_futures=True)
+
+
 def rebuild_media_from_originals(
     *,
     originals_dir: Optional[str] = None,
     refresh_existing: bool = False,
     dry_run: bool = False,
     progress: Optional[Callable[[str], None]] = None,
-) -> Dict[str, int]:
+    workers: int = 1,
+    batch_size: int = _REBUILD_BATCH_SIZE,
+    resume: bool = True,
+) -> Dict[str, Any]:
     """originals ディレクトリを直接走査して Media を再登録する（冪等）。
 
     取り込み inbox は取り込み後に空になり、originals を再スキャンする導線が無かった。
@@ -1282,21 +1387,29 @@ def rebuild_media_from_originals(
 
     冪等性は ``local_rel_path`` をキーに担保する（同じ相対パスの再登録はスキップ）。
 
+    走査はディレクトリ単位のストリーミングで、新規登録分は ``batch_size`` 件ごとに
+    1 トランザクションでコミットする。コミットのたびに確定位置をチェックポイントへ
+    記録し、中断後の再実行（``resume``）ではその位置から走査を再開する。
+
     Args:
         originals_dir: originals のルート。未指定時は設定から解決。
         refresh_existing: 既存 Media のメタデータも再適用する。
         dry_run: 変更を加えず件数のみ集計する。
         progress: 1件処理ごとに呼ばれる任意のコールバック（メッセージ文字列）。
+        workers: ファイル解析（ハッシュ・EXIF・pHash）の並列プロセス数。1 以下は直列。
+        batch_size: 1 トランザクションで登録する Media の件数。
+        resume: 前回中断時のチェックポイントがあればその位置から再開する。
 
     Returns:
-        集計辞書（scanned / created / skipped / refreshed / errors）。
+        集計辞書（scanned / created / skipped / refreshed / errors /
+        elapsed_seconds / files_per_second）。
     """
 
     if originals_dir is None:
         originals_dir = _resolve_directory("MEDIA_ORIGINALS_DIRECTORY")
 
     root = Path(originals_dir)
-    stats: Dict[str, int] = {
+    stats: Dict[str, Any] = {
         "scanned": 0,
         "created": 0,
         "skipped": 0,
@@ -1313,6 +1426,18 @@ def rebuild_media_from_originals(
         )
         return stats
 
+    batch_size = max(1, batch_size)
+    checkpoint = None if dry_run else _rebuild_checkpoint_for(originals_dir)
+    resume_after = checkpoint.load() if checkpoint is not None and resume else None
+    if resume_after:
+        _log_info(
+            "local_import.rebuild.resume",
+            "originals 再構築を前回の確定位置から再開します",
+            originals_dir=originals_dir,
+            resume_after=resume_after,
+            status="resumed",
+        )
+
     # ファイル1件ごとの個別SELECT（N+1）を避けるため、既存の相対パスを
     # 一括で取得しておく（rel_path → media.id）
     existing_ids_by_rel_path: dict[str, int] = dict(
@@ -1321,31 +1446,129 @@ def rebuild_media_from_originals(
         )
     )
 
-    for path in sorted(p for p in root.rglob("*") if p.is_file()):
-        if path.suffix.lower() not in SUPPORTED_EXTENSIONS:
-            continue
+    started_at = time.monotonic()
+    last_report_at = started_at
+    batch: List[Tuple[str, MediaFileAnalysis]] = []
+    # 確定済みとみなせる最後の相対パス（これ以前の新規登録はコミット済み）
+    position: Optional[str] = None
+
+    def _record_error(rel_path: str, exc: BaseException) -> None:
+        stats["errors"] += 1
+        _log_error(
+            "local_import.rebuild.error",
+            "originals 再構築中にエラーが発生しました",
+            exc_info=exc,
+            rel_path=rel_path,
+            error_type=type(exc).__name__,
+            error_message=str(exc),
+        )
+        if progress:
+            progress(f"error {rel_path}: {exc}")
+
+    def _add_media(rel_path: str, analysis: MediaFileAnalysis) -> Media:
+        media = build_media_from_analysis(
+            analysis,
+            google_media_id=None,
+            relative_path=rel_path,
+        )
+        db.session.add(media)
+        return media
 
-        rel_path = path.relative_to(root).as_posix()
-        stats["scanned"] += 1
+    def _created(rel_path: str, media: Media) -> None:
+        existing_ids_by_rel_path[rel_path] = media.id
+        stats["created"] += 1
+        if progress:
+            progress(f"created media_id={media.id} {rel_path}")
 
+    def _flush_batch(batch: List[Tuple[str, MediaFileAnalysis]]) -> None:
         try:
+            created = [(rel_path, _add_media(rel_path, analysis), analysis) for rel_path, analysis in batch]
+            db.session.flush()
+            for _, media, analysis in created:
+                exif_model = ensure_exif_for_media(media, analysis)
+                if exif_model is not None:
+                    db.session.add(exif_model)
+            db.session.commit()
+        except Exception as exc:  # noqa: BLE001 - 原因のファイルを特定するため1件ずつやり直す
+            db.session.rollback()
+            _log_warning(
+                "local_import.rebuild.batch_retry",
+                "バッチ登録に失敗したため1件ずつ登録し直します",
+                batch_size=len(batch),
+                first_rel_path=batch[0][0],
+                error_type=type(exc).__name__,
+                error_message=str(exc),
+            )
+            for rel_path, analysis in batch:
+                try:
+                    media = _add_media(rel_path, analysis)
+                    db.session.flush()
+                    exif_model = ensure_exif_for_media(media, analysis)
+                    if exif_model is not None:
+                        db.session.add(exif_model)
+                    db.session.commit()
+                except Exception as item_exc:  # noqa: BLE001 - 1件の失敗で全体を止めない
+                    db.session.rollback()
+                    _record_error(rel_path, item_exc)
+                else:
+                    _created(rel_path, media)
+            return
+
+        for rel_path, media, _ in created:
+            _created(rel_path, media)
+
+    def _update_throughput() -> None:
+        elapsed = max(time.monotonic() - started_at, 1e-9)
+        stats["elapsed_seconds"] = round(elapsed, 3)
+        stats["files_per_second"] = round(stats["scanned"] / elapsed, 2)
+
+    def _report_progress() -> None:
+        nonlocal last_report_at
+        now = time.monotonic()
+        if now - last_report_at < _REBUILD_PROGRESS_INTERVAL_SECONDS:
+            return
+        last_report_at = now
+        _update_throughput()
+        _log_info(
+            "local_import.rebuild.progress",
+            "originals 再構築の進捗",
+            originals_dir=originals_dir,
+            position=position,
+            status="running",
+            summary=dict(stats),
+        )
+
+    def _candidates() -> Iterator[Tuple[str, str]]:
+        for rel_path, path in iter_original_files(
+            root,
+            extensions=SUPPORTED_EXTENSIONS,
+            excluded_dirnames=(_ZIP_STAGING_DIRNAME, BLOB_DIRNAME),
+            resume_after=resume_after,
+        ):
+            stats["scanned"] += 1
             existing_id = existing_ids_by_rel_path.get(rel_path)
             if existing_id is not None:
-                if refresh_existing:
+                if not refresh_existing:
+                    stats["skipped"] += 1
+                    continue
+                try:
                     if not dry_run:
                         existing = db.session.get(Media, existing_id)
                         refresh_media_metadata_from_original(
                             existing,
                             originals_dir=originals_dir,
-                            fallback_path=str(path),
-                            file_extension=path.suffix.lower(),
+                            fallback_path=path,
+                            file_extension=os.path.splitext(path)[1].lower(),
                             preserve_original_path=True,
                         )
-                    stats["refreshed"] += 1
-                    if progress:
-                        progress(f"refreshed media_id={existing_id} {rel_path}")
-                else:
-                    stats["skipped"] += 1
+                        db.session.commit()
+                except Exception as exc:  # noqa: BLE001 - 1件の失敗で全体を止めない
+                    db.session.rollback()
+                    _record_error(rel_path, exc)
+                    continue
+                stats["refreshed"] += 1
+                if progress:
+                    progress(f"refreshed media_id={existing_id} {rel_path}")
                 continue
 
             if dry_run:
@@ -1353,43 +1576,38 @@ def rebuild_media_from_originals(
                 if progress:
                     progress(f"would create {rel_path}")
                 continue
+            yield rel_path, path
+
+    def _commit_position() -> None:
+        if batch:
+            _flush_batch(batch)
+            batch.clear()
+        if checkpoint is not None and position is not None:
+            checkpoint.save(position)
+        _report_progress()
+
+    for rel_path, _path, analysis, error in _analyze_originals_in_order(
+        _candidates(), workers=workers
+    ):
+        position = rel_path
+        if error is not None:
+            _record_error(rel_path, error)
+        else:
+            batch.append((rel_path, analysis))
+        if len(batch) >= batch_size:
+            _commit_position()
 
-            analysis = _media_analyzer.analyze(str(path))
-            media = build_media_from_analysis(
-                analysis,
-                google_media_id=None,
-                relative_path=rel_path,
-            )
-            db.session.add(media)
-            db.session.flush()
-
-            exif_model = ensure_exif_for_media(media, analysis)
-            if exif_model is not None:
-                db.session.add(exif_model)
-
-            db.session.commit()
-            stats["created"] += 1
-            if progress:
-                progress(f"created media_id={media.id} {rel_path}")
-        except Exception as exc:  # noqa: BLE001 - 1件の失敗で全体を止めない
-            db.session.rollback()
-            stats["errors"] += 1
-            _log_error(
-                "local_import.rebuild.error",
-                "originals 再構築中にエラーが発生しました",
-                exc_info=True,
-                rel_path=rel_path,
-                error_type=type(exc).__name__,
-                error_message=str(exc),
-            )
-            if progress:
-                progress(f"error {rel_path}: {exc}")
+    _commit_position()
+    if checkpoint is not None:
+        checkpoint.clear()
 
+    _update_throughput()
     _log_info(
         "local_import.rebuild.done",
         "originals 再構築が完了しました",
         originals_dir=originals_dir,
         status="done",
+        workers=workers,
         summary=stats,
     )
     return stats
@@ -0,0 +1,280 @@
+"""削除済みメディアのファイル削除キュー（トゥームストーン）の処理.
+
+メディア削除 API は ``media_file_deletion`` に削除対象のパスを記録して
+すぐ返す。このモジュールのタスクがメディア単位でまとめて取り出し、
+スレッドプールで並列に unlink する。失敗した行は指数バックオフで再試行し、
+``_MAX_ATTEMPTS`` 回失敗した行はバックログに残して処理対象から外す。
+
+削除前にメディアがまだ削除済みかを確認し、復元されたメディア
+（``is_deleted`` が戻されたもの）の行は何も消さずに取り消す。ファイルに
+触れる前に ``attempts`` を加算してコミットする（取得）ため、
+:func:`restore_media_file_deletions` は ``attempts == 0`` の行だけを消せた
+場合に限り復元を許可し、タスクと同時に走っても復元済みメディアの
+ファイルは消えない。
+"""
+
+from __future__ import annotations
+
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy import delete, func, select
+from sqlalchemy.orm.exc import StaleDataError
+
+from bounded_contexts.photonest.infrastructure.local_import.storage.blob_store import (
+    ContentAddressedBlobStore,
+)
+from bounded_contexts.photonest.infrastructure.photo_models import Media, MediaFileDeletion
+from bounded_contexts.storage import StorageDomain, StorageIntent
+from shared.kernel.database.db import db
+from shared.kernel.logging.logging_config import setup_task_logging
+from shared.kernel.settings.settings import settings
+
+_logger = setup_task_logging(__name__)
+
+_MAX_ATTEMPTS = 8
+_RETRY_BASE_SECONDS = 30
+_RETRY_MAX_SECONDS = 3600
+
+KIND_FILE = "file"
+KIND_TREE = "tree"
+KIND_BLOB = "blob"
+
+
+def _utcnow() -> datetime:
+    return datetime.now(timezone.utc)
+
+
+def _storage_service():
+    from bounded_contexts.storage.application.filesystem_factory import get_storage_service
+
+    return get_storage_service(settings)
+
+
+def _retry_delay(attempts: int) -> timedelta:
+    return timedelta(seconds=min(_RETRY_BASE_SECONDS * (2 ** max(0, attempts - 1)), _RETRY_MAX_SECONDS))
+
+
+def pending_media_file_deletions(session=None) -> int:
+    """再試行上限に達していない削除待ちの行数（キューのバックログ）を返す."""
+
+    session = session or db.session
+    return int(
+        session.execute(
+            select(func.count(MediaFileDeletion.id)).where(MediaFileDeletion.attempts < _MAX_ATTEMPTS)
+        ).scalar()
+        or 0
+    )
+
+
+def restore_media_file_deletions(media_id: int, session) -> bool:
+    """*media_id* の削除待ちを取り消し、ファイルが残っていれば ``True`` を返す.
+
+    タスクが取得していない（``attempts == 0``）行だけを削除する。削除待ちが
+    無い、または一部でもタスクが取得済みなら何も変更せず ``False`` を返す
+    （呼び出し側はそのままコミットせずに復元を拒否する）。
+    """
+
+    total = session.execute(
+        select(func.count(MediaFileDeletion.id)).where(MediaFileDeletion.media_id == media_id)
+    ).scalar() or 0
+    if not total:
+        return False
+    deleted = session.execute(
+        delete(MediaFileDeletion)
+        .where(MediaFileDeletion.media_id == media_id, MediaFileDeletion.attempts == 0)
+        .execution_options(synchronize_session=False)
+    ).rowcount
+    if deleted != total:
+        session.rollback()
+        return False
+    return True
+
+
+def _remove_path(service, row: MediaFileDeletion) -> Optional[str]:
+    """1 行分のファイルを削除し、失敗時はエラーメッセージを返す（既に無ければ成功）."""
+
+    try:
+        area = service.for_domain(StorageDomain(row.storage_domain))
+        resolved = area.resolve(*row.rel_path.split("/"), intent=StorageIntent.DELETE)
+        if not resolved.absolute_path or not resolved.exists:
+            return None
+        if row.kind == KIND_TREE:
+            service.remove_tree(resolved.absolute_path)
+        else:
+            service.remove(resolved.absolute_path)
+        return None
+    except FileNotFoundError:
+        return None
+    except Exception as exc:  # NAS の一時的な失敗は再試行に回す
+        return str(exc) or exc.__class__.__name__
+
+
+def _release_blob(service, row: MediaFileDeletion) -> Optional[str]:
+    """参照の無くなった originals の内容 blob を削除する."""
+
+    try:
+        base_path = service.for_domain(StorageDomain.MEDIA_ORIGINALS).first_existing()
+        if not base_path:
+            return None
+        store = ContentAddressedBlobStore(base_path)
+        if not store.blob_path(row.rel_path).exists():
+            return None
+        still_referenced = db.session.execute(
+            select(Media.id)
+            .where(
+                Media.hash_sha256 == row.rel_path,
+                Media.id != row.media_id,
+                Media.is_deleted.is_(False),
+                Media.local_rel_path.isnot(None),
+            )
+            .limit(1)
+        ).first() is not None
+        store.release(row.rel_path, still_referenced=still_referenced)
+        return None
+    except Exception as exc:
+        return str(exc) or exc.__class__.__name__
+
+
+def _path_reused(row: MediaFileDeletion) -> bool:
+    """削除待ちの原本パスを、その後に取り込まれた別の有効なメディアが使っているか."""
+
+    if row.kind != KIND_FILE or row.storage_domain != StorageDomain.MEDIA_ORIGINALS.value:
+        return False
+    return db.session.execute(
+        select(Media.id)
+        .where(
+            Media.local_rel_path == row.rel_path,
+            Media.id != row.media_id,
+            Media.is_deleted.is_(False),
+        )
+        .limit(1)
+    ).first() is not None
+
+
+def process_media_file_deletions(
+    *, limit: Optional[int] = None, workers: Optional[int] = None
+) -> Dict[str, object]:
+    """削除待ちの行をメディア単位で最大 *limit* 件分処理する.
+
+    Returns:
+        ``removed`` / ``cancelled`` / ``failed`` の行数と、残りのバックログ
+        ``remaining`` を含む辞書。
+    """
+
+    limit = limit or settings.media_deletion_batch_size
+    workers = workers or settings.media_deletion_workers
+    now = _utcnow()
+
+    media_ids = [
+        media_id
+        for (media_id,) in db.session.execute(
+            select(MediaFileDeletion.media_id)
+            .where(MediaFileDeletion.not_before <= now, MediaFileDeletion.attempts < _MAX_ATTEMPTS)
+            .group_by(MediaFileDeletion.media_id)
+            .order_by(func.min(MediaFileDeletion.id))
+            .limit(limit)
+        )
+    ]
+    if not media_ids:
+        return {"ok": True, "removed": 0, "cancelled": 0, "failed": 0, "remaining": pending_media_file_deletions()}
+
+    rows = db.session.execute(
+        select(MediaFileDeletion)
+        .where(
+            MediaFileDeletion.media_id.in_(media_ids),
+            MediaFileDeletion.attempts < _MAX_ATTEMPTS,
+        )
+        .order_by(MediaFileDeletion.id)
+    ).scalars().all()
+    deleted_media = {
+        media_id
+        for (media_id,) in db.session.execute(
+            select(Media.id).where(Media.id.in_(media_ids), Media.is_deleted.is_(True))
+        )
+    }
+
+    cancelled = 0
+    claimed: List[MediaFileDeletion] = []
+    for row in rows:
+        if row.media_id not in deleted_media or _path_reused(row):
+            # 復元されたメディア・再取り込みで再利用されたパスは消さない
+            db.session.delete(row)
+            cancelled += 1
+        else:
+            row.attempts = (row.attempts or 0) + 1
+            claimed.append(row)
+    try:
+        db.session.commit()
+    except StaleDataError:
+        # 同時に復元された（行が消された）ので、このバッチは次回に回す
+        db.session.rollback()
+        return {"ok": True, "removed": 0, "cancelled": 0, "failed": 0, "remaining": pending_media_file_deletions()}
+
+    paths = [row for row in claimed if row.kind != KIND_BLOB]
+    blobs = [row for row in claimed if row.kind == KIND_BLOB]
+    service = _storage_service()
+    outcomes: List[Tuple[MediaFileDeletion, Optional[str]]] = []
+    if paths:
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="media-delete") as pool:
+            outcomes.extend(zip(paths, pool.map(lambda row: _remove_path(service, row), paths)))
+
+    # 原本の削除に失敗したメディアの blob は、原本が消えるまで解放しない
+    blocked = {
+        row.media_id
+        for row, error in outcomes
+        if error and row.storage_domain == StorageDomain.MEDIA_ORIGINALS.value
+    }
+    for row in blobs:
+        if row.media_id in blocked:
+            row.attempts -= 1
+            row.not_before = now + _retry_delay(1)
+            continue
+        outcomes.append((row, _release_blob(service, row)))
+
+    removed = failed = 0
+    for row, error in outcomes:
+        if error is None:
+            db.session.delete(row)
+            removed += 1
+            continue
+        failed += 1
+        row.last_error = error[:1000]
+        row.not_before = now + _retry_delay(row.attempts)
+        _logger.warning(
+            "media_file_deletion.failed",
+            extra={
+                "event": "media_file_deletion.failed",
+                "media_id": row.media_id,
+                "storage_domain": row.storage_domain,
+                "rel_path": row.rel_path,
+                "attempts": row.attempts,
+                "error": error,
+            },
+        )
+    db.session.commit()
+
+    result = {
+        "ok": True,
+        "media": len(media_ids),
+        "removed": removed,
+        "cancelled": cancelled,
+        "failed": failed,
+        "remaining": pending_media_file_deletions(),
+    }
+    _logger.info(
+        "media_file_deletion.batch",
+        extra={"event": "media_file_deletion.batch", **result},
+    )
+    return result
+
+
+__all__ = [
+    "KIND_BLOB",
+    "KIND_FILE",
+    "KIND_TREE",
+    "restore_media_file_deletions",
+    "pending_media_file_deletions",
+    "process_media_file_deletions",
+]
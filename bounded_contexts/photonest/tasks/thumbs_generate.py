@@ -13,6 +13,7 @@ from dataclasses import dataclass
 from pathlib import Path
 from typing import Dict, Iterable, List, Optional, Tuple, TYPE_CHECKING
 import contextlib
+import io
 import shutil
 
 from shared.kernel.database.db import db
@@ -27,8 +28,24 @@ register_avif_support()
 
 from PIL import Image, ImageOps
 
+from bounded_contexts.photonest.domain.media_processing import (
+    ThumbnailManifest,
+    ThumbnailVariant,
+    encode_blurhash,
+)
+from bounded_contexts.photonest.infrastructure.media_processing.thumbnail_packs import (
+    PACK_DIRNAME,
+    ThumbnailPackStore,
+    pack_bucket_for,
+    thumbnail_pack_store_for,
+)
 from bounded_contexts.photonest.infrastructure.photo_models import Media, MediaPlayback
 from shared.kernel.logging.logging_config import structured_task_logger
+from shared.kernel.metrics.instruments import (
+    MEDIA_JOBS_TOTAL,
+    MEDIA_STAGE_DURATION,
+    THUMBNAILS_WRITTEN_TOTAL,
+)
 from shared.kernel.settings.settings import settings
 from bounded_contexts.storage import StorageDomain
 
@@ -54,6 +71,9 @@ MIN_VIDEO_POSTER_LONG_SIDE = 720
 THUMBNAIL_OUTPUT_SUFFIX = ".avif"
 AVIF_QUALITY = 60
 
+# Long side the image is reduced to before computing the BlurHash placeholder.
+BLURHASH_SAMPLE_SIZE = 32
+
 
 @dataclass
 class _SourceResolution:
@@ -466,6 +486,186 @@ def _resolve_source(
     return _resolve_photo_source(media, rel_name, log=log)
 
 
+# ---------------------------------------------------------------------------
+# Thumbnail manifest
+# ---------------------------------------------------------------------------
+
+
+def _manifest_from_paths(rel_path: str, paths: Dict[int, str]) -> ThumbnailManifest:
+    """Build the manifest for thumbnails written (or kept) by this task."""
+
+    byte_sizes: Dict[int, int] = {}
+    for size, path in paths.items():
+        try:
+            byte_sizes[size] = Path(path).stat().st_size
+        except OSError:
+            continue
+    return ThumbnailManifest.from_sizes(rel_path, byte_sizes)
+
+
+def _probe_manifest(media: Media, base_dir: Path) -> ThumbnailManifest:
+    """Discover existing thumbnails on disk the way the API used to."""
+
+    candidates: List[Path] = []
+    for value in (media.thumbnail_rel_path, media.local_rel_path):
+        if value and Path(value) not in candidates:
+            candidates.append(Path(value))
+    if media.local_rel_path:
+        for suffix in (THUMBNAIL_OUTPUT_SUFFIX, ".jpg", ".png"):
+            candidate = _replace_suffix(Path(media.local_rel_path), suffix)
+            if candidate not in candidates:
+                candidates.append(candidate)
+
+    for rel_path in candidates:
+        if rel_path.is_absolute() or ".." in rel_path.parts:
+            continue
+        byte_sizes: Dict[int, int] = {}
+        for size in SIZES:
+            try:
+                byte_sizes[size] = (base_dir / str(size) / rel_path).stat().st_size
+            except OSError:
+                continue
+        if byte_sizes:
+            return ThumbnailManifest.from_sizes(rel_path.as_posix(), byte_sizes)
+    return ThumbnailManifest.empty()
+
+
+def _pack_thumbnails(
+    store: ThumbnailPackStore,
+    rel_path: str,
+    paths: Dict[int, str],
+    kept: Dict[int, ThumbnailVariant],
+) -> Tuple[ThumbnailManifest, Dict[int, str]]:
+    """Move the loose thumbnails in *paths* into packs and build the manifest.
+
+    *kept* holds sizes already stored in a pack that were skipped this run.
+    Loose files are removed once their bytes are appended, so existing loose
+    thumbnails migrate into packs whenever a media item is regenerated.
+    """
+
+    manifest = ThumbnailManifest.empty()
+    packed_paths: Dict[int, str] = {}
+    for size, variant in sorted(kept.items()):
+        manifest = manifest.with_variant(rel_path, size, variant.bytes, pack=variant.pack, offset=variant.offset)
+        packed_paths[size] = f"{PACK_DIRNAME}/{variant.pack}@{variant.offset}"
+    for size, path in sorted(paths.items()):
+        loose = Path(path)
+        try:
+            data = loose.read_bytes()
+        except OSError:
+            continue
+        location = store.append(pack_bucket_for(rel_path), data)
+        loose.unlink(missing_ok=True)
+        manifest = manifest.with_variant(
+            rel_path, size, location.length, pack=location.pack, offset=location.offset
+        )
+        packed_paths[size] = f"{PACK_DIRNAME}/{location.pack}@{location.offset}"
+    return manifest, packed_paths
+
+
+def _open_thumbnail(base_dir: Path, manifest: ThumbnailManifest, size: int):
+    """Return something :func:`open_image_compat` can open for *size* (file or pack bytes)."""
+
+    packed = manifest.packed_variant(size)
+    if packed is None:
+        return base_dir / manifest.path_for(size)
+    store = ThumbnailPackStore(base_dir, max_pack_bytes=settings.thumbnail_pack_max_bytes)
+    return io.BytesIO(store.read(packed.pack, packed.offset, packed.bytes))
+
+
+def _blurhash_for(image: Image.Image) -> str:
+    """Return the BlurHash placeholder of *image* (reduced to a few dozen pixels)."""
+
+    sample = image.convert("RGB")
+    sample.thumbnail((BLURHASH_SAMPLE_SIZE, BLURHASH_SAMPLE_SIZE), Image.Resampling.BILINEAR, reducing_gap=2.0)
+    return encode_blurhash(sample.tobytes(), sample.width, sample.height)
+
+
+def backfill_thumbnail_manifests(*, limit: int = 500) -> Dict[str, object]:
+    """Record ``thumbnail_manifest`` for up to *limit* media that have none yet.
+
+    Rows are processed in id order so repeated runs make progress until every
+    live media item has a manifest; ``remaining`` tells whether another run is
+    needed.
+    """
+
+    log = _task_logger.bind(limit=limit)
+    rows = (
+        Media.query.filter(Media.thumbnail_manifest.is_(None), Media.is_deleted.is_(False))
+        .order_by(Media.id.asc())
+        .limit(limit)
+        .all()
+    )
+    if not rows:
+        return {"ok": True, "processed": 0, "with_thumbnails": 0, "remaining": False}
+
+    base_dir = _thumb_base_dir()
+    with_thumbnails = 0
+    for media in rows:
+        manifest = _probe_manifest(media, base_dir)
+        if manifest.variants:
+            with_thumbnails += 1
+        media.thumbnail_manifest = manifest.to_raw()
+    db.session.commit()
+
+    result = {
+        "ok": True,
+        "processed": len(rows),
+        "with_thumbnails": with_thumbnails,
+        "remaining": len(rows) == limit,
+    }
+    log.info("thumbnail_manifest.backfill", **result)
+    return result
+
+
+def backfill_blurhashes(*, limit: int = 500) -> Dict[str, object]:
+    """Compute ``blurhash`` for up to *limit* media from their smallest thumbnail.
+
+    Only media with a recorded manifest are considered. Media without any
+    thumbnail (or whose thumbnail cannot be decoded) get an empty string so
+    they are not picked up again; ``thumbs_generate`` fills them in later.
+    """
+
+    log = _task_logger.bind(limit=limit)
+    rows = (
+        Media.query.filter(
+            Media.blurhash.is_(None),
+            Media.thumbnail_manifest.isnot(None),
+            Media.is_deleted.is_(False),
+        )
+        .order_by(Media.id.asc())
+        .limit(limit)
+        .all()
+    )
+    if not rows:
+        return {"ok": True, "processed": 0, "with_placeholder": 0, "remaining": False}
+
+    base_dir = _thumb_base_dir()
+    with_placeholder = 0
+    for media in rows:
+        manifest = ThumbnailManifest.from_raw(media.thumbnail_manifest)
+        size = min(manifest.variants) if manifest is not None and manifest.rel_path else None
+        placeholder = ""
+        if size is not None:
+            try:
+                with open_image_compat(_open_thumbnail(base_dir, manifest, size)) as image:
+                    placeholder = _blurhash_for(image)
+                with_placeholder += 1
+            except Exception as exc:
+                log.warning("blurhash.backfill_failed", media_id=media.id, error=str(exc))
+        media.blurhash = placeholder
+    db.session.commit()
+
+    result = {
+        "ok": True,
+        "processed": len(rows),
+        "with_placeholder": with_placeholder,
+        "remaining": len(rows) == limit,
+    }
+    log.info("blurhash.backfill", **result)
+    return result
+
+
 # ---------------------------------------------------------------------------
 # Main task implementation
 # ---------------------------------------------------------------------------
@@ -514,6 +714,9 @@ def thumbs_generate(*, media_id: int, force: bool = False) -> Dict[str, object]:
 
     log = log.bind(media_type="video" if m.is_video else "photo")
     base_dir = _thumb_base_dir()
+    pack_store = thumbnail_pack_store_for(base_dir)
+    previous_manifest = ThumbnailManifest.from_raw(m.thumbnail_manifest)
+    kept_packed: Dict[int, ThumbnailVariant] = {}
     generated: List[int] = []
     skipped: List[int] = []
     notes: str | None = None
@@ -540,10 +743,13 @@ def thumbs_generate(*, media_id: int, force: bool = False) -> Dict[str, object]:
 
     rel_name = Path(base_rel)
 
-    source, error_response = _resolve_source(m, rel_name, log=log)
+    with MEDIA_STAGE_DURATION.labels("thumbnail", "source").time():
+        source, error_response = _resolve_source(m, rel_name, log=log)
     if error_response:
-        event = "thumbnail_generation.retry_pending" if error_response.get("notes") == PLAYBACK_NOT_READY_NOTES else "thumbnail_generation.failed"
+        retry_pending = error_response.get("notes") == PLAYBACK_NOT_READY_NOTES
+        event = "thumbnail_generation.retry_pending" if retry_pending else "thumbnail_generation.failed"
         log.warning(event, response=error_response)
+        MEDIA_JOBS_TOTAL.labels("thumbnail", "retry_pending" if retry_pending else "failed").inc()
         return error_response
     assert source is not None
 
@@ -562,6 +768,17 @@ def thumbs_generate(*, media_id: int, force: bool = False) -> Dict[str, object]:
     # ------------------------------------------------------------------
     for size in SIZES:
         dest = base_dir / str(size) / rel_name
+        packed = (
+            previous_manifest.packed_variant(size)
+            if pack_store is not None
+            and previous_manifest is not None
+            and previous_manifest.rel_path == rel_name.as_posix()
+            else None
+        )
+        if packed is not None and not force:
+            skipped.append(size)
+            kept_packed[size] = packed
+            continue
         if dest.exists() and not force:
             skipped.append(size)
             paths[size] = dest.as_posix()
@@ -632,16 +849,34 @@ def thumbs_generate(*, media_id: int, force: bool = False) -> Dict[str, object]:
         dest.parent.mkdir(parents=True, exist_ok=True)
         scale = size / float(long_side)
         new_size = (int(img.size[0] * scale), int(img.size[1] * scale))
-        resized = img.resize(new_size, Image.Resampling.LANCZOS)
-        _write_image(resized, dest)
+        with MEDIA_STAGE_DURATION.labels("thumbnail", "resize").time():
+            resized = img.resize(new_size, Image.Resampling.LANCZOS)
+        with MEDIA_STAGE_DURATION.labels("thumbnail", "encode").time():
+            _write_image(resized, dest)
         generated.append(size)
         paths[size] = dest.as_posix()
         last_output_size = size
         last_output_path = dest
 
     new_rel = rel_name.as_posix()
-    if m.thumbnail_rel_path != new_rel:
+    if pack_store is not None:
+        with MEDIA_STAGE_DURATION.labels("thumbnail", "pack").time():
+            packed_manifest, paths = _pack_thumbnails(pack_store, new_rel, paths, kept_packed)
+        manifest = packed_manifest.to_raw()
+    else:
+        manifest = _manifest_from_paths(new_rel, paths).to_raw()
+    blurhash = m.blurhash
+    if generated or not blurhash:
+        with MEDIA_STAGE_DURATION.labels("thumbnail", "placeholder").time():
+            blurhash = _blurhash_for(img)
+    if (
+        m.thumbnail_rel_path != new_rel
+        or m.thumbnail_manifest != manifest
+        or m.blurhash != blurhash
+    ):
         m.thumbnail_rel_path = new_rel
+        m.thumbnail_manifest = manifest
+        m.blurhash = blurhash
         db.session.add(m)
         db.session.commit()
 
@@ -665,5 +900,8 @@ def thumbs_generate(*, media_id: int, force: bool = False) -> Dict[str, object]:
         total_generated=len(generated),
         total_skipped=len(skipped),
     )
+    MEDIA_JOBS_TOTAL.labels("thumbnail", "generated" if generated else "skipped").inc()
+    for size in generated:
+        THUMBNAILS_WRITTEN_TOTAL.labels(size).inc()
 
     return result
@@ -14,6 +14,17 @@ without requiring a full Celery deployment:
     Perform the actual ffmpeg based transcoding for a queued playback
     record.  The worker is intentionally compact but validates the output
     and updates the database in a manner compatible with the tests.
+
+Each encode runs under a thread budget handed out by
+:class:`TranscodeScheduler`, which shares the cores of the host between
+concurrent transcodes and may split long videos into segments that are
+encoded in parallel and concatenated afterwards.  Progress is read from
+ffmpeg's ``-progress`` output while the process runs.
+
+When ``TRANSCODE_HLS_ENABLED`` is set, a finished std1080p output is also
+segmented into an HLS ladder (fMP4 segments, several renditions) recorded as
+a ``preset='hls'`` playback row whose ``rel_path`` points at the master
+playlist.
 """
 
 from dataclasses import dataclass
@@ -21,14 +32,34 @@ from datetime import datetime, timezone
 import json
 import logging
 import math
-from pathlib import Path
+from pathlib import Path, PurePosixPath
 import shutil
 import subprocess
-from typing import Any, Dict, List, Optional, cast
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, Optional, Sequence, Tuple, cast
 
 from shared.kernel.database.db import db
+from bounded_contexts.photonest.application.media_processing.transcode_scheduler import (
+    TranscodeProgressTracker,
+    TranscodeScheduler,
+)
+from bounded_contexts.photonest.domain.media_processing import (
+    HLS_INIT_SEGMENT,
+    HLS_MASTER_PLAYLIST,
+    HLS_SEGMENT_SECONDS,
+    HlsRendition,
+    TranscodeJobProfile,
+    TranscodePlan,
+    select_hls_renditions,
+)
+from bounded_contexts.photonest.infrastructure.media_processing.transcode_runtime import (
+    FfmpegRunResult,
+    run_ffmpeg_with_progress,
+)
 from bounded_contexts.photonest.infrastructure.photo_models import Media, MediaPlayback
 from shared.kernel.logging.logging_config import setup_task_logging
+from shared.kernel.metrics.instruments import MEDIA_JOBS_TOTAL, MEDIA_STAGE_DURATION
 from shared.kernel.settings.settings import ApplicationSettings, settings
 from bounded_contexts.storage import StorageDomain
 from .thumbs_generate import thumbs_generate
@@ -418,77 +449,121 @@ def backfill_playback_posters(*, limit: Optional[int] = None) -> Dict[str, objec
 # ---------------------------------------------------------------------------
 
 
-def transcode_queue_scan() -> Dict[str, object]:
+_QUEUE_SCAN_BATCH_SIZE = 500
+_QUEUE_SCAN_STAT_WORKERS = 8
+
+
+def transcode_queue_scan(*, batch_size: int = _QUEUE_SCAN_BATCH_SIZE) -> Dict[str, object]:
     """Detect media requiring playback generation.
 
     The function follows the contract described in the specification and
     returns a JSON serialisable dictionary with ``queued`` and ``skipped``
-    counts.  Only minimal error handling is implemented as required for
-    the unit tests.
+    counts (plus ``scanned`` and ``elapsed_ms``).
+
+    Candidates are walked newest first in keyset pages of *batch_size* rows
+    so memory stays flat for large backlogs, and each page is committed
+    before the next is read.  Source existence checks for a page run
+    concurrently in a small thread pool, since each one is a ``stat`` on a
+    possibly remote ``MEDIA_ORIGINALS`` mount.
     """
 
+    started = time.monotonic()
     queued = 0
     skipped = 0
+    scanned = 0
     now = datetime.now(timezone.utc)
-
-    medias: List[Media] = (
-        Media.query.filter_by(is_video=True, has_playback=False, is_deleted=False)
-        .order_by(Media.id.desc())
-        .all()
-    )
-
-    # メディア1件ごとの個別SELECT（N+1）を避けるため、対象メディアの
-    # std1080p プレイバックを一括取得する（id昇順で上書きし最新を残す）
-    playbacks_by_media: Dict[int, MediaPlayback] = {}
-    if medias:
-        playback_rows = (
-            MediaPlayback.query.filter(
-                MediaPlayback.media_id.in_([m.id for m in medias]),
-                MediaPlayback.preset == "std1080p",
+    orig_dir = _orig_dir()
+    batch_size = max(1, batch_size)
+    last_id: Optional[int] = None
+
+    with ThreadPoolExecutor(
+        max_workers=_QUEUE_SCAN_STAT_WORKERS, thread_name_prefix="transcode-scan"
+    ) as pool:
+        while True:
+            query = Media.query.filter_by(is_video=True, has_playback=False, is_deleted=False)
+            if last_id is not None:
+                query = query.filter(Media.id < last_id)
+            medias: List[Media] = query.order_by(Media.id.desc()).limit(batch_size).all()
+            if not medias:
+                break
+            last_id = medias[-1].id
+            scanned += len(medias)
+
+            # メディア1件ごとの個別SELECT（N+1）を避けるため、ページ内メディアの
+            # std1080p プレイバックを一括取得する（id昇順で上書きし最新を残す）
+            playbacks_by_media: Dict[int, MediaPlayback] = {}
+            playback_rows = (
+                MediaPlayback.query.filter(
+                    MediaPlayback.media_id.in_([m.id for m in medias]),
+                    MediaPlayback.preset == "std1080p",
+                )
+                .order_by(MediaPlayback.id.asc())
+                .all()
             )
-            .order_by(MediaPlayback.id.asc())
-            .all()
-        )
-        for row in playback_rows:
-            playbacks_by_media[row.media_id] = row
+            for row in playback_rows:
+                playbacks_by_media[row.media_id] = row
 
-    for m in medias:
-        if not m.local_rel_path:
-            skipped += 1
-            continue
-
-        src_path = _orig_dir() / m.local_rel_path
-        if not src_path.exists():
-            skipped += 1
-            continue
+            candidates = [m for m in medias if m.local_rel_path]
+            skipped += len(medias) - len(candidates)
+            exists = pool.map(
+                lambda media: (orig_dir / media.local_rel_path).exists(), candidates
+            )
 
-        pb = playbacks_by_media.get(m.id)
-        if pb and pb.status in {"pending", "processing", "done"}:
-            skipped += 1
-            continue
+            for m, src_exists in zip(candidates, exists):
+                if not src_exists:
+                    skipped += 1
+                    continue
+
+                pb = playbacks_by_media.get(m.id)
+                if pb and pb.status in {"pending", "processing", "done"}:
+                    skipped += 1
+                    continue
+
+                rel_path = _normalise_rel_path(m.local_rel_path, suffix=".mp4")
+                if not rel_path:
+                    rel_path = f"media_{m.id}.mp4"
+                if pb:
+                    pb.status = "pending"
+                    pb.rel_path = rel_path
+                    pb.error_msg = None
+                    pb.updated_at = now
+                else:
+                    pb = MediaPlayback(
+                        media_id=m.id,
+                        preset="std1080p",
+                        rel_path=rel_path,
+                        status="pending",
+                        created_at=now,
+                        updated_at=now,
+                    )
+                    db.session.add(pb)
+                queued += 1
 
-        rel_path = _normalise_rel_path(m.local_rel_path, suffix=".mp4")
-        if not rel_path:
-            rel_path = f"media_{m.id}.mp4"
-        if pb:
-            pb.status = "pending"
-            pb.rel_path = rel_path
-            pb.error_msg = None
-            pb.updated_at = now
-        else:
-            pb = MediaPlayback(
-                media_id=m.id,
-                preset="std1080p",
-                rel_path=rel_path,
-                status="pending",
-                created_at=now,
-                updated_at=now,
-            )
-            db.session.add(pb)
-        queued += 1
+            db.session.commit()
+            if len(medias) < batch_size:
+                break
 
-    db.session.commit()
-    return {"queued": queued, "skipped": skipped, "notes": None}
+    elapsed_ms = int((time.monotonic() - started) * 1000)
+    logger.info(
+        "Transcode queue scan finished: queued=%s skipped=%s scanned=%s",
+        queued,
+        skipped,
+        scanned,
+        extra={
+            "event": "transcode.queue_scan.finished",
+            "queued": queued,
+            "skipped": skipped,
+            "scanned": scanned,
+            "elapsed_ms": elapsed_ms,
+        },
+    )
+    return {
+        "queued": queued,
+        "skipped": skipped,
+        "notes": None,
+        "scanned": scanned,
+        "elapsed_ms": elapsed_ms,
+    }
 
 
 # ---------------------------------------------------------------------------
@@ -515,6 +590,354 @@ def _probe(path: Path) -> Dict[str, object]:
     return json.loads(proc.stdout)
 
 
+def _source_duration_ms(probe: Optional[Dict[str, Any]], media: Media) -> Optional[int]:
+    """Return the source duration from *probe*, falling back to the media row."""
+
+    if probe:
+        duration = _coerce_duration_ms((probe.get("format", {}) or {}).get("duration"))
+        if duration:
+            return duration
+    return media.duration_ms or None
+
+
+def _encode_command(
+    src_path: Path,
+    out_path: Path,
+    *,
+    threads: int,
+    start_ms: Optional[int] = None,
+    duration_ms: Optional[int] = None,
+    faststart: bool = True,
+) -> List[str]:
+    """Build the H.264/AAC encode command for the whole file or one segment."""
+
+    video_filter = (
+        "scale='min(1920,iw)':'min(1080,ih)':force_original_aspect_ratio=decrease,"
+        "pad='ceil(iw/2)*2':'ceil(ih/2)*2'"
+    )
+    cmd = ["ffmpeg", "-y"]
+    if start_ms:
+        cmd += ["-ss", f"{start_ms / 1000:.3f}"]
+    cmd += ["-i", str(src_path)]
+    if duration_ms:
+        cmd += ["-t", f"{duration_ms / 1000:.3f}"]
+    cmd += [
+        "-vf",
+        video_filter,
+        "-c:v",
+        "libx264",
+        "-crf",
+        str(settings.transcode_crf),
+        "-preset",
+        "veryfast",
+        "-threads",
+        str(threads),
+        "-c:a",
+        "aac",
+        "-b:a",
+        "128k",
+        "-ac",
+        "2",
+    ]
+    if faststart:
+        cmd += ["-movflags", "+faststart"]
+    cmd.append(str(out_path))
+    return cmd
+
+
+def _encode_segmented(
+    playback_id: int,
+    src_path: Path,
+    tmp_out: Path,
+    plan: TranscodePlan,
+    tracker: TranscodeProgressTracker,
+) -> Optional[Tuple[List[str], FfmpegRunResult]]:
+    """Encode *src_path* in parallel segments and concatenate them into *tmp_out*.
+
+    Returns ``None`` on success or the failing command and its result.
+    """
+
+    segment_dir = _tmp_dir() / f"pb_{playback_id}_segments"
+    shutil.rmtree(segment_dir, ignore_errors=True)
+    segment_dir.mkdir(parents=True, exist_ok=True)
+    segment_ms = cast(int, plan.segment_duration_ms)
+
+    def _encode(index: int) -> Tuple[List[str], Path, FfmpegRunResult]:
+        seg_path = segment_dir / f"seg_{index:03d}.mp4"
+        cmd = _encode_command(
+            src_path,
+            seg_path,
+            threads=plan.threads,
+            start_ms=index * segment_ms,
+            duration_ms=segment_ms,
+            faststart=False,
+        )
+        return cmd, seg_path, run_ffmpeg_with_progress(cmd, on_progress=tracker.reporter(index))
+
+    try:
+        results = TranscodeScheduler.run_segments(plan, _encode)
+        for cmd, _seg_path, run in results:
+            if run.returncode != 0:
+                return cmd, run
+
+        concat_list = segment_dir / "concat.txt"
+        concat_list.write_text(
+            "".join(f"file '{seg_path.as_posix()}'\n" for _cmd, seg_path, _run in results),
+            encoding="utf-8",
+        )
+        concat_cmd = [
+            "ffmpeg",
+            "-y",
+            "-f",
+            "concat",
+            "-safe",
+            "0",
+            "-i",
+            str(concat_list),
+            "-c",
+            "copy",
+            "-movflags",
+            "+faststart",
+            str(tmp_out),
+        ]
+        concat_run = run_ffmpeg_with_progress(concat_cmd)
+        if concat_run.returncode != 0:
+            return concat_cmd, concat_run
+        return None
+    finally:
+        shutil.rmtree(segment_dir, ignore_errors=True)
+
+
+def _log_progress(playback_id: int, media_id: int, percent: int, done_ms: int) -> None:
+    logger.info(
+        "Transcode progress for playback %s: %s%%",
+        playback_id,
+        percent,
+        extra={
+            "event": "transcode.progress",
+            "playback_id": playback_id,
+            "media_id": media_id,
+            "percent": percent,
+            "out_time_ms": done_ms,
+        },
+    )
+
+
+def _hls_rel_dir(out_rel: str) -> str:
+    """Return the playback-relative directory holding the HLS tree of *out_rel*."""
+
+    rel = PurePosixPath(out_rel)
+    return (rel.parent / f"{rel.stem}_hls").as_posix()
+
+
+def _hls_command(
+    src_path: Path,
+    out_dir: Path,
+    renditions: Sequence[HlsRendition],
+    *,
+    threads: int,
+) -> List[str]:
+    """Build a single ffmpeg run producing every rendition of the HLS ladder.
+
+    Keyframes are forced on the segment grid so that all renditions switch at
+    the same boundaries, and each variant gets its own ``v<N>/`` directory with
+    an fMP4 init segment, ``.m4s`` media segments and a media playlist.
+    """
+
+    count = len(renditions)
+    split = f"[0:v]split={count}" + "".join(f"[s{i}]" for i in range(count))
+    scales = [
+        f"[s{i}]scale=-2:'min({r.max_height},ih)'[v{i}]"
+        for i, r in enumerate(renditions)
+    ]
+    cmd = [
+        "ffmpeg",
+        "-y",
+        "-i",
+        str(src_path),
+        "-filter_complex",
+        ";".join([split, *scales]),
+    ]
+    for i in range(count):
+        cmd += ["-map", f"[v{i}]", "-map", "0:a:0"]
+    cmd += [
+        "-c:v",
+        "libx264",
+        "-preset",
+        "veryfast",
+        "-profile:v",
+        "high",
+        "-pix_fmt",
+        "yuv420p",
+        "-threads",
+        str(threads),
+        "-force_key_frames",
+        f"expr:gte(t,n_forced*{HLS_SEGMENT_SECONDS})",
+        "-sc_threshold",
+        "0",
+        "-c:a",
+        "aac",
+        "-ac",
+        "2",
+    ]
+    for i, r in enumerate(renditions):
+        cmd += [
+            f"-b:v:{i}",
+            f"{r.video_bitrate_kbps}k",
+            f"-maxrate:v:{i}",
+            f"{r.max_bitrate_kbps}k",
+            f"-bufsize:v:{i}",
+            f"{r.buffer_size_kbps}k",
+            f"-b:a:{i}",
+            f"{r.audio_bitrate_kbps}k",
+        ]
+    cmd += [
+        "-f",
+        "hls",
+        "-hls_time",
+        str(HLS_SEGMENT_SECONDS),
+        "-hls_playlist_type",
+        "vod",
+        "-hls_segment_type",
+        "fmp4",
+        "-hls_flags",
+        "independent_segments",
+        "-hls_fmp4_init_filename",
+        HLS_INIT_SEGMENT,
+        "-hls_segment_filename",
+        str(out_dir / "v%v" / "seg_%05d.m4s"),
+        "-master_pl_name",
+        HLS_MASTER_PLAYLIST,
+        "-var_stream_map",
+        " ".join(f"v:{i},a:{i},name:{r.name}" for i, r in enumerate(renditions)),
+        str(out_dir / "v%v" / "index.m3u8"),
+    ]
+    return cmd
+
+
+def _upsert_hls_playback(std_pb: MediaPlayback, rel_path: str) -> MediaPlayback:
+    now = datetime.now(timezone.utc)
+    hls_pb = MediaPlayback.query.filter_by(media_id=std_pb.media_id, preset="hls").first()
+    if hls_pb is None:
+        hls_pb = MediaPlayback(
+            media_id=std_pb.media_id,
+            preset="hls",
+            rel_path=rel_path,
+            status="processing",
+            created_at=now,
+            updated_at=now,
+        )
+        db.session.add(hls_pb)
+    else:
+        hls_pb.rel_path = rel_path
+        hls_pb.status = "processing"
+        hls_pb.error_msg = None
+        hls_pb.updated_at = now
+    db.session.commit()
+    return hls_pb
+
+
+def _generate_hls(std_pb: MediaPlayback, video_path: Path) -> Optional[MediaPlayback]:
+    """Segment the finished std1080p output into an HLS/fMP4 ladder.
+
+    The std1080p MP4 is used as the source because it is already normalised
+    (H.264/AAC, at most 1080p), which keeps decoding cheap.  Failures only mark
+    the ``hls`` playback row as ``error``; the MP4 playback stays available.
+    """
+
+    rel_dir = _hls_rel_dir(cast(str, std_pb.rel_path))
+    hls_pb = _upsert_hls_playback(std_pb, f"{rel_dir}/{HLS_MASTER_PLAYLIST}")
+    renditions = select_hls_renditions(std_pb.height)
+
+    work_dir = _tmp_dir() / f"pb_{std_pb.id}_hls"
+    shutil.rmtree(work_dir, ignore_errors=True)
+    for index in range(len(renditions)):
+        (work_dir / f"v{index}").mkdir(parents=True, exist_ok=True)
+
+    try:
+        profile = TranscodeJobProfile(duration_ms=std_pb.duration_ms)
+        with TranscodeScheduler.from_settings().reserve(
+            key=f"pb{hls_pb.id}", profile=profile
+        ) as plan:
+            tracker = TranscodeProgressTracker(
+                total_ms=profile.duration_ms,
+                notify=lambda percent, done_ms: _log_progress(
+                    hls_pb.id, hls_pb.media_id, percent, done_ms
+                ),
+            )
+            cmd = _hls_command(
+                video_path, work_dir, renditions, threads=plan.reserved_threads
+            )
+            run = run_ffmpeg_with_progress(cmd, on_progress=tracker.reporter(0))
+
+        if run.returncode != 0 or not (work_dir / HLS_MASTER_PLAYLIST).exists():
+            logger.warning(
+                "HLS generation failed for playback %s",
+                hls_pb.id,
+                extra={
+                    "event": "transcode.hls.failed",
+                    "playback_id": hls_pb.id,
+                    "media_id": hls_pb.media_id,
+                    "ffmpeg_command": " ".join(cmd),
+                    "return_code": run.returncode,
+                    "error": _summarise_ffmpeg_error(run.stderr),
+                },
+            )
+            hls_pb.status = "error"
+            hls_pb.error_msg = (run.stderr or "missing_master_playlist")[-1000:]
+            hls_pb.updated_at = datetime.now(timezone.utc)
+            db.session.commit()
+            return hls_pb
+
+        dest_dir = _play_dir() / rel_dir
+        try:
+            shutil.rmtree(dest_dir, ignore_errors=True)
+            dest_dir.parent.mkdir(parents=True, exist_ok=True)
+            shutil.move(str(work_dir), dest_dir)
+        except OSError as exc:
+            logger.warning(
+                "Moving HLS output failed for playback %s: %s",
+                hls_pb.id,
+                exc,
+                extra={
+                    "event": "transcode.hls.move_failed",
+                    "playback_id": hls_pb.id,
+                    "media_id": hls_pb.media_id,
+                    "dest_dir": str(dest_dir),
+                },
+            )
+            hls_pb.status = "error"
+            hls_pb.error_msg = f"file_move_error: {exc}"[:1000]
+            hls_pb.updated_at = datetime.now(timezone.utc)
+            db.session.commit()
+            return hls_pb
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+    hls_pb.width = std_pb.width
+    hls_pb.height = std_pb.height
+    hls_pb.v_codec = "h264"
+    hls_pb.a_codec = "aac"
+    hls_pb.v_bitrate_kbps = renditions[0].video_bitrate_kbps
+    hls_pb.duration_ms = std_pb.duration_ms
+    hls_pb.poster_rel_path = std_pb.poster_rel_path
+    hls_pb.status = "done"
+    hls_pb.updated_at = datetime.now(timezone.utc)
+    db.session.commit()
+    logger.info(
+        "HLS playback generated for playback %s",
+        hls_pb.id,
+        extra={
+            "event": "transcode.hls.generated",
+            "playback_id": hls_pb.id,
+            "media_id": hls_pb.media_id,
+            "dest_dir": str(dest_dir),
+            "renditions": [r.name for r in renditions],
+        },
+    )
+    return hls_pb
+
+
 @dataclass
 class _WorkResult:
     ok: bool
@@ -530,6 +953,13 @@ class _WorkResult:
 def transcode_worker(*, media_playback_id: int, force: bool = False) -> Dict[str, object]:
     """Transcode a queued playback item using ffmpeg."""
 
+    result = _transcode_playback(media_playback_id=media_playback_id, force=force)
+    outcome = result.get("note") or ("done" if result.get("ok") else "failed")
+    MEDIA_JOBS_TOTAL.labels("transcode", outcome).inc()
+    return result
+
+
+def _transcode_playback(*, media_playback_id: int, force: bool) -> Dict[str, object]:
     if force:
         logger.debug(
             "Force flag received by transcode_worker; proceeding with standard processing.",
@@ -607,7 +1037,8 @@ def transcode_worker(*, media_playback_id: int, force: bool = False) -> Dict[str
 
     src_probe: Optional[Dict[str, Any]] = None
     try:
-        src_probe = _probe(src_path)
+        with MEDIA_STAGE_DURATION.labels("transcode", "probe").time():
+            src_probe = _probe(src_path)
     except Exception:  # pragma: no cover - best effort for passthrough detection
         src_probe = None
 
@@ -615,7 +1046,8 @@ def transcode_worker(*, media_playback_id: int, force: bool = False) -> Dict[str
 
     if passthrough:
         try:
-            shutil.copy2(src_path, tmp_out)
+            with MEDIA_STAGE_DURATION.labels("transcode", "passthrough").time():
+                shutil.copy2(src_path, tmp_out)
             logger.info(
                 "MP4 passthrough copy completed for playback %s",
                 pb.id,
@@ -645,59 +1077,63 @@ def transcode_worker(*, media_playback_id: int, force: bool = False) -> Dict[str
             passthrough = False
 
     if not passthrough:
-        crf = settings.transcode_crf
-        video_filter = (
-            "scale='min(1920,iw)':'min(1080,ih)':force_original_aspect_ratio=decrease,"
-            "pad='ceil(iw/2)*2':'ceil(ih/2)*2'"
-        )
-
-        cmd = [
-            "ffmpeg",
-            "-y",
-            "-i",
-            str(src_path),
-            "-vf",
-            video_filter,
-            "-c:v",
-            "libx264",
-            "-crf",
-            str(crf),
-            "-preset",
-            "veryfast",
-            "-c:a",
-            "aac",
-            "-b:a",
-            "128k",
-            "-ac",
-            "2",
-            "-movflags",
-            "+faststart",
-            str(tmp_out),
-        ]
-        proc = subprocess.run(cmd, capture_output=True, text=True)
-        if proc.returncode != 0:
+        profile = TranscodeJobProfile(duration_ms=_source_duration_ms(src_probe, m))
+        with TranscodeScheduler.from_settings().reserve(
+            key=f"pb{pb.id}", profile=profile
+        ) as plan:
+            logger.info(
+                "Transcode plan for playback %s: threads=%s segments=%s",
+                pb.id,
+                plan.threads,
+                plan.segments,
+                extra={
+                    "event": "transcode.plan",
+                    "playback_id": pb.id,
+                    "media_id": pb.media_id,
+                    "threads": plan.threads,
+                    "segments": plan.segments,
+                    "source_duration_ms": profile.duration_ms,
+                },
+            )
+            tracker = TranscodeProgressTracker(
+                total_ms=profile.duration_ms,
+                segments=plan.segments,
+                notify=lambda percent, done_ms: _log_progress(pb.id, pb.media_id, percent, done_ms),
+            )
+            with MEDIA_STAGE_DURATION.labels("transcode", "encode").time():
+                if plan.is_segmented:
+                    failure = _encode_segmented(pb.id, src_path, tmp_out, plan, tracker)
+                else:
+                    cmd = _encode_command(src_path, tmp_out, threads=plan.threads)
+                    run = run_ffmpeg_with_progress(cmd, on_progress=tracker.reporter(0))
+                    failure = (cmd, run) if run.returncode != 0 else None
+
+        if failure is not None:
+            cmd, run = failure
             error_details = {
                 "playback_id": pb.id,
                 "media_id": pb.media_id,
                 "input_path": str(src_path),
                 "output_path": str(tmp_out),
                 "ffmpeg_command": " ".join(cmd),
-                "return_code": proc.returncode,
-                "stderr": proc.stderr,
-                "stdout": proc.stdout,
+                "return_code": run.returncode,
+                "stderr": run.stderr,
+                "threads": plan.threads,
+                "segments": plan.segments,
             }
-            error_summary = _summarise_ffmpeg_error(proc.stderr)
+            error_summary = _summarise_ffmpeg_error(run.stderr)
             if not error_summary:
-                error_summary = f"ffmpeg exited with code {proc.returncode}"
+                error_summary = f"ffmpeg exited with code {run.returncode}"
             logger.error(
-                f"FFmpeg変換失敗: playback_id={pb.id}, media_id={pb.media_id} - return_code={proc.returncode}",
+                f"FFmpeg変換失敗: playback_id={pb.id}, media_id={pb.media_id} - return_code={run.returncode}",
                 extra={
                     "event": "transcode.ffmpeg.failed",
                     "error_details": json.dumps(error_details),
                 },
             )
+            tmp_out.unlink(missing_ok=True)
             pb.status = "error"
-            pb.error_msg = proc.stderr[-1000:]
+            pb.error_msg = run.stderr[-1000:]
             pb.updated_at = datetime.now(timezone.utc)
             db.session.commit()
             return {
@@ -890,7 +1326,8 @@ def transcode_worker(*, media_playback_id: int, force: bool = False) -> Dict[str
         },
     )
 
-    poster_rel = _generate_poster(pb, dest_path)
+    with MEDIA_STAGE_DURATION.labels("transcode", "poster").time():
+        poster_rel = _generate_poster(pb, dest_path)
 
     poster_path = (_play_dir() / poster_rel) if poster_rel else None
     if poster_path and not poster_path.exists():
@@ -938,6 +1375,24 @@ def transcode_worker(*, media_playback_id: int, force: bool = False) -> Dict[str
     m.has_playback = True
     db.session.commit()
 
+    hls_pb: Optional[MediaPlayback] = None
+    if settings.transcode_hls_enabled:
+        try:
+            hls_pb = _generate_hls(pb, dest_path)
+        except Exception as exc:  # pragma: no cover - defensive
+            db.session.rollback()
+            logger.warning(
+                "HLS generation raised for playback %s: %s",
+                pb.id,
+                exc,
+                extra={
+                    "event": "transcode.hls.exception",
+                    "playback_id": pb.id,
+                    "media_id": pb.media_id,
+                },
+                exc_info=True,
+            )
+
     if poster_rel:
         try:
             thumbs_generate(media_id=m.id, force=True)
@@ -963,4 +1418,5 @@ def transcode_worker(*, media_playback_id: int, force: bool = False) -> Dict[str
         "note": note_value,
         "output_path": str(dest_path),
         "poster_path": str(poster_path) if poster_path else None,
+        "hls_status": hls_pb.status if hls_pb else None,
     }
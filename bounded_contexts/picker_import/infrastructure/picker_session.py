@@ -122,3 +122,12 @@ def _ensure_unique_session_id(mapper, connection, target):
         counter += 1
 
     target.session_id = candidate
+
+
+def _register_progress_listeners() -> None:
+    from .session_progress import register_session_progress_listeners
+
+    register_session_progress_listeners()
+
+
+_register_progress_listeners()
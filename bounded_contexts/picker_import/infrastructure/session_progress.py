@@ -0,0 +1,325 @@
+"""インポート／ピッカーセッション進捗の Redis pub/sub 配信。
+
+UI は ``/local-import/status`` や ``/picker/session/{id}`` をポーリングしており、
+そのたびに ``PickerSelection`` の ``GROUP BY status`` 集計が走る。ここでは
+ワーカー側で ``picker_session`` / ``picker_selection`` の変更をコミット時に
+検知し、進捗スナップショットを Redis に保存したうえでチャンネルへ publish する。
+SSE エンドポイントはこのチャンネルを購読するだけで、閲覧者数に比例した
+集計クエリは発生しない。
+
+* スナップショット: ``session_progress:<id>`` に最新状態を TTL 付きで保存。
+  再接続したクライアントはこれを受け取ってから差分を待つ（リプレイ）。
+* 連番: ``session_progress:<id>:seq`` を INCR した値を ``seq`` として埋め込み、
+  SSE の ``id`` に使う。スナップショット保存と publish は Lua で原子的に行う。
+* 選択件数の集計はセッション単位で ``_COUNTS_MIN_INTERVAL`` 秒に 1 回まで。
+  セッション行自体（status / stats / selected_count）の変更は常に配信し、
+  件数を含まない配信では直前のスナップショットの件数を引き継ぐ。
+
+``REDIS_URL`` が未設定、または Redis に接続できない場合は何もしない
+（ポーリング API はそのまま使える）。
+"""
+from __future__ import annotations
+
+import json
+import threading
+import time
+from datetime import datetime, timezone
+from typing import Any, Dict, Optional
+
+from sqlalchemy import event, func, inspect, select
+from sqlalchemy.orm import Session
+
+from shared.infrastructure.redis_client import LazyRedisClient
+from shared.kernel.settings.settings import settings
+
+# 進捗スナップショットの保持期間（秒）。終了したセッションも 1 日は再生できる。
+_SNAPSHOT_TTL_SECONDS = 24 * 60 * 60
+# 選択件数の再集計間隔（秒）。大量インポート中の集計クエリを抑える。
+_COUNTS_MIN_INTERVAL = 1.0
+
+# これ以上進捗が変化しないセッション状態。SSE はこの状態を送ったら閉じる。
+TERMINAL_STATES = frozenset({"imported", "canceled", "expired", "error", "failed"})
+
+_PENDING_KEY = "session_progress.pending"
+
+# KEYS[1]=snapshot, KEYS[2]=seq, KEYS[3]=channel / ARGV[1]=payload, ARGV[2]=ttl
+_PUBLISH_SCRIPT = """
+local seq = redis.call('INCR', KEYS[2])
+redis.call('EXPIRE', KEYS[2], ARGV[2])
+local payload = cjson.decode(ARGV[1])
+payload['seq'] = seq
+if payload['counts'] == nil then
+  local previous = redis.call('GET', KEYS[1])
+  if previous then
+    payload['counts'] = cjson.decode(previous)['counts']
+  end
+end
+local message = cjson.encode(payload)
+redis.call('SET', KEYS[1], message, 'EX', ARGV[2])
+redis.call('PUBLISH', KEYS[3], message)
+return seq
+"""
+
+_lock = threading.Lock()
+_publish_script: Any = None
+_last_counts_at: Dict[int, float] = {}
+
+
+def snapshot_key(session_id: int) -> str:
+    return f"session_progress:{session_id}"
+
+
+def channel_name(session_id: int) -> str:
+    return f"session_progress:{session_id}:events"
+
+
+def _seq_key(session_id: int) -> str:
+    return f"session_progress:{session_id}:seq"
+
+
+def _iso(value: Optional[datetime]) -> Optional[str]:
+    if value is None:
+        return None
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return value.isoformat().replace("+00:00", "Z")
+
+
+def build_progress_payload(
+    picker_session: Any,
+    counts: Optional[Dict[str, int]] = None,
+) -> Dict[str, Any]:
+    """セッション行から配信用の進捗スナップショットを組み立てる。"""
+
+    payload: Dict[str, Any] = {
+        "session_id": picker_session.id,
+        "state": picker_session.status,
+        "stats": picker_session.stats(),
+        "selected_count": picker_session.selected_count,
+        "last_updated": _iso(picker_session.updated_at),
+    }
+    if counts is not None:
+        payload["counts"] = dict(counts)
+    return payload
+
+
+def load_selection_counts(session: Session, session_id: int) -> Dict[str, int]:
+    """選択ステータスごとの件数を 1 クエリで取得する。"""
+    from bounded_contexts.photonest.infrastructure.photo_models import PickerSelection
+
+    rows = session.execute(
+        select(PickerSelection.status, func.count(PickerSelection.id))
+        .where(PickerSelection.session_id == session_id)
+        .group_by(PickerSelection.status)
+    ).all()
+    return {status: count for status, count in rows}
+
+
+# ---------------------------------------------------------------------------
+# Redis クライアント
+# ---------------------------------------------------------------------------
+
+
+def _register_publish_script(client: Any) -> None:
+    global _publish_script
+
+    _publish_script = client.register_script(_PUBLISH_SCRIPT)
+
+
+_redis = LazyRedisClient(
+    "Session progress publishing is paused",
+    event="session_progress.redis_unavailable",
+    on_connect=_register_publish_script,
+)
+
+
+def publishing_enabled() -> bool:
+    return _redis.client() is not None
+
+
+def publish_session_progress(payload: Dict[str, Any]) -> Optional[int]:
+    """スナップショットを保存して購読者へ配信し、採番した ``seq`` を返す。"""
+    from redis.exceptions import RedisError
+
+    client = _redis.client()
+    if client is None:
+        return None
+    session_id = int(payload["session_id"])
+    try:
+        seq = _publish_script(
+            keys=[snapshot_key(session_id), _seq_key(session_id), channel_name(session_id)],
+            args=[json.dumps(payload, default=str), _SNAPSHOT_TTL_SECONDS],
+        )
+    except RedisError as exc:
+        _redis.mark_unavailable(exc)
+        return None
+    return int(seq)
+
+
+def load_snapshot(session_id: int) -> Optional[Dict[str, Any]]:
+    """保存済みの最新スナップショットを返す。無ければ ``None``。"""
+    from redis.exceptions import RedisError
+
+    client = _redis.client()
+    if client is None:
+        return None
+    try:
+        raw = client.get(snapshot_key(session_id))
+    except RedisError as exc:
+        _redis.mark_unavailable(exc)
+        return None
+    if not raw:
+        return None
+    try:
+        return json.loads(raw)
+    except ValueError:
+        return None
+
+
+class ProgressSubscription:
+    """セッションの進捗チャンネルを購読する非同期コンテキストマネージャ。
+
+    購読を確立してからスナップショットを読むことで、その間に publish された
+    進捗を取りこぼさない（重複は ``seq`` で除外する）。
+    """
+
+    def __init__(self, session_id: int) -> None:
+        self._session_id = session_id
+        self._client: Any = None
+        self._pubsub: Any = None
+
+    async def __aenter__(self) -> "ProgressSubscription":
+        import redis.asyncio as redis_async
+
+        self._client = redis_async.from_url(settings.redis_url)
+        self._pubsub = self._client.pubsub()
+        try:
+            await self._pubsub.subscribe(channel_name(self._session_id))
+        except Exception:
+            await self.__aexit__(None, None, None)
+            raise
+        return self
+
+    async def __aexit__(self, *exc_info: Any) -> None:
+        if self._pubsub is not None:
+            await self._pubsub.aclose()
+        if self._client is not None:
+            await self._client.aclose()
+
+    async def get(self, timeout: float) -> Optional[Dict[str, Any]]:
+        """次の進捗を返す。``timeout`` 秒なにも届かなければ ``None``。"""
+
+        deadline = time.monotonic() + timeout
+        while True:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return None
+            message = await self._pubsub.get_message(
+                ignore_subscribe_messages=True, timeout=remaining
+            )
+            if message is None:
+                return None
+            try:
+                return json.loads(message["data"])
+            except (TypeError, ValueError):
+                continue
+
+
+# ---------------------------------------------------------------------------
+# SQLAlchemy フック
+# ---------------------------------------------------------------------------
+
+
+def _attribute_changed(obj: Any, *names: str) -> bool:
+    state = inspect(obj)
+    return any(state.attrs[name].history.has_changes() for name in names)
+
+
+def _counts_due(session_id: int, now: float) -> bool:
+    with _lock:
+        last = _last_counts_at.get(session_id)
+        if last is not None and now - last < _COUNTS_MIN_INTERVAL:
+            return False
+        _last_counts_at[session_id] = now
+        return True
+
+
+def _collect_progress(session: Session, flush_context: Any) -> None:
+    """flush された変更から配信すべきセッション進捗を集めておく。"""
+    from bounded_contexts.photonest.infrastructure.photo_models import PickerSelection
+    from bounded_contexts.picker_import.infrastructure.picker_session import PickerSession
+
+    if not publishing_enabled():
+        return
+
+    forced: Dict[int, PickerSession] = {}
+    touched: set[int] = set()
+    for obj in list(session.new) + list(session.dirty):
+        if isinstance(obj, PickerSession) and obj.id is not None:
+            if obj in session.new or _attribute_changed(
+                obj, "status", "stats_json", "selected_count"
+            ):
+                forced[obj.id] = obj
+        elif isinstance(obj, PickerSelection) and obj.session_id is not None:
+            if obj in session.new or _attribute_changed(obj, "status"):
+                touched.add(obj.session_id)
+    if not forced and not touched:
+        return
+
+    pending: Dict[int, Dict[str, Any]] = session.info.setdefault(_PENDING_KEY, {})
+    now = time.monotonic()
+    for session_id in set(forced) | touched:
+        if session_id not in forced and not _counts_due(session_id, now):
+            continue
+        picker_session = forced.get(session_id) or session.get(PickerSession, session_id)
+        if picker_session is None:
+            continue
+        counts = None
+        # 終了状態への遷移時は間引かずに最終件数を載せる。
+        if session_id in touched or picker_session.status in TERMINAL_STATES:
+            counts = load_selection_counts(session, session_id)
+        pending[session_id] = build_progress_payload(picker_session, counts)
+
+
+def _publish_pending(session: Session) -> None:
+    pending = session.info.pop(_PENDING_KEY, None)
+    if not pending:
+        return
+    for payload in pending.values():
+        publish_session_progress(payload)
+        if payload.get("state") in TERMINAL_STATES:
+            with _lock:
+                _last_counts_at.pop(payload["session_id"], None)
+
+
+def _discard_pending(session: Session, *args: Any) -> None:
+    session.info.pop(_PENDING_KEY, None)
+
+
+_listeners_registered = False
+
+
+def register_session_progress_listeners() -> None:
+    """全 Session に進捗配信フックを登録する（多重登録しない）。"""
+    global _listeners_registered
+
+    if _listeners_registered:
+        return
+    event.listen(Session, "after_flush", _collect_progress)
+    event.listen(Session, "after_commit", _publish_pending)
+    event.listen(Session, "after_rollback", _discard_pending)
+    _listeners_registered = True
+
+
+__all__ = [
+    "ProgressSubscription",
+    "TERMINAL_STATES",
+    "build_progress_payload",
+    "channel_name",
+    "load_selection_counts",
+    "load_snapshot",
+    "publish_session_progress",
+    "publishing_enabled",
+    "register_session_progress_listeners",
+    "snapshot_key",
+]
@@ -75,6 +75,8 @@ from bounded_contexts.picker_import.domain.services import (
     ImportResultAggregator,
     MediaHashingService,
 )
+from bounded_contexts.photonest.infrastructure.local_import.storage.blob_store import blob_store_for
+from shared.kernel.file_hash import record_sha256
 from shared.kernel.utils import open_image_compat
 
 
@@ -245,6 +247,27 @@ def _atomic_move_into_place(src: Path, dest: Path) -> str:
     return "copy+replace"
 
 
+def _place_original(src: Path, dest: Path, orig_dir: Path, sha256: str) -> str:
+    """ダウンロード済みファイルを originals の *dest* に置き、採用した方式を返す.
+
+    blob ストアが有効なら内容を ``originals/.blobs`` に 1 つだけ置き、*dest* は
+    そのリンクにする（``"blob+hardlink"`` 等）。無効・失敗時は
+    :func:`_atomic_move_into_place` で移動する。
+    """
+
+    blob_store = blob_store_for(orig_dir)
+    if blob_store is not None:
+        try:
+            placement = blob_store.place(src, dest, sha256)
+        except OSError:
+            pass
+        else:
+            with contextlib.suppress(FileNotFoundError):
+                src.unlink()
+            return f"blob+{placement}"
+    return _atomic_move_into_place(src, dest)
+
+
 class AuthError(Exception):
     """Authorization failure that should not be retried."""
 
@@ -402,6 +425,9 @@ def _download(url: str, dest_dir: Path, headers: Dict[str, str] | None = None) -
 
             status_code = resp.status_code
 
+        digest = hasher.hexdigest()
+        # 取り込み後の再試行・メタデータ再適用で読み直さないよう登録しておく
+        record_sha256(tmp_path, digest)
         _log_info(
             "picker.download.success",
             f"ファイルダウンロード成功: {url} ({total_bytes} bytes)",
@@ -410,7 +436,7 @@ def _download(url: str, dest_dir: Path, headers: Dict[str, str] | None = None) -
             status_code=status_code,
         )
 
-        return Downloaded(tmp_path, total_bytes, hasher.hexdigest())
+        return Downloaded(tmp_path, total_bytes, digest)
     except requests.Timeout as e:
         _log_error(
             "picker.download.timeout",
@@ -1019,7 +1045,7 @@ def picker_import_item(
             final_path = orig_dir / out_rel
             final_path.parent.mkdir(parents=True, exist_ok=True)
             try:
-                move_method = _atomic_move_into_place(dl.path, final_path)
+                move_method = _place_original(dl.path, final_path, orig_dir, dl.sha256)
                 if move_method == "copy+replace":
                     _log_warning(
                         "picker.file.move.cross_device",
@@ -1721,7 +1747,7 @@ def picker_import(*, picker_session_id: int, account_id: int) -> Dict[str, objec
             )
             final_path = orig_dir / out_rel
             final_path.parent.mkdir(parents=True, exist_ok=True)
-            _atomic_move_into_place(dl.path, final_path)
+            _place_original(dl.path, final_path, orig_dir, dl.sha256)
 
             _log_info(
                 "picker.item.file.saved",
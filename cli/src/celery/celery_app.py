@@ -12,6 +12,8 @@ from shared.kernel.database.db import db
 from shared.infrastructure.models.celery_task import CeleryTaskRecord, CeleryTaskStatus
 from shared.infrastructure.models.job_sync import JobSync
 from shared.kernel.logging.logging_config import log_task_info
+from shared.kernel.metrics.instruments import install_celery_instrumentation
+from shared.kernel.profiling import install_celery_profiling
 
 # shared.infrastructure.models.__init__ は shared モデル（User・GoogleAccount 等）を
 # import する。これらは bounded_context のモデルを文字列 relationship で参照しているため、
@@ -167,6 +169,12 @@ def _configure_beat_logging(**_: Any) -> None:
     _ensure_worker_logging()
 
 
+# Task counts/durations for /metrics (task_prerun/task_postrun signals).
+install_celery_instrumentation()
+# On-demand profiling via the ``profile`` task header (shared/kernel/profiling.py).
+install_celery_profiling()
+
+
 def _to_str(value: Any) -> Optional[str]:
     if value is None:
         return None
@@ -581,6 +589,30 @@ celery.conf.beat_schedule = {
         "task": "thumbnail_retry.process_due",
         "schedule": timedelta(minutes=1),
     },
+    "thumbnail-manifest-backfill": {
+        "task": "thumbs.manifest_backfill",
+        "schedule": timedelta(minutes=10),  # 未記録のメディアが無くなれば空振りで終わる
+        "kwargs": {"limit": 500},
+    },
+    "blurhash-backfill": {
+        "task": "thumbs.blurhash_backfill",
+        "schedule": timedelta(minutes=10),  # マニフェスト記録済みで未計算のメディアが無くなれば空振り
+        "kwargs": {"limit": 500},
+    },
+    "thumbnail-pack-compaction": {
+        "task": "thumbs.pack_compact",
+        "schedule": timedelta(days=1),  # パックを使っていなければ空振りで終わる
+        "kwargs": {"min_dead_ratio": 0.5, "limit": 10},
+    },
+    "album-stats-repair": {
+        "task": "albums.repair_stats",
+        "schedule": timedelta(days=1),  # 撮影日時の再取得などで集計列がずれた分を直す
+        "kwargs": {"batch_size": 200},
+    },
+    "media-file-deletion": {
+        "task": "media_files.delete_pending",
+        "schedule": timedelta(minutes=1),  # 削除 API からの即時起動に失敗した分も拾う
+    },
     "backup-cleanup": {
         "task": "backup_cleanup.cleanup",
         "schedule": timedelta(days=1),  # 毎日実行
@@ -591,6 +623,11 @@ celery.conf.beat_schedule = {
         "schedule": timedelta(days=1),  # 毎日実行
         "kwargs": {"retention_days": 365},  # 1年以上前のログを削除
     },
+    "logs-partition-maintenance": {
+        "task": "logs.partition_maintenance",
+        "schedule": timedelta(days=1),  # パーティション化していない DB では何もしない
+        "kwargs": {"months_ahead": 3},  # 3か月先までの月次パーティションを事前作成
+    },
     "certificates-auto-rotation": {
         "task": "certificates.auto_rotate",
         "schedule": timedelta(hours=1),
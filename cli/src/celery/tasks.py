@@ -17,12 +17,19 @@ from bounded_contexts.picker_import.tasks.session_recovery import (
     get_session_status_report
 )
 from shared.application.tasks.backup_cleanup import cleanup_old_backups, get_backup_status
-from shared.application.tasks.log_cleanup import cleanup_old_logs
+from shared.application.tasks.log_cleanup import cleanup_old_logs, maintain_log_partitions
 from bounded_contexts.photonest.tasks.media_post_processing import process_due_thumbnail_retries
+from bounded_contexts.photonest.tasks.media_file_deletion import process_media_file_deletions
+from bounded_contexts.photonest.tasks.album_stats import repair_album_stats
+from bounded_contexts.photonest.infrastructure.media_processing.thumbnail_packs import (
+    compact_thumbnail_packs,
+)
 from shared.kernel.logging.logging_config import log_task_info, log_task_error
 from bounded_contexts.photonest.tasks.thumbs_generate import (
     PLAYBACK_NOT_READY_NOTES,
     PlaybackNotReadyError,
+    backfill_blurhashes,
+    backfill_thumbnail_manifests,
     thumbs_generate,
 )
 from bounded_contexts.certs.tasks.rotate_certificates import (  # noqa: F401 - タスク登録目的
@@ -248,6 +255,21 @@ def cleanup_old_logs_task(self, retention_days: int = 365):
         return {"ok": False, "error": str(e)}
 
 
+@celery.task(bind=True, name="logs.partition_maintenance")
+def log_partition_maintenance_task(self, months_ahead: int = 3):
+    """Pre-create monthly partitions of the log tables (MySQL / MariaDB only)."""
+    try:
+        return maintain_log_partitions(months_ahead=months_ahead)
+    except Exception as e:  # pragma: no cover - defensive path
+        self.log_error(
+            f"Log partition maintenance failed: {str(e)}",
+            event="logs_partition_maintenance",
+            exc_info=True,
+            months_ahead=months_ahead,
+        )
+        return {"ok": False, "error": str(e)}
+
+
 @celery.task(bind=True, name="thumbnail_retry.process_due")
 def thumbnail_retry_process_task(self, limit: int = 50):
     """Process thumbnail retry records whose scheduled time has elapsed."""
@@ -263,6 +285,81 @@ def thumbnail_retry_process_task(self, limit: int = 50):
         return {"ok": False, "error": str(e)}
 
 
+@celery.task(bind=True, name="thumbs.manifest_backfill")
+def thumbnail_manifest_backfill_task(self, limit: int = 500):
+    """Record the thumbnail manifest for media created before it existed."""
+
+    try:
+        return backfill_thumbnail_manifests(limit=limit)
+    except Exception as e:
+        self.log_error(
+            f"Thumbnail manifest backfill failed: {str(e)}",
+            event="thumbnail_manifest_backfill",
+            exc_info=True,
+        )
+        return {"ok": False, "error": str(e)}
+
+
+@celery.task(bind=True, name="thumbs.blurhash_backfill")
+def blurhash_backfill_task(self, limit: int = 500):
+    """Compute BlurHash placeholders for media created before they existed."""
+
+    try:
+        return backfill_blurhashes(limit=limit)
+    except Exception as e:
+        self.log_error(
+            f"BlurHash backfill failed: {str(e)}",
+            event="blurhash_backfill",
+            exc_info=True,
+        )
+        return {"ok": False, "error": str(e)}
+
+
+@celery.task(bind=True, name="thumbs.pack_compact")
+def thumbnail_pack_compact_task(self, min_dead_ratio: float = 0.5, limit: int = 10):
+    """Rewrite thumbnail packs whose entries are mostly unreferenced."""
+
+    try:
+        return compact_thumbnail_packs(min_dead_ratio=min_dead_ratio, limit=limit)
+    except Exception as e:
+        self.log_error(
+            f"Thumbnail pack compaction failed: {str(e)}",
+            event="thumbnail_pack_compact",
+            exc_info=True,
+        )
+        return {"ok": False, "error": str(e)}
+
+
+@celery.task(bind=True, name="albums.repair_stats")
+def album_stats_repair_task(self, batch_size: int = 200):
+    """Recompute denormalised album statistics that drifted from album_item."""
+
+    try:
+        return repair_album_stats(batch_size=batch_size)
+    except Exception as e:
+        self.log_error(
+            f"Album stats repair failed: {str(e)}",
+            event="album_stats_repair",
+            exc_info=True,
+        )
+        return {"ok": False, "error": str(e)}
+
+
+@celery.task(bind=True, name="media_files.delete_pending")
+def media_file_deletion_task(self, limit: int | None = None):
+    """Remove files of deleted media recorded in the deletion queue."""
+
+    try:
+        return process_media_file_deletions(limit=limit)
+    except Exception as e:
+        self.log_error(
+            f"Media file deletion failed: {str(e)}",
+            event="media_file_deletion",
+            exc_info=True,
+        )
+        return {"ok": False, "error": str(e)}
+
+
 @celery.task(bind=True, name="session_recovery.force_cleanup_all")
 def force_cleanup_all_sessions_task(self):
     """全ての処理中セッションを強制的にクリーンアップする（緊急時用）"""
@@ -327,6 +424,12 @@ __all__ = [
     "local_import_task_celery",
     "cleanup_stale_sessions_task",
     "thumbnail_retry_process_task",
+    "log_partition_maintenance_task",
+    "thumbnail_manifest_backfill_task",
+    "blurhash_backfill_task",
+    "thumbnail_pack_compact_task",
+    "album_stats_repair_task",
+    "media_file_deletion_task",
     "force_cleanup_all_sessions_task",
     "session_status_report_task",
     "backup_cleanup_task",
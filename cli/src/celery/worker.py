@@ -0,0 +1,70 @@
+"""Start a Celery worker specialised for one queue lane.
+
+Usage::
+
+    python -m cli.src.celery.worker --lane interactive
+    python -m cli.src.celery.worker --lane bulk --concurrency 2
+
+``--lane all`` (the default) consumes every queue, matching the previous
+single-worker deployment.
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+from typing import List, Optional, Sequence
+
+from shared.kernel.celery_queues import WORKER_LANES
+
+
+def build_worker_argv(
+    lane: str,
+    *,
+    concurrency: Optional[int] = None,
+    loglevel: str = "info",
+) -> List[str]:
+    """Return the ``celery worker`` argument list for *lane*."""
+
+    try:
+        worker_lane = WORKER_LANES[lane]
+    except KeyError:
+        raise ValueError(
+            f"Unknown worker lane {lane!r}; expected one of {sorted(WORKER_LANES)}"
+        ) from None
+    return worker_lane.worker_argv(concurrency=concurrency, loglevel=loglevel)
+
+
+def _parse_args(argv: Optional[Sequence[str]]) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "--lane",
+        choices=sorted(WORKER_LANES),
+        default=os.environ.get("CELERY_WORKER_LANE") or "all",
+        help="Queue lane to consume (default: $CELERY_WORKER_LANE or 'all').",
+    )
+    parser.add_argument(
+        "--concurrency",
+        type=int,
+        default=int(os.environ.get("CELERY_WORKER_CONCURRENCY") or 0) or None,
+        help="Override the lane's default concurrency.",
+    )
+    parser.add_argument("--loglevel", default="info")
+    return parser.parse_args(argv)
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    args = _parse_args(argv)
+    worker_argv = build_worker_argv(
+        args.lane, concurrency=args.concurrency, loglevel=args.loglevel
+    )
+
+    # Importing the tasks module registers every task, as ``-A cli.src.celery.tasks`` does.
+    from cli.src.celery.tasks import celery
+
+    celery.worker_main(worker_argv)
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
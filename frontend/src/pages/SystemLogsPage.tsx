@@ -142,11 +142,9 @@ const groupLogsByTrace = (logs: AdminLogEntry[]): LogGroup[] => {
   return groups;
 };
 
-/** JSON データをファイルとしてダウンロードさせる。 */
-const downloadJson = (data: unknown, filename: string): void => {
-  const blob = new Blob([JSON.stringify(data, null, 2)], {
-    type: 'application/json',
-  });
+/** テキストをファイルとしてダウンロードさせる。 */
+const downloadText = (text: string, filename: string, type: string): void => {
+  const blob = new Blob([text], { type });
   const url = URL.createObjectURL(blob);
   const anchor = document.createElement('a');
   anchor.href = url;
@@ -157,6 +155,11 @@ const downloadJson = (data: unknown, filename: string): void => {
   URL.revokeObjectURL(url);
 };
 
+/** JSON データをファイルとしてダウンロードさせる。 */
+const downloadJson = (data: unknown, filename: string): void => {
+  downloadText(JSON.stringify(data, null, 2), filename, 'application/json');
+};
+
 /** エクスポートファイル名（例: system-logs-app-2026-07-14T12-29-13.json）。 */
 const exportFileName = (source: AdminLogSource): string => {
   const stamp = new Date().toISOString().replace(/[:.]/g, '-').replace('Z', '');
@@ -341,6 +344,9 @@ const SystemLogsPage: React.FC = () => {
           {log.hasTrace && (
             <i className="fa-solid fa-triangle-exclamation text-danger ms-1" />
           )}
+          {log.hasProfile && (
+            <i className="fa-solid fa-fire text-warning ms-1" />
+          )}
         </Button>
       </td>
     </tr>
@@ -361,6 +367,17 @@ const SystemLogsPage: React.FC = () => {
     }
   };
 
+  const handleDownloadProfile = async () => {
+    if (!detail) return;
+    try {
+      const text = await apiClient.getAdminLogProfile(detail.source, detail.id);
+      // flamegraph.pl / speedscope で読み込める collapsed stack 形式
+      downloadText(text, `profile-${detail.source}-${detail.id}.collapsed`, 'text/plain');
+    } catch (e: any) {
+      setError(getApiErrorCode(e) || e?.message || t('Failed to download profile'));
+    }
+  };
+
   const handleCopyDetail = async () => {
     if (!detail) return;
     const ok = await copyToClipboard(buildLogDetailText(detail, t));
@@ -686,6 +703,15 @@ const SystemLogsPage: React.FC = () => {
           )}
         </Modal.Body>
         <Modal.Footer>
+          {detail?.hasProfile && (
+            <Button
+              variant="outline-warning"
+              onClick={handleDownloadProfile}
+              data-testid="log-detail-profile"
+            >
+              <i className="fa-solid fa-fire me-1" />{t('Download profile')}
+            </Button>
+          )}
           <Button
             variant={copied ? 'success' : 'outline-primary'}
             onClick={handleCopyDetail}
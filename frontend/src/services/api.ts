@@ -483,6 +483,14 @@ class ApiClient {
     return response.data;
   }
 
+  /** プロファイル結果（collapsed stack 形式のテキスト）を取得する。 */
+  async getAdminLogProfile(source: AdminLogSource, id: number): Promise<string> {
+    const response = await this.client.get<string>(`/admin/logs/${source}/${id}/profile`, {
+      responseType: 'text',
+    });
+    return response.data;
+  }
+
   async exportAdminLogs(params: AdminLogsExportQuery): Promise<AdminLogsExportResponse> {
     const response = await this.client.get<AdminLogsExportResponse>('/admin/logs/export', { params });
     return response.data;
@@ -261,6 +261,8 @@ export interface AdminLogEntry {
   message: string;
   messageTruncated: boolean;
   hasTrace: boolean;
+  // profile.request / profile.task イベント（collapsed stack をダウンロード可能）
+  hasProfile: boolean;
   // app のみ
   path?: string | null;
   requestId?: string | null;
@@ -284,6 +286,10 @@ export interface AdminLogsQuery {
   source?: AdminLogSource;
   page?: number;
   pageSize?: number;
+  // 前ページの pagination.nextCursor（指定時は page の代わりにキーセットでページング）
+  cursor?: string;
+  // relevance は q との一致度順（FULLTEXT を使える DB のみ。それ以外は newest と同じ）
+  sort?: 'newest' | 'relevance';
   level?: string;
   event?: string;
   q?: string;
@@ -294,7 +300,7 @@ export interface AdminLogsQuery {
 
 export interface AdminLogsResponse {
   logs: AdminLogEntry[];
-  pagination: Pagination;
+  pagination: Pagination & { nextCursor: string | null };
   availableLevels: string[];
   filter: {
     source: string;
@@ -304,6 +310,7 @@ export interface AdminLogsResponse {
     traceId: string | null;
     since: string | null;
     until: string | null;
+    sort: 'newest' | 'relevance';
   };
   server_time: string;
 }
@@ -322,6 +329,11 @@ export interface AdminLogsExportQuery {
   traceId?: string;
   since?: string;
   until?: string;
+  // ndjson は1行1件のストリーミング（件数上限なし。gzip で圧縮）。既定は json（上限 1000 件）
+  format?: 'json' | 'ndjson';
+  gzip?: boolean;
+  // ndjson の再開位置（受信済みの最終行の cursor）
+  cursor?: string;
 }
 
 export interface AdminLogsExportResponse {
@@ -402,6 +414,8 @@ export interface AlbumSummary {
   coverImageId: number | null;
   coverMediaId: number | null;
   mediaCount: number;
+  shotAtStart?: string | null;
+  shotAtEnd?: string | null;
   createdAt: string | null;
   updatedAt: string | null;
   lastModified: string | null;
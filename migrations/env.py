@@ -141,6 +141,15 @@ def run_migrations_online() -> None:
                 directives[:] = []
                 logger.info("No changes in schema detected.")
 
+    def include_object(obj, name, type_, reflected, compare_to):
+        """MySQL 専用のログ検索サイドカー（FULLTEXT 付き・モデル無し）は比較しない。"""
+        from shared.infrastructure.log_search import SEARCH_TABLES
+
+        search_tables = {table.name for table in SEARCH_TABLES.values()}
+        if type_ == "table" and reflected and name in search_tables:
+            return False
+        return True
+
     connectable = create_engine(
         _get_database_url(),
         pool_pre_ping=True,
@@ -151,6 +160,7 @@ def run_migrations_online() -> None:
             connection=connection,
             target_metadata=target_metadata,
             process_revision_directives=process_revision_directives,
+            include_object=include_object,
         )
         with context.begin_transaction():
             context.run_migrations()
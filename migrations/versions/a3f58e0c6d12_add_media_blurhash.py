@@ -0,0 +1,39 @@
+"""add media blurhash
+
+メディア一覧・アルバム詳細・重複候補は、サムネイルが届くまでタイルが空白の
+ままだった。``thumbs_generate`` が 256 のサムネイルから BlurHash（4×3 成分、
+28 文字）を計算して ``media.blurhash`` に保存し、API はそれを返す。既存行は
+NULL のまま追加し、``thumbs.blurhash_backfill`` タスクが順次埋める。
+
+レガシーDB（現行モデルからスキーマ構築済み）では列が既に存在するため、
+存在しない場合だけ追加する。
+
+Revision ID: a3f58e0c6d12
+Revises: d91b3f6c2e47
+Create Date: 2026-10-18
+
+"""
+from __future__ import annotations
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = "a3f58e0c6d12"
+down_revision = "d91b3f6c2e47"
+branch_labels = None
+depends_on = None
+
+
+def _media_columns() -> set[str]:
+    return {column["name"] for column in sa.inspect(op.get_bind()).get_columns("media")}
+
+
+def upgrade() -> None:
+    if "blurhash" not in _media_columns():
+        op.add_column("media", sa.Column("blurhash", sa.String(length=32), nullable=True))
+
+
+def downgrade() -> None:
+    if "blurhash" in _media_columns():
+        op.drop_column("media", "blurhash")
@@ -0,0 +1,94 @@
+"""add album stats columns
+
+アルバム一覧は呼び出しのたびに ``album_item`` を ``GROUP BY`` して件数と
+先頭メディアを求めていた。件数・撮影日の範囲を ``album`` 行に持たせ
+（表紙は既存の ``cover_media_id``）、一覧は ``album`` だけを読む。既存行は
+ここで ``album_item`` から集計して埋める（以後は ``refresh_album_stats`` と
+``albums.repair_stats`` タスクが保つ）。一覧の並び順用に
+``(created_at, id)`` のインデックスも追加する。
+
+レガシーDB（現行モデルからスキーマ構築済み）では列・インデックスが既に
+存在するため、存在しない場合だけ追加する。
+
+Revision ID: b5c27e9f1a84
+Revises: a3f58e0c6d12
+Create Date: 2026-10-18
+
+"""
+from __future__ import annotations
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = "b5c27e9f1a84"
+down_revision = "a3f58e0c6d12"
+branch_labels = None
+depends_on = None
+
+_INDEX_NAME = "ix_album_created_at_id"
+
+_BACKFILL_STATEMENTS = (
+    """
+    UPDATE album SET
+        media_count = (
+            SELECT COUNT(*) FROM album_item ai JOIN media m ON m.id = ai.media_id
+            WHERE ai.album_id = album.id
+        ),
+        shot_at_min = (
+            SELECT MIN(m.shot_at) FROM album_item ai JOIN media m ON m.id = ai.media_id
+            WHERE ai.album_id = album.id
+        ),
+        shot_at_max = (
+            SELECT MAX(m.shot_at) FROM album_item ai JOIN media m ON m.id = ai.media_id
+            WHERE ai.album_id = album.id
+        )
+    """,
+    "UPDATE album SET cover_media_id = NULL WHERE media_count = 0",
+    """
+    UPDATE album SET cover_media_id = (
+        SELECT ai.media_id FROM album_item ai
+        WHERE ai.album_id = album.id
+        ORDER BY ai.sort_index, ai.media_id
+        LIMIT 1
+    )
+    WHERE media_count > 0 AND (
+        cover_media_id IS NULL OR NOT EXISTS (
+            SELECT 1 FROM album_item ai
+            WHERE ai.album_id = album.id AND ai.media_id = album.cover_media_id
+        )
+    )
+    """,
+)
+
+
+def _inspector():
+    return sa.inspect(op.get_bind())
+
+
+def upgrade() -> None:
+    columns = {column["name"] for column in _inspector().get_columns("album")}
+    if "media_count" not in columns:
+        op.add_column(
+            "album",
+            sa.Column("media_count", sa.Integer(), nullable=False, server_default="0"),
+        )
+    if "shot_at_min" not in columns:
+        op.add_column("album", sa.Column("shot_at_min", sa.DateTime(), nullable=True))
+    if "shot_at_max" not in columns:
+        op.add_column("album", sa.Column("shot_at_max", sa.DateTime(), nullable=True))
+
+    if _INDEX_NAME not in {index["name"] for index in _inspector().get_indexes("album")}:
+        op.create_index(_INDEX_NAME, "album", ["created_at", "id"])
+
+    for statement in _BACKFILL_STATEMENTS:
+        op.execute(sa.text(statement))
+
+
+def downgrade() -> None:
+    if _INDEX_NAME in {index["name"] for index in _inspector().get_indexes("album")}:
+        op.drop_index(_INDEX_NAME, table_name="album")
+    columns = {column["name"] for column in _inspector().get_columns("album")}
+    for name in ("shot_at_max", "shot_at_min", "media_count"):
+        if name in columns:
+            op.drop_column("album", name)
@@ -0,0 +1,42 @@
+"""add media thumbnail manifest
+
+アルバム詳細（``_resolve_best_thumbnail_url``）・サムネイル API・メディア削除は
+サムネイルの有無をサイズ × パス候補ごとに NAS 上のファイルを stat して
+調べていた（1,000 枚のアルバムで 1 リクエスト数千回）。``thumbs_generate`` が
+生成したサイズ・形式・バイト数を ``media.thumbnail_manifest`` に記録し、
+読み取り側はこの列だけでサムネイルを解決する。既存行は NULL のまま追加し、
+``thumbs.manifest_backfill`` タスクが順次埋める（NULL の行は従来どおり
+ファイルを探す）。
+
+レガシーDB（現行モデルからスキーマ構築済み）では列が既に存在するため、
+存在しない場合だけ追加する。
+
+Revision ID: c4e8a1d27b90
+Revises: e2f4a7c9d305
+Create Date: 2026-10-18
+
+"""
+from __future__ import annotations
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = "c4e8a1d27b90"
+down_revision = "e2f4a7c9d305"
+branch_labels = None
+depends_on = None
+
+
+def _media_columns() -> set[str]:
+    return {column["name"] for column in sa.inspect(op.get_bind()).get_columns("media")}
+
+
+def upgrade() -> None:
+    if "thumbnail_manifest" not in _media_columns():
+        op.add_column("media", sa.Column("thumbnail_manifest", sa.JSON(), nullable=True))
+
+
+def downgrade() -> None:
+    if "thumbnail_manifest" in _media_columns():
+        op.drop_column("media", "thumbnail_manifest")
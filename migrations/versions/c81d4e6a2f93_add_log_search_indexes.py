@@ -0,0 +1,96 @@
+"""add log search indexes
+
+管理画面のログ検索は ``message`` / ``event`` の ``ILIKE '%...%'`` で、
+ログが増えるほど全件走査になっていた。
+
+- ``log`` / ``worker_log`` に ``(created_at, id)`` のインデックスを追加する
+  （新しい順の一覧とキーセットページングで使う）。
+- ``log.event`` にインデックスを追加する（イベント名の前方一致で使う。
+  ``worker_log.event`` には既にある）。
+- MySQL / MariaDB では本文検索用のサイドカーテーブル ``log_search``
+  （event・message・path）/ ``worker_log_search``（event・message・task_name）を
+  作り、そこに FULLTEXT インデックスを張って既存行を写す。ログテーブルは
+  ``d4a9e2b7c615`` で月次パーティション化し、パーティション化したテーブルは
+  FULLTEXT を持てないため、元テーブルには張らない。主キーは
+  ``(created_at, id)``。以後の行はログハンドラが元テーブルと同じトランザクションで
+  書く（``shared/infrastructure/log_search.py``）。サイドカーは SQLite に無いため
+  モデルには宣言せず、``migrations/env.py`` の自動生成でも比較対象から外す。
+  既存行のコピーは大きなテーブルでは時間がかかる。
+
+レガシーDB（現行モデルからスキーマ構築済み）ではインデックスが既に
+存在することがあるため、存在しない場合だけ追加する。
+
+Revision ID: c81d4e6a2f93
+Revises: b5c27e9f1a84
+Create Date: 2026-10-18
+
+"""
+from __future__ import annotations
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = "c81d4e6a2f93"
+down_revision = "b5c27e9f1a84"
+branch_labels = None
+depends_on = None
+
+_INDEXES = (
+    ("log", "ix_log_created_at_id", ["created_at", "id"]),
+    ("log", "ix_log_event", ["event"]),
+    ("worker_log", "ix_worker_log_created_at_id", ["created_at", "id"]),
+)
+
+# shared/infrastructure/log_search.py のテーブル定義と一致させる
+_SEARCH_TABLES = (
+    ("log", "log_search", "ft_log_search", sa.Integer(), "path"),
+    ("worker_log", "worker_log_search", "ft_worker_log_search", sa.BigInteger(), "task_name"),
+)
+
+
+def _index_names(table: str) -> set[str]:
+    return {index["name"] for index in sa.inspect(op.get_bind()).get_indexes(table)}
+
+
+def _supports_fulltext() -> bool:
+    return op.get_bind().dialect.name in ("mysql", "mariadb")
+
+
+def upgrade() -> None:
+    for table, name, columns in _INDEXES:
+        if name not in _index_names(table):
+            op.create_index(name, table, columns)
+
+    if not _supports_fulltext():
+        return
+    for source, table, index, id_type, extra in _SEARCH_TABLES:
+        if sa.inspect(op.get_bind()).has_table(table):
+            continue
+        op.create_table(
+            table,
+            sa.Column("created_at", sa.DateTime(), nullable=False),
+            sa.Column("id", id_type, autoincrement=False, nullable=False),
+            sa.Column("event", sa.String(length=50), nullable=False),
+            sa.Column("message", sa.Text(), nullable=False),
+            sa.Column(extra, sa.String(length=255), nullable=True),
+            sa.PrimaryKeyConstraint("created_at", "id"),
+        )
+        op.execute(
+            sa.text(
+                f"INSERT INTO {table} (created_at, id, event, message, {extra}) "
+                f"SELECT created_at, id, event, message, {extra} FROM {source}"
+            )
+        )
+        op.create_index(index, table, ["event", "message", extra], mysql_prefix="FULLTEXT")
+
+
+def downgrade() -> None:
+    if _supports_fulltext():
+        for _source, table, _index, _id_type, _extra in _SEARCH_TABLES:
+            if sa.inspect(op.get_bind()).has_table(table):
+                op.drop_table(table)
+
+    for table, name, _columns in reversed(_INDEXES):
+        if name in _index_names(table):
+            op.drop_index(name, table_name=table)
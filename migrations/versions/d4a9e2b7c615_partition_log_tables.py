@@ -0,0 +1,109 @@
+"""partition log tables by month
+
+保持期間の削除（``logs.cleanup``）は ``log`` / ``worker_log`` から古い行を
+``DELETE`` しており、数千万行のテーブルでは長時間のロック・undo の肥大・
+レプリケーション遅延を招いていた。MySQL / MariaDB では両テーブルを
+``PARTITION BY RANGE (TO_DAYS(created_at))`` の月次パーティションに変換し、
+保持期間の削除を ``DROP PARTITION`` にする。
+
+- 既存行の最古の月から今月の3か月先までの区画と、末尾の ``p_future``
+  （``MAXVALUE``）を作る。以後の区画は ``logs.partition_maintenance``
+  タスクが ``p_future`` を分割して事前に作る。
+- パーティションキーは全ての一意キーに含める必要があるため、主キーを
+  ``(id, created_at)`` に変える（``id`` は引き続き AUTO_INCREMENT で一意）。
+- パーティション化したテーブルは FULLTEXT インデックスを持てない。本文検索の
+  FULLTEXT は ``c81d4e6a2f93`` の非パーティションのサイドカー（``log_search`` /
+  ``worker_log_search``）にあり、このマイグレーションでは触らない。
+
+既存データの変換はテーブルの再構築（全行コピー）になるため、大きな
+テーブルではメンテナンス時間帯に適用すること。SQLite（開発・テスト）では
+何もしない。既にパーティション化済みのテーブルはスキップする。
+
+Revision ID: d4a9e2b7c615
+Revises: c81d4e6a2f93
+Create Date: 2026-10-18
+
+"""
+from __future__ import annotations
+
+from datetime import date, datetime, timezone
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = "d4a9e2b7c615"
+down_revision = "c81d4e6a2f93"
+branch_labels = None
+depends_on = None
+
+_TABLES = ("log", "worker_log")
+
+_MONTHS_AHEAD = 3
+
+
+def _next_month(value: date) -> date:
+    if value.month == 12:
+        return date(value.year + 1, 1, 1)
+    return date(value.year, value.month + 1, 1)
+
+
+def _is_partitioned(bind, table: str) -> bool:
+    return bool(
+        bind.execute(
+            sa.text(
+                "SELECT COUNT(*) FROM information_schema.PARTITIONS "
+                "WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = :table "
+                "AND PARTITION_NAME IS NOT NULL"
+            ),
+            {"table": table},
+        ).scalar()
+    )
+
+
+def _partition_definitions(bind, table: str) -> str:
+    oldest = bind.execute(sa.text(f"SELECT MIN(created_at) FROM {table}")).scalar()
+    today = datetime.now(timezone.utc).date()
+    month = date((oldest or today).year, (oldest or today).month, 1)
+    last_month = date(today.year, today.month, 1)
+    for _ in range(_MONTHS_AHEAD):
+        last_month = _next_month(last_month)
+
+    definitions = []
+    while month <= last_month:
+        definitions.append(
+            f"PARTITION p{month:%Y%m} "
+            f"VALUES LESS THAN (TO_DAYS('{_next_month(month):%Y-%m-%d}'))"
+        )
+        month = _next_month(month)
+    definitions.append("PARTITION p_future VALUES LESS THAN MAXVALUE")
+    return ", ".join(definitions)
+
+
+def upgrade() -> None:
+    bind = op.get_bind()
+    if bind.dialect.name not in ("mysql", "mariadb"):
+        return
+
+    for table in _TABLES:
+        if _is_partitioned(bind, table):
+            continue
+        op.execute(sa.text(f"ALTER TABLE {table} DROP PRIMARY KEY, ADD PRIMARY KEY (id, created_at)"))
+        op.execute(
+            sa.text(
+                f"ALTER TABLE {table} PARTITION BY RANGE (TO_DAYS(created_at)) "
+                f"({_partition_definitions(bind, table)})"
+            )
+        )
+
+
+def downgrade() -> None:
+    bind = op.get_bind()
+    if bind.dialect.name not in ("mysql", "mariadb"):
+        return
+
+    for table in _TABLES:
+        if not _is_partitioned(bind, table):
+            continue
+        op.execute(sa.text(f"ALTER TABLE {table} REMOVE PARTITIONING"))
+        op.execute(sa.text(f"ALTER TABLE {table} DROP PRIMARY KEY, ADD PRIMARY KEY (id)"))
@@ -0,0 +1,59 @@
+"""add media file deletion queue
+
+メディア削除（単体・一括）はリクエスト内で原本・全サイズ × パス候補の
+サムネイル・再生ファイルを同期的に unlink しており、遅い NAS では 500 件の
+削除がタイムアウトしてイベントループも止めていた。削除リクエストは
+``media_file_deletion`` にトゥームストーンを記録して返し、実ファイルは
+``media_files.delete_pending`` タスクがまとめて削除する。
+
+レガシーDB（現行モデルからスキーマ構築済み）ではテーブルが既に存在するため、
+存在しない場合だけ作成する。
+
+Revision ID: d91b3f6c2e47
+Revises: c4e8a1d27b90
+Create Date: 2026-10-18
+
+"""
+from __future__ import annotations
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = "d91b3f6c2e47"
+down_revision = "c4e8a1d27b90"
+branch_labels = None
+depends_on = None
+
+BigInt = sa.BigInteger().with_variant(sa.Integer(), "sqlite")
+
+
+def upgrade() -> None:
+    if sa.inspect(op.get_bind()).has_table("media_file_deletion"):
+        return
+    op.create_table(
+        "media_file_deletion",
+        sa.Column("id", BigInt, primary_key=True, autoincrement=True),
+        sa.Column("media_id", BigInt, sa.ForeignKey("media.id"), nullable=False),
+        sa.Column("storage_domain", sa.String(32), nullable=False),
+        sa.Column("rel_path", sa.String(1024), nullable=False),
+        sa.Column(
+            "kind",
+            sa.Enum("file", "tree", "blob", name="media_file_deletion_kind", native_enum=False),
+            nullable=False,
+        ),
+        sa.Column("attempts", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("last_error", sa.Text(), nullable=True),
+        sa.Column("not_before", sa.DateTime(), nullable=False),
+        sa.Column("created_at", sa.DateTime(), nullable=False),
+    )
+    op.create_index("ix_media_file_deletion_not_before", "media_file_deletion", ["not_before"])
+    op.create_index("ix_media_file_deletion_media_id", "media_file_deletion", ["media_id"])
+
+
+def downgrade() -> None:
+    if not sa.inspect(op.get_bind()).has_table("media_file_deletion"):
+        return
+    op.drop_index("ix_media_file_deletion_media_id", table_name="media_file_deletion")
+    op.drop_index("ix_media_file_deletion_not_before", table_name="media_file_deletion")
+    op.drop_table("media_file_deletion")
@@ -304,6 +304,20 @@ _DOWNLOAD_DEFINITIONS: tuple[SettingFieldDefinition, ...] = (
         required=True,
         description=_(u"Validity in seconds for thumbnail download URLs."),
     ),
+    SettingFieldDefinition(
+        key="MEDIA_IMAGE_URL_TTL_SECONDS",
+        label=_(u"Responsive image URL TTL"),
+        data_type="integer",
+        required=True,
+        description=_(u"Validity in seconds for resized image URLs. Responses are cached by browsers as immutable for this long."),
+    ),
+    SettingFieldDefinition(
+        key="MEDIA_IMAGE_CACHE_MAX_BYTES",
+        label=_(u"Responsive image cache size"),
+        data_type="integer",
+        required=True,
+        description=_(u"Maximum total bytes of resized images kept on disk. Least recently used images are removed first."),
+    ),
     SettingFieldDefinition(
         key="MEDIA_PLAYBACK_URL_TTL_SECONDS",
         label=_(u"Playback URL TTL"),
@@ -349,6 +363,13 @@ _STORAGE_DEFINITIONS: tuple[SettingFieldDefinition, ...] = (
         required=True,
         description=_(u"Maximum upload size in bytes."),
     ),
+    SettingFieldDefinition(
+        key="MEDIA_UPLOAD_RESUMABLE_MAX_SIZE_BYTES",
+        label=_(u"Resumable upload max size (bytes)"),
+        data_type="integer",
+        required=True,
+        description=_(u"Maximum size in bytes of a file sent through the resumable chunked upload API."),
+    ),
     SettingFieldDefinition(
         key="MEDIA_LOCAL_IMPORT_DIRECTORY",
         label=_(u"Local import directory"),
@@ -493,6 +514,142 @@ _MEDIA_PROCESSING_DEFINITIONS: tuple[SettingFieldDefinition, ...] = (
         required=True,
         description=_(u"Constant Rate Factor used for video transcoding."),
     ),
+    SettingFieldDefinition(
+        key="TRANSCODE_THREADS",
+        label=_(u"Transcode threads"),
+        data_type="integer",
+        required=True,
+        description=_(u"Threads per ffmpeg process. 0 derives the budget from host cores and concurrent transcodes."),
+    ),
+    SettingFieldDefinition(
+        key="TRANSCODE_MAX_PARALLEL_JOBS",
+        label=_(u"Concurrent transcodes per host"),
+        data_type="integer",
+        required=True,
+        description=_(u"Expected number of transcodes running at once on a worker host; used to split CPU cores fairly."),
+    ),
+    SettingFieldDefinition(
+        key="TRANSCODE_SEGMENT_THRESHOLD_SECONDS",
+        label=_(u"Segment-parallel transcode threshold (seconds)"),
+        data_type="integer",
+        required=True,
+        description=_(u"Videos at least this long are split into segments and encoded in parallel when cores are idle. 0 disables splitting."),
+    ),
+    SettingFieldDefinition(
+        key="TRANSCODE_HLS_ENABLED",
+        label=_(u"Generate HLS playback"),
+        data_type="boolean",
+        required=True,
+        description=_(u"Also produce an HLS playlist with fMP4 segments in several qualities so players can adapt to the connection."),
+        choices=BOOLEAN_CHOICES,
+    ),
+    SettingFieldDefinition(
+        key="LOCAL_IMPORT_ZIP_STREAMING",
+        label=_(u"Stream ZIP members on local import"),
+        data_type="boolean",
+        required=True,
+        description=_(u"Write supported ZIP members straight to the originals volume while hashing them, instead of extracting archives to a temporary directory first."),
+        choices=BOOLEAN_CHOICES,
+    ),
+    SettingFieldDefinition(
+        key="LOCAL_IMPORT_ZIP_WORKERS",
+        label=_(u"Concurrent ZIP archives on local import"),
+        data_type="integer",
+        required=True,
+        description=_(u"Number of archives read in parallel when ZIP streaming is enabled."),
+    ),
+    SettingFieldDefinition(
+        key="ORIGINALS_BLOB_STORE_ENABLED",
+        label=_(u"Deduplicate originals by content"),
+        data_type="boolean",
+        required=True,
+        description=_(u"Keep one copy of each file under originals/.blobs keyed by SHA-256 and create the dated original paths as links to it, so imports on the same filesystem do not copy data."),
+        choices=BOOLEAN_CHOICES,
+    ),
+    SettingFieldDefinition(
+        key="ORIGINALS_BLOB_LINK_MODE",
+        label=_(u"Original link type"),
+        data_type="string",
+        required=True,
+        description=_(u"How original paths point at the shared copy. Reflinks need a filesystem with copy-on-write clones (Btrfs, XFS) and fall back to hard links elsewhere."),
+        choices=(
+            ("hardlink", "hardlink"),
+            ("reflink", "reflink"),
+        ),
+    ),
+    SettingFieldDefinition(
+        key="FILE_HASH_CACHE_ENABLED",
+        label=_(u"Cache file hashes"),
+        data_type="boolean",
+        required=True,
+        description=_(u"Reuse the SHA-256 of a file whose device, inode, size and modification time are unchanged instead of reading it again."),
+        choices=BOOLEAN_CHOICES,
+    ),
+    SettingFieldDefinition(
+        key="FILE_HASH_BUFFER_BYTES",
+        label=_(u"File hash read buffer (bytes)"),
+        data_type="integer",
+        required=True,
+        description=_(u"Read size used when a file has to be hashed. Larger buffers help on spinning NAS disks. 0 uses the Python default."),
+    ),
+    SettingFieldDefinition(
+        key="FILE_HASH_USE_MMAP",
+        label=_(u"Hash files through mmap"),
+        data_type="boolean",
+        required=True,
+        description=_(u"Memory-map files when hashing them instead of reading them in chunks."),
+        choices=BOOLEAN_CHOICES,
+    ),
+    SettingFieldDefinition(
+        key="THUMBNAIL_FAST_PATH_ENABLED",
+        label=_(u"Render missing thumbnails on request"),
+        data_type="boolean",
+        required=True,
+        description=_(u"Render missing 256/512 thumbnails inside the API process instead of returning 404 until the background job finishes."),
+        choices=BOOLEAN_CHOICES,
+    ),
+    SettingFieldDefinition(
+        key="THUMBNAIL_FAST_PATH_WORKERS",
+        label=_(u"On-request thumbnail threads"),
+        data_type="integer",
+        required=True,
+        description=_(u"Threads per API process used to render missing thumbnails."),
+    ),
+    SettingFieldDefinition(
+        key="THUMBNAIL_FAST_PATH_MAX_PENDING",
+        label=_(u"Queued on-request thumbnails"),
+        data_type="integer",
+        required=True,
+        description=_(u"Renders allowed to wait for a free thread. Further requests fall back to the background thumbnail job."),
+    ),
+    SettingFieldDefinition(
+        key="THUMBNAIL_PACK_ENABLED",
+        label=_(u"Store thumbnails in pack files"),
+        data_type="boolean",
+        required=True,
+        description=_(u"Append newly generated thumbnails to large per-date pack files instead of writing one file per size."),
+    ),
+    SettingFieldDefinition(
+        key="THUMBNAIL_PACK_MAX_BYTES",
+        label=_(u"Thumbnail pack size"),
+        data_type="integer",
+        required=True,
+        description=_(u"Maximum size in bytes of one thumbnail pack file before a new pack is started."),
+    ),
+    SettingFieldDefinition(
+        key="MEDIA_DELETION_WORKERS",
+        label=_(u"Parallel file deletions"),
+        data_type="integer",
+        required=True,
+        description=_(u"Threads the background deletion job uses to remove files of deleted media."),
+    ),
+    SettingFieldDefinition(
+        key="MEDIA_DELETION_BATCH_SIZE",
+        label=_(u"Media per deletion batch"),
+        data_type="integer",
+        required=True,
+        description=_(u"Number of deleted media whose files are removed in one run of the background deletion job."),
+    ),
 )
 
 _MAIL_DEFINITIONS: tuple[SettingFieldDefinition, ...] = (
@@ -20,6 +20,7 @@ from shared.kernel.version import get_version_string
 from presentation.fastapi.logging_setup import configure_db_logging
 from presentation.fastapi.middleware.db_session import ScopedSessionLifecycleMiddleware
 from presentation.fastapi.middleware.request_logging import RequestLoggingMiddleware
+from presentation.fastapi.middleware.request_profiling import RequestProfilingMiddleware
 
 logger = logging.getLogger(__name__)
 
@@ -53,6 +54,12 @@ def create_app() -> FastAPI:
     # ------------------------------------------------------------------
     configure_db_logging()
 
+    # ------------------------------------------------------------------
+    # 管理者向けオンデマンドプロファイリング（X-Profile / __profile）
+    # requestId を参照するため RequestLoggingMiddleware より先に追加して内側に置く。
+    # ------------------------------------------------------------------
+    app.add_middleware(RequestProfilingMiddleware)
+
     # ------------------------------------------------------------------
     # リクエストロギング（requestId 発行 + api.input/api.output/api.error）
     # CORS より先に add_middleware することで CORS の内側に配置し、
@@ -144,6 +151,7 @@ def _register_error_handlers(app: FastAPI) -> None:
 def _register_routers(app: FastAPI) -> None:
     """全ルーターを ``/api`` プレフィックスで登録する。"""
     from presentation.fastapi.routers.health import router as health_router
+    from presentation.fastapi.routers.metrics import router as metrics_router
     from presentation.fastapi.routers.auth import router as auth_router, token_router
     from presentation.fastapi.routers.version import router as version_router
     from presentation.fastapi.routers.echo import router as echo_router
@@ -182,8 +190,9 @@ def _register_routers(app: FastAPI) -> None:
     from presentation.fastapi.routers.albums import router as albums_router
     from presentation.fastapi.routers.tags import router as tags_router
 
-    # ヘルスチェック（/api プレフィックスなし）
+    # ヘルスチェック・メトリクス（/api プレフィックスなし）
     app.include_router(health_router)
+    app.include_router(metrics_router)
 
     # API ルーター（/api プレフィックスあり）
     api_prefix = "/api"
@@ -0,0 +1,70 @@
+"""ライブラリ変更カウンタによる一覧 API の条件付き GET。"""
+from __future__ import annotations
+
+import hashlib
+from typing import Optional
+
+from fastapi import Request, Response, status
+from fastapi.concurrency import run_in_threadpool
+
+from shared.application.authenticated_principal import AuthenticatedPrincipal
+
+# ブラウザにも毎回再検証させる（304 なら本文は送らない）
+_CACHE_CONTROL = "private, no-cache"
+
+
+async def library_etag(request: Request, principal: AuthenticatedPrincipal) -> Optional[str]:
+    """ライブラリの版・パス・クエリ・権限から弱い ETag を作る。
+
+    カウンタを使えない（Redis 未設定・障害）ときは ``None``。応答には
+    ``server_time`` など毎回変わる値が含まれるため弱い ETag にする。
+    カウンタの読み出しは同期 Redis クライアントのため、イベントループの外で行う。
+    """
+    from bounded_contexts.photonest.infrastructure.library_version import (
+        current_library_version,
+    )
+
+    version = await run_in_threadpool(current_library_version)
+    if version is None:
+        return None
+    query = "&".join(f"{key}={value}" for key, value in sorted(request.query_params.multi_items()))
+    scope = ",".join(sorted(principal.permissions))
+    digest = hashlib.sha256(
+        f"{version}|{request.url.path}|{query}|{principal.subject_type}:{principal.id}|{scope}".encode()
+    ).hexdigest()
+    return f'W/"{digest[:32]}"'
+
+
+def _etag_matches(header: str, etag: str) -> bool:
+    if header.strip() == "*":
+        return True
+    opaque = etag[2:] if etag.startswith("W/") else etag
+    for candidate in header.split(","):
+        candidate = candidate.strip()
+        if candidate.startswith("W/"):
+            candidate = candidate[2:]
+        if candidate == opaque:
+            return True
+    return False
+
+
+def not_modified(request: Request, etag: Optional[str]) -> Optional[Response]:
+    """``If-None-Match`` が *etag* と一致すれば 304 応答を返す。"""
+
+    header = request.headers.get("If-None-Match")
+    if etag is None or not header or not _etag_matches(header, etag):
+        return None
+    return Response(
+        status_code=status.HTTP_304_NOT_MODIFIED,
+        headers={"ETag": etag, "Cache-Control": _CACHE_CONTROL},
+    )
+
+
+def set_etag(response: Response, etag: Optional[str]) -> None:
+    if etag is None:
+        return
+    response.headers["ETag"] = etag
+    response.headers["Cache-Control"] = _CACHE_CONTROL
+
+
+__all__ = ["library_etag", "not_modified", "set_etag"]
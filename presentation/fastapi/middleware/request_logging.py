@@ -8,6 +8,8 @@ Flask 版 ``presentation/web/middleware/request_logging.py`` の後継。
   記録する。
 - 未処理例外は必ず traceback 付きで ``api.error`` として記録してから
   再送出する（グローバルハンドラが 500 応答を返す）。
+- ``/metrics`` 向けにルートテンプレート単位のリクエスト数・レイテンシ・
+  リクエストあたりの SQL 実行数を記録する。
 """
 from __future__ import annotations
 
@@ -21,6 +23,14 @@ from starlette.requests import Request
 from starlette.responses import Response
 
 from shared.kernel.logging.request_context import bind_request_id, reset_request_id
+from shared.kernel.metrics.instruments import (
+    HTTP_REQUEST_DB_QUERIES,
+    HTTP_REQUEST_DURATION,
+    HTTP_REQUESTS_IN_PROGRESS,
+    HTTP_REQUESTS_TOTAL,
+    begin_request_query_count,
+    end_request_query_count,
+)
 
 logger = logging.getLogger(__name__)
 
@@ -38,6 +48,24 @@ _SENSITIVE_QUERY_KEYS = {
 }
 
 
+def _route_template(request: Request) -> str:
+    """メトリクスのラベルに使うルートテンプレート（``/api/media/{media_id}`` 等）。
+
+    生のパスをラベルにすると ID ごとに系列が増えるため、未マッチは 1 つにまとめる。
+    """
+    route = request.scope.get("route")
+    return getattr(route, "path", None) or "unmatched"
+
+
+def _record_request_metrics(
+    request: Request, status_code: int, duration: float, query_count: int
+) -> None:
+    route = _route_template(request)
+    HTTP_REQUESTS_TOTAL.labels(request.method, route, status_code).inc()
+    HTTP_REQUEST_DURATION.labels(request.method, route).observe(duration)
+    HTTP_REQUEST_DB_QUERIES.labels(route).observe(query_count)
+
+
 def _masked_query_params(request: Request) -> dict[str, str]:
     return {
         key: _MASKED_VALUE if key.lower() in _SENSITIVE_QUERY_KEYS else value
@@ -58,6 +86,9 @@ class RequestLoggingMiddleware(BaseHTTPMiddleware):
         path = request.url.path
         is_api = path.startswith("/api")
         started = time.perf_counter()
+        query_count, query_count_token = begin_request_query_count()
+        in_progress = HTTP_REQUESTS_IN_PROGRESS.labels(request.method)
+        in_progress.inc()
 
         try:
             if is_api:
@@ -77,6 +108,9 @@ class RequestLoggingMiddleware(BaseHTTPMiddleware):
             try:
                 response = await call_next(request)
             except Exception as exc:
+                _record_request_metrics(
+                    request, 500, time.perf_counter() - started, query_count[0]
+                )
                 # API/Worker 以外の経路（SPA 配信等）も含め、未処理例外は
                 # 必ず traceback 付きで DB ログへ残す。応答の生成は
                 # グローバル例外ハンドラに委ねる。
@@ -101,6 +135,9 @@ class RequestLoggingMiddleware(BaseHTTPMiddleware):
                 )
                 raise
 
+            _record_request_metrics(
+                request, response.status_code, time.perf_counter() - started, query_count[0]
+            )
             if is_api:
                 output_payload = {
                     "method": request.method,
@@ -122,6 +159,8 @@ class RequestLoggingMiddleware(BaseHTTPMiddleware):
             response.headers["X-Request-ID"] = request_id
             return response
         finally:
+            in_progress.dec()
+            end_request_query_count(query_count_token)
             reset_request_id(context_token)
 
 
@@ -0,0 +1,116 @@
+"""管理者向けオンデマンドのリクエストプロファイリング（FastAPI）。
+
+``X-Profile: 1`` ヘッダーまたは ``__profile=1`` クエリを付けたリクエストを、
+``admin:system-settings`` 権限を持つ利用者に限りサンプリングプロファイラ
+（``shared/kernel/profiling.py``）の下で実行する。
+
+- 結果（collapsed stack・SQL 一覧・N+1 候補）は ``profile.request`` イベントとして
+  System Logs（``log`` テーブル）へ保存し、管理画面からダウンロードできる。
+- 応答には ``X-Profile-Id``（= requestId）を付与し、ログとの突き合わせに使う。
+- 権限が無い・認証できない場合はフラグを無視して通常どおり処理する。
+
+requestId を参照するため ``RequestLoggingMiddleware`` の内側に配置する。
+"""
+from __future__ import annotations
+
+import json
+import logging
+from typing import Optional
+
+from starlette.concurrency import run_in_threadpool
+from starlette.middleware.base import BaseHTTPMiddleware, RequestResponseEndpoint
+from starlette.requests import Request
+from starlette.responses import Response
+
+from shared.kernel.profiling import ProfileSession
+
+logger = logging.getLogger(__name__)
+
+PROFILE_HEADER = "X-Profile"
+PROFILE_QUERY_PARAM = "__profile"
+PROFILE_PERMISSION = "admin:system-settings"
+
+_TRUTHY = {"1", "true", "yes", "on"}
+
+
+def _profile_requested(request: Request) -> bool:
+    flag = request.headers.get(PROFILE_HEADER) or request.query_params.get(PROFILE_QUERY_PARAM)
+    return bool(flag) and flag.strip().lower() in _TRUTHY
+
+
+def _authorize(request: Request) -> bool:
+    """リクエストのトークンが プロファイル権限を持つか判定する（同期処理）。"""
+    from presentation.fastapi.dependencies.auth import ACCESS_TOKEN_COOKIE
+    from presentation.fastapi.services.token_service import TokenService
+    from shared.kernel.database.session import get_db
+
+    authorization = request.headers.get("Authorization") or ""
+    scheme, _, credentials = authorization.partition(" ")
+    token: Optional[str] = credentials.strip() if scheme.lower() == "bearer" else None
+    token = token or request.cookies.get(ACCESS_TOKEN_COOKIE)
+    if not token:
+        return False
+
+    # テストでの ``dependency_overrides[get_db]`` も尊重する。
+    provider = request.app.dependency_overrides.get(get_db, get_db)
+    sessions = provider()
+    try:
+        principal, _reason = TokenService.verify_access_token_with_reason(
+            token, session=next(sessions)
+        )
+        return bool(principal and principal.can(PROFILE_PERMISSION))
+    finally:
+        sessions.close()
+
+
+class RequestProfilingMiddleware(BaseHTTPMiddleware):
+    """権限を持つ管理者が要求したリクエストをプロファイルして結果を保存する。"""
+
+    async def dispatch(
+        self, request: Request, call_next: RequestResponseEndpoint
+    ) -> Response:
+        if not _profile_requested(request):
+            return await call_next(request)
+        try:
+            allowed = await run_in_threadpool(_authorize, request)
+        except Exception:
+            logger.warning(
+                "プロファイル要求の認可に失敗しました",
+                extra={"event": "profile.authorize_failed", "path": request.url.path},
+                exc_info=True,
+            )
+            allowed = False
+        if not allowed:
+            return await call_next(request)
+
+        path = request.url.path
+        request_id = getattr(request.state, "request_id", None)
+        profile = ProfileSession(f"{request.method} {path}")
+        # call_next 内のタスク・スレッドプールは現在のコンテキストを引き継ぐため、
+        # start() 後に呼び出すことでエンドポイント側の SQL も記録される。
+        profile.start()
+        status_code = 500
+        try:
+            response = await call_next(request)
+            status_code = response.status_code
+        finally:
+            profile.stop()
+            report = profile.report()
+            report.update(
+                {
+                    "message": "Request profile captured",
+                    "requestId": request_id,
+                    "status": status_code,
+                }
+            )
+            logger.info(
+                json.dumps(report, ensure_ascii=False, default=str),
+                extra={"event": "profile.request", "request_id": request_id, "path": path},
+            )
+
+        if request_id:
+            response.headers["X-Profile-Id"] = request_id
+        return response
+
+
+__all__ = ["RequestProfilingMiddleware"]
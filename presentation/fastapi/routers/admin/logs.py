@@ -3,18 +3,34 @@
 ``log``（APIリクエスト単位・requestId で追跡）と ``worker_log``（Celery ジョブ
 単位・taskId で追跡）の内容を、時間範囲・ログレベル等でフィルタして一覧返却する。
 閲覧専用（書き込みAPIは提供しない）。`admin:system-settings` 権限が必要。
+
+``profile.request`` / ``profile.task`` イベント（オンデマンドプロファイル結果）は
+``/{source}/{log_id}/profile`` から collapsed stack 形式でダウンロードできる。
+
+本文検索（``q``）は MySQL / MariaDB では検索用サイドカー（``log_search`` /
+``worker_log_search``）の FULLTEXT インデックス（語の前方一致・一致度順の
+並べ替えが可能）を結合して引き、サイドカーの無い DB（SQLite）では部分一致を使う。
+イベント名はインデックスの効く前方一致。``cursor`` を渡すと ``(created_at, id)`` の
+キーセットでページングする（深いページでも OFFSET の読み飛ばしが無い）。
+エクスポートは ``format=ndjson`` で件数の上限なくストリーミングできる。
 """
 from __future__ import annotations
 
+import base64
+import json
 import math
+import re
+import zlib
 from datetime import datetime, timezone
 from typing import Any, Optional
 
 from fastapi import APIRouter, Depends, HTTPException, Query, status
-from sqlalchemy import func
+from fastapi.responses import PlainTextResponse, StreamingResponse
+from sqlalchemy import and_, false, func, or_
 from sqlalchemy.orm import Session
 
 from shared.application.authenticated_principal import AuthenticatedPrincipal
+from shared.infrastructure.log_search import search_table
 from shared.kernel.database.session import get_db
 from presentation.fastapi.dependencies.auth import get_current_principal
 
@@ -25,9 +41,32 @@ _SOURCES = ("app", "worker")
 # 一覧表示でのメッセージ最大長（全文・traceback は詳細APIで返す）
 _LIST_MESSAGE_MAX = 500
 
-# 1回のエクスポートで返す最大件数（メモリ・応答サイズの上限）
+# 1回のエクスポートで返す最大件数（メモリ・応答サイズの上限。ndjson には無い）
 _EXPORT_MAX = 1000
 
+_EXPORT_FORMATS = ("json", "ndjson")
+
+# ndjson エクスポートのキーセット1バッチの件数と、サーバーサイドカーソルの取得単位
+_EXPORT_BATCH = 5000
+_EXPORT_YIELD_PER = 500
+
+# オンデマンドプロファイル結果のイベント名プレフィックス
+_PROFILE_EVENT_PREFIX = "profile."
+
+_SORTS = ("newest", "relevance")
+
+# 本文検索の対象列。MySQL / MariaDB ではサイドカーの同じ列の FULLTEXT インデックスを
+# 使う（shared/infrastructure/log_search.py と一致させる）。
+_FULLTEXT_COLUMNS = {
+    "app": ("event", "message", "path"),
+    "worker": ("event", "message", "task_name"),
+}
+
+# InnoDB の既定 innodb_ft_min_token_size。これより短い語は FULLTEXT で引けない
+_FULLTEXT_MIN_TOKEN = 3
+
+_FULLTEXT_WORD = re.compile(r"[0-9A-Za-z_]+")
+
 
 def _require_log_view_permission(principal: AuthenticatedPrincipal) -> None:
     if not principal.can("admin:system-settings"):
@@ -74,6 +113,10 @@ def _truncate_message(message: Optional[str]) -> tuple[str, bool]:
     return text, False
 
 
+def _has_profile(row) -> bool:
+    return bool(row.event and row.event.startswith(_PROFILE_EVENT_PREFIX))
+
+
 def _serialize_app_log(row, *, detailed: bool = False) -> dict[str, Any]:
     message, truncated = _truncate_message(row.message)
     payload: dict[str, Any] = {
@@ -87,6 +130,7 @@ def _serialize_app_log(row, *, detailed: bool = False) -> dict[str, Any]:
         "path": row.path,
         "requestId": row.request_id,
         "hasTrace": bool(row.trace),
+        "hasProfile": _has_profile(row),
     }
     if detailed:
         payload["trace"] = row.trace
@@ -111,6 +155,7 @@ def _serialize_worker_log(row, *, detailed: bool = False) -> dict[str, Any]:
         "queueName": row.queue_name,
         "loggerName": row.logger_name,
         "hasTrace": bool(row.trace),
+        "hasProfile": _has_profile(row),
     }
     if detailed:
         payload["trace"] = row.trace
@@ -129,6 +174,91 @@ def _log_model(source: str):
     return WorkerLog
 
 
+def _escape_like(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
+
+def _search_table(db: Session, model):
+    """*model* の FULLTEXT 付き検索サイドカー（無い DB では ``None``）。"""
+    return search_table(db.get_bind(), model.__tablename__)
+
+
+def _fulltext_words(term: str) -> Optional[list[str]]:
+    """*term* を FULLTEXT で引ける語に分ける（引けない語を含む場合は ``None``）。
+
+    InnoDB の既定パーサは英数字以外で語を区切り、日本語などは分かち書きしないため、
+    非 ASCII や短すぎる語は部分一致に回す。
+    """
+    if not term.isascii():
+        return None
+    words = _FULLTEXT_WORD.findall(term)
+    if not words or any(len(word) < _FULLTEXT_MIN_TOKEN for word in words):
+        return None
+    return words
+
+
+def _fulltext_match(search, source: str, q: str | None):
+    """``q`` のうち FULLTEXT で引ける語の ``MATCH ... AGAINST``（真偽・一致度を兼ねる）。
+
+    *search* は検索サイドカーで、クエリに結合してから使う。
+    """
+    from sqlalchemy.dialects.mysql import match
+
+    words = [
+        word
+        for term in (q or "").split()
+        for word in (_fulltext_words(term) or ())
+    ]
+    if not words:
+        return None
+    columns = [search.c[name] for name in _FULLTEXT_COLUMNS[source]]
+    # 全語必須（+）・語の前方一致（*）
+    against = " ".join(f"+{word}*" for word in words)
+    return match(*columns, against=against).in_boolean_mode()
+
+
+def _apply_text_search(query, model, source: str, q: str, *, search=None):
+    """空白区切りの語をすべて含むログに絞り込む（対象は ``_FULLTEXT_COLUMNS``）。"""
+    terms = q.split()
+    if search is not None:
+        matched = _fulltext_match(search, source, q)
+        if matched is not None:
+            # サイドカーの主キー (created_at, id) で結合し、元テーブルの区画も刈り込む
+            query = query.join(
+                search,
+                and_(search.c.created_at == model.created_at, search.c.id == model.id),
+            ).filter(matched)
+        terms = [term for term in terms if _fulltext_words(term) is None]
+    columns = [getattr(model, name) for name in _FULLTEXT_COLUMNS[source]]
+    for term in terms:
+        pattern = f"%{_escape_like(term)}%"
+        query = query.filter(or_(*(column.ilike(pattern, escape="\\") for column in columns)))
+    return query
+
+
+def _encode_cursor(row) -> str:
+    raw = f"{row.created_at.isoformat()}|{row.id}"
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def _decode_cursor(raw: str) -> Optional[tuple[datetime, int]]:
+    try:
+        text = base64.urlsafe_b64decode(raw + "=" * (-len(raw) % 4)).decode()
+        created_at, log_id = text.split("|", 1)
+        return datetime.fromisoformat(created_at), int(log_id)
+    except (ValueError, UnicodeDecodeError):
+        return None
+
+
+def _older_than(model, cursor_key: tuple[datetime, int]):
+    """新しい順で *cursor_key* より後ろ（``(created_at, id)`` が小さい）の行。"""
+    cursor_at, cursor_id = cursor_key
+    return or_(
+        model.created_at < cursor_at,
+        and_(model.created_at == cursor_at, model.id < cursor_id),
+    )
+
+
 def _apply_log_filters(
     query,
     model,
@@ -140,14 +270,17 @@ def _apply_log_filters(
     trace_id: str | None,
     since_dt: Optional[datetime],
     until_dt: Optional[datetime],
+    search=None,
 ):
     """一覧・エクスポートで共通のフィルタ条件を適用する。"""
     if levels:
         query = query.filter(func.upper(model.level).in_(levels))
     if event:
-        query = query.filter(model.event.ilike(f"%{event}%"))
-    if q:
-        query = query.filter(model.message.ilike(f"%{q}%"))
+        # ILIKE は LOWER() で包まれてインデックスが効かないため LIKE の前方一致
+        # （MySQL の照合順序・SQLite の LIKE はどちらも ASCII の大文字小文字を区別しない）
+        query = query.filter(model.event.like(f"{_escape_like(event)}%", escape="\\"))
+    if q and q.strip():
+        query = _apply_text_search(query, model, source, q, search=search)
     if trace_id:
         if source == "app":
             query = query.filter(model.request_id == trace_id)
@@ -167,9 +300,14 @@ async def list_logs(
     source: str = Query("app", description="ログの出所（app=APIリクエスト / worker=Celery ジョブ）"),
     page: int = Query(1, ge=1),
     pageSize: int = Query(50, ge=1, le=200),
+    cursor: str | None = Query(
+        None,
+        description="前ページの pagination.nextCursor。指定時は page の代わりにキーセットでページングする",
+    ),
+    sort: str = Query("newest", description="並び順（newest=新しい順 / relevance=q との一致度順）"),
     level: str | None = Query(None, description="ログレベル（カンマ区切りで複数指定可・大文字小文字無視）"),
-    event: str | None = Query(None, description="イベント名（部分一致）"),
-    q: str | None = Query(None, description="メッセージ本文（部分一致）"),
+    event: str | None = Query(None, description="イベント名（前方一致）"),
+    q: str | None = Query(None, description="本文検索（空白区切りの語をすべて含む。イベント名・本文・パス/タスク名が対象）"),
     traceId: str | None = Query(
         None,
         description="追跡キー（app: requestId 完全一致 / worker: taskUuid または fileTaskId 完全一致）",
@@ -179,7 +317,11 @@ async def list_logs(
     principal: AuthenticatedPrincipal = Depends(get_current_principal),
     db: Session = Depends(get_db),
 ):
-    """DBに記録されたログを新しい順に一覧で返す（時間・レベル等でフィルタ可能）。"""
+    """DBに記録されたログを新しい順に一覧で返す（時間・レベル等でフィルタ可能）。
+
+    ``sort=relevance`` は FULLTEXT を使える DB で ``q`` を指定したときだけ一致度順に
+    なり（ページングは ``page``）、それ以外は新しい順のまま。
+    """
     _require_log_view_permission(principal)
 
     if source not in _SOURCES:
@@ -187,8 +329,20 @@ async def list_logs(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail={"error": "invalid_source", "message": f"source must be one of {_SOURCES}"},
         )
+    if sort not in _SORTS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail={"error": "invalid_sort", "message": f"sort must be one of {_SORTS}"},
+        )
+    cursor_key = _decode_cursor(cursor) if cursor else None
+    if cursor and cursor_key is None:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail={"error": "invalid_cursor"},
+        )
 
     model = _log_model(source)
+    search = _search_table(db, model)
 
     levels = [part.strip().upper() for part in (level or "").split(",") if part.strip()]
     since_dt = _parse_dt_utc_naive(since)
@@ -204,15 +358,30 @@ async def list_logs(
         trace_id=traceId,
         since_dt=since_dt,
         until_dt=until_dt,
+        search=search,
     )
 
     total = query.count()
-    rows = (
-        query.order_by(model.created_at.desc(), model.id.desc())
-        .offset((page - 1) * pageSize)
-        .limit(pageSize)
-        .all()
-    )
+    score = _fulltext_match(search, source, q) if search is not None and sort == "relevance" else None
+    next_cursor = None
+    if score is not None:
+        rows = (
+            query.order_by(score.desc(), model.created_at.desc(), model.id.desc())
+            .offset((page - 1) * pageSize)
+            .limit(pageSize)
+            .all()
+        )
+    else:
+        if cursor_key is not None:
+            query = query.filter(_older_than(model, cursor_key))
+        query = query.order_by(model.created_at.desc(), model.id.desc())
+        if cursor_key is None:
+            query = query.offset((page - 1) * pageSize)
+        # 1件多く読んで次ページの有無とカーソルを決める
+        rows = query.limit(pageSize + 1).all()
+        if len(rows) > pageSize:
+            rows = rows[:pageSize]
+            next_cursor = _encode_cursor(rows[-1])
 
     serialize = _serialize_app_log if source == "app" else _serialize_worker_log
     logs = [serialize(row) for row in rows]
@@ -230,8 +399,9 @@ async def list_logs(
             "pageSize": pageSize,
             "totalCount": total,
             "totalPages": total_pages,
-            "hasNext": page < total_pages,
+            "hasNext": next_cursor is not None if cursor_key is not None else page < total_pages,
             "hasPrev": page > 1,
+            "nextCursor": next_cursor,
         },
         "availableLevels": available_levels,
         "filter": {
@@ -242,11 +412,69 @@ async def list_logs(
             "traceId": traceId,
             "since": _iso(since_dt),
             "until": _iso(until_dt),
+            "sort": sort,
         },
         "server_time": _iso(datetime.now(timezone.utc)),
     }
 
 
+def _ndjson_lines(bind, query, model, serialize, cursor_key):
+    """*query* の行を新しい順に NDJSON で返す（キーセットのバッチ・行数上限なし）。
+
+    本文の送出はハンドラーが返った後に行われ、ハンドラーは返す前にリクエストの
+    セッションを閉じる。そのため *bind* に専用のセッションを開いて *query* を
+    載せ替え、ストリームの終了時（切断を含む）に閉じる。
+
+    各バッチはサーバーサイドカーソル（``yield_per``）で読み、ORM の identity map に
+    溜めないよう列だけを取り出す。各行の ``cursor`` を ``cursor`` パラメータに渡すと
+    その行の次から再開できる。
+    """
+    db = Session(bind=bind)
+    try:
+        yield from _ndjson_batches(db, query.with_session(db), model, serialize, cursor_key)
+    finally:
+        db.close()
+
+
+def _ndjson_batches(db: Session, query, model, serialize, cursor_key):
+    columns = query.with_entities(*model.__table__.columns)
+    while True:
+        batch = columns
+        if cursor_key is not None:
+            batch = batch.filter(_older_than(model, cursor_key))
+        batch = (
+            batch.order_by(model.created_at.desc(), model.id.desc())
+            .limit(_EXPORT_BATCH)
+            .yield_per(_EXPORT_YIELD_PER)
+        )
+        lines: list[str] = []
+        count = 0
+        for row in batch:
+            count += 1
+            cursor_key = (row.created_at, row.id)
+            payload = serialize(row, detailed=True)
+            payload["cursor"] = _encode_cursor(row)
+            lines.append(json.dumps(payload, ensure_ascii=False) + "\n")
+            if len(lines) >= _EXPORT_YIELD_PER:
+                yield "".join(lines)
+                lines = []
+        if lines:
+            yield "".join(lines)
+        # バッチごとにトランザクションを終え、長い読み取りスナップショットを持ち続けない
+        db.rollback()
+        if count < _EXPORT_BATCH:
+            return
+
+
+def _gzip_chunks(chunks):
+    compressor = zlib.compressobj(wbits=31)  # gzip ヘッダ付き
+    for chunk in chunks:
+        data = compressor.compress(chunk.encode("utf-8"))
+        if data:
+            yield data
+    yield compressor.flush()
+
+
 @router.get("/export")
 async def export_logs(
     source: str = Query("app", description="ログの出所（app / worker）"),
@@ -255,18 +483,27 @@ async def export_logs(
         description="エクスポート対象の ID（カンマ区切り）。指定時はフィルタより優先。",
     ),
     level: str | None = Query(None, description="ログレベル（カンマ区切りで複数指定可）"),
-    event: str | None = Query(None, description="イベント名（部分一致）"),
-    q: str | None = Query(None, description="メッセージ本文（部分一致）"),
+    event: str | None = Query(None, description="イベント名（前方一致）"),
+    q: str | None = Query(None, description="本文検索（空白区切りの語をすべて含む）"),
     traceId: str | None = Query(None, description="追跡キー（完全一致）"),
     since: str | None = Query(None, description="この日時以降（ISO 8601）"),
     until: str | None = Query(None, description="この日時以前（ISO 8601）"),
+    format: str = Query(
+        "json",
+        description="json=1つの JSON（上限 1000 件）/ ndjson=1行1件のストリーミング（上限なし）",
+    ),
+    gzip: bool = Query(False, description="ndjson を gzip 圧縮して返す"),
+    cursor: str | None = Query(
+        None, description="ndjson の再開位置（受信済みの最終行の cursor）"
+    ),
     principal: AuthenticatedPrincipal = Depends(get_current_principal),
     db: Session = Depends(get_db),
 ):
     """複数ログをまとめて（メッセージ全文・traceback 付きで）エクスポートする。
 
     ``ids`` を指定した場合はその ID 群を、指定しない場合は一覧と同じフィルタ条件に
-    合致するログを新しい順に返す。上限は ``_EXPORT_MAX`` 件。
+    合致するログを新しい順に返す。``format=json`` は上限 ``_EXPORT_MAX`` 件の
+    JSON、``format=ndjson`` は件数の上限なく1行1件でストリーミングする。
     """
     _require_log_view_permission(principal)
 
@@ -275,20 +512,34 @@ async def export_logs(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail={"error": "invalid_source", "message": f"source must be one of {_SOURCES}"},
         )
+    if format not in _EXPORT_FORMATS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail={"error": "invalid_format", "message": f"format must be one of {_EXPORT_FORMATS}"},
+        )
+    cursor_key = _decode_cursor(cursor) if cursor else None
+    if cursor and cursor_key is None:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail={"error": "invalid_cursor"},
+        )
 
     model = _log_model(source)
     query = db.query(model)
+    streaming = format == "ndjson"
 
     id_list = [
         int(part) for part in (ids or "").split(",") if part.strip().isdigit()
     ]
     if ids is not None and not id_list:
         # ids は渡されたが有効な数値が無い → 対象なしとして空で返す。
-        return {"source": source, "count": 0, "logs": [], "exportedAt": _iso(datetime.now(timezone.utc))}
+        query = query.filter(false())
+        if not streaming:
+            return {"source": source, "count": 0, "logs": [], "exportedAt": _iso(datetime.now(timezone.utc))}
 
     if id_list:
-        query = query.filter(model.id.in_(id_list[:_EXPORT_MAX]))
-    else:
+        query = query.filter(model.id.in_(id_list if streaming else id_list[:_EXPORT_MAX]))
+    elif ids is None:
         levels = [part.strip().upper() for part in (level or "").split(",") if part.strip()]
         query = _apply_log_filters(
             query,
@@ -300,15 +551,39 @@ async def export_logs(
             trace_id=traceId,
             since_dt=_parse_dt_utc_naive(since),
             until_dt=_parse_dt_utc_naive(until),
+            search=_search_table(db, model),
+        )
+
+    serialize = _serialize_app_log if source == "app" else _serialize_worker_log
+
+    if streaming:
+        # 同期ジェネレータは Starlette がスレッドプールで回す（イベントループを塞がない）
+        chunks = _ndjson_lines(db.get_bind(), query, model, serialize, cursor_key)
+        # 認証で使ったリクエストのセッションを返してから流す（ストリーム中に
+        # 接続を 1 本握り続けない）。ストリームは専用のセッションで読む
+        db.close()
+        filename = "logs-{}-{}.ndjson".format(
+            source, datetime.now(timezone.utc).strftime("%Y%m%d_%H%M%S")
+        )
+        media_type = "application/x-ndjson"
+        if gzip:
+            chunks = _gzip_chunks(chunks)
+            filename += ".gz"
+            media_type = "application/gzip"
+        return StreamingResponse(
+            chunks,
+            media_type=media_type,
+            headers={"Content-Disposition": f'attachment; filename="{filename}"'},
         )
 
+    if cursor_key is not None:
+        query = query.filter(_older_than(model, cursor_key))
     rows = (
         query.order_by(model.created_at.desc(), model.id.desc())
         .limit(_EXPORT_MAX)
         .all()
     )
 
-    serialize = _serialize_app_log if source == "app" else _serialize_worker_log
     logs = [serialize(row, detailed=True) for row in rows]
 
     return {
@@ -345,3 +620,40 @@ async def get_log_detail(
 
     serialize = _serialize_app_log if source == "app" else _serialize_worker_log
     return {"log": serialize(row, detailed=True)}
+
+
+@router.get("/{source}/{log_id}/profile", response_class=PlainTextResponse)
+async def download_log_profile(
+    source: str,
+    log_id: int,
+    principal: AuthenticatedPrincipal = Depends(get_current_principal),
+    db: Session = Depends(get_db),
+):
+    """プロファイル結果の collapsed stack（flamegraph.pl / speedscope 入力形式）を返す。"""
+    _require_log_view_permission(principal)
+
+    if source not in _SOURCES:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail={"error": "invalid_source", "message": f"source must be one of {_SOURCES}"},
+        )
+
+    model = _log_model(source)
+    row = db.get(model, log_id)
+    if row is None or not _has_profile(row):
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail={"error": "profile_not_found"},
+        )
+
+    try:
+        collapsed = json.loads(row.message or "{}").get("collapsed") or ""
+    except (ValueError, AttributeError):
+        collapsed = ""
+
+    return PlainTextResponse(
+        collapsed + "\n" if collapsed else "",
+        headers={
+            "Content-Disposition": f'attachment; filename="profile-{source}-{log_id}.collapsed"'
+        },
+    )
@@ -15,7 +15,7 @@ import logging
 from datetime import datetime, timezone
 from typing import Optional
 
-from fastapi import APIRouter, Depends, HTTPException, Query, Request, status
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, status
 from sqlalchemy import case, func
 from sqlalchemy.orm import Session
 
@@ -25,6 +25,7 @@ from presentation.fastapi.dependencies.auth import (
     get_current_principal,
     require_permission,
 )
+from presentation.fastapi.dependencies.conditional import library_etag, not_modified, set_etag
 
 logger = logging.getLogger(__name__)
 
@@ -40,30 +41,13 @@ def _serialize_tag(tag) -> dict:
     return {"id": tag.id, "name": tag.name, "attr": tag.attr}
 
 
-def _serialize_album_summary(
-    album,
-    *,
-    media_count: int = 0,
-    fallback_cover_id: Optional[int] = None,
-    available_media_ids: Optional[list[int]] = None,
-) -> dict:
-    available_set = set(available_media_ids or [])
-    computed_count = media_count if media_count is not None else len(available_set)
-    cover_id = album.cover_media_id
-
-    if computed_count == 0:
-        cover_id = None
-    elif available_set and (cover_id not in available_set):
-        cover_id = None
-    if cover_id is None:
-        cover_id = fallback_cover_id
-
-    created_at = (
-        album.created_at.isoformat().replace("+00:00", "Z") if album.created_at else None
-    )
-    updated_at = (
-        album.updated_at.isoformat().replace("+00:00", "Z") if album.updated_at else None
-    )
+def _iso(value: Optional[datetime]) -> Optional[str]:
+    return value.isoformat().replace("+00:00", "Z") if value else None
+
+
+def _serialize_album_summary(album) -> dict:
+    """``album`` 行の集計列（``refresh_album_stats`` が更新）だけで要約を作る。"""
+    cover_id = album.cover_media_id if album.media_count else None
     return {
         "id": album.id,
         "title": album.name,
@@ -71,52 +55,34 @@ def _serialize_album_summary(
         "visibility": album.visibility,
         "coverImageId": cover_id,
         "coverMediaId": cover_id,
-        "mediaCount": int(computed_count or 0),
-        "createdAt": created_at,
-        "lastModified": updated_at,
+        "mediaCount": int(album.media_count or 0),
+        "shotAtStart": _iso(album.shot_at_min),
+        "shotAtEnd": _iso(album.shot_at_max),
+        "createdAt": _iso(album.created_at),
+        "lastModified": _iso(album.updated_at),
         "displayOrder": album.display_order,
     }
 
 
 def _resolve_best_thumbnail_url(media, db: Session) -> Optional[str]:
-    """利用可能な最大サイズのサムネイル URL を返す（無ければ None）。"""
-    try:
-        from presentation.fastapi.services.storage_helpers import (
-            _resolve_storage_file,
-            _thumbnail_rel_path_candidates,
-        )
-        from bounded_contexts.storage import StorageDomain
-    except Exception:
-        return None
+    """利用可能な最大サイズのサムネイル URL を返す（無ければ None）。
 
-    rel_candidates = _thumbnail_rel_path_candidates(media)
-    if not rel_candidates:
-        return None
+    ``media.thumbnail_manifest`` だけで判断し、ファイルシステムは参照しない
+    （マニフェスト未記録のメディアは None で、呼び出し側の 512 に任せる）。
+    """
+    from bounded_contexts.photonest.domain.media_processing import ThumbnailManifest
 
-    for size in (2048, 1024, 512):
-        for rel_path in rel_candidates:
-            try:
-                resolved = _resolve_storage_file(
-                    StorageDomain.MEDIA_THUMBNAILS,
-                    str(size),
-                    rel_path.as_posix(),
-                )
-                if resolved.exists:
-                    return f"/api/media/{media.id}/thumbnail?size={size}"
-            except Exception:
-                continue
-    return None
+    manifest = ThumbnailManifest.from_raw(getattr(media, "thumbnail_manifest", None))
+    size = manifest.largest((2048, 1024, 512)) if manifest is not None else None
+    if size is None:
+        return None
+    return f"/api/media/{media.id}/thumbnail?size={size}"
 
 
 def _serialize_album_detail(album, media_rows, db: Session) -> dict:
     media_items: list[dict] = []
-    fallback_cover_id: Optional[int] = None
-    media_ids: list[int] = []
 
     for media, sort_index in media_rows:
-        if fallback_cover_id is None:
-            fallback_cover_id = media.id
-        media_ids.append(media.id)
         tags = sorted(media.tags, key=lambda t: (t.name or "").lower())
         thumbnail_url = f"/api/media/{media.id}/thumbnail?size=512"
         full_url = _resolve_best_thumbnail_url(media, db) or thumbnail_url
@@ -124,25 +90,16 @@ def _serialize_album_detail(album, media_rows, db: Session) -> dict:
             {
                 "id": media.id,
                 "filename": media.filename,
-                "shotAt": (
-                    media.shot_at.isoformat().replace("+00:00", "Z")
-                    if media.shot_at
-                    else None
-                ),
+                "shotAt": _iso(media.shot_at),
                 "thumbnailUrl": thumbnail_url,
                 "fullUrl": full_url,
+                "blurhash": media.blurhash or None,
                 "sortIndex": sort_index,
                 "tags": [_serialize_tag(t) for t in tags],
             }
         )
 
-    summary = _serialize_album_summary(
-        album,
-        media_count=len(media_items),
-        fallback_cover_id=fallback_cover_id,
-        available_media_ids=media_ids,
-    )
-    summary["coverMediaId"] = summary.get("coverMediaId")
+    summary = _serialize_album_summary(album)
     summary["media"] = media_items
     summary["mediaIds"] = [item["id"] for item in media_items]
     return summary
@@ -176,6 +133,8 @@ def _album_error_to_http(error) -> HTTPException:
 
 @router.get("/albums")
 async def api_albums_list(
+    request: Request,
+    response: Response,
     q: str = Query("", description="タイトルの部分一致フィルタ"),
     page: int = Query(1, ge=1),
     pageSize: int = Query(24, ge=1, le=200),
@@ -184,23 +143,18 @@ async def api_albums_list(
     principal: AuthenticatedPrincipal = Depends(require_permission("media:view", "album:view")),
     db: Session = Depends(get_db),
 ):
-    """アルバム一覧をページングして返す。"""
-    from bounded_contexts.photonest.infrastructure.photo_models import Album, album_item
-
-    stats_subquery = (
-        db.query(
-            album_item.c.album_id.label("album_id"),
-            func.count(album_item.c.media_id).label("media_count"),
-            func.min(album_item.c.media_id).label("first_media_id"),
-        )
-        .group_by(album_item.c.album_id)
-        .subquery()
-    )
+    """アルバム一覧をページングして返す。
 
-    query = (
-        db.query(Album, stats_subquery.c.media_count, stats_subquery.c.first_media_id)
-        .outerjoin(stats_subquery, Album.id == stats_subquery.c.album_id)
-    )
+    件数・表紙は ``album`` 行の集計列を読むだけで、``album_item`` は集計しない。
+    """
+    from bounded_contexts.photonest.infrastructure.photo_models import Album
+
+    etag = await library_etag(request, principal)
+    cached = not_modified(request, etag)
+    if cached is not None:
+        return cached
+
+    query = db.query(Album)
 
     if q:
         query = query.filter(Album.name.ilike(f"%{q}%"))
@@ -222,15 +176,9 @@ async def api_albums_list(
     total = db.query(func.count(Album.id)).scalar() or 0
     rows = query.offset((page - 1) * pageSize).limit(pageSize).all()
 
-    items = [
-        _serialize_album_summary(
-            row[0],
-            media_count=row[1] or 0,
-            fallback_cover_id=row[2],
-        )
-        for row in rows
-    ]
+    items = [_serialize_album_summary(album) for album in rows]
 
+    set_etag(response, etag)
     return {
         "items": items,
         "total": total,
@@ -7,6 +7,7 @@ from __future__ import annotations
 import logging
 import os
 import random
+import shutil
 import string
 from datetime import datetime, timezone
 from typing import Any, Optional
@@ -421,9 +422,10 @@ async def upload_local_import_files(
 
         target_path = os.path.join(import_dir, target_name)
         try:
-            content = await upload_file.read()
+            # 数 GB の動画でもメモリへ全量を載せないよう 1MiB 単位で書き出す
+            await upload_file.seek(0)
             with open(target_path, "wb") as f:
-                f.write(content)
+                shutil.copyfileobj(upload_file.file, f, 1024 * 1024)
         except Exception as exc:
             _local_import_log("Failed to save uploaded import file", level="error", filename=original_name, error=str(exc))
             skipped.append({"filename": original_name, "reason": "save_failed"})
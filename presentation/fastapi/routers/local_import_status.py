@@ -5,9 +5,11 @@ app.py では ``/api`` プレフィックスで登録する → 最終的に ``/
 """
 from __future__ import annotations
 
+import json
 import logging
 
-from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Request
+from fastapi.responses import StreamingResponse
 from sqlalchemy import func
 from sqlalchemy.orm import Session
 
@@ -19,6 +21,23 @@ logger = logging.getLogger(__name__)
 
 router = APIRouter(prefix="/local-import", tags=["local-import-status"])
 
+# 進捗が届かないときにキープアライブを送る間隔（秒）。
+_SSE_HEARTBEAT_SECONDS = 15.0
+# Redis が無い場合、EventSource に再接続（＝ポーリング）させる間隔（ミリ秒）。
+_SSE_FALLBACK_RETRY_MS = 5000
+
+
+def _sse_event(payload: dict) -> str:
+    data = json.dumps(payload, ensure_ascii=False, default=str)
+    return f"id: {payload.get('seq', 0)}\nevent: progress\ndata: {data}\n\n"
+
+
+def _parse_last_event_id(value: str | None) -> int:
+    try:
+        return int(value) if value else 0
+    except ValueError:
+        return 0
+
 
 # ---------------------------------------------------------------------------
 # エンドポイント
@@ -47,6 +66,85 @@ async def get_session_status(
     }
 
 
+@router.get("/sessions/{session_id}/events")
+async def stream_session_events(
+    session_id: int,
+    request: Request,
+    last_event_id: str | None = Header(None),
+    principal: AuthenticatedPrincipal = Depends(get_current_principal),
+    db: Session = Depends(get_db),
+):
+    """セッション進捗を Server-Sent Events で配信する。
+
+    最初に最新スナップショット（Redis に無ければ DB から組み立てたもの）を送り、
+    以降はワーカーが Redis に publish した進捗を ``event: progress`` として中継する。
+    ``Last-Event-ID`` 以下の ``seq`` は送らない。終了状態に達したら接続を閉じる。
+    Redis が使えない場合はスナップショットを 1 件送って ``retry`` 後の再接続を促す。
+    """
+    from bounded_contexts.picker_import.infrastructure.picker_session import PickerSession
+    from bounded_contexts.picker_import.infrastructure.session_progress import (
+        TERMINAL_STATES,
+        ProgressSubscription,
+        build_progress_payload,
+        load_selection_counts,
+        load_snapshot,
+        publishing_enabled,
+    )
+
+    session = db.get(PickerSession, session_id)
+    if not session:
+        raise HTTPException(status_code=404, detail={"error": f"セッションが見つかりません: {session_id}"})
+
+    fallback = build_progress_payload(session, load_selection_counts(db, session_id))
+    fallback["seq"] = 0
+    # ストリームは終了状態まで数時間続くことがあり、get_db の後処理はその後になる。
+    # 以降 DB は使わないので、ここで接続をプールに返す（開いたトランザクションも終える）
+    db.close()
+    resume_after = _parse_last_event_id(last_event_id)
+    streaming = publishing_enabled()
+
+    def _initial(snapshot: dict | None) -> dict:
+        if not snapshot:
+            return fallback
+        if "counts" not in snapshot:
+            snapshot["counts"] = fallback["counts"]
+        return snapshot
+
+    async def _events():
+        if not streaming:
+            yield f"retry: {_SSE_FALLBACK_RETRY_MS}\n\n"
+            yield _sse_event(fallback)
+            return
+
+        async with ProgressSubscription(session_id) as subscription:
+            snapshot = _initial(load_snapshot(session_id))
+            last_seq = resume_after
+            if snapshot["seq"] == 0 or snapshot["seq"] > last_seq:
+                yield _sse_event(snapshot)
+                last_seq = max(last_seq, snapshot["seq"])
+            if snapshot.get("state") in TERMINAL_STATES:
+                return
+
+            while not await request.is_disconnected():
+                message = await subscription.get(_SSE_HEARTBEAT_SECONDS)
+                if message is None:
+                    yield ": keepalive\n\n"
+                    continue
+                seq = int(message.get("seq") or 0)
+                if seq <= last_seq:
+                    continue
+                last_seq = seq
+                yield _sse_event(message)
+                if message.get("state") in TERMINAL_STATES:
+                    return
+
+    return StreamingResponse(
+        _events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
 @router.get("/sessions/{session_id}/errors")
 async def get_session_errors(
     session_id: int,
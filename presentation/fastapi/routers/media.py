@@ -9,19 +9,26 @@ Flask-Smorest 版 ``presentation/web/api/routes.py`` のメディア関連エン
 - ``POST   /api/media/bulk-actions`` — 一括操作
 - ``GET    /api/media/{media_id}/thumbnail`` — サムネイル画像
 - ``POST   /api/media/{media_id}/thumb-url`` — 署名付きサムネイル URL
+- ``POST   /api/media/{media_id}/image-url`` — 署名付き派生画像（任意幅・形式）URL
 - ``POST   /api/media/{media_id}/recover`` — メタデータ再取得・復元
 - ``POST   /api/media/{media_id}/original-url`` — 署名付きオリジナル URL
 - ``POST   /api/media/{media_id}/playback-url`` — 署名付き再生 URL
+- ``POST   /api/media/{media_id}/hls-url`` — 署名付き HLS マスタープレイリスト URL
 - ``GET    /api/media/thumbs/{rel}`` — サムネイル fallback ダウンロード
 - ``GET    /api/media/playback/{rel}`` — 再生ファイル fallback ダウンロード
 - ``GET    /api/media/originals/{rel}`` — オリジナル fallback ダウンロード
+- ``GET    /api/dl/img/{token}`` — 署名付き派生画像
+- ``GET    /api/dl/hls/{token}/{name}`` — 署名付き HLS プレイリスト・セグメント
 - ``GET    /api/dl/{token}`` — 署名付きトークンで保護されたダウンロード
 """
 from __future__ import annotations
 
+import asyncio
 import base64
 import hashlib
+import functools
 import hmac
+import io
 import json
 import logging
 import mimetypes
@@ -36,16 +43,19 @@ from urllib.parse import quote
 from uuid import uuid4
 
 from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, status
+from fastapi.concurrency import run_in_threadpool
 from fastapi.responses import StreamingResponse
 from sqlalchemy import case, func, select
 from sqlalchemy.orm import Session, joinedload
 from werkzeug.utils import secure_filename
 
 from shared.application.authenticated_principal import AuthenticatedPrincipal
+from shared.kernel.celery_queues import TaskPriority
 from shared.kernel.database.session import get_db
 from shared.kernel.settings.settings import settings
 from shared.kernel.time.clock import utc_now_isoformat
 from presentation.fastapi.dependencies.auth import get_current_principal
+from presentation.fastapi.dependencies.conditional import library_etag, not_modified, set_etag
 
 logger = logging.getLogger(__name__)
 
@@ -328,6 +338,51 @@ def _build_accel_target(prefix: Optional[str], rel: str, token: str) -> Optional
 # ---------------------------------------------------------------------------
 
 
+_STREAM_CHUNK_SIZE = 256 * 1024
+_RANGE_RE = re.compile(r"bytes=(\d*)-(\d*)$")
+
+
+def _parse_range(range_header: str, size: int) -> Optional[tuple[int, int]]:
+    """単一の ``bytes=`` 範囲を ``(start, end)`` に解釈する（満たせない場合は ``(-1, -1)``）."""
+
+    m = _RANGE_RE.match(range_header.strip())
+    if not m or not (m.group(1) or m.group(2)):
+        return None
+    if not m.group(1):
+        suffix = int(m.group(2))
+        if suffix <= 0 or size <= 0:
+            return -1, -1
+        return max(size - suffix, 0), size - 1
+    start = int(m.group(1))
+    if start >= size:
+        return -1, -1
+    end = min(int(m.group(2) or size - 1), size - 1)
+    if end < start:
+        return None
+    return start, end
+
+
+def _iter_file_range(service, abs_path: str, start: int, length: int):
+    with service.open(abs_path, "rb") as f:
+        f.seek(start)
+        remaining = length
+        while remaining > 0:
+            chunk = f.read(min(_STREAM_CHUNK_SIZE, remaining))
+            if not chunk:
+                break
+            remaining -= len(chunk)
+            yield chunk
+
+
+def _signed_ttl(payload: dict) -> int:
+    """トークンの有効期限までの残り秒数（``Cache-Control`` の ``max-age`` 用）。"""
+    exp_ts = payload.get("exp")
+    try:
+        return max(int(exp_ts) - int(time.time()), 0) if exp_ts else 0
+    except (TypeError, ValueError):
+        return 0
+
+
 def _build_file_response(
     *,
     payload: dict,
@@ -342,12 +397,7 @@ def _build_file_response(
     service = _storage_service()
     abs_path = resolved.absolute_path
     size = service.size(abs_path)
-    exp_ts = payload.get("exp")
-    try:
-        ttl = max(int(exp_ts) - int(time.time()), 0) if exp_ts else 0
-    except (TypeError, ValueError):
-        ttl = 0
-    cache_control = f"private, max-age={ttl}"
+    cache_control = f"private, max-age={_signed_ttl(payload)}"
 
     headers: dict[str, str] = {
         "Accept-Ranges": "bytes",
@@ -357,24 +407,28 @@ def _build_file_response(
     if download_filename:
         headers["Content-Disposition"] = _build_content_disposition(download_filename)
     if accel_target:
+        # 本文と Range 処理は nginx の internal ロケーションが担うため、
+        # ここではファイルを読まずヘッダーだけを返す。
         headers["X-Accel-Redirect"] = accel_target
+        headers.pop("Content-Length")
+        return Response(content=b"", headers=headers, media_type=content_type)
 
     range_header = request.headers.get("Range") if request.method != "HEAD" else None
     if range_header:
-        m = re.match(r"bytes=(\d+)-(\d*)", range_header)
-        if m:
-            start = int(m.group(1))
-            end = int(m.group(2) or size - 1)
-            end = min(end, size - 1)
+        byte_range = _parse_range(range_header, size)
+        if byte_range == (-1, -1):
+            return Response(
+                status_code=416,
+                headers={"Content-Range": f"bytes */{size}", "Accept-Ranges": "bytes"},
+            )
+        if byte_range is not None:
+            start, end = byte_range
             length = end - start + 1
-            with service.open(abs_path, "rb") as f:
-                f.seek(start)
-                data = f.read(length)
             range_headers = dict(headers)
             range_headers["Content-Range"] = f"bytes {start}-{end}/{size}"
             range_headers["Content-Length"] = str(length)
-            return Response(
-                content=data,
+            return StreamingResponse(
+                _iter_file_range(service, abs_path, start, length),
                 status_code=206,
                 headers=range_headers,
                 media_type=content_type,
@@ -387,9 +441,66 @@ def _build_file_response(
             media_type=content_type,
         )
 
-    with service.open(abs_path, "rb") as f:
-        data = f.read()
-    return Response(content=data, headers=headers, media_type=content_type)
+    return StreamingResponse(
+        _iter_file_range(service, abs_path, 0, size),
+        headers=headers,
+        media_type=content_type,
+    )
+
+
+def _build_packed_response(
+    *,
+    store,
+    variant,
+    content_type: str,
+    ttl: int,
+    request: Request,
+) -> Response:
+    """パックに格納されたサムネイルを返す（``Range`` / ``HEAD`` 対応）。
+
+    X-Accel-Redirect はパックの一部分だけを返せないため、パック内のエントリは
+    常にアプリが ``pread`` で読んで返す。
+    """
+    size = variant.bytes
+    headers: dict[str, str] = {
+        "Accept-Ranges": "bytes",
+        "Cache-Control": f"private, max-age={ttl}",
+    }
+    start, end, status_code = 0, size - 1, 200
+    range_header = request.headers.get("Range") if request.method != "HEAD" else None
+    if range_header:
+        byte_range = _parse_range(range_header, size)
+        if byte_range == (-1, -1):
+            return Response(
+                status_code=416,
+                headers={"Content-Range": f"bytes */{size}", "Accept-Ranges": "bytes"},
+            )
+        if byte_range is not None:
+            start, end = byte_range
+            status_code = 206
+            headers["Content-Range"] = f"bytes {start}-{end}/{size}"
+
+    if request.method == "HEAD":
+        headers["Content-Length"] = str(size)
+        return Response(content=b"", headers=headers, media_type=content_type)
+
+    data = store.read(variant.pack, variant.offset, size, start=start, end=end)
+    headers["Content-Length"] = str(len(data))
+    return Response(content=data, status_code=status_code, headers=headers, media_type=content_type)
+
+
+def _packed_thumbnail_from_token(payload: dict, db: Session):
+    """サムネイルのトークンが指すエントリがパックにあれば ``(store, variant)`` を返す。"""
+    from bounded_contexts.photonest.infrastructure.photo_models import Media
+
+    size = payload.get("size")
+    media = db.get(Media, payload.get("mid")) if payload.get("mid") else None
+    if media is None or media.is_deleted or not isinstance(size, int):
+        return None
+    manifest = _thumbnail_manifest(media)
+    if manifest is None or payload.get("path") != f"thumbs/{size}/{manifest.rel_path}":
+        return None
+    return _packed_thumbnail(media, size)
 
 
 # ---------------------------------------------------------------------------
@@ -397,47 +508,94 @@ def _build_file_response(
 # ---------------------------------------------------------------------------
 
 
-def _remove_media_files(media, db: Session) -> None:
-    from bounded_contexts.photonest.infrastructure.photo_models import MediaPlayback
+def _enqueue_media_file_deletions(media, db: Session) -> int:
+    """メディアの実ファイルを削除キュー（``media_file_deletion``）に登録する。
+
+    ファイルはここでは消さず、同じトランザクションで記録した行を
+    ``media_files.delete_pending`` タスクがバッチで削除する。
+    """
+    from bounded_contexts.photonest.infrastructure.photo_models import MediaFileDeletion
+    from bounded_contexts.photonest.tasks.media_file_deletion import (
+        KIND_BLOB,
+        KIND_FILE,
+        KIND_TREE,
+    )
     from bounded_contexts.storage import StorageDomain
-    from bounded_contexts.storage.infrastructure.filesystem import StorageIntent
 
-    service = _storage_service()
-    rel_path = _normalize_rel_path(media.local_rel_path)
+    entries: dict[tuple[str, str], str] = {}
 
-    def _remove(domain, *parts) -> None:
-        try:
-            resolved = _resolve_storage_file(domain, *parts, intent=StorageIntent.DELETE)
-            abs_path = resolved.absolute_path
-            if not abs_path:
-                return
-            service.remove(abs_path)
-        except FileNotFoundError:
-            pass
-        except Exception as exc:
-            logger.warning(
-                "Failed to remove file: media_id=%s error=%s", media.id, exc
-            )
+    def _add(domain, rel: str, kind: str = KIND_FILE) -> None:
+        entries.setdefault((domain.value, rel), kind)
 
+    rel_path = _normalize_rel_path(media.local_rel_path)
     if rel_path:
-        _remove(StorageDomain.MEDIA_ORIGINALS, rel_path.as_posix())
-
-    thumb_candidates = _thumbnail_rel_path_candidates(media)
-    if thumb_candidates:
-        for size in (256, 1024, 2048):
-            for candidate in thumb_candidates:
-                _remove(StorageDomain.MEDIA_THUMBNAILS, str(size), candidate.as_posix())
+        _add(StorageDomain.MEDIA_ORIGINALS, rel_path.as_posix())
+        if media.hash_sha256:
+            # 原本の論理パスが消えた後、参照の無くなった内容 blob を解放する
+            _add(StorageDomain.MEDIA_ORIGINALS, media.hash_sha256, KIND_BLOB)
+
+    manifest = _thumbnail_manifest(media)
+    if manifest is not None:
+        # 記録済みのサイズだけを消す（存在しない候補を探し回らない）
+        for size in sorted(manifest.variants):
+            # パック内のエントリは個別ファイルが無い（領域はパックの詰め直しで回収する）
+            if manifest.path_for(size) is not None:
+                _add(StorageDomain.MEDIA_THUMBNAILS, manifest.path_for(size))
+    else:
+        for size in (256, 512, 1024, 2048):
+            for candidate in _thumbnail_rel_path_candidates(media):
+                _add(StorageDomain.MEDIA_THUMBNAILS, f"{size}/{candidate.as_posix()}")
+    media.thumbnail_manifest = None
 
     for playback in media.playbacks:
         rel = _normalize_rel_path(playback.rel_path)
-        if rel:
-            _remove(StorageDomain.MEDIA_PLAYBACK, rel.as_posix())
+        if rel and playback.preset == "hls":
+            # HLS はマスタープレイリストと各画質のセグメントをディレクトリ単位で持つ
+            if rel.parent.parts:
+                _add(StorageDomain.MEDIA_PLAYBACK, rel.parent.as_posix(), KIND_TREE)
+        elif rel:
+            _add(StorageDomain.MEDIA_PLAYBACK, rel.as_posix())
         poster_rel = _normalize_rel_path(playback.poster_rel_path)
         if poster_rel:
-            _remove(StorageDomain.MEDIA_PLAYBACK, poster_rel.as_posix())
+            _add(StorageDomain.MEDIA_PLAYBACK, poster_rel.as_posix())
+
+    for (domain, rel), kind in entries.items():
+        db.add(
+            MediaFileDeletion(
+                media_id=media.id, storage_domain=domain, rel_path=rel, kind=kind
+            )
+        )
+    return len(entries)
+
+
+def _trigger_media_file_deletion() -> None:
+    """コミット後に削除キューの処理タスクを起動する（失敗しても定期実行で拾われる）。"""
+    if settings.testing:
+        return
+    try:
+        from cli.src.celery.tasks import media_file_deletion_task
+
+        media_file_deletion_task.apply_async(priority=int(TaskPriority.LOW))
+    except Exception as exc:
+        logger.warning("Failed to enqueue media file deletion task: %s", exc)
+
 
+def _soft_delete_media(
+    media,
+    db: Session,
+    *,
+    now: Optional[datetime] = None,
+    touched_album_ids: Optional[set[int]] = None,
+) -> None:
+    """メディアを論理削除し、アルバムから外してファイル削除キューに登録する。
 
-def _soft_delete_media(media, db: Session, *, now: Optional[datetime] = None) -> None:
+    *touched_album_ids* を渡すとアルバムの集計列は更新せず ID を集めるだけにする
+    （一括削除で最後に 1 回だけ再計算する）。
+    """
+    from bounded_contexts.photonest.infrastructure.album import (
+        album_ids_for_media,
+        refresh_album_stats,
+    )
     from bounded_contexts.photonest.infrastructure.photo_models import Album, album_item
 
     if media.is_deleted:
@@ -445,47 +603,18 @@ def _soft_delete_media(media, db: Session, *, now: Optional[datetime] = None) ->
 
     effective_now = now or datetime.now(timezone.utc)
 
-    associated_albums = (
-        db.query(Album)
-        .join(album_item, Album.id == album_item.c.album_id)
-        .filter(album_item.c.media_id == media.id)
-        .all()
-    )
-
-    if associated_albums:
+    album_ids = album_ids_for_media(db, [media.id])
+    if album_ids:
         db.execute(album_item.delete().where(album_item.c.media_id == media.id))
-        for album in associated_albums:
-            if album.cover_media_id == media.id:
-                new_cover_id = db.execute(
-                    select(album_item.c.media_id)
-                    .where(album_item.c.album_id == album.id)
-                    .order_by(album_item.c.sort_index.asc(), album_item.c.media_id.asc())
-                    .limit(1)
-                ).scalar()
-                album.cover_media_id = new_cover_id
-            else:
-                if album.cover_media_id is not None:
-                    existing_cover = db.execute(
-                        select(album_item.c.media_id)
-                        .where(
-                            album_item.c.album_id == album.id,
-                            album_item.c.media_id == album.cover_media_id,
-                        )
-                        .limit(1)
-                    ).scalar()
-                    if existing_cover is None:
-                        new_cover_id = db.execute(
-                            select(album_item.c.media_id)
-                            .where(album_item.c.album_id == album.id)
-                            .order_by(
-                                album_item.c.sort_index.asc(), album_item.c.media_id.asc()
-                            )
-                            .limit(1)
-                        ).scalar()
-                        album.cover_media_id = new_cover_id
+        for album in db.query(Album).filter(Album.id.in_(album_ids)):
             album.updated_at = effective_now
+        if touched_album_ids is not None:
+            touched_album_ids.update(album_ids)
+        else:
+            # 件数・撮影日の範囲を更新し、表紙だったメディアは並び順が先頭のものに替える
+            refresh_album_stats(db, album_ids)
 
-    _remove_media_files(media, db)
+    _enqueue_media_file_deletions(media, db)
     media.is_deleted = True
     media.updated_at = effective_now
 
@@ -527,7 +656,8 @@ def _trigger_thumbnail_regeneration(
     if thumbs_task is not None and not settings.testing:
         try:
             async_result = thumbs_task.apply_async(
-                kwargs={"media_id": media_id, "force": force}
+                kwargs={"media_id": media_id, "force": force},
+                priority=int(TaskPriority.HIGH),
             )
             celery_task_id = getattr(async_result, "id", None)
             logger.info(
@@ -555,6 +685,260 @@ def _trigger_thumbnail_regeneration(
         return False, celery_task_id
 
 
+def _thumbnail_manifest(media):
+    """``media.thumbnail_manifest`` を返す（未記録なら ``None``）。"""
+    from bounded_contexts.photonest.domain.media_processing import ThumbnailManifest
+
+    return ThumbnailManifest.from_raw(getattr(media, "thumbnail_manifest", None))
+
+
+def _thumbnail_base_path() -> Optional[str]:
+    """サムネイルの書き込み先ベース（``thumbs_generate`` と同じ先頭候補）を返す。"""
+    from bounded_contexts.storage import StorageDomain
+    from presentation.fastapi.services.storage_helpers import _storage_path_candidates
+
+    candidates = _storage_path_candidates(StorageDomain.MEDIA_THUMBNAILS)
+    return candidates[0] if candidates else None
+
+
+def _packed_thumbnail(media, size: int):
+    """*size* のサムネイルがパックに格納されていれば ``(store, variant)`` を返す。"""
+    from bounded_contexts.photonest.infrastructure.media_processing.thumbnail_packs import (
+        ThumbnailPackStore,
+    )
+
+    manifest = _thumbnail_manifest(media)
+    variant = manifest.packed_variant(size) if manifest is not None else None
+    base_path = _thumbnail_base_path()
+    if variant is None or base_path is None:
+        return None
+    return ThumbnailPackStore(base_path, max_pack_bytes=settings.thumbnail_pack_max_bytes), variant
+
+
+def _find_thumbnail(media, size: int) -> tuple[Optional[str], Optional[str]]:
+    """*size* のサムネイルの相対パスと絶対パスを返す（無ければ ``(None, None)``）。
+
+    マニフェストが記録済みのメディアはファイルシステムを調べずに決める。
+    未記録（バックフィル前）のメディアだけ従来どおりパス候補を stat して探す。
+    パックに格納されたサイズは個別ファイルが無いため ``(None, None)``
+    （:func:`_packed_thumbnail` で読む）。
+    """
+    from bounded_contexts.storage import StorageDomain
+
+    manifest = _thumbnail_manifest(media)
+    if manifest is not None:
+        base_path = _thumbnail_base_path()
+        if manifest.path_for(size) is None or base_path is None:
+            return None, None
+        return manifest.rel_path, os.path.join(base_path, manifest.path_for(size))
+
+    for candidate in _thumbnail_rel_path_candidates(media):
+        cand_str = candidate.as_posix()
+        current = _resolve_storage_file(StorageDomain.MEDIA_THUMBNAILS, str(size), cand_str)
+        if current.exists and current.absolute_path:
+            return cand_str, current.absolute_path
+    return None, None
+
+
+_THUMBNAIL_FAST_PATH_TIMEOUT_SECONDS = 15.0
+
+
+def _thumbnail_fast_path_source(media) -> Optional[str]:
+    """同期生成に使う元画像の絶対パスを返す。
+
+    写真は原本、動画は完了済み再生ファイルのポスターを使う。再生ファイルが
+    未完了・ポスターが無い動画は ``None``（非同期ジョブの再試行に任せる）。
+    """
+    from bounded_contexts.storage import StorageDomain
+
+    if media.is_video:
+        playback = _select_preferred_playback(list(media.playbacks or []))
+        if not playback or playback.status != "done":
+            return None
+        source_rel = _normalize_rel_path(playback.poster_rel_path)
+        domain = StorageDomain.MEDIA_PLAYBACK
+    else:
+        source_rel = _normalize_rel_path(media.local_rel_path)
+        domain = StorageDomain.MEDIA_ORIGINALS
+    if not source_rel:
+        return None
+    resolved = _resolve_storage_file(domain, source_rel.as_posix())
+    if not resolved.exists or not resolved.absolute_path:
+        return None
+    return resolved.absolute_path
+
+
+async def _render_thumbnail_fast_path(media, size: int) -> Optional[str]:
+    """256/512 のサムネイルを API プロセス内で生成し、書き込んだ絶対パスを返す。
+
+    同じ ``(media, size)`` の同時リクエストは 1 回の生成を待ち合わせる。
+    プールが満杯・元画像が使えない・生成失敗・タイムアウトのときは ``None``。
+    """
+    from bounded_contexts.photonest.infrastructure.media_processing.thumbnail_fast_path import (
+        FAST_PATH_SIZES,
+        get_render_pool,
+        render_thumbnail,
+    )
+    from bounded_contexts.photonest.tasks.thumbs_generate import THUMBNAIL_OUTPUT_SUFFIX
+
+    if not settings.thumbnail_fast_path_enabled or size not in FAST_PATH_SIZES:
+        return None
+    source = _thumbnail_fast_path_source(media)
+    base_path = _thumbnail_base_path()
+    manifest = _thumbnail_manifest(media)
+    if manifest is not None and manifest.rel_path:
+        # 記録済みの他サイズと同じパスに揃える
+        dest_rel = _normalize_rel_path(manifest.rel_path)
+    else:
+        base_rel = _normalize_rel_path(getattr(media, "thumbnail_rel_path", None)) or _normalize_rel_path(
+            media.local_rel_path
+        )
+        # thumbs_generate と同じ出力パス（拡張子を AVIF に置き換えたもの）に書き込む
+        dest_rel = base_rel.with_name(base_rel.stem + THUMBNAIL_OUTPUT_SUFFIX) if base_rel else None
+    if source is None or dest_rel is None or base_path is None:
+        return None
+    dest = Path(base_path) / str(size) / dest_rel
+
+    future = get_render_pool().submit((media.id, size), render_thumbnail, Path(source), dest, size)
+    if future is None:
+        logger.info("Thumbnail fast path saturated: media_id=%s size=%s", media.id, size)
+        return None
+    try:
+        # 待っているリクエストが切断・タイムアウトしても生成自体は他の待ち手のために続ける
+        rendered = await asyncio.wait_for(
+            asyncio.shield(asyncio.wrap_future(future)),
+            timeout=_THUMBNAIL_FAST_PATH_TIMEOUT_SECONDS,
+        )
+    except asyncio.TimeoutError:
+        logger.warning("Thumbnail fast path timed out: media_id=%s size=%s", media.id, size)
+        return None
+    except Exception as exc:
+        logger.warning(
+            "Thumbnail fast path failed: media_id=%s size=%s error=%s", media.id, size, exc
+        )
+        return None
+    logger.info("Thumbnail rendered on request: media_id=%s size=%s", media.id, size)
+    return str(rendered)
+
+
+def _record_fast_path_thumbnail(db: Session, media, size: int, abs_path: str) -> None:
+    """同期生成した *size* を記録済みのマニフェストに追加してコミットする。
+
+    マニフェストは行をロックして読み直し、その間に ``thumbs.generate`` が記録した
+    内容に追記する。未記録（バックフィル前）のメディアは 1 サイズだけの
+    マニフェストにすると他のサイズを探さなくなるため ``NULL`` のまま残す
+    （``thumbs.manifest_backfill`` がディスクを調べて全サイズを記録する）。
+    """
+    from bounded_contexts.photonest.infrastructure.photo_models import Media
+
+    fresh = (
+        db.query(Media)
+        .filter(Media.id == media.id)
+        .with_for_update()
+        .populate_existing()
+        .one_or_none()
+    )
+    manifest = _thumbnail_manifest(fresh) if fresh is not None else None
+    base_path = _thumbnail_base_path()
+    if (
+        manifest is not None
+        and manifest.rel_path
+        and not manifest.has(size)
+        and base_path is not None
+        # 生成中にマニフェストの相対パスが変わっていたら、書いたファイルは載せない
+        and Path(abs_path) == Path(base_path) / str(size) / manifest.rel_path
+    ):
+        try:
+            byte_size = os.stat(abs_path).st_size
+        except OSError:
+            byte_size = None
+        if byte_size is not None:
+            fresh.thumbnail_manifest = manifest.with_variant(
+                manifest.rel_path, size, byte_size
+            ).to_raw()
+    db.commit()
+
+
+_IMAGE_DERIVATIVE_TIMEOUT_SECONDS = 15.0
+_THUMBNAIL_SIZES = (256, 512, 1024, 2048)
+
+
+def _negotiate_image_format(accept: Optional[str]) -> str:
+    """``Accept`` ヘッダーから派生画像の形式（avif → webp → jpeg の優先順）を選ぶ。
+
+    ``image/*`` や ``*/*`` は AVIF/WebP 非対応のブラウザも送るため、
+    明示された型だけを対応とみなす。
+    """
+    accepted: dict[str, float] = {}
+    for part in (accept or "").split(","):
+        media_range, _, params = part.strip().partition(";")
+        q = 1.0
+        for param in params.split(";"):
+            name, _, value = param.strip().partition("=")
+            if name == "q":
+                try:
+                    q = float(value)
+                except ValueError:
+                    q = 0.0
+        accepted[media_range.strip().lower()] = q
+    for fmt, mime in (("avif", "image/avif"), ("webp", "image/webp")):
+        if accepted.get(mime, 0.0) > 0:
+            return fmt
+    return "jpeg"
+
+
+def _derivative_source(media, width: int) -> Optional[tuple[Any, str]]:
+    """派生画像の元にするサムネイルと版（キャッシュキー用）を返す。
+
+    幅 *width* 以上で最小のサイズを選び、無ければ生成済みで最大のものを使う。
+    元は絶対パス。パックに格納されたサイズはエントリを読む関数を返す。
+    """
+    manifest = _thumbnail_manifest(media)
+    if manifest is not None:
+        sizes = [size for size in _THUMBNAIL_SIZES if manifest.has(size)]
+    else:
+        sizes = list(_THUMBNAIL_SIZES)
+    larger = [size for size in sizes if size >= width]
+    for size in larger + sorted(set(sizes) - set(larger), reverse=True):
+        packed = _packed_thumbnail(media, size)
+        if packed is not None:
+            store, variant = packed
+            version = f"{size}/{variant.pack}@{variant.offset}:{variant.bytes}"
+            return functools.partial(store.read, variant.pack, variant.offset, variant.bytes), version
+        rel, abs_path = _find_thumbnail(media, size)
+        if abs_path is None:
+            continue
+        if manifest is not None:
+            version = f"{size}/{rel}:{manifest.variants[size].bytes}"
+        else:
+            try:
+                stat_result = os.stat(abs_path)
+            except OSError:
+                continue
+            version = f"{size}/{rel}:{stat_result.st_size}:{stat_result.st_mtime_ns}"
+        return abs_path, version
+    return None
+
+
+def _derivative_version_tag(version: str) -> str:
+    """派生画像トークンの ``ver``（元サムネイルの版のハッシュ）。"""
+    return hashlib.sha256(version.encode()).hexdigest()[:16]
+
+
+def _build_image_derivative(cache, key: str, source, width: int, fmt: str, quality: int) -> Path:
+    from bounded_contexts.photonest.infrastructure.media_processing.image_derivatives import (
+        IMAGE_FORMATS,
+        render_derivative,
+    )
+
+    cached = cache.get(key)
+    if cached is not None:
+        return cached
+    if callable(source):
+        source = io.BytesIO(source())
+    return cache.put(key, render_derivative(source, width, fmt, quality), IMAGE_FORMATS[fmt][1])
+
+
 # ---------------------------------------------------------------------------
 # メディア一覧
 # ---------------------------------------------------------------------------
@@ -562,6 +946,8 @@ def _trigger_thumbnail_regeneration(
 
 @router.get("/media")
 async def api_media_list(
+    request: Request,
+    response: Response,
     page: int = Query(1, ge=1),
     pageSize: int = Query(200, ge=1, le=500),
     cursor: Optional[str] = Query(None),
@@ -574,9 +960,17 @@ async def api_media_list(
     principal: AuthenticatedPrincipal = Depends(get_current_principal),
     db: Session = Depends(get_db),
 ):
-    """メディア一覧をページングして返す。"""
+    """メディア一覧をページングして返す。
+
+    ライブラリが前回から変わっていなければ ``If-None-Match`` に 304 を返す。
+    """
     from bounded_contexts.photonest.infrastructure.photo_models import Media, Tag
 
+    etag = await library_etag(request, principal)
+    cached = not_modified(request, etag)
+    if cached is not None:
+        return cached
+
     trace = uuid4().hex
     logger.info("media.list.begin trace=%s cursor=%s", trace, cursor)
 
@@ -661,11 +1055,13 @@ async def api_media_list(
             "account_email": account_email,
             "camera_make": media.camera_make,
             "camera_model": media.camera_model,
+            "blurhash": media.blurhash or None,
             "tags": [_serialize_tag(t) for t in media_tags],
         }
 
     items = [_serialize(m) for m in items_raw]
     logger.info("media.list.success trace=%s count=%d", trace, len(items))
+    set_etag(response, etag)
     return {
         "items": items,
         "page": page,
@@ -681,6 +1077,8 @@ async def api_media_list(
 
 @router.get("/media/duplicates")
 async def api_media_duplicates(
+    request: Request,
+    response: Response,
     limit: int = Query(100, ge=1, le=500),
     principal: AuthenticatedPrincipal = Depends(get_current_principal),
     db: Session = Depends(get_db),
@@ -695,6 +1093,11 @@ async def api_media_duplicates(
             detail={"error": "forbidden", "message": "You do not have permission to view media."},
         )
 
+    etag = await library_etag(request, principal)
+    cached = not_modified(request, etag)
+    if cached is not None:
+        return cached
+
     not_deleted = or_(Media.is_deleted.is_(False), Media.is_deleted.is_(None))
 
     exact_hashes = [
@@ -733,6 +1136,7 @@ async def api_media_duplicates(
             "id": m.id,
             "filename": m.filename,
             "thumbnail_url": f"/api/media/{m.id}/thumbnail?size=512",
+            "blurhash": m.blurhash or None,
             "width": m.width,
             "height": m.height,
             "bytes": m.bytes,
@@ -794,6 +1198,7 @@ async def api_media_duplicates(
             "items": [_dup_member(m) for m in members],
         })
 
+    set_etag(response, etag)
     return {"groups": groups, "group_count": len(groups)}
 
 
@@ -918,6 +1323,7 @@ async def api_media_delete(
     now = datetime.now(timezone.utc)
     _soft_delete_media(media, db, now=now)
     db.commit()
+    _trigger_media_file_deletion()
     logger.info("media.delete: media_id=%s user_id=%s", media_id, principal.id)
     return {"result": "deleted"}
 
@@ -1036,9 +1442,14 @@ async def api_media_bulk_actions(
     now = datetime.now(timezone.utc)
 
     if action == "delete":
+        from bounded_contexts.photonest.infrastructure.album import refresh_album_stats
+
+        touched_album_ids: set[int] = set()
         for m in ordered_medias:
-            _soft_delete_media(m, db, now=now)
+            _soft_delete_media(m, db, now=now, touched_album_ids=touched_album_ids)
+        refresh_album_stats(db, touched_album_ids)
         db.commit()
+        _trigger_media_file_deletion()
         logger.info("media.bulk.delete: ids=%s user_id=%s", normalized_media_ids, principal.id)
         return {"result": "deleted", "deleted_ids": normalized_media_ids}
 
@@ -1117,7 +1528,6 @@ async def api_media_thumbnail(
 ):
     """サムネイル画像を返す。"""
     from bounded_contexts.photonest.infrastructure.photo_models import Media
-    from bounded_contexts.storage import StorageDomain
 
     if size not in (256, 512, 1024, 2048):
         raise HTTPException(
@@ -1131,31 +1541,44 @@ async def api_media_thumbnail(
     if media.is_deleted:
         raise HTTPException(status_code=status.HTTP_410_GONE, detail={"error": "gone"})
 
-    rel_candidates = _thumbnail_rel_path_candidates(media)
-    if not rel_candidates:
+    if not _thumbnail_rel_path_candidates(media):
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail={"error": "not_found"})
 
-    resolved_rel: Optional[str] = None
-    resolved_file = None
-
-    for candidate in rel_candidates:
-        cand_str = candidate.as_posix()
-        current = _resolve_storage_file(StorageDomain.MEDIA_THUMBNAILS, str(size), cand_str)
-        if current.exists and current.absolute_path:
-            resolved_rel = cand_str
-            resolved_file = current
-            break
-
-    if not resolved_file or not resolved_file.absolute_path or not resolved_rel:
+    def _missing() -> HTTPException:
         triggered, celery_task_id = _trigger_thumbnail_regeneration(
             media_id, reason="api_thumbnail_missing", principal_id=principal.id
         )
         payload: dict[str, Any] = {"error": "not_found", "thumbnailJobTriggered": triggered}
         if celery_task_id:
             payload["thumbnailJobId"] = celery_task_id
-        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=payload)
+        return HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=payload)
+
+    packed = _packed_thumbnail(media, size)
+    if packed is not None:
+        store, variant = packed
+        try:
+            return _build_packed_response(
+                store=store,
+                variant=variant,
+                content_type=mimetypes.guess_type(_thumbnail_manifest(media).rel_path or "")[0]
+                or "application/octet-stream",
+                ttl=settings.media_thumbnail_url_ttl_seconds,
+                request=request,
+            )
+        except (FileNotFoundError, ValueError):
+            # パックが消えた・切り詰められた。次回はファイルを探し直す
+            media.thumbnail_manifest = None
+            db.commit()
+            raise _missing()
+
+    _, abs_path = _find_thumbnail(media, size)
+    if abs_path is None:
+        # 小さいサイズはその場で生成して返す。生成できないときだけ非同期ジョブに回す
+        abs_path = await _render_thumbnail_fast_path(media, size)
+        if abs_path is None:
+            raise _missing()
+        _record_fast_path_thumbnail(db, media, size, abs_path)
 
-    abs_path = resolved_file.absolute_path
     ct = mimetypes.guess_type(abs_path)[0] or media.mime_type or "application/octet-stream"
     ttl = settings.media_thumbnail_url_ttl_seconds
 
@@ -1174,13 +1597,19 @@ async def api_media_thumbnail(
         )
 
     service = _storage_service()
-    with service.open(abs_path, "rb") as f:
-        data = f.read()
+    try:
+        with service.open(abs_path, "rb") as f:
+            data = f.read()
+    except FileNotFoundError:
+        # マニフェストに載っているのにファイルが消えている。次回はファイルを探し直す
+        media.thumbnail_manifest = None
+        db.commit()
+        raise _missing()
     return Response(
         content=data,
         media_type=ct,
         headers={
-            "Content-Length": str(service.size(abs_path)),
+            "Content-Length": str(len(data)),
             "Cache-Control": f"private, max-age={ttl}",
         },
     )
@@ -1195,7 +1624,6 @@ async def api_media_thumb_url(
 ):
     """署名付きサムネイル URL を返す。"""
     from bounded_contexts.photonest.infrastructure.photo_models import Media
-    from bounded_contexts.storage import StorageDomain
 
     body = await request.json()
     size = body.get("size")
@@ -1211,27 +1639,16 @@ async def api_media_thumb_url(
     if media.is_deleted:
         raise HTTPException(status_code=status.HTTP_410_GONE, detail={"error": "gone"})
 
-    rel_candidates = _thumbnail_rel_path_candidates(media)
-    if not rel_candidates:
-        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail={"error": "not_found"})
-
-    resolved_rel: Optional[str] = None
-    resolved_file = None
-
-    for candidate in rel_candidates:
-        cand_str = candidate.as_posix()
-        current = _resolve_storage_file(StorageDomain.MEDIA_THUMBNAILS, str(size), cand_str)
-        if current.exists and current.absolute_path:
-            resolved_rel = cand_str
-            resolved_file = current
-            break
-
-    if not resolved_file or not resolved_file.absolute_path or not resolved_rel:
+    resolved_rel, abs_path = _find_thumbnail(media, size)
+    if _packed_thumbnail(media, size) is not None:
+        # パック内のエントリも同じ論理パスで署名し、配信時にパックから読む
+        resolved_rel = abs_path = _thumbnail_manifest(media).rel_path
+    if not abs_path or not resolved_rel:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail={"error": "not_found"})
 
     token_path = f"thumbs/{size}/{resolved_rel}"
     ct = (
-        mimetypes.guess_type(resolved_file.absolute_path)[0]
+        mimetypes.guess_type(abs_path)[0]
         or media.mime_type
         or "application/octet-stream"
     )
@@ -1258,6 +1675,86 @@ async def api_media_thumb_url(
     }
 
 
+@router.post("/media/{media_id}/image-url")
+async def api_media_image_url(
+    media_id: int,
+    request: Request,
+    principal: AuthenticatedPrincipal = Depends(get_current_principal),
+    db: Session = Depends(get_db),
+):
+    """任意幅・形式の派生画像を返す署名付き URL を発行する。
+
+    ``format`` を省略（または ``auto``）すると、画像取得時の ``Accept`` から
+    AVIF / WebP / JPEG を選ぶ。URL はサムネイルの版を含むため内容が変わらず、
+    レスポンスは ``immutable`` でキャッシュできる。
+    """
+    from bounded_contexts.photonest.infrastructure.media_processing.image_derivatives import (
+        IMAGE_FORMATS,
+        MAX_DERIVATIVE_WIDTH,
+        QUALITY_RANGE,
+    )
+    from bounded_contexts.photonest.infrastructure.photo_models import Media
+
+    body = await request.json()
+    width = body.get("width")
+    if not isinstance(width, int) or isinstance(width, bool) or not 1 <= width <= MAX_DERIVATIVE_WIDTH:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail={"error": "invalid_width"},
+        )
+    fmt = body.get("format") or "auto"
+    if fmt != "auto" and fmt not in IMAGE_FORMATS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail={"error": "invalid_format"},
+        )
+    quality = body.get("quality")
+    if quality is not None and (
+        not isinstance(quality, int)
+        or isinstance(quality, bool)
+        or not QUALITY_RANGE[0] <= quality <= QUALITY_RANGE[1]
+    ):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail={"error": "invalid_quality"},
+        )
+
+    media = db.get(Media, media_id)
+    if not media:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail={"error": "not_found"})
+    if media.is_deleted:
+        raise HTTPException(status_code=status.HTTP_410_GONE, detail={"error": "gone"})
+
+    source = _derivative_source(media, width)
+    if source is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail={"error": "not_found"})
+
+    ttl = settings.media_image_url_ttl_seconds
+    exp, max_age = _cacheable_signed_exp(ttl)
+    token_payload: dict[str, Any] = {
+        "v": 1,
+        "typ": "image",
+        "mid": media_id,
+        "w": width,
+        "ver": _derivative_version_tag(source[1]),
+        "exp": exp,
+    }
+    if fmt != "auto":
+        token_payload["fmt"] = fmt
+    if quality is not None:
+        token_payload["q"] = quality
+    token = _sign_payload(token_payload)
+    expires_at = (
+        datetime.fromtimestamp(exp, tz=timezone.utc).isoformat().replace("+00:00", "Z")
+    )
+    logger.info("url.image.issue: mid=%s width=%s format=%s ttl=%s", media_id, width, fmt, ttl)
+    return {
+        "url": f"/api/dl/img/{token}",
+        "expiresAt": expires_at,
+        "cacheControl": f"private, max-age={max_age}, immutable",
+    }
+
+
 @router.post("/media/{media_id}/recover")
 async def api_media_recover(
     media_id: int,
@@ -1282,7 +1779,17 @@ async def api_media_recover(
     if not media:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail={"error": "not_found"})
     if media.is_deleted:
-        raise HTTPException(status_code=status.HTTP_410_GONE, detail={"error": "gone"})
+        # 削除キューがまだファイルに触れていなければ削除を取り消して復元する
+        from bounded_contexts.photonest.tasks.media_file_deletion import (
+            restore_media_file_deletions,
+        )
+
+        if not restore_media_file_deletions(media.id, db):
+            raise HTTPException(status_code=status.HTTP_410_GONE, detail={"error": "gone"})
+        media.is_deleted = False
+        media.updated_at = datetime.now(timezone.utc)
+        db.commit()
+        logger.info("media.undelete: media_id=%s user_id=%s", media_id, principal.id)
 
     rel_path = _normalize_rel_path(media.local_rel_path)
     if not rel_path:
@@ -1331,7 +1838,13 @@ async def api_media_recover(
 
     db.refresh(media)
 
-    changed = False
+    from bounded_contexts.photonest.infrastructure.album import (
+        album_ids_for_media,
+        refresh_album_stats,
+    )
+
+    # 撮影日時が変わると収録先アルバムの撮影日の範囲も変わる
+    changed = refresh_album_stats(db, album_ids_for_media(db, [media.id])) > 0
     if not media.thumbnail_rel_path and media.local_rel_path:
         media.thumbnail_rel_path = media.local_rel_path
         changed = True
@@ -1466,6 +1979,75 @@ async def api_media_playback_url(
     }
 
 
+_HLS_CONTENT_TYPES = {
+    ".m3u8": "application/vnd.apple.mpegurl",
+    ".m4s": "video/iso.segment",
+    ".mp4": "video/mp4",
+}
+
+
+@router.post("/media/{media_id}/hls-url")
+async def api_media_hls_url(
+    media_id: int,
+    principal: AuthenticatedPrincipal = Depends(get_current_principal),
+    db: Session = Depends(get_db),
+):
+    """署名付き HLS マスタープレイリスト URL を返す。
+
+    トークンは HLS ディレクトリ全体（プレイリスト・init・セグメント）を対象とし、
+    URL のパス中に埋め込む。プレイリスト内の相対 URI はそのまま同じトークン配下に
+    解決されるため、プレイリストを書き換える必要はない。
+    """
+    from bounded_contexts.photonest.domain.media_processing import HLS_MASTER_PLAYLIST
+    from bounded_contexts.photonest.infrastructure.photo_models import Media, MediaPlayback
+    from bounded_contexts.storage import StorageDomain
+
+    media = db.get(Media, media_id)
+    if not media or not media.is_video:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail={"error": "not_found"})
+    if media.is_deleted:
+        raise HTTPException(status_code=status.HTTP_410_GONE, detail={"error": "gone"})
+
+    pb = (
+        db.query(MediaPlayback)
+        .filter_by(media_id=media_id, preset="hls")
+        .first()
+    )
+    if not pb or pb.status == "error":
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail={"error": "not_found"})
+    if pb.status in ("pending", "processing"):
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail={"error": "not_ready"})
+
+    rel = _normalize_rel_path(pb.rel_path)
+    if pb.status != "done" or not rel or rel.name != HLS_MASTER_PLAYLIST or not rel.parent.parts:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail={"error": "not_found"})
+    resolved = _resolve_storage_file(StorageDomain.MEDIA_PLAYBACK, *rel.parts)
+    if not resolved.exists or not resolved.absolute_path:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail={"error": "not_found"})
+
+    ttl = settings.media_playback_url_ttl_seconds
+    exp, max_age = _cacheable_signed_exp(ttl)
+    token_payload = {
+        "v": 1,
+        "typ": "hls",
+        "mid": media_id,
+        "size": None,
+        "path": f"playback/{rel.parent.as_posix()}/",
+        "ct": _HLS_CONTENT_TYPES[".m3u8"],
+        "exp": exp,
+    }
+    token = _sign_payload(token_payload)
+    expires_at = (
+        datetime.fromtimestamp(exp, tz=timezone.utc).isoformat().replace("+00:00", "Z")
+    )
+    logger.info("url.hls.issue: mid=%s ttl=%s", media_id, ttl)
+    return {
+        "url": f"/api/dl/hls/{token}/{HLS_MASTER_PLAYLIST}",
+        "expiresAt": expires_at,
+        "cacheControl": f"private, max-age={max_age}",
+    }
+
+
 # ---------------------------------------------------------------------------
 # ダウンロード fallback エンドポイント（nginx X-Accel-Redirect 未設定時）
 # ---------------------------------------------------------------------------
@@ -1502,7 +2084,16 @@ def _handle_accel_fallback(
 
     resolved = _resolve_storage_file(storage_domain, *segments)
     if not resolved.exists or not resolved.absolute_path:
-        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND)
+        packed = _packed_thumbnail_from_token(payload, db) if expected_type == "thumb" else None
+        if packed is None:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND)
+        return _build_packed_response(
+            store=packed[0],
+            variant=packed[1],
+            content_type=payload.get("ct") or "application/octet-stream",
+            ttl=_signed_ttl(payload),
+            request=request,
+        )
 
     ct = (
         payload.get("ct") if payload else None
@@ -1587,6 +2178,193 @@ async def api_download_original_fallback(
     )
 
 
+@router.get("/dl/img/{token}")
+async def api_download_image(
+    token: str,
+    request: Request,
+    principal: AuthenticatedPrincipal = Depends(get_current_principal),
+    db: Session = Depends(get_db),
+):
+    """署名付きトークンの派生画像を返す（``/dl/{token:path}`` より先に登録する）。
+
+    要求幅以上で最小のサムネイルから生成し、ディスク LRU キャッシュに置く。
+    """
+    from bounded_contexts.photonest.infrastructure.media_processing.image_derivatives import (
+        IMAGE_FORMATS,
+        MAX_DERIVATIVE_WIDTH,
+        get_derivative_cache,
+    )
+    from bounded_contexts.photonest.infrastructure.media_processing.thumbnail_fast_path import (
+        get_render_pool,
+    )
+    from bounded_contexts.photonest.infrastructure.photo_models import Media
+
+    payload, err = _verify_token(token)
+    if err:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail={"error": err},
+        )
+    width = payload.get("w")
+    fmt = payload.get("fmt")
+    if (
+        payload.get("typ") != "image"
+        or not isinstance(width, int)
+        or not 1 <= width <= MAX_DERIVATIVE_WIDTH
+        or (fmt is not None and fmt not in IMAGE_FORMATS)
+    ):
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail={"error": "forbidden"})
+
+    media = db.get(Media, payload.get("mid"))
+    if not media or media.is_deleted:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail={"error": "not_found"})
+    source = _derivative_source(media, width)
+    if source is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail={"error": "not_found"})
+    if payload.get("ver") != _derivative_version_tag(source[1]):
+        # 発行後にサムネイルが作り直された。同じ URL で別の内容を immutable として
+        # 返さないよう拒否し、URL を発行し直させる
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail={"error": "stale"})
+
+    negotiated = fmt is None
+    if negotiated:
+        fmt = _negotiate_image_format(request.headers.get("Accept"))
+    content_type, _, default_quality = IMAGE_FORMATS[fmt]
+    quality = payload.get("q") or default_quality
+    source_path, source_version = source
+    key = hashlib.sha256(
+        f"{media.id}|{source_version}|{width}|{fmt}|{quality}".encode()
+    ).hexdigest()
+
+    try:
+        ttl = max(int(payload.get("exp", 0)) - int(time.time()), 0)
+    except (TypeError, ValueError):
+        ttl = 0
+    headers = {
+        "Cache-Control": f"private, max-age={ttl}, immutable",
+        "ETag": f'"{key[:32]}"',
+    }
+    if negotiated:
+        headers["Vary"] = "Accept"
+    if request.headers.get("If-None-Match") == headers["ETag"]:
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+
+    cache = get_derivative_cache()
+    # キャッシュの索引（SQLite）とファイルの読み出しはイベントループの外で行う
+    path = await run_in_threadpool(cache.get, key)
+    if path is None:
+        future = get_render_pool().submit(
+            ("image", key),
+            _build_image_derivative,
+            cache,
+            key,
+            source_path if callable(source_path) else Path(source_path),
+            width,
+            fmt,
+            quality,
+        )
+        if future is None:
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail={"error": "busy"},
+                headers={"Retry-After": "1"},
+            )
+        try:
+            path = await asyncio.wait_for(
+                asyncio.shield(asyncio.wrap_future(future)),
+                timeout=_IMAGE_DERIVATIVE_TIMEOUT_SECONDS,
+            )
+        except asyncio.TimeoutError:
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail={"error": "busy"},
+                headers={"Retry-After": "1"},
+            )
+        except Exception as exc:
+            logger.warning(
+                "Image derivative failed: media_id=%s width=%s format=%s error=%s",
+                media.id,
+                width,
+                fmt,
+                exc,
+            )
+            raise HTTPException(
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                detail={"error": "render_failed"},
+            )
+
+    try:
+        data = await run_in_threadpool(Path(path).read_bytes)
+    except FileNotFoundError:
+        # 読み出す直前に追い出された。次のリクエストで作り直す
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail={"error": "busy"},
+            headers={"Retry-After": "1"},
+        )
+    headers["Content-Length"] = str(len(data))
+    return Response(content=data, media_type=content_type, headers=headers)
+
+
+@router.api_route("/dl/hls/{token}/{name:path}", methods=["GET", "HEAD"])
+async def api_download_hls(
+    token: str,
+    name: str,
+    request: Request,
+    principal: AuthenticatedPrincipal = Depends(get_current_principal),
+    db: Session = Depends(get_db),
+):
+    """HLS トークン配下のプレイリスト・セグメントを配信する。
+
+    ``/dl/{token:path}`` より先に登録し、こちらを優先させる。
+    """
+    from bounded_contexts.storage import StorageDomain
+
+    payload, err = _verify_token(token)
+    if err:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail={"error": err},
+        )
+
+    prefix = payload.get("path", "")
+    if (
+        payload.get("typ") != "hls"
+        or not prefix.startswith("playback/")
+        or not prefix.endswith("/")
+        or ".." in prefix.split("/")
+    ):
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail={"error": "forbidden"})
+
+    segments = name.split("/")
+    if any(part in ("", ".", "..") for part in segments):
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail={"error": "not_found"})
+    ct = _HLS_CONTENT_TYPES.get(os.path.splitext(name)[1].lower())
+    if ct is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail={"error": "not_found"})
+
+    rel = prefix[len("playback/"):] + name
+    resolved = _resolve_storage_file(StorageDomain.MEDIA_PLAYBACK, *rel.split("/"))
+    if not resolved.exists or not resolved.absolute_path:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail={"error": "not_found"})
+
+    # プレイリストは小さいためアプリから直接返し、セグメントは nginx に委ねる
+    accel_target: Optional[str] = None
+    if settings.media_accel_redirect_enabled and not name.endswith(".m3u8"):
+        accel_target = _build_accel_target(settings.media_accel_playback_location, rel, token)
+
+    return _build_file_response(
+        payload=payload,
+        resolved=resolved,
+        rel=rel,
+        content_type=ct,
+        download_filename=None,
+        accel_target=accel_target,
+        request=request,
+        db=db,
+    )
+
+
 @router.api_route("/dl/{token:path}", methods=["GET", "HEAD"])
 async def api_download(
     token: str,
@@ -1636,7 +2414,16 @@ async def api_download(
         raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail={"error": "forbidden"})
 
     if not resolved.exists or not resolved.absolute_path:
-        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail={"error": "not_found"})
+        packed = _packed_thumbnail_from_token(payload, db) if typ == "thumb" else None
+        if packed is None:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail={"error": "not_found"})
+        return _build_packed_response(
+            store=packed[0],
+            variant=packed[1],
+            content_type=ct,
+            ttl=_signed_ttl(payload),
+            request=request,
+        )
 
     abs_path = resolved.absolute_path
     download_filename = _resolve_download_filename(payload, rel, abs_path, db)
@@ -0,0 +1,26 @@
+"""Prometheus 形式のメトリクスエンドポイント。
+
+``/metrics`` は ``/healthz`` と同じくルート直下に置き、スクレイパーが認証なしで
+取得できるようにする。``METRICS_MULTIPROC_DIR`` が設定されていれば、他の
+ワーカープロセス（gunicorn/uvicorn/Celery）が書き出した値も合算して返す。
+"""
+from __future__ import annotations
+
+from fastapi import APIRouter
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import Response
+
+from shared.kernel.metrics.registry import CONTENT_TYPE_LATEST, generate_latest
+
+router = APIRouter(tags=["metrics"])
+
+
+@router.get("/metrics", include_in_schema=False)
+async def metrics():
+    """全メトリクスを Prometheus テキスト形式で返す。"""
+    # 他プロセスのスナップショット読み込みとキュー長の取得はブロッキング I/O。
+    body = await run_in_threadpool(generate_latest)
+    return Response(content=body, media_type=CONTENT_TYPE_LATEST)
+
+
+__all__ = ["router"]
@@ -12,13 +12,14 @@ import logging
 from datetime import datetime, timezone
 from typing import Optional
 
-from fastapi import APIRouter, Depends, HTTPException, Query, Request, status
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, status
 from sqlalchemy import func
 from sqlalchemy.orm import Session
 
 from shared.application.authenticated_principal import AuthenticatedPrincipal
 from shared.kernel.database.session import get_db
 from presentation.fastapi.dependencies.auth import get_current_principal
+from presentation.fastapi.dependencies.conditional import library_etag, not_modified, set_etag
 
 logger = logging.getLogger(__name__)
 
@@ -42,6 +43,8 @@ def _serialize_tag(tag) -> dict:
 
 @router.get("/tags")
 async def api_tags_list(
+    request: Request,
+    response: Response,
     q: str = Query("", description="タグ名の部分一致フィルタ"),
     limit: int = Query(20, ge=1, le=1000),
     principal: AuthenticatedPrincipal = Depends(get_current_principal),
@@ -50,12 +53,18 @@ async def api_tags_list(
     """タグ一覧を返す（インクリメンタル検索対応）。"""
     from bounded_contexts.photonest.infrastructure.photo_models import Tag
 
+    etag = await library_etag(request, principal)
+    cached = not_modified(request, etag)
+    if cached is not None:
+        return cached
+
     query = db.query(Tag)
     if q:
         like_expr = f"%{q}%"
         query = query.filter(Tag.name.ilike(like_expr))
 
     tags = query.order_by(Tag.name.asc()).limit(limit).all()
+    set_etag(response, etag)
     return {"items": [_serialize_tag(tag) for tag in tags]}
 
 
@@ -12,6 +12,7 @@ import logging
 from uuid import uuid4
 
 from fastapi import APIRouter, Cookie, Depends, File, Form, HTTPException, Request, Response, UploadFile, status
+from fastapi.concurrency import run_in_threadpool
 from sqlalchemy.orm import Session
 
 from shared.application.authenticated_principal import AuthenticatedPrincipal
@@ -22,6 +23,9 @@ logger = logging.getLogger(__name__)
 
 router = APIRouter(prefix="/upload", tags=["upload"])
 
+# 再開可能アップロードの本文をまとめてからスレッドプールで書き込む単位
+_RESUMABLE_WRITE_BUFFER = 1024 * 1024
+
 
 def _get_or_create_upload_session_id(
     request: Request,
@@ -171,3 +175,228 @@ async def api_upload_commit(
     if destination == "wiki":
         response_body["media"] = media_payload
     return response_body
+
+
+# ---------------------------------------------------------------------------
+# 再開可能（チャンク）アップロード
+# ---------------------------------------------------------------------------
+
+
+def _find_existing_media(db: Session, files: list[tuple[str, int | None]]) -> dict[str, int]:
+    """``(sha256, size)`` のうち取り込み済みの Media があるものを ``sha256 → media_id`` で返す。"""
+    from bounded_contexts.photonest.infrastructure.photo_models import Media
+
+    wanted = {sha: size for sha, size in files}
+    if not wanted:
+        return {}
+    rows = (
+        db.query(Media.id, Media.hash_sha256, Media.bytes)
+        .filter(Media.hash_sha256.in_(list(wanted)), Media.is_deleted.is_(False))
+        .all()
+    )
+    existing: dict[str, int] = {}
+    for media_id, sha, size in rows:
+        expected_size = wanted.get(sha)
+        if expected_size is None or size is None or int(size) == int(expected_size):
+            existing.setdefault(sha, int(media_id))
+    return existing
+
+
+def _resumable_error(exc: Exception) -> HTTPException:
+    from shared.application.resumable_upload import (
+        ResumableUploadNotFoundError,
+        UploadChecksumMismatchError,
+        UploadOffsetError,
+    )
+    from shared.application.upload_service import UnsupportedFormatError, UploadTooLargeError
+
+    if isinstance(exc, ResumableUploadNotFoundError):
+        return HTTPException(status_code=404, detail={"error": "not_found", "message": str(exc)})
+    if isinstance(exc, UploadOffsetError):
+        return HTTPException(status_code=409, detail={"error": "offset_conflict", "message": str(exc)})
+    if isinstance(exc, UploadChecksumMismatchError):
+        return HTTPException(status_code=422, detail={"error": "checksum_mismatch", "message": str(exc)})
+    if isinstance(exc, UploadTooLargeError):
+        return HTTPException(status_code=413, detail={"error": "file_too_large", "message": str(exc)})
+    if isinstance(exc, UnsupportedFormatError):
+        return HTTPException(status_code=400, detail={"error": "unsupported_format", "message": str(exc)})
+    return HTTPException(status_code=400, detail={"error": "upload_failed", "message": str(exc)})
+
+
+def _parse_sha256_entries(entries) -> list[tuple[str, int | None]]:
+    from shared.application.resumable_upload import normalize_sha256
+    from shared.application.upload_service import UploadError
+
+    parsed: list[tuple[str, int | None]] = []
+    for entry in entries or []:
+        if not isinstance(entry, dict):
+            continue
+        try:
+            sha = normalize_sha256(entry.get("sha256") or entry.get("hashSha256"))
+        except UploadError as exc:
+            raise _resumable_error(exc)
+        if sha is None:
+            continue
+        size = entry.get("size") if entry.get("size") is not None else entry.get("length")
+        parsed.append((sha, int(size) if size is not None else None))
+    return parsed
+
+
+@router.post("/resumable/check")
+async def api_upload_resumable_check(
+    body: dict,
+    principal: AuthenticatedPrincipal = Depends(get_current_principal),
+    db: Session = Depends(get_db),
+):
+    """送信前に SHA-256 を照会し、取り込み済みで送らなくてよいファイルを返す。"""
+    files = _parse_sha256_entries(body.get("files"))
+    existing = _find_existing_media(db, files)
+    return {
+        "existing": [{"sha256": sha, "mediaId": media_id} for sha, media_id in existing.items()],
+        "missing": [sha for sha, _ in files if sha not in existing],
+    }
+
+
+@router.post("/resumable", status_code=status.HTTP_201_CREATED)
+async def api_upload_resumable_create(
+    request: Request,
+    response: Response,
+    body: dict,
+    principal: AuthenticatedPrincipal = Depends(get_current_principal),
+    db: Session = Depends(get_db),
+    upload_session: str | None = Cookie(None, alias="upload_session_id"),
+):
+    """再開可能アップロードを開始する。SHA-256 が取り込み済みなら受信せずに返す。"""
+    from shared.application.resumable_upload import create_resumable_upload
+    from shared.application.upload_service import UploadError
+
+    try:
+        length = int(body.get("length") or body.get("size") or 0)
+    except (TypeError, ValueError):
+        raise HTTPException(status_code=400, detail={"error": "invalid_payload", "message": "Invalid length"})
+
+    declared = _parse_sha256_entries([{"sha256": body.get("sha256"), "size": length}])
+    if declared:
+        existing = _find_existing_media(db, declared)
+        if existing:
+            response.status_code = status.HTTP_200_OK
+            return {"status": "duplicate", "sha256": declared[0][0], "mediaId": existing[declared[0][0]]}
+
+    upload_session_id = _get_or_create_upload_session_id(request, response, upload_session)
+    try:
+        upload = await run_in_threadpool(
+            create_resumable_upload,
+            session_id=upload_session_id,
+            owner_id=int(principal.id),
+            file_name=str(body.get("fileName") or body.get("file_name") or ""),
+            length=length,
+            expected_sha256=declared[0][0] if declared else None,
+        )
+    except UploadError as exc:
+        raise _resumable_error(exc)
+
+    response.headers["Location"] = f"{request.url.path}/{upload.upload_id}"
+    response.headers["Upload-Offset"] = "0"
+    return {"status": "created", **upload.as_dict()}
+
+
+@router.api_route("/resumable/{upload_id}", methods=["GET", "HEAD"])
+async def api_upload_resumable_status(
+    upload_id: str,
+    response: Response,
+    principal: AuthenticatedPrincipal = Depends(get_current_principal),
+):
+    """受信済みのオフセットと未受信区間を返す（再開時にまず呼ぶ）。"""
+    from shared.application.resumable_upload import get_resumable_upload
+    from shared.application.upload_service import UploadError
+
+    try:
+        upload = await run_in_threadpool(get_resumable_upload, upload_id, owner_id=int(principal.id))
+    except UploadError as exc:
+        raise _resumable_error(exc)
+
+    response.headers["Upload-Offset"] = str(upload.offset)
+    response.headers["Upload-Length"] = str(upload.length)
+    response.headers["Cache-Control"] = "no-store"
+    return upload.as_dict()
+
+
+@router.patch("/resumable/{upload_id}")
+async def api_upload_resumable_patch(
+    upload_id: str,
+    request: Request,
+    response: Response,
+    principal: AuthenticatedPrincipal = Depends(get_current_principal),
+    db: Session = Depends(get_db),
+):
+    """``Upload-Offset`` の位置から本文のバイト列を書き込む。チャンクは並行送信してよい。
+
+    本文はイベントループ上で受け取り、ファイル書き込み・ハッシュ計算・完了処理は
+    スレッドプールで行う（大きなアップロードが他のリクエストを止めないように）。
+    """
+    from starlette.requests import ClientDisconnect
+
+    from shared.application.resumable_upload import open_chunk
+    from shared.application.upload_service import UploadError
+
+    raw_offset = request.headers.get("Upload-Offset")
+    if raw_offset is None or not raw_offset.isdigit():
+        raise HTTPException(
+            status_code=400,
+            detail={"error": "invalid_offset", "message": "Upload-Offset header is required"},
+        )
+
+    try:
+        writer = await run_in_threadpool(
+            open_chunk, upload_id, offset=int(raw_offset), owner_id=int(principal.id)
+        )
+    except UploadError as exc:
+        raise _resumable_error(exc)
+
+    buffer = bytearray()
+    try:
+        async for data in request.stream():
+            buffer += data
+            if len(buffer) >= _RESUMABLE_WRITE_BUFFER:
+                await run_in_threadpool(writer.write, bytes(buffer))
+                buffer.clear()
+        if buffer:
+            await run_in_threadpool(writer.write, bytes(buffer))
+    except ClientDisconnect:
+        # 切断までに届いた分は記録し、クライアントは続きから再送できる
+        if buffer:
+            await run_in_threadpool(writer.write, bytes(buffer))
+        await run_in_threadpool(writer.commit)
+        raise HTTPException(status_code=400, detail={"error": "client_disconnected"})
+    except UploadError as exc:
+        await run_in_threadpool(writer.close)
+        raise _resumable_error(exc)
+
+    try:
+        upload = await run_in_threadpool(writer.commit)
+    except UploadError as exc:
+        raise _resumable_error(exc)
+
+    response.headers["Upload-Offset"] = str(upload.offset)
+    payload = upload.as_dict()
+    if upload.temp_file_id is not None and upload.sha256:
+        existing = _find_existing_media(db, [(upload.sha256, upload.length)])
+        if upload.sha256 in existing:
+            payload["duplicateOf"] = existing[upload.sha256]
+    return payload
+
+
+@router.delete("/resumable/{upload_id}", status_code=status.HTTP_204_NO_CONTENT)
+async def api_upload_resumable_abort(
+    upload_id: str,
+    principal: AuthenticatedPrincipal = Depends(get_current_principal),
+):
+    """受信途中のアップロードを破棄する。"""
+    from shared.application.resumable_upload import abort_resumable_upload
+    from shared.application.upload_service import UploadError
+
+    try:
+        await run_in_threadpool(abort_resumable_upload, upload_id, owner_id=int(principal.id))
+    except UploadError as exc:
+        raise _resumable_error(exc)
+    return Response(status_code=status.HTTP_204_NO_CONTENT)
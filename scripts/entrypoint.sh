@@ -222,8 +222,9 @@ case "$MODE" in
 
   worker)
     wait_for_schema
-    log "Starting Celery worker"
-    exec celery -A cli.src.celery.tasks worker --loglevel=info --concurrency=2 -Q celery,picker_import
+    # CELERY_WORKER_LANE で担当キューを絞れる（interactive / bulk / io / maintenance、既定 all は全キュー）
+    log "Starting Celery worker (lane=${CELERY_WORKER_LANE:-all})"
+    exec python -m cli.src.celery.worker --lane "${CELERY_WORKER_LANE:-all}"
     ;;
 
   beat)
@@ -0,0 +1,427 @@
+"""再開可能なチャンクアップロード（tus 風のオフセット指定 PATCH）
+
+1 ファイルを任意の大きさのチャンクに分け、``Upload-Offset`` を指定して
+何度でも・並行して送れるようにする。受信済みの区間は JSON の状態ファイルに
+記録し、接続が切れてもクライアントは未受信の区間だけを送り直せばよい。
+
+SHA-256 は「先頭から連続して受信済みの範囲」をチャンク到着ごとに進めて
+計算するため、最後のチャンクが届いた時点でハッシュが確定している。
+計算途中のハッシュ状態はプロセス内にだけ保持し、別プロセス（別ワーカー）が
+続きを受けた場合は先頭から計算し直す（結果は常に正しい）。
+
+全区間が揃うと :func:`shared.application.upload_service.prepare_upload` と
+同じ形式の準備済みファイルとしてアップロードセッションへ移すため、確定は
+既存の ``/upload/commit`` で行う。
+"""
+from __future__ import annotations
+
+import hashlib
+import json
+import re
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Tuple
+from uuid import uuid4
+
+try:  # pragma: no cover - Windows 等では fcntl が無い
+    import fcntl
+except ImportError:  # pragma: no cover
+    fcntl = None  # type: ignore[assignment]
+
+from shared.application.upload_service import (
+    PreparedUpload,
+    UnsupportedFormatError,
+    UploadError,
+    UploadTooLargeError,
+    _ALLOWED_EXTENSIONS,
+    _build_analysis,
+    _detect_format,
+    _determine_session_dir,
+    _tmp_base_dir,
+)
+from shared.kernel.settings.settings import settings
+
+# クライアントへ推奨するチャンクサイズ（これより大きくても小さくても受け付ける）
+RESUMABLE_CHUNK_SIZE = 8 * 1024 * 1024
+_HASH_READ_SIZE = 1024 * 1024
+_SHA256_RE = re.compile(r"^[0-9a-f]{64}$")
+# 放置されたアップロードは新規作成時にこの秒数で掃除する
+_STALE_AFTER_SECONDS = 7 * 24 * 3600
+
+
+class ResumableUploadNotFoundError(UploadError):
+    """指定されたアップロードが存在しない（または他ユーザーのもの）場合の例外"""
+
+
+class UploadOffsetError(UploadError):
+    """チャンクのオフセットや長さがファイルの範囲外の場合の例外"""
+
+
+class UploadChecksumMismatchError(UploadError):
+    """受信したファイルのハッシュが事前申告と一致しない場合の例外"""
+
+
+@dataclass
+class ResumableUpload:
+    """再開可能アップロードの状態"""
+
+    upload_id: str
+    file_name: str
+    length: int
+    session_id: str
+    owner_id: Optional[int]
+    expected_sha256: Optional[str] = None
+    ranges: List[List[int]] = field(default_factory=list)
+    sha256: Optional[str] = None
+    temp_file_id: Optional[str] = None
+
+    @property
+    def received_bytes(self) -> int:
+        return sum(end - start for start, end in self.ranges)
+
+    @property
+    def offset(self) -> int:
+        """先頭から途切れずに受信済みのバイト数"""
+
+        if self.ranges and self.ranges[0][0] == 0:
+            return self.ranges[0][1]
+        return 0
+
+    @property
+    def complete(self) -> bool:
+        return self.offset >= self.length
+
+    def missing_ranges(self) -> List[Tuple[int, int]]:
+        missing: List[Tuple[int, int]] = []
+        cursor = 0
+        for start, end in self.ranges:
+            if start > cursor:
+                missing.append((cursor, start))
+            cursor = max(cursor, end)
+        if cursor < self.length:
+            missing.append((cursor, self.length))
+        return missing
+
+    def as_dict(self) -> dict:
+        return {
+            "uploadId": self.upload_id,
+            "fileName": self.file_name,
+            "length": self.length,
+            "offset": self.offset,
+            "receivedBytes": self.received_bytes,
+            "missingRanges": [list(r) for r in self.missing_ranges()],
+            "complete": self.temp_file_id is not None,
+            "hashSha256": self.sha256,
+            "tempFileId": self.temp_file_id,
+            "chunkSize": RESUMABLE_CHUNK_SIZE,
+        }
+
+
+def _merge_range(ranges: List[List[int]], start: int, end: int) -> List[List[int]]:
+    merged: List[List[int]] = []
+    for current in sorted(ranges + [[start, end]]):
+        if merged and current[0] <= merged[-1][1]:
+            merged[-1][1] = max(merged[-1][1], current[1])
+        else:
+            merged.append(list(current))
+    return merged
+
+
+# ---------------------------------------------------------------------------
+# 状態ファイル
+# ---------------------------------------------------------------------------
+
+
+def _max_resumable_size() -> int:
+    return settings.upload_resumable_max_size
+
+
+def _resumable_dir() -> Path:
+    directory = _tmp_base_dir() / "_resumable"
+    directory.mkdir(parents=True, exist_ok=True)
+    return directory
+
+
+def _paths(upload_id: str) -> Tuple[Path, Path, Path]:
+    if not re.fullmatch(r"[0-9a-f]{32}", upload_id or ""):
+        raise ResumableUploadNotFoundError("Upload not found")
+    base = _resumable_dir()
+    return base / f"{upload_id}.part", base / f"{upload_id}.json", base / f"{upload_id}.lock"
+
+
+@contextmanager
+def _locked(upload_id: str) -> Iterator[None]:
+    """同一アップロードの状態更新をプロセス間で直列化する"""
+
+    _, _, lock_path = _paths(upload_id)
+    with lock_path.open("a+") as handle:
+        if fcntl is not None:
+            fcntl.flock(handle.fileno(), fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            if fcntl is not None:
+                fcntl.flock(handle.fileno(), fcntl.LOCK_UN)
+
+
+def _load(upload_id: str) -> ResumableUpload:
+    _, state_path, _ = _paths(upload_id)
+    try:
+        data = json.loads(state_path.read_text(encoding="utf-8"))
+    except FileNotFoundError:
+        raise ResumableUploadNotFoundError("Upload not found") from None
+    return ResumableUpload(**data)
+
+
+def _save(state: ResumableUpload) -> None:
+    _, state_path, _ = _paths(state.upload_id)
+    tmp_path = state_path.with_suffix(".json.tmp")
+    tmp_path.write_text(json.dumps(asdict(state), ensure_ascii=False), encoding="utf-8")
+    tmp_path.replace(state_path)
+
+
+def _discard_files(upload_id: str) -> None:
+    for path in _paths(upload_id):
+        path.unlink(missing_ok=True)
+
+
+# ---------------------------------------------------------------------------
+# 逐次 SHA-256
+# ---------------------------------------------------------------------------
+
+_hashers: Dict[str, Tuple[int, "hashlib._Hash"]] = {}
+_hashers_lock = threading.Lock()
+
+
+def _advance_hash(state: ResumableUpload, part_path: Path) -> Optional[str]:
+    """連続受信済みの範囲までハッシュを進め、全体が揃えば16進ダイジェストを返す"""
+
+    frontier = min(state.offset, state.length)
+    with _hashers_lock:
+        hashed, hasher = _hashers.pop(state.upload_id, (0, hashlib.sha256()))
+
+    if hashed < frontier:
+        with part_path.open("rb") as fh:
+            fh.seek(hashed)
+            remaining = frontier - hashed
+            while remaining > 0:
+                chunk = fh.read(min(_HASH_READ_SIZE, remaining))
+                if not chunk:
+                    break
+                hasher.update(chunk)
+                remaining -= len(chunk)
+                hashed += len(chunk)
+
+    if hashed >= state.length:
+        return hasher.hexdigest()
+
+    with _hashers_lock:
+        current = _hashers.get(state.upload_id)
+        if current is None or current[0] < hashed:
+            _hashers[state.upload_id] = (hashed, hasher)
+    return None
+
+
+def _forget_hash(upload_id: str) -> None:
+    with _hashers_lock:
+        _hashers.pop(upload_id, None)
+
+
+# ---------------------------------------------------------------------------
+# 公開 API
+# ---------------------------------------------------------------------------
+
+
+def normalize_sha256(value: Optional[str]) -> Optional[str]:
+    if value is None or value == "":
+        return None
+    normalized = str(value).strip().lower()
+    if not _SHA256_RE.match(normalized):
+        raise UploadError("Invalid SHA-256 digest")
+    return normalized
+
+
+def create_resumable_upload(
+    *,
+    session_id: str,
+    owner_id: Optional[int],
+    file_name: str,
+    length: int,
+    expected_sha256: Optional[str] = None,
+) -> ResumableUpload:
+    """受信領域を確保して新しいアップロードを開始する"""
+
+    original_name = Path(file_name or "").name
+    if not original_name:
+        raise UploadError("No file name given")
+    if (Path(original_name).suffix or "").lower() not in _ALLOWED_EXTENSIONS:
+        raise UnsupportedFormatError("Unsupported file format")
+    if length <= 0:
+        raise UploadError("Upload length must be positive")
+    if length > _max_resumable_size():
+        raise UploadTooLargeError("File exceeds the allowed size limit")
+
+    state = ResumableUpload(
+        upload_id=uuid4().hex,
+        file_name=original_name,
+        length=int(length),
+        session_id=session_id,
+        owner_id=owner_id,
+        expected_sha256=normalize_sha256(expected_sha256),
+    )
+    purge_stale_resumable_uploads()
+    part_path, _, _ = _paths(state.upload_id)
+    with part_path.open("wb") as fh:
+        # 並行するチャンクが任意の位置へ書けるよう、最終サイズのスパースファイルにしておく
+        fh.truncate(state.length)
+    _save(state)
+    return state
+
+
+def get_resumable_upload(upload_id: str, *, owner_id: Optional[int]) -> ResumableUpload:
+    state = _load(upload_id)
+    if state.owner_id != owner_id:
+        raise ResumableUploadNotFoundError("Upload not found")
+    return state
+
+
+class ChunkWriter:
+    """1 回の PATCH で届くチャンクを受信ファイルの所定位置へ書き込む"""
+
+    def __init__(self, state: ResumableUpload, offset: int) -> None:
+        if offset < 0 or offset >= state.length:
+            raise UploadOffsetError("Upload-Offset is out of range")
+        self._state = state
+        self._start = offset
+        self._position = offset
+        part_path, _, _ = _paths(state.upload_id)
+        self._part_path = part_path
+        self._handle = part_path.open("r+b")
+        self._handle.seek(offset)
+
+    def write(self, data: bytes) -> None:
+        if not data:
+            return
+        if self._position + len(data) > self._state.length:
+            raise UploadOffsetError("Chunk exceeds the declared upload length")
+        self._handle.write(data)
+        self._position += len(data)
+
+    def close(self) -> None:
+        self._handle.close()
+
+    def commit(self) -> ResumableUpload:
+        """書き込んだ区間を記録し、全区間が揃っていれば準備済みファイルへ移す"""
+
+        self._handle.flush()
+        self._handle.close()
+        upload_id = self._state.upload_id
+        with _locked(upload_id):
+            state = _load(upload_id)
+            if self._position > self._start:
+                state.ranges = _merge_range(state.ranges, self._start, self._position)
+                _save(state)
+            if state.temp_file_id is None and state.complete:
+                return self._complete(state)
+
+        if not state.complete:
+            _advance_hash(state, self._part_path)
+        return state
+
+    def _complete(self, state: ResumableUpload) -> ResumableUpload:
+        digest = _advance_hash(state, self._part_path)
+        if digest is None:  # pragma: no cover - 全区間が揃っていれば必ず確定する
+            raise UploadError("Failed to compute upload digest")
+        state.sha256 = digest
+        if state.expected_sha256 and state.expected_sha256 != digest:
+            _forget_hash(state.upload_id)
+            _discard_files(state.upload_id)
+            raise UploadChecksumMismatchError(
+                "Uploaded content does not match the declared SHA-256"
+            )
+        prepared = _finalize(state, self._part_path)
+        state.temp_file_id = prepared.temp_file_id
+        _save(state)
+        return state
+
+
+def open_chunk(upload_id: str, *, offset: int, owner_id: Optional[int]) -> ChunkWriter:
+    state = get_resumable_upload(upload_id, owner_id=owner_id)
+    if state.temp_file_id is not None:
+        raise UploadOffsetError("Upload is already complete")
+    return ChunkWriter(state, offset)
+
+
+def _finalize(state: ResumableUpload, part_path: Path) -> PreparedUpload:
+    """受信完了ファイルを ``prepare_upload`` と同じ形式でアップロードセッションへ移す"""
+
+    session_dir = _determine_session_dir(state.session_id)
+    temp_file_id = uuid4().hex
+    temp_path = session_dir / temp_file_id
+    part_path.replace(temp_path)
+    _forget_hash(state.upload_id)
+
+    analysis_result = _build_analysis(temp_path, state.file_name)
+    analysis_result.setdefault("format", _detect_format(state.file_name))
+    metadata = {
+        "temp_file_id": temp_file_id,
+        "file_name": state.file_name,
+        "file_size": state.length,
+        "status": "analyzed",
+        "analysis_result": analysis_result,
+        "hash_sha256": state.sha256,
+    }
+    (session_dir / f"{temp_file_id}.json").write_text(
+        json.dumps(metadata, ensure_ascii=False), encoding="utf-8"
+    )
+    return PreparedUpload(
+        temp_file_id=temp_file_id,
+        file_name=state.file_name,
+        file_size=state.length,
+        status="analyzed",
+        analysis_result=analysis_result,
+    )
+
+
+def abort_resumable_upload(upload_id: str, *, owner_id: Optional[int]) -> None:
+    get_resumable_upload(upload_id, owner_id=owner_id)
+    with _locked(upload_id):
+        _forget_hash(upload_id)
+        _discard_files(upload_id)
+
+
+def purge_stale_resumable_uploads(max_age_seconds: int = _STALE_AFTER_SECONDS) -> int:
+    """最終更新から *max_age_seconds* 以上経過したアップロードを削除し、件数を返す"""
+
+    cutoff = time.time() - max_age_seconds
+    purged = 0
+    for state_path in _resumable_dir().glob("*.json"):
+        try:
+            if state_path.stat().st_mtime >= cutoff:
+                continue
+        except FileNotFoundError:
+            continue
+        upload_id = state_path.stem
+        _forget_hash(upload_id)
+        _discard_files(upload_id)
+        purged += 1
+    return purged
+
+
+__all__ = [
+    "RESUMABLE_CHUNK_SIZE",
+    "ChunkWriter",
+    "ResumableUpload",
+    "ResumableUploadNotFoundError",
+    "UploadChecksumMismatchError",
+    "UploadOffsetError",
+    "abort_resumable_upload",
+    "create_resumable_upload",
+    "get_resumable_upload",
+    "normalize_sha256",
+    "open_chunk",
+    "purge_stale_resumable_uploads",
+]
@@ -6,6 +6,13 @@ from sqlalchemy import delete, select
 
 from shared.kernel.database.db import db
 from shared.kernel.logging.logging_config import setup_task_logging
+from shared.infrastructure.log_partitions import (
+    LOG_PARTITION_TABLES,
+    add_future_partitions,
+    drop_partitions_before,
+    range_partitions,
+)
+from shared.infrastructure.log_search import SEARCH_TABLES, delete_search_rows_before
 from shared.infrastructure.models.job_sync import JobSync
 from shared.infrastructure.models.log import Log
 from bounded_contexts.picker_import.infrastructure.picker_session import PickerSession
@@ -15,18 +22,28 @@ logger = setup_task_logging(__name__)
 
 
 def cleanup_old_logs(*, retention_days: int = 365) -> dict[str, object]:
-    """Physically delete log records older than the retention window."""
+    """Physically delete log records older than the retention window.
+
+    Partitioned log tables (MySQL / MariaDB) drop whole expired monthly
+    partitions instead of deleting rows; the partition holding the cutoff is
+    kept until it expires entirely. The non-partitioned full-text search
+    tables (``log_search`` / ``worker_log_search``) are trimmed to the same
+    cutoff in committed batches.
+    """
     cutoff = datetime.now(timezone.utc) - timedelta(days=retention_days)
     deleted_counts: dict[str, int] = {"log": 0, "worker_log": 0, "picker_session": 0}
+    for search in SEARCH_TABLES.values():
+        deleted_counts[search.name] = 0
+    dropped_partitions: dict[str, list[str]] = {}
 
     try:
-        log_stmt = delete(Log).where(Log.created_at < cutoff)
-        log_result = db.session.execute(log_stmt)
-        deleted_counts["log"] = int(log_result.rowcount or 0)
-
-        worker_stmt = delete(WorkerLog).where(WorkerLog.created_at < cutoff)
-        worker_result = db.session.execute(worker_stmt)
-        deleted_counts["worker_log"] = int(worker_result.rowcount or 0)
+        for model in (Log, WorkerLog):
+            table = model.__tablename__
+            if range_partitions(db.session, table):
+                dropped_partitions[table] = drop_partitions_before(db.session, table, cutoff)
+                continue
+            result = db.session.execute(delete(model).where(model.created_at < cutoff))
+            deleted_counts[table] = int(result.rowcount or 0)
 
         job_sync_exists = (
             select(JobSync.id)
@@ -44,12 +61,16 @@ def cleanup_old_logs(*, retention_days: int = 365) -> dict[str, object]:
 
         db.session.commit()
 
+        for table, search in SEARCH_TABLES.items():
+            deleted_counts[search.name] = delete_search_rows_before(db.session, table, cutoff)
+
         logger.info(
             "Old log cleanup completed",
             extra={
                 "event": "logs.cleanup",
                 "cutoff": cutoff.isoformat(),
                 "deleted_counts": deleted_counts,
+                "dropped_partitions": dropped_partitions,
                 "retention_days": retention_days,
             },
         )
@@ -57,6 +78,7 @@ def cleanup_old_logs(*, retention_days: int = 365) -> dict[str, object]:
         return {
             "ok": True,
             "deleted": deleted_counts,
+            "dropped_partitions": dropped_partitions,
             "cutoff": cutoff.isoformat(),
             "retention_days": retention_days,
         }
@@ -72,3 +94,42 @@ def cleanup_old_logs(*, retention_days: int = 365) -> dict[str, object]:
             exc_info=True,
         )
         return {"ok": False, "error": str(exc), "retention_days": retention_days}
+
+
+def maintain_log_partitions(*, months_ahead: int = 3) -> dict[str, object]:
+    """Pre-create monthly log partitions up to *months_ahead* months ahead.
+
+    New partitions are split off the empty ``p_future`` partition so that
+    inserts never land in the catch-all partition. Tables that are not
+    partitioned (SQLite, unconverted databases) are skipped.
+    """
+    today = datetime.now(timezone.utc).date()
+    created: dict[str, list[str]] = {}
+
+    try:
+        for table in LOG_PARTITION_TABLES:
+            if range_partitions(db.session, table):
+                created[table] = add_future_partitions(
+                    db.session, table, today=today, months_ahead=months_ahead
+                )
+        db.session.commit()
+    except Exception as exc:  # pragma: no cover - defensive logging path
+        db.session.rollback()
+        logger.error(
+            "Log partition maintenance failed",
+            extra={"event": "logs.partition_maintenance.error", "months_ahead": months_ahead},
+            exc_info=True,
+        )
+        return {"ok": False, "error": str(exc), "months_ahead": months_ahead}
+
+    result = {
+        "ok": True,
+        "partitioned": sorted(created),
+        "partitions_created": created,
+        "months_ahead": months_ahead,
+    }
+    logger.info(
+        "Log partition maintenance completed",
+        extra={"event": "logs.partition_maintenance", **result},
+    )
+    return result
@@ -2,7 +2,6 @@
 from __future__ import annotations
 
 import filecmp
-import hashlib
 import json
 import shutil
 from dataclasses import dataclass
@@ -14,6 +13,7 @@ import logging
 from werkzeug.datastructures import FileStorage
 
 from shared.kernel.settings.system_settings_defaults import DEFAULT_APPLICATION_SETTINGS
+from shared.kernel.file_hash import sha256_file
 from shared.kernel.settings.settings import settings
 from bounded_contexts.storage import StorageDomain
 
@@ -263,11 +263,7 @@ def _delete_metadata(session_dir: Path, temp_file_id: str) -> None:
 
 
 def _calculate_sha256(path: Path) -> str:
-    sha256 = hashlib.sha256()
-    with path.open("rb") as fh:
-        for chunk in iter(lambda: fh.read(1024 * 1024), b""):
-            sha256.update(chunk)
-    return sha256.hexdigest()
+    return sha256_file(path)
 
 
 def _files_identical(path_a: Path, path_b: Path) -> bool:
@@ -277,9 +273,15 @@ def _files_identical(path_a: Path, path_b: Path) -> bool:
         return False
 
 
-def _generate_hashed_destination(dest_dir: Path, temp_path: Path, filename: str) -> tuple[Path, str, bool]:
+def _generate_hashed_destination(
+    dest_dir: Path,
+    temp_path: Path,
+    filename: str,
+    file_hash: Optional[str] = None,
+) -> tuple[Path, str, bool]:
     suffix = (Path(filename).suffix or "").lower()
-    file_hash = _calculate_sha256(temp_path)
+    # 再開可能アップロードは受信中に計算済みのハッシュをメタデータに持つ
+    file_hash = file_hash or _calculate_sha256(temp_path)
     candidate = dest_dir / f"{file_hash}{suffix}"
 
     if candidate.exists():
@@ -454,7 +456,10 @@ def _commit_prepared_files(
             continue
 
         destination_path, file_hash, already_exists = _generate_hashed_destination(
-            destination_dir, temp_path, metadata.get("file_name", "uploaded")
+            destination_dir,
+            temp_path,
+            metadata.get("file_name", "uploaded"),
+            metadata.get("hash_sha256"),
         )
 
         if already_exists:
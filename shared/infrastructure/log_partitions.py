@@ -0,0 +1,142 @@
+"""``log`` / ``worker_log`` の月次 RANGE パーティション操作（MySQL / MariaDB）.
+
+両テーブルは ``PARTITION BY RANGE (TO_DAYS(created_at))`` で月ごとに分割し、
+末尾に ``MAXVALUE`` の ``p_future`` を置く（マイグレーション
+``d4a9e2b7c615``）。保持期間の削除は期限切れの月を ``DROP PARTITION`` で
+丸ごと捨て、翌月以降の区画は ``p_future`` を ``REORGANIZE`` して事前に作る
+（``p_future`` が空のうちは行のコピーは発生しない）。
+
+パーティションの無い DB（SQLite・変換前の MySQL）では各関数は何もしない。
+"""
+from __future__ import annotations
+
+from datetime import date, datetime
+from typing import Any, Optional
+
+from sqlalchemy import text
+
+LOG_PARTITION_TABLES = ("log", "worker_log")
+
+FUTURE_PARTITION = "p_future"
+
+_PARTITION_DIALECTS = ("mysql", "mariadb")
+
+# MySQL の TO_DAYS() と date.toordinal() の差（TO_DAYS('0001-01-01') = 366）
+_TO_DAYS_OFFSET = 365
+
+
+def month_start(value: date) -> date:
+    return date(value.year, value.month, 1)
+
+
+def next_month(value: date) -> date:
+    if value.month == 12:
+        return date(value.year + 1, 1, 1)
+    return date(value.year, value.month + 1, 1)
+
+
+def partition_name(month: date) -> str:
+    return f"p{month:%Y%m}"
+
+
+def partition_definition(month: date) -> str:
+    """*month* の1か月分を収める区画の定義（上限は翌月1日の TO_DAYS）."""
+
+    return (
+        f"PARTITION {partition_name(month)} "
+        f"VALUES LESS THAN (TO_DAYS('{next_month(month):%Y-%m-%d}'))"
+    )
+
+
+def supports_partitioning(session: Any) -> bool:
+    bind = session.get_bind()
+    return bind.dialect.name in _PARTITION_DIALECTS
+
+
+def range_partitions(session: Any, table: str) -> list[tuple[str, Optional[date]]]:
+    """*table* の区画を ``(名前, 上限日)`` の昇順で返す（``MAXVALUE`` は ``None``）.
+
+    パーティション化されていなければ空リスト。
+    """
+
+    if not supports_partitioning(session):
+        return []
+    rows = session.execute(
+        text(
+            "SELECT PARTITION_NAME, PARTITION_DESCRIPTION "
+            "FROM information_schema.PARTITIONS "
+            "WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = :table "
+            "AND PARTITION_NAME IS NOT NULL "
+            "ORDER BY PARTITION_ORDINAL_POSITION"
+        ),
+        {"table": table},
+    ).all()
+    partitions: list[tuple[str, Optional[date]]] = []
+    for name, description in rows:
+        if str(description).upper() == "MAXVALUE":
+            partitions.append((name, None))
+        else:
+            partitions.append((name, date.fromordinal(int(description) - _TO_DAYS_OFFSET)))
+    return partitions
+
+
+def add_future_partitions(
+    session: Any, table: str, *, today: date, months_ahead: int
+) -> list[str]:
+    """*today* の月から *months_ahead* か月先までの区画を作り、作った区画名を返す."""
+
+    partitions = range_partitions(session, table)
+    if not partitions or partitions[-1][1] is not None:
+        return []
+    bounded = [upper for _name, upper in partitions if upper is not None]
+    # 既存の最後の区画の翌月（区画が1つも無ければ今月）から作る
+    month = bounded[-1] if bounded else month_start(today)
+    last_month = month_start(today)
+    for _ in range(max(0, months_ahead)):
+        last_month = next_month(last_month)
+
+    months: list[date] = []
+    while month <= last_month:
+        months.append(month)
+        month = next_month(month)
+    if not months:
+        return []
+
+    definitions = ", ".join(partition_definition(m) for m in months)
+    session.execute(
+        text(
+            f"ALTER TABLE {table} REORGANIZE PARTITION {FUTURE_PARTITION} INTO "
+            f"({definitions}, PARTITION {FUTURE_PARTITION} VALUES LESS THAN MAXVALUE)"
+        )
+    )
+    return [partition_name(m) for m in months]
+
+
+def drop_partitions_before(session: Any, table: str, cutoff: datetime) -> list[str]:
+    """上限が *cutoff* 以前の区画（全行が期限切れ）を落とし、落とした区画名を返す.
+
+    *cutoff* を含む月の区画は残す（保持期間は最大1か月長くなる）。
+    """
+
+    expired = [
+        name
+        for name, upper in range_partitions(session, table)
+        if upper is not None and upper <= cutoff.date()
+    ]
+    if expired:
+        session.execute(text(f"ALTER TABLE {table} DROP PARTITION {', '.join(expired)}"))
+    return expired
+
+
+__all__ = [
+    "FUTURE_PARTITION",
+    "LOG_PARTITION_TABLES",
+    "add_future_partitions",
+    "drop_partitions_before",
+    "month_start",
+    "next_month",
+    "partition_definition",
+    "partition_name",
+    "range_partitions",
+    "supports_partitioning",
+]
@@ -0,0 +1,131 @@
+"""``log`` / ``worker_log`` の本文検索用サイドカーテーブル（MySQL / MariaDB）.
+
+ログテーブルは月次 RANGE パーティションに分割しており（``log_partitions``）、
+パーティション化した InnoDB テーブルは FULLTEXT インデックスを持てない。
+そのため検索対象の列だけを写した非パーティションの ``log_search`` /
+``worker_log_search`` を置き、FULLTEXT インデックスはそちらに持たせる
+（マイグレーション ``c81d4e6a2f93``）。
+
+- 主キーは ``(created_at, id)``。元テーブルとは ``id`` と ``created_at`` で結合し、
+  保持期間の削除は主キーの範囲で行う（``delete_search_rows_before``）。
+- 行は ``DBLogHandler`` が元テーブルへの INSERT と同じトランザクションで書く。
+
+サイドカーは SQLite に作らないため、モデルのメタデータには登録しない
+（``migrations/env.py`` の自動生成でも比較対象から外す）。サイドカーの無い DB
+では ``search_table`` が ``None`` を返し、検索は部分一致になる。
+"""
+from __future__ import annotations
+
+from typing import Any, Optional
+
+from sqlalchemy import (
+    BigInteger,
+    Column,
+    DateTime,
+    Index,
+    Integer,
+    MetaData,
+    String,
+    Table,
+    Text,
+    delete,
+    inspect,
+)
+from sqlalchemy.engine import Engine
+
+_SEARCH_DIALECTS = ("mysql", "mariadb")
+
+# 1回の DELETE で消すサイドカーの行数（長いロック・undo の肥大を避ける）
+DELETE_BATCH = 10000
+
+_metadata = MetaData()
+
+log_search = Table(
+    "log_search",
+    _metadata,
+    Column("created_at", DateTime, primary_key=True),
+    Column("id", Integer, primary_key=True, autoincrement=False),
+    Column("event", String(50), nullable=False),
+    Column("message", Text, nullable=False),
+    Column("path", String(255), nullable=True),
+    Index("ft_log_search", "event", "message", "path", mysql_prefix="FULLTEXT"),
+)
+
+worker_log_search = Table(
+    "worker_log_search",
+    _metadata,
+    Column("created_at", DateTime, primary_key=True),
+    Column("id", BigInteger, primary_key=True, autoincrement=False),
+    Column("event", String(50), nullable=False),
+    Column("message", Text, nullable=False),
+    Column("task_name", String(255), nullable=True),
+    Index("ft_worker_log_search", "event", "message", "task_name", mysql_prefix="FULLTEXT"),
+)
+
+# 元テーブル名 → サイドカー
+SEARCH_TABLES = {"log": log_search, "worker_log": worker_log_search}
+
+# サイドカーが使えるか（エンジン・元テーブルごとにキャッシュ）
+_available: dict[tuple[int, str], bool] = {}
+
+
+def _fulltext_index(search: Table) -> str:
+    return next(iter(search.indexes)).name
+
+
+def search_table(bind: Any, table: str) -> Optional[Table]:
+    """*table* の FULLTEXT 付きサイドカーを返す（無い DB では ``None``）."""
+
+    engine = getattr(bind, "engine", bind)
+    if not isinstance(engine, Engine) or engine.dialect.name not in _SEARCH_DIALECTS:
+        return None
+    search = SEARCH_TABLES[table]
+    key = (id(engine), table)
+    if key not in _available:
+        inspector = inspect(engine)
+        _available[key] = inspector.has_table(search.name) and _fulltext_index(search) in {
+            index["name"] for index in inspector.get_indexes(search.name)
+        }
+    return search if _available[key] else None
+
+
+def search_values(search: Table, row_id: int, values: dict[str, Any]) -> dict[str, Any]:
+    """元テーブルへの INSERT の値から、サイドカーの行を作る."""
+
+    row = {column.name: values.get(column.name) for column in search.columns}
+    row["id"] = row_id
+    return row
+
+
+def delete_search_rows_before(session: Any, table: str, cutoff) -> int:
+    """*cutoff* より古いサイドカーの行を ``DELETE_BATCH`` 件ずつ消し、件数を返す.
+
+    バッチごとにコミットする。サイドカーの無い DB では何もしない。
+    """
+
+    search = search_table(session.get_bind(), table)
+    if search is None:
+        return 0
+    deleted = 0
+    while True:
+        result = session.execute(
+            delete(search)
+            .where(search.c.created_at < cutoff)
+            .with_dialect_options(mysql_limit=DELETE_BATCH)
+        )
+        session.commit()
+        count = int(result.rowcount or 0)
+        deleted += count
+        if count < DELETE_BATCH:
+            return deleted
+
+
+__all__ = [
+    "DELETE_BATCH",
+    "SEARCH_TABLES",
+    "delete_search_rows_before",
+    "log_search",
+    "search_table",
+    "search_values",
+    "worker_log_search",
+]
@@ -8,6 +8,15 @@ from sqlalchemy.orm import Mapped, mapped_column
 
 class Log(db.Model):
     __tablename__ = "log"
+    # MySQL / MariaDB では created_at の月次 RANGE パーティションに分割し、主キーは
+    # (id, created_at)（マイグレーション d4a9e2b7c615、区画の操作は
+    # shared/infrastructure/log_partitions.py）。パーティション化したテーブルは
+    # FULLTEXT を持てないため、本文検索はサイドカーの log_search（log_search.py）で引く。
+    # いずれも SQLite には無いため宣言しない。
+    __table_args__ = (
+        db.Index("ix_log_created_at_id", "created_at", "id"),
+        db.Index("ix_log_event", "event"),
+    )
 
     id: Mapped[int] = mapped_column(db.Integer, primary_key=True)
     level: Mapped[str] = mapped_column(db.String(50), nullable=False)
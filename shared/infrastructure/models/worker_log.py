@@ -12,7 +12,13 @@ BigInt = db.BigInteger().with_variant(db.Integer, "sqlite")
 
 class WorkerLog(db.Model):
     __tablename__ = "worker_log"
+    # MySQL / MariaDB では created_at の月次 RANGE パーティションに分割し、主キーは
+    # (id, created_at)（マイグレーション d4a9e2b7c615、区画の操作は
+    # shared/infrastructure/log_partitions.py）。パーティション化したテーブルは
+    # FULLTEXT を持てないため、本文検索はサイドカーの worker_log_search（log_search.py）で引く。
+    # いずれも SQLite には無いため宣言しない。
     __table_args__ = (
+        db.Index("ix_worker_log_created_at_id", "created_at", "id"),
         db.Index("ix_worker_log_event", "event"),
         db.Index("ix_worker_log_file_task_id", "file_task_id"),
         db.Index(
@@ -0,0 +1,85 @@
+"""``REDIS_URL`` への同期クライアントを遅延接続で共有する。
+
+ライブラリ変更カウンタ（``library_version``）やセッション進捗配信
+（``session_progress``）のように、Redis を「あれば使う」補助機能向け。
+
+* 初回利用時に接続し、``REDIS_URL`` が変わったら作り直す。
+* 未設定なら ``None`` を返し、呼び出し側は Redis 無しの動作に戻る。
+* 操作に失敗したら ``mark_unavailable`` で一定時間 ``None`` を返し、障害中の
+  Redis に毎回タイムアウトまで待たされないようにする（サーキットブレーカ）。
+"""
+from __future__ import annotations
+
+import logging
+import threading
+import time
+from typing import Any, Callable, Optional
+
+from shared.kernel.settings.settings import settings
+
+logger = logging.getLogger(__name__)
+
+# Redis 障害時に再接続を試みるまでの待機時間（秒）。
+RETRY_AFTER_FAILURE_SECONDS = 30.0
+# 接続・操作のタイムアウト（秒）。
+SOCKET_TIMEOUT_SECONDS = 2
+
+
+class LazyRedisClient:
+    """遅延接続とサーキットブレーカ付きの同期 Redis クライアント。
+
+    *unavailable_message* と *event* は障害時の警告ログに使う。*on_connect* は
+    接続（再接続）のたびにクライアントを受け取る（Lua スクリプトの登録など）。
+    """
+
+    def __init__(
+        self,
+        unavailable_message: str,
+        *,
+        event: str,
+        on_connect: Optional[Callable[[Any], None]] = None,
+        retry_after: float = RETRY_AFTER_FAILURE_SECONDS,
+    ) -> None:
+        self._unavailable_message = unavailable_message
+        self._event = event
+        self._on_connect = on_connect
+        self._retry_after = retry_after
+        self._lock = threading.Lock()
+        self._client: Any = None
+        self._client_url: Optional[str] = None
+        self._disabled_until = 0.0
+
+    def client(self) -> Any:
+        """クライアントを返す。未設定・障害中は ``None``。"""
+
+        redis_url = settings.redis_url
+        if not redis_url or time.monotonic() < self._disabled_until:
+            return None
+        with self._lock:
+            if self._client is None or self._client_url != redis_url:
+                import redis
+
+                client = redis.from_url(
+                    redis_url,
+                    socket_timeout=SOCKET_TIMEOUT_SECONDS,
+                    socket_connect_timeout=SOCKET_TIMEOUT_SECONDS,
+                )
+                if self._on_connect is not None:
+                    self._on_connect(client)
+                self._client = client
+                self._client_url = redis_url
+            return self._client
+
+    def mark_unavailable(self, exc: Exception) -> None:
+        """*exc* で失敗したことを記録し、``retry_after`` 秒クライアントを止める。"""
+
+        self._disabled_until = time.monotonic() + self._retry_after
+        logger.warning(
+            "%s: %s",
+            self._unavailable_message,
+            exc,
+            extra={"event": self._event},
+        )
+
+
+__all__ = ["LazyRedisClient", "RETRY_AFTER_FAILURE_SECONDS"]
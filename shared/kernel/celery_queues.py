@@ -0,0 +1,187 @@
+"""Declarative Celery queue topology: worker lanes, task routing and priorities.
+
+Tasks are routed by name onto a small set of queues so that short interactive
+work (thumbnail regeneration triggered from the UI) is never stuck behind a
+long ``local_import.run`` or an ffmpeg transcode. Each queue belongs to a
+*lane* that describes how a worker consuming it should be started
+(prefetch, concurrency) and whether its tasks acknowledge late.
+
+A single worker started with the ``all`` lane consumes every queue, which
+keeps small deployments working with one container.
+"""
+from __future__ import annotations
+
+from dataclasses import dataclass
+from enum import IntEnum
+from typing import Dict, List, Mapping, Optional, Tuple
+
+DEFAULT_QUEUE = "celery"
+QUEUE_INTERACTIVE = "interactive"
+QUEUE_BULK = "bulk"
+QUEUE_IO = "io"
+QUEUE_MAINTENANCE = "maintenance"
+# Queue name used by older deployments (``-Q celery,picker_import``).
+LEGACY_PICKER_QUEUE = "picker_import"
+
+
+class TaskPriority(IntEnum):
+    """Message priority for the Redis transport (lower values are served first)."""
+
+    HIGH = 0
+    NORMAL = 3
+    LOW = 6
+
+
+PRIORITY_STEPS: Tuple[int, ...] = (0, 3, 6, 9)
+
+
+@dataclass(frozen=True)
+class WorkerLane:
+    """How a worker specialised for a group of queues should run."""
+
+    name: str
+    queues: Tuple[str, ...]
+    prefetch_multiplier: int
+    acks_late: bool
+    concurrency: int
+    max_tasks_per_child: Optional[int] = None
+
+    def worker_argv(
+        self,
+        *,
+        concurrency: Optional[int] = None,
+        loglevel: str = "info",
+    ) -> List[str]:
+        """Return ``celery worker`` arguments that start this lane."""
+
+        argv = [
+            "worker",
+            f"--loglevel={loglevel}",
+            "--queues",
+            ",".join(self.queues),
+            "--prefetch-multiplier",
+            str(self.prefetch_multiplier),
+            "--concurrency",
+            str(concurrency or self.concurrency),
+            "--hostname",
+            f"{self.name}@%h",
+        ]
+        if self.max_tasks_per_child:
+            argv += ["--max-tasks-per-child", str(self.max_tasks_per_child)]
+        return argv
+
+
+WORKER_LANES: Mapping[str, WorkerLane] = {
+    # UI-triggered, short and idempotent: never prefetch behind a running task.
+    QUEUE_INTERACTIVE: WorkerLane(
+        name=QUEUE_INTERACTIVE,
+        queues=(QUEUE_INTERACTIVE,),
+        prefetch_multiplier=1,
+        acks_late=True,
+        concurrency=2,
+    ),
+    # Long CPU-bound jobs (imports, transcodes). Early ack: with Redis an
+    # unacked message is redelivered after the visibility timeout, which a
+    # multi-hour import would exceed and then run twice.
+    QUEUE_BULK: WorkerLane(
+        name=QUEUE_BULK,
+        queues=(QUEUE_BULK,),
+        prefetch_multiplier=1,
+        acks_late=False,
+        concurrency=1,
+        max_tasks_per_child=20,
+    ),
+    # Network-bound downloads: threads mostly wait, so prefetch a few.
+    QUEUE_IO: WorkerLane(
+        name=QUEUE_IO,
+        queues=(QUEUE_IO,),
+        prefetch_multiplier=4,
+        acks_late=True,
+        concurrency=4,
+    ),
+    QUEUE_MAINTENANCE: WorkerLane(
+        name=QUEUE_MAINTENANCE,
+        queues=(QUEUE_MAINTENANCE, DEFAULT_QUEUE, LEGACY_PICKER_QUEUE),
+        prefetch_multiplier=1,
+        acks_late=True,
+        concurrency=1,
+    ),
+    "all": WorkerLane(
+        name="all",
+        queues=(
+            QUEUE_INTERACTIVE,
+            QUEUE_IO,
+            QUEUE_BULK,
+            QUEUE_MAINTENANCE,
+            DEFAULT_QUEUE,
+            LEGACY_PICKER_QUEUE,
+        ),
+        prefetch_multiplier=1,
+        acks_late=False,
+        concurrency=2,
+    ),
+}
+
+TASK_QUEUES: Mapping[str, str] = {
+    "thumbs.generate": QUEUE_INTERACTIVE,
+    "local_import.run": QUEUE_BULK,
+    "picker_import.item": QUEUE_IO,
+    # Deletes requested from the UI: keep them off the single maintenance slot.
+    "media_files.delete_pending": QUEUE_IO,
+    "thumbs.manifest_backfill": QUEUE_BULK,
+    "thumbs.blurhash_backfill": QUEUE_BULK,
+    "cli.src.celery.tasks.download_file": QUEUE_IO,
+    "picker_import.watchdog": QUEUE_MAINTENANCE,
+    "picker_session.advance": QUEUE_MAINTENANCE,
+    "session_recovery.cleanup_stale_sessions": QUEUE_MAINTENANCE,
+    "session_recovery.force_cleanup_all": QUEUE_MAINTENANCE,
+    "session_recovery.status_report": QUEUE_MAINTENANCE,
+    "thumbnail_retry.process_due": QUEUE_MAINTENANCE,
+    "thumbs.pack_compact": QUEUE_MAINTENANCE,
+    "albums.repair_stats": QUEUE_MAINTENANCE,
+    "logs.cleanup": QUEUE_MAINTENANCE,
+    "logs.partition_maintenance": QUEUE_MAINTENANCE,
+    "backup_cleanup.cleanup": QUEUE_MAINTENANCE,
+    "backup_cleanup.status": QUEUE_MAINTENANCE,
+    "certificates.auto_rotate": QUEUE_MAINTENANCE,
+}
+
+
+def lane_for_queue(queue: str) -> WorkerLane:
+    """Return the specialised lane that owns *queue*."""
+
+    for lane in WORKER_LANES.values():
+        if lane.name != "all" and queue in lane.queues:
+            return lane
+    raise KeyError(queue)
+
+
+def task_routes() -> Dict[str, Dict[str, str]]:
+    return {task: {"queue": queue} for task, queue in TASK_QUEUES.items()}
+
+
+def task_annotations() -> Dict[str, Dict[str, bool]]:
+    """Per-task ``acks_late`` following the lane of the task's queue."""
+
+    return {
+        task: {"acks_late": lane_for_queue(queue).acks_late}
+        for task, queue in TASK_QUEUES.items()
+    }
+
+
+__all__ = [
+    "DEFAULT_QUEUE",
+    "LEGACY_PICKER_QUEUE",
+    "PRIORITY_STEPS",
+    "QUEUE_BULK",
+    "QUEUE_INTERACTIVE",
+    "QUEUE_IO",
+    "QUEUE_MAINTENANCE",
+    "TASK_QUEUES",
+    "TaskPriority",
+    "WORKER_LANES",
+    "WorkerLane",
+    "lane_for_queue",
+    "task_annotations",
+    "task_routes",
+]
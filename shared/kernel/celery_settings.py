@@ -4,6 +4,13 @@ from __future__ import annotations
 from dataclasses import dataclass, field
 from typing import Mapping, Sequence
 
+from shared.kernel.celery_queues import (
+    DEFAULT_QUEUE,
+    PRIORITY_STEPS,
+    TaskPriority,
+    task_annotations,
+    task_routes,
+)
 from shared.kernel.settings.settings import settings
 
 
@@ -39,4 +46,13 @@ class CelerySettings:
             "accept_content": list(self.accept_content),
             "timezone": self.timezone,
             "enable_utc": self.enable_utc,
+            "task_default_queue": DEFAULT_QUEUE,
+            "task_default_priority": int(TaskPriority.NORMAL),
+            "task_routes": task_routes(),
+            "task_annotations": task_annotations(),
+            # Without priority_steps the Redis transport ignores message priority.
+            "broker_transport_options": {
+                "priority_steps": list(PRIORITY_STEPS),
+                "queue_order_strategy": "priority",
+            },
         }
@@ -108,6 +108,37 @@ def _get_scoped_session() -> scoped_session:
     return _scoped_session
 
 
+# ---------------------------------------------------------------------------
+# クエリ計測（/metrics）
+# ---------------------------------------------------------------------------
+
+
+def _install_query_metrics() -> None:
+    """全 Engine の SQL 実行時間とリクエストあたりのクエリ数を計測する。
+
+    ``Engine`` クラスに登録するため、FastAPI 用セッションファクトリやテスト用
+    エンジンなど、このモジュール以外で作られたエンジンにも適用される。
+    """
+    from shared.kernel.metrics import instruments
+
+    event.listen(sa.engine.Engine, "before_cursor_execute", instruments.before_cursor_execute)
+    event.listen(sa.engine.Engine, "after_cursor_execute", instruments.after_cursor_execute)
+    event.listen(sa.engine.Engine, "handle_error", instruments.handle_db_error)
+
+
+def _install_query_profiling() -> None:
+    """管理者が要求したプロファイル中のリクエスト／タスクについて SQL を記録する。"""
+    from shared.kernel import profiling
+
+    event.listen(sa.engine.Engine, "before_cursor_execute", profiling.before_cursor_execute)
+    event.listen(sa.engine.Engine, "after_cursor_execute", profiling.after_cursor_execute)
+    event.listen(sa.engine.Engine, "handle_error", profiling.handle_db_error)
+
+
+_install_query_metrics()
+_install_query_profiling()
+
+
 # ---------------------------------------------------------------------------
 # Flask-SQLAlchemy 互換ラッパー
 # ---------------------------------------------------------------------------
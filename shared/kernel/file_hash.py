@@ -0,0 +1,207 @@
+"""ファイル SHA-256 の計算と、stat をキーにした永続キャッシュ。
+
+取り込みの再試行・メタデータ再適用・アップロードのたびに GB 級の動画を
+読み直してハッシュを計算していた。``(st_dev, st_ino, st_size, st_mtime_ns)`` が
+前回計算時と同じファイルは内容も同じとみなし、SQLite のサイドカーファイルに
+保存したハッシュを返す。ファイルが書き換えられれば stat が変わるため自動的に
+無効になる（同じ inode の古い行は次の計算結果で上書きされる）。
+
+mtime の分解能より短い間隔で同じサイズのまま書き換えられると stat が変わらない
+ことがあるため、mtime が直近（``_RACY_WINDOW_NS`` 以内）のファイルはキャッシュに
+保存しない（git の racy-clean 判定と同じ考え方）。
+
+キャッシュの読み書きに失敗してもハッシュ計算自体は継続する。
+"""
+from __future__ import annotations
+
+import hashlib
+import logging
+import mmap
+import os
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Optional, Tuple
+
+from shared.kernel.settings.settings import settings
+
+logger = logging.getLogger(__name__)
+
+_RACY_WINDOW_NS = 2_000_000_000
+_CACHE_FILENAME = "file_hash_cache.sqlite3"
+
+_StatKey = Tuple[int, int, int, int]
+
+
+def _stat_key(stat_result: os.stat_result) -> _StatKey:
+    return (stat_result.st_dev, stat_result.st_ino, stat_result.st_size, stat_result.st_mtime_ns)
+
+
+class FileHashCache:
+    """``(device, inode)`` ごとに最後に計算したハッシュと stat を保持する SQLite ストア。
+
+    接続はスレッドごと・プロセスごとに開く（Celery prefork の fork 後に親の
+    接続を使い回さないため）。
+    """
+
+    _SCHEMA = (
+        "CREATE TABLE IF NOT EXISTS file_hash ("
+        " dev INTEGER NOT NULL,"
+        " ino INTEGER NOT NULL,"
+        " size INTEGER NOT NULL,"
+        " mtime_ns INTEGER NOT NULL,"
+        " sha256 TEXT NOT NULL,"
+        " recorded_at REAL NOT NULL,"
+        " PRIMARY KEY (dev, ino)"
+        ")"
+    )
+
+    def __init__(self, path: Path) -> None:
+        self._path = Path(path)
+        self._local = threading.local()
+
+    @property
+    def path(self) -> Path:
+        return self._path
+
+    def get(self, key: _StatKey) -> Optional[str]:
+        """stat が記録時と一致すればハッシュを返す。"""
+
+        row = self._connection().execute(
+            "SELECT size, mtime_ns, sha256 FROM file_hash WHERE dev = ? AND ino = ?",
+            key[:2],
+        ).fetchone()
+        if row is None or (row[0], row[1]) != key[2:]:
+            return None
+        return row[2]
+
+    def put(self, key: _StatKey, digest: str) -> None:
+        self._connection().execute(
+            "INSERT INTO file_hash (dev, ino, size, mtime_ns, sha256, recorded_at)"
+            " VALUES (?, ?, ?, ?, ?, ?)"
+            " ON CONFLICT(dev, ino) DO UPDATE SET size = excluded.size,"
+            " mtime_ns = excluded.mtime_ns, sha256 = excluded.sha256,"
+            " recorded_at = excluded.recorded_at",
+            (*key, digest, time.time()),
+        )
+
+    def _connection(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is not None and self._local.pid == os.getpid():
+            return conn
+        self._path.parent.mkdir(parents=True, exist_ok=True)
+        conn = sqlite3.connect(str(self._path), timeout=5, isolation_level=None)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.execute(self._SCHEMA)
+        self._local.conn = conn
+        self._local.pid = os.getpid()
+        return conn
+
+
+_caches: dict[Path, FileHashCache] = {}
+_caches_lock = threading.Lock()
+
+
+def _cache() -> Optional[FileHashCache]:
+    if not settings.file_hash_cache_enabled:
+        return None
+    path = settings.file_hash_cache_path or Path(settings.tmp_directory) / _CACHE_FILENAME
+    path = Path(path)
+    with _caches_lock:
+        cache = _caches.get(path)
+        if cache is None:
+            cache = _caches[path] = FileHashCache(path)
+    return cache
+
+
+def _compute_sha256(file_path: str, *, buffer_size: int, use_mmap: bool) -> str:
+    with open(file_path, "rb") as fh:
+        if use_mmap:
+            try:
+                with mmap.mmap(fh.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                    return hashlib.sha256(mapped).hexdigest()
+            except ValueError:
+                # 空ファイルは mmap できない
+                return hashlib.sha256().hexdigest()
+        if buffer_size <= 0 and hasattr(hashlib, "file_digest"):
+            # Python 3.11+ は C レベルループの file_digest を使う。
+            # pyproject.toml は >=3.10 を許容するため 3.10 では 1MiB チャンクで代替。
+            return hashlib.file_digest(fh, "sha256").hexdigest()
+        digest = hashlib.sha256()
+        buffer = bytearray(buffer_size if buffer_size > 0 else 1024 * 1024)
+        view = memoryview(buffer)
+        while read := fh.readinto(buffer):
+            digest.update(view[:read])
+        return digest.hexdigest()
+
+
+def _is_settled(stat_result: os.stat_result) -> bool:
+    return time.time_ns() - stat_result.st_mtime_ns > _RACY_WINDOW_NS
+
+
+def _cached(file_path: str) -> Tuple[Optional[FileHashCache], Optional[_StatKey], Optional[str]]:
+    cache = _cache()
+    if cache is None:
+        return None, None, None
+    try:
+        key = _stat_key(os.stat(file_path))
+        return cache, key, cache.get(key)
+    except (OSError, sqlite3.Error) as exc:
+        logger.debug("file hash cache lookup failed for %s: %s", file_path, exc)
+        return None, None, None
+
+
+def _store(cache: FileHashCache, file_path: str, key: _StatKey, digest: str) -> None:
+    try:
+        stat_result = os.stat(file_path)
+        # 計算中に書き換えられたファイルや、直近に書かれたファイルは記録しない
+        if _stat_key(stat_result) != key or not _is_settled(stat_result):
+            return
+        cache.put(key, digest)
+    except (OSError, sqlite3.Error) as exc:
+        logger.debug("file hash cache update failed for %s: %s", file_path, exc)
+
+
+def sha256_file(file_path: str | os.PathLike[str]) -> str:
+    """*file_path* の SHA-256（16 進）を返す。stat が変わっていなければキャッシュを使う。
+
+    キャッシュミス時の読み込み方法は ``FILE_HASH_BUFFER_BYTES``（読み込みバッファ、
+    0 は既定の ``hashlib.file_digest``）と ``FILE_HASH_USE_MMAP`` で切り替える。
+    """
+
+    path = os.fspath(file_path)
+    cache, key, digest = _cached(path)
+    if digest is not None:
+        return digest
+
+    digest = _compute_sha256(
+        path,
+        buffer_size=settings.file_hash_buffer_bytes,
+        use_mmap=settings.file_hash_use_mmap,
+    )
+    if cache is not None and key is not None:
+        _store(cache, path, key, digest)
+    return digest
+
+
+def record_sha256(file_path: str | os.PathLike[str], digest: str) -> None:
+    """書き込みと同時に計算したハッシュをキャッシュへ登録する。
+
+    ダウンロード・ZIP 展開など、ファイルを書きながらハッシュを求めた箇所から呼ぶ。
+    書き込み直後のファイルは racy 判定で記録されないため、ここでは mtime の
+    新しさは問わずに記録する（書き込んだ本人が内容を知っているため）。
+    """
+
+    path = os.fspath(file_path)
+    cache = _cache()
+    if cache is None:
+        return
+    try:
+        cache.put(_stat_key(os.stat(path)), digest)
+    except (OSError, sqlite3.Error) as exc:
+        logger.debug("file hash cache update failed for %s: %s", path, exc)
+
+
+__all__ = ["FileHashCache", "record_sha256", "sha256_file"]
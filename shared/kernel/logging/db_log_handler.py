@@ -2,12 +2,14 @@ import json
 import logging
 import sys
 import traceback
+from datetime import datetime, timezone
 from typing import TYPE_CHECKING, Any, Dict, Optional, Set
 
 from sqlalchemy import insert, create_engine
 from sqlalchemy.engine import Engine
 from sqlalchemy.exc import DataError, OperationalError
 
+from shared.infrastructure.log_search import search_table, search_values
 from shared.kernel.database.db import db
 from shared.kernel.settings.settings import settings
 
@@ -113,6 +115,11 @@ class DBLogHandler(logging.Handler):
         log_model.__table__.create(bind=engine, checkfirst=True)
         self._ensured_engines.add(marker)
 
+    def _search_table(self, engine: Engine):
+        if not isinstance(engine, Engine):  # pragma: no cover - supports mocks in tests
+            return None
+        return search_table(engine, self._get_log_model().__tablename__)
+
     def emit(self, record: logging.LogRecord) -> None:
         trace = None
         if record.exc_info:
@@ -181,23 +188,31 @@ class DBLogHandler(logging.Handler):
         engine = self._resolve_engine()
 
         log_model = self._get_log_model()
-        stmt = insert(log_model).values(
-            **self._build_insert_values(
-                record=record,
-                message_json=message_json,
-                trace=trace,
-                event=event,
-                path_value=path_value,
-                request_id=request_id,
-                payload=payload,
-                extras=extras,
-            )
+        values = self._build_insert_values(
+            record=record,
+            message_json=message_json,
+            trace=trace,
+            event=event,
+            path_value=path_value,
+            request_id=request_id,
+            payload=payload,
+            extras=extras,
         )
+        # 検索用サイドカーと同じ値にするため、モデルの既定値を使わずここで決める
+        values.setdefault("created_at", datetime.now(timezone.utc))
+        stmt = insert(log_model).values(**values)
 
         def _persist(engine_to_use: Engine) -> None:
             self._ensure_table(engine_to_use)
+            search = self._search_table(engine_to_use)
             with engine_to_use.begin() as conn:
-                conn.execute(stmt)
+                result = conn.execute(stmt)
+                if search is not None:
+                    conn.execute(
+                        insert(search).values(
+                            **search_values(search, result.inserted_primary_key[0], values)
+                        )
+                    )
 
         try:
             _persist(engine)
@@ -0,0 +1 @@
+"""Prometheus-compatible metrics (registry and application instruments)."""
@@ -0,0 +1,278 @@
+"""Application metrics and the hooks that feed them.
+
+Recording sites import the metric objects from here:
+
+* ``RequestLoggingMiddleware`` – request rate, latency and DB queries per request;
+* SQLAlchemy engine events (``shared/kernel/database/db.py``) – query latency;
+* Celery signals (``cli/src/celery/celery_app.py``) – task rate and duration;
+* ``thumbs_generate`` / ``transcode_worker`` – per-stage media throughput.
+
+Queue depth is read from the Redis broker at scrape time.
+"""
+from __future__ import annotations
+
+import contextvars
+import logging
+import time
+from typing import Any, Iterable, List, Optional, Tuple
+
+from shared.kernel.celery_queues import LEGACY_PICKER_QUEUE, PRIORITY_STEPS, WORKER_LANES
+from shared.kernel.metrics.registry import REGISTRY, Counter, Gauge, Histogram, Sample
+
+logger = logging.getLogger(__name__)
+
+_LONG_BUCKETS = (0.1, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0, 300.0, 900.0, 1800.0, 3600.0)
+_QUERY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5)
+_COUNT_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100, 200, 500)
+
+HTTP_REQUESTS_TOTAL = Counter(
+    "http_requests_total",
+    "HTTP requests by method, route template and status code.",
+    ("method", "route", "status"),
+)
+HTTP_REQUEST_DURATION = Histogram(
+    "http_request_duration_seconds",
+    "HTTP request latency by method and route template.",
+    ("method", "route"),
+)
+HTTP_REQUESTS_IN_PROGRESS = Gauge(
+    "http_requests_in_progress",
+    "HTTP requests currently being served.",
+    ("method",),
+)
+HTTP_REQUEST_DB_QUERIES = Histogram(
+    "http_request_db_queries",
+    "Number of SQL statements executed while serving one request.",
+    ("route",),
+    buckets=_COUNT_BUCKETS,
+)
+
+DB_QUERY_DURATION = Histogram(
+    "db_query_duration_seconds",
+    "SQL statement execution time by statement type.",
+    ("operation",),
+    buckets=_QUERY_BUCKETS,
+)
+
+CELERY_TASKS_TOTAL = Counter(
+    "celery_tasks_total",
+    "Finished Celery tasks by task name and final state.",
+    ("task", "state"),
+)
+CELERY_TASK_DURATION = Histogram(
+    "celery_task_duration_seconds",
+    "Celery task run time by task name.",
+    ("task",),
+    buckets=_LONG_BUCKETS,
+)
+CELERY_TASKS_IN_PROGRESS = Gauge(
+    "celery_tasks_in_progress",
+    "Celery tasks currently executing.",
+    ("task",),
+)
+
+MEDIA_STAGE_DURATION = Histogram(
+    "media_stage_duration_seconds",
+    "Time spent in each stage of the thumbnail and transcode pipelines.",
+    ("pipeline", "stage"),
+    buckets=_LONG_BUCKETS,
+)
+MEDIA_JOBS_TOTAL = Counter(
+    "media_jobs_total",
+    "Thumbnail and transcode jobs by outcome.",
+    ("pipeline", "result"),
+)
+THUMBNAILS_WRITTEN_TOTAL = Counter(
+    "thumbnails_written_total",
+    "Thumbnail files written by target size.",
+    ("size",),
+)
+
+
+# ---------------------------------------------------------------------------
+# Per-request query counting
+# ---------------------------------------------------------------------------
+
+# Holds a one-element list while a request is served. The list itself is
+# shared with the endpoint's task/thread, so increments made there are seen
+# by the middleware.
+_request_queries: contextvars.ContextVar[Optional[List[int]]] = contextvars.ContextVar(
+    "metrics_request_queries", default=None
+)
+
+
+def begin_request_query_count() -> Tuple[List[int], contextvars.Token]:
+    counter = [0]
+    return counter, _request_queries.set(counter)
+
+
+def end_request_query_count(token: contextvars.Token) -> None:
+    _request_queries.reset(token)
+
+
+def _statement_operation(statement: str) -> str:
+    head = statement.lstrip()[:8].split(None, 1)
+    verb = head[0].upper() if head else ""
+    if verb in {"SELECT", "INSERT", "UPDATE", "DELETE"}:
+        return verb.lower()
+    return "other"
+
+
+def before_cursor_execute(conn: Any, cursor: Any, statement: str, *args: Any) -> None:
+    conn.info.setdefault("metrics_query_started", []).append(time.perf_counter())
+
+
+def after_cursor_execute(conn: Any, cursor: Any, statement: str, *args: Any) -> None:
+    started = conn.info.get("metrics_query_started")
+    if not started:
+        return
+    DB_QUERY_DURATION.labels(_statement_operation(statement)).observe(
+        time.perf_counter() - started.pop()
+    )
+    counter = _request_queries.get()
+    if counter is not None:
+        counter[0] += 1
+
+
+def handle_db_error(exception_context: Any) -> None:
+    # A failed statement never reaches ``after_cursor_execute``.
+    connection = getattr(exception_context, "connection", None)
+    started = connection.info.get("metrics_query_started") if connection is not None else None
+    if started:
+        started.pop()
+
+
+# ---------------------------------------------------------------------------
+# Celery
+# ---------------------------------------------------------------------------
+
+_task_started: dict[str, float] = {}
+
+
+def _on_task_prerun(task_id: Optional[str] = None, task: Any = None, **_: Any) -> None:
+    if task_id is None or task is None:
+        return
+    _task_started[task_id] = time.perf_counter()
+    CELERY_TASKS_IN_PROGRESS.labels(task.name).inc()
+
+
+def _on_task_postrun(
+    task_id: Optional[str] = None,
+    task: Any = None,
+    state: Optional[str] = None,
+    **_: Any,
+) -> None:
+    if task_id is None or task is None:
+        return
+    started = _task_started.pop(task_id, None)
+    CELERY_TASKS_IN_PROGRESS.labels(task.name).dec()
+    CELERY_TASKS_TOTAL.labels(task.name, (state or "UNKNOWN").lower()).inc()
+    if started is not None:
+        CELERY_TASK_DURATION.labels(task.name).observe(time.perf_counter() - started)
+
+
+def install_celery_instrumentation() -> None:
+    from celery import signals
+
+    signals.task_prerun.connect(_on_task_prerun, weak=False)
+    signals.task_postrun.connect(_on_task_postrun, weak=False)
+
+
+def _broker_queue_names() -> List[str]:
+    names = set()
+    for lane in WORKER_LANES.values():
+        names.update(lane.queues)
+    names.add(LEGACY_PICKER_QUEUE)
+    return sorted(names)
+
+
+def _queue_depth_collector() -> Iterable[Tuple[str, str, str, List[Sample]]]:
+    from shared.kernel.settings.settings import settings
+
+    broker_url = settings.celery_broker_url
+    if not broker_url.startswith(("redis://", "rediss://", "unix://")):
+        return []
+    import redis
+
+    # kombu stores each non-zero priority in its own list: ``<queue>\x06\x16<p>``.
+    client = redis.from_url(broker_url, socket_timeout=1, socket_connect_timeout=1)
+    try:
+        pipe = client.pipeline(transaction=False)
+        names = _broker_queue_names()
+        for name in names:
+            for step in PRIORITY_STEPS:
+                pipe.llen(f"{name}\x06\x16{step}" if step else name)
+        lengths = pipe.execute()
+    finally:
+        client.close()
+
+    samples: List[Sample] = []
+    per_queue = len(PRIORITY_STEPS)
+    for index, name in enumerate(names):
+        depth = sum(lengths[index * per_queue:(index + 1) * per_queue])
+        samples.append(("celery_queue_depth", {"queue": name}, float(depth)))
+    return [("celery_queue_depth", "gauge", "Messages waiting in each Celery queue.", samples)]
+
+
+REGISTRY.register_collector(_queue_depth_collector)
+
+
+def _media_file_deletion_backlog_collector() -> Iterable[Tuple[str, str, str, List[Sample]]]:
+    from bounded_contexts.photonest.tasks.media_file_deletion import pending_media_file_deletions
+    from shared.kernel.database.session import _get_session_factory
+
+    session = _get_session_factory()()
+    try:
+        backlog = pending_media_file_deletions(session)
+    finally:
+        session.close()
+    return [
+        (
+            "media_file_deletion_backlog",
+            "gauge",
+            "Files of deleted media waiting in the deletion queue.",
+            [("media_file_deletion_backlog", {}, float(backlog))],
+        )
+    ]
+
+
+REGISTRY.register_collector(_media_file_deletion_backlog_collector)
+
+
+def enable_multiprocess_from_settings() -> None:
+    from shared.kernel.settings.settings import settings
+
+    directory = settings.metrics_multiproc_dir
+    if directory and REGISTRY.multiprocess_directory is None:
+        try:
+            REGISTRY.enable_multiprocess(directory)
+        except OSError as exc:
+            logger.warning(
+                "Metrics multiprocess directory is unusable: %s",
+                exc,
+                extra={"event": "metrics.multiproc.unavailable"},
+            )
+
+
+enable_multiprocess_from_settings()
+
+
+__all__ = [
+    "CELERY_TASKS_IN_PROGRESS",
+    "CELERY_TASKS_TOTAL",
+    "CELERY_TASK_DURATION",
+    "DB_QUERY_DURATION",
+    "HTTP_REQUESTS_IN_PROGRESS",
+    "HTTP_REQUESTS_TOTAL",
+    "HTTP_REQUEST_DB_QUERIES",
+    "HTTP_REQUEST_DURATION",
+    "MEDIA_JOBS_TOTAL",
+    "MEDIA_STAGE_DURATION",
+    "THUMBNAILS_WRITTEN_TOTAL",
+    "after_cursor_execute",
+    "before_cursor_execute",
+    "begin_request_query_count",
+    "end_request_query_count",
+    "handle_db_error",
+    "install_celery_instrumentation",
+]
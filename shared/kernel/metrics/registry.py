@@ -0,0 +1,548 @@
+"""Minimal in-process metrics registry with Prometheus text exposition.
+
+Counters, gauges and histograms keep their values in plain Python objects
+guarded by a per-child lock, so recording a sample costs a dict lookup and a
+couple of arithmetic operations.
+
+When ``METRICS_MULTIPROC_DIR`` is set, every process (gunicorn/uvicorn
+workers, Celery prefork children) periodically writes a JSON snapshot of its
+values to ``<dir>/<host>_<pid>_<token>.json``. The process serving
+``/metrics`` merges those files with its own live values:
+
+* counters and histograms are summed over every file, including exited
+  processes, so totals stay monotonic;
+* gauges are aggregated over processes that flushed recently (``livesum``
+  or ``max``).
+
+Files that have not been rewritten for ``STALE_AFTER_SECONDS`` belong to
+processes that are gone; their counters are folded into ``archive.json`` and
+the file is removed so the directory does not grow without bound.
+"""
+from __future__ import annotations
+
+import atexit
+import bisect
+import contextlib
+import fcntl
+import json
+import math
+import os
+import socket
+import threading
+import time
+import uuid
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+CONTENT_TYPE_LATEST = "text/plain; version=0.0.4; charset=utf-8"
+
+DEFAULT_BUCKETS: Tuple[float, ...] = (
+    0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0,
+)
+
+FLUSH_INTERVAL_SECONDS = 5.0
+GAUGE_LIVENESS_SECONDS = FLUSH_INTERVAL_SECONDS * 3
+STALE_AFTER_SECONDS = 600.0
+
+_ARCHIVE_FILENAME = "archive.json"
+_LOCK_FILENAME = ".lock"
+
+LabelValues = Tuple[str, ...]
+Sample = Tuple[str, Dict[str, str], float]
+
+
+class _CounterChild:
+    __slots__ = ("_lock", "value")
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self.value = 0.0
+
+    def inc(self, amount: float = 1.0) -> None:
+        if amount < 0:
+            raise ValueError("Counters can only be incremented")
+        with self._lock:
+            self.value += amount
+
+    def export(self) -> float:
+        return self.value
+
+    def reset(self) -> None:
+        self.value = 0.0
+
+
+class _GaugeChild:
+    __slots__ = ("_lock", "value")
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self.value = 0.0
+
+    def inc(self, amount: float = 1.0) -> None:
+        with self._lock:
+            self.value += amount
+
+    def dec(self, amount: float = 1.0) -> None:
+        with self._lock:
+            self.value -= amount
+
+    def set(self, value: float) -> None:
+        self.value = float(value)
+
+    def export(self) -> float:
+        return self.value
+
+    def reset(self) -> None:
+        self.value = 0.0
+
+
+class _HistogramChild:
+    __slots__ = ("_lock", "_buckets", "counts", "sum")
+
+    def __init__(self, buckets: Tuple[float, ...]) -> None:
+        self._lock = threading.Lock()
+        self._buckets = buckets
+        # One slot per finite bucket plus the implicit ``+Inf`` bucket.
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+
+    def observe(self, value: float) -> None:
+        index = bisect.bisect_left(self._buckets, value)
+        with self._lock:
+            self.counts[index] += 1
+            self.sum += value
+
+    @contextlib.contextmanager
+    def time(self) -> Iterator[None]:
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - started)
+
+    def export(self) -> List[Any]:
+        with self._lock:
+            return [list(self.counts), self.sum]
+
+    def reset(self) -> None:
+        self.counts = [0] * (len(self._buckets) + 1)
+        self.sum = 0.0
+
+
+class _Metric:
+    kind = ""
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        *,
+        registry: Optional["Registry"] = None,
+    ) -> None:
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._children: Dict[LabelValues, Any] = {}
+        self._lock = threading.Lock()
+        (registry if registry is not None else REGISTRY).register(self)
+
+    def _new_child(self) -> Any:
+        raise NotImplementedError
+
+    def labels(self, *values: Any) -> Any:
+        key = tuple(str(value) for value in values)
+        child = self._children.get(key)
+        if child is not None:
+            return child
+        if len(key) != len(self.labelnames):
+            raise ValueError(
+                f"{self.name} expects labels {self.labelnames}, got {len(key)} values"
+            )
+        with self._lock:
+            return self._children.setdefault(key, self._new_child())
+
+    def _default(self) -> Any:
+        if self.labelnames:
+            raise ValueError(f"{self.name} requires labels {self.labelnames}")
+        return self.labels()
+
+    def export(self) -> Dict[str, Any]:
+        with self._lock:
+            children = list(self._children.items())
+        return {json.dumps(key): child.export() for key, child in children}
+
+    def reset(self) -> None:
+        """Zero every child in place (cached ``labels()`` handles stay valid)."""
+
+        with self._lock:
+            children = list(self._children.values())
+        for child in children:
+            child.reset()
+
+
+class Counter(_Metric):
+    """Monotonically increasing value. Name it with a ``_total`` suffix."""
+
+    kind = "counter"
+
+    def _new_child(self) -> _CounterChild:
+        return _CounterChild()
+
+    def inc(self, amount: float = 1.0) -> None:
+        self._default().inc(amount)
+
+
+class Gauge(_Metric):
+    """Value that can go up and down.
+
+    ``multiprocess_mode`` selects how values from several processes are
+    combined: ``"livesum"`` (default) or ``"max"``.
+    """
+
+    kind = "gauge"
+
+    def __init__(self, *args: Any, multiprocess_mode: str = "livesum", **kwargs: Any) -> None:
+        if multiprocess_mode not in {"livesum", "max"}:
+            raise ValueError(f"Unsupported multiprocess_mode: {multiprocess_mode}")
+        self.multiprocess_mode = multiprocess_mode
+        super().__init__(*args, **kwargs)
+
+    def _new_child(self) -> _GaugeChild:
+        return _GaugeChild()
+
+    def inc(self, amount: float = 1.0) -> None:
+        self._default().inc(amount)
+
+    def dec(self, amount: float = 1.0) -> None:
+        self._default().dec(amount)
+
+    def set(self, value: float) -> None:
+        self._default().set(value)
+
+
+class Histogram(_Metric):
+    """Distribution of observed values in cumulative buckets."""
+
+    kind = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        *,
+        buckets: Sequence[float] = DEFAULT_BUCKETS,
+        registry: Optional["Registry"] = None,
+    ) -> None:
+        self.buckets = tuple(sorted(float(b) for b in buckets if not math.isinf(b)))
+        super().__init__(name, documentation, labelnames, registry=registry)
+
+    def _new_child(self) -> _HistogramChild:
+        return _HistogramChild(self.buckets)
+
+    def observe(self, value: float) -> None:
+        self._default().observe(value)
+
+    def time(self) -> contextlib.AbstractContextManager:
+        return self._default().time()
+
+
+# A collector returns ``(name, kind, help, samples)`` tuples computed at scrape
+# time, e.g. queue depths read from the broker. Its values are not aggregated
+# across processes.
+Collector = Callable[[], Iterable[Tuple[str, str, str, List[Sample]]]]
+
+
+class Registry:
+    """Holds metrics, handles multiprocess snapshots and renders exposition text."""
+
+    def __init__(self) -> None:
+        self._metrics: Dict[str, _Metric] = {}
+        self._collectors: List[Collector] = []
+        self._lock = threading.Lock()
+        self._directory: Optional[Path] = None
+        self._file_id = ""
+        self._flusher: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+
+    # -- registration -------------------------------------------------------
+
+    def register(self, metric: _Metric) -> None:
+        with self._lock:
+            if metric.name in self._metrics:
+                raise ValueError(f"Duplicate metric name: {metric.name}")
+            self._metrics[metric.name] = metric
+
+    def register_collector(self, collector: Collector) -> None:
+        with self._lock:
+            self._collectors.append(collector)
+
+    # -- multiprocess -------------------------------------------------------
+
+    @property
+    def multiprocess_directory(self) -> Optional[Path]:
+        return self._directory
+
+    def enable_multiprocess(self, directory: os.PathLike[str] | str) -> None:
+        """Start writing snapshots of this process into *directory*."""
+
+        path = Path(directory)
+        path.mkdir(parents=True, exist_ok=True)
+        self._directory = path
+        self._start_flusher()
+
+    def _start_flusher(self) -> None:
+        self._file_id = f"{socket.gethostname()}_{os.getpid()}_{uuid.uuid4().hex[:8]}"
+        self._stop = threading.Event()
+        self._flusher = threading.Thread(
+            target=self._flush_loop, name="metrics-flusher", daemon=True
+        )
+        self._flusher.start()
+
+    def _flush_loop(self) -> None:
+        stop = self._stop
+        while not stop.wait(FLUSH_INTERVAL_SECONDS):
+            self.flush()
+
+    def _after_fork_in_child(self) -> None:
+        # Values inherited from the parent are the parent's to report. Locks
+        # are recreated because a thread may have held one at fork time.
+        for metric in list(self._metrics.values()):
+            metric._lock = threading.Lock()
+            for child in metric._children.values():
+                child._lock = threading.Lock()
+            metric.reset()
+        if self._directory is not None:
+            self._start_flusher()
+
+    def _own_path(self) -> Optional[Path]:
+        if self._directory is None or not self._file_id:
+            return None
+        return self._directory / f"{self._file_id}.json"
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            metrics = list(self._metrics.values())
+        return {metric.name: metric.export() for metric in metrics}
+
+    def flush(self) -> None:
+        """Write this process's snapshot atomically. Never raises."""
+
+        path = self._own_path()
+        if path is None:
+            return
+        tmp_path = path.with_suffix(".tmp")
+        try:
+            tmp_path.write_text(
+                json.dumps({"pid": os.getpid(), "metrics": self.snapshot()}),
+                encoding="utf-8",
+            )
+            os.replace(tmp_path, path)
+        except OSError:
+            pass
+
+    def _peer_snapshots(self) -> Tuple[List[Tuple[float, Dict[str, Any]]], Dict[str, Any]]:
+        """Return ``([(age, snapshot), ...], archive)`` written by other processes."""
+
+        directory = self._directory
+        if directory is None:
+            return [], {}
+        own = self._own_path()
+        kinds = {name: metric.kind for name, metric in self._metrics.items()}
+        live: List[Tuple[float, Dict[str, Any]]] = []
+        now = time.time()
+        with _locked(directory / _LOCK_FILENAME):
+            archive_path = directory / _ARCHIVE_FILENAME
+            archive = _read_json(archive_path) or {}
+            archive_changed = False
+            for path in directory.glob("*.json"):
+                if path == own or path.name == _ARCHIVE_FILENAME:
+                    continue
+                try:
+                    age = now - path.stat().st_mtime
+                except OSError:
+                    continue
+                data = _read_json(path)
+                if data is None:
+                    continue
+                if age > STALE_AFTER_SECONDS:
+                    archive = _merge_monotonic(archive, data.get("metrics", {}), kinds)
+                    archive_changed = True
+                    with contextlib.suppress(OSError):
+                        path.unlink()
+                    continue
+                live.append((age, data.get("metrics", {})))
+            if archive_changed:
+                tmp_path = archive_path.with_suffix(".tmp")
+                tmp_path.write_text(json.dumps(archive), encoding="utf-8")
+                os.replace(tmp_path, archive_path)
+        return live, archive
+
+    # -- exposition ---------------------------------------------------------
+
+    def render(self) -> str:
+        """Return the Prometheus text exposition of every metric."""
+
+        with self._lock:
+            metrics = list(self._metrics.values())
+            collectors = list(self._collectors)
+
+        live, archive = self._peer_snapshots()
+        lines: List[str] = []
+        for metric in metrics:
+            sources = [metric.export()]
+            for age, snapshot in live:
+                # A process that stopped flushing no longer counts towards gauges.
+                if metric.kind != "gauge" or age <= GAUGE_LIVENESS_SECONDS:
+                    sources.append(snapshot.get(metric.name, {}))
+            if metric.kind != "gauge":
+                sources.append(archive.get(metric.name, {}))
+            lines.extend(_render_metric(metric, _combine(metric, sources)))
+        for collector in collectors:
+            try:
+                families = list(collector())
+            except Exception:
+                continue
+            for name, kind, documentation, samples in families:
+                lines.append(f"# HELP {name} {_escape_help(documentation)}")
+                lines.append(f"# TYPE {name} {kind}")
+                for sample_name, labels, value in samples:
+                    lines.append(f"{sample_name}{_format_labels(labels)} {_format_value(value)}")
+        return "\n".join(lines) + "\n"
+
+
+# ---------------------------------------------------------------------------
+# Helpers
+# ---------------------------------------------------------------------------
+
+
+@contextlib.contextmanager
+def _locked(path: Path) -> Iterator[None]:
+    with open(path, "a+") as handle:
+        fcntl.flock(handle.fileno(), fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(handle.fileno(), fcntl.LOCK_UN)
+
+
+def _read_json(path: Path) -> Optional[Dict[str, Any]]:
+    try:
+        return json.loads(path.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return None
+
+
+def _add_values(left: Any, right: Any) -> Any:
+    if isinstance(left, list):
+        counts = [a + b for a, b in zip(left[0], right[0])]
+        return [counts, left[1] + right[1]]
+    return left + right
+
+
+def _merge_monotonic(
+    archive: Dict[str, Any],
+    snapshot: Dict[str, Any],
+    kinds: Dict[str, str],
+) -> Dict[str, Any]:
+    """Fold counter/histogram values of *snapshot* into *archive*.
+
+    Gauges are skipped: a dead process no longer contributes to them.
+    """
+
+    for name, children in snapshot.items():
+        if kinds.get(name) in (None, "gauge"):
+            continue
+        target = archive.setdefault(name, {})
+        for key, value in children.items():
+            target[key] = _add_values(target[key], value) if key in target else value
+    return archive
+
+
+def _combine(metric: _Metric, sources: List[Dict[str, Any]]) -> Dict[str, Any]:
+    combined: Dict[str, Any] = {}
+    use_max = getattr(metric, "multiprocess_mode", "") == "max"
+    for children in sources:
+        for key, value in children.items():
+            if key not in combined:
+                combined[key] = value
+            elif use_max:
+                combined[key] = max(combined[key], value)
+            else:
+                combined[key] = _add_values(combined[key], value)
+    return combined
+
+
+def _escape_help(text: str) -> str:
+    return text.replace("\\", "\\\\").replace("\n", "\\n")
+
+
+def _escape_label(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(labels: Dict[str, str]) -> str:
+    if not labels:
+        return ""
+    inner = ",".join(f'{key}="{_escape_label(str(value))}"' for key, value in labels.items())
+    return "{" + inner + "}"
+
+
+def _format_value(value: float) -> str:
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+def _format_bound(bound: float) -> str:
+    return "+Inf" if math.isinf(bound) else repr(float(bound))
+
+
+def _render_metric(metric: _Metric, values: Dict[str, Any]) -> List[str]:
+    lines = [
+        f"# HELP {metric.name} {_escape_help(metric.documentation)}",
+        f"# TYPE {metric.name} {metric.kind}",
+    ]
+    for key in sorted(values):
+        labels = dict(zip(metric.labelnames, json.loads(key)))
+        value = values[key]
+        if metric.kind != "histogram":
+            lines.append(f"{metric.name}{_format_labels(labels)} {_format_value(value)}")
+            continue
+        counts, total = value
+        cumulative = 0
+        bounds = list(metric.buckets) + [math.inf]
+        for bound, count in zip(bounds, counts):
+            cumulative += count
+            bucket_labels = {**labels, "le": _format_bound(bound)}
+            lines.append(f"{metric.name}_bucket{_format_labels(bucket_labels)} {cumulative}")
+        lines.append(f"{metric.name}_sum{_format_labels(labels)} {_format_value(total)}")
+        lines.append(f"{metric.name}_count{_format_labels(labels)} {cumulative}")
+    return lines
+
+
+REGISTRY = Registry()
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=REGISTRY._after_fork_in_child)
+atexit.register(REGISTRY.flush)
+
+
+def generate_latest(registry: Registry = REGISTRY) -> str:
+    return registry.render()
+
+
+__all__ = [
+    "CONTENT_TYPE_LATEST",
+    "Collector",
+    "Counter",
+    "DEFAULT_BUCKETS",
+    "Gauge",
+    "Histogram",
+    "REGISTRY",
+    "Registry",
+    "generate_latest",
+]
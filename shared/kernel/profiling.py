@@ -0,0 +1,297 @@
+"""On-demand sampling profiler with per-profile SQL capture.
+
+A :class:`ProfileSession` is activated around one request or Celery task.
+While it is active:
+
+* a background thread samples the Python stacks of the threads doing the work
+  every ``interval`` seconds and aggregates them into *collapsed stacks*
+  (``frame;frame;frame count`` lines, the input format of ``flamegraph.pl``
+  and speedscope);
+* SQLAlchemy cursor events (registered in ``shared/kernel/database/db.py``)
+  record each statement and its duration, and the thread that ran it is added
+  to the sampled set so work in thread pools is captured too;
+* identical statements repeated ``N_PLUS_ONE_THRESHOLD`` times or more are
+  flagged as likely N+1 queries.
+
+The thread that activated the session is always sampled. Stacks of other
+requests running on the same event-loop thread can appear in the samples.
+"""
+from __future__ import annotations
+
+import contextvars
+import json
+import logging
+import os
+import sys
+import threading
+import time
+from collections import Counter as _Counter
+from typing import Any, Dict, List, Optional
+
+DEFAULT_INTERVAL_SECONDS = 0.005
+N_PLUS_ONE_THRESHOLD = 5
+MAX_STACK_DEPTH = 128
+
+# Reports are persisted in TEXT columns (64 KiB on MySQL); stay well below.
+_REPORT_BUDGET_BYTES = 60_000
+_MAX_STATEMENTS = 30
+_SQL_PREVIEW_CHARS = 500
+
+_ROOT_DIR = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+_active_profile: contextvars.ContextVar[Optional["ProfileSession"]] = contextvars.ContextVar(
+    "active_profile", default=None
+)
+
+
+def _frame_label(code: Any) -> str:
+    filename = code.co_filename
+    if filename.startswith(_ROOT_DIR):
+        filename = os.path.relpath(filename, _ROOT_DIR)
+    else:
+        marker = "site-packages" + os.sep
+        index = filename.rfind(marker)
+        if index >= 0:
+            filename = filename[index + len(marker):]
+    # ``;`` separates frames in the collapsed format.
+    return f"{code.co_name} ({filename}:{code.co_firstlineno})".replace(";", ":")
+
+
+class ProfileSession:
+    """Samples stacks and records SQL for one unit of work."""
+
+    def __init__(self, label: str, *, interval: float = DEFAULT_INTERVAL_SECONDS) -> None:
+        self.label = label
+        self.interval = interval
+        self.stacks: _Counter[str] = _Counter()
+        self.sample_count = 0
+        self.statements: List[tuple[str, float]] = []
+        self._threads = {threading.get_ident()}
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._sampler: Optional[threading.Thread] = None
+        self._token: Optional[contextvars.Token] = None
+        self.started_at = 0.0
+        self.duration = 0.0
+
+    # -- lifecycle ----------------------------------------------------------
+
+    def start(self) -> "ProfileSession":
+        self.started_at = time.perf_counter()
+        self._token = _active_profile.set(self)
+        self._sampler = threading.Thread(
+            target=self._sample_loop, name="profile-sampler", daemon=True
+        )
+        self._sampler.start()
+        return self
+
+    def stop(self) -> None:
+        self.duration = time.perf_counter() - self.started_at
+        self._stop.set()
+        if self._sampler is not None:
+            self._sampler.join(timeout=1.0)
+        if self._token is not None:
+            try:
+                _active_profile.reset(self._token)
+            except ValueError:
+                # Stopped from a different context (e.g. Celery postrun signal).
+                _active_profile.set(None)
+            self._token = None
+
+    def __enter__(self) -> "ProfileSession":
+        return self.start()
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.stop()
+
+    # -- sampling -----------------------------------------------------------
+
+    def add_thread(self, ident: int) -> None:
+        if ident not in self._threads:
+            with self._lock:
+                self._threads.add(ident)
+
+    def _sample_loop(self) -> None:
+        own = threading.get_ident()
+        while not self._stop.wait(self.interval):
+            with self._lock:
+                threads = tuple(self._threads)
+            frames = sys._current_frames()
+            for ident in threads:
+                if ident == own:
+                    continue
+                frame = frames.get(ident)
+                if frame is None:
+                    continue
+                labels: List[str] = []
+                while frame is not None and len(labels) < MAX_STACK_DEPTH:
+                    labels.append(_frame_label(frame.f_code))
+                    frame = frame.f_back
+                labels.reverse()
+                self.stacks[";".join(labels)] += 1
+                self.sample_count += 1
+
+    # -- SQL ----------------------------------------------------------------
+
+    def record_statement(self, statement: str, duration: float) -> None:
+        with self._lock:
+            self.statements.append((statement, duration))
+
+    # -- reporting ----------------------------------------------------------
+
+    def collapsed(self, *, limit_bytes: Optional[int] = None) -> str:
+        """Return collapsed stacks, heaviest first.
+
+        ``limit_bytes`` bounds the size of the text once embedded in a JSON
+        string (escapes included), which is how reports are stored.
+        """
+
+        lines: List[str] = []
+        used = 0
+        for stack, count in self.stacks.most_common():
+            line = f"{stack} {count}"
+            if limit_bytes is not None:
+                # The two quotes of the dumped line stand in for its ``\\n``.
+                cost = len(json.dumps(line, ensure_ascii=False).encode())
+                if used + cost > limit_bytes:
+                    break
+                used += cost
+            lines.append(line)
+        return "\n".join(lines)
+
+    def query_summary(self) -> Dict[str, Any]:
+        grouped: Dict[str, List[float]] = {}
+        for statement, duration in self.statements:
+            grouped.setdefault(" ".join(statement.split()), []).append(duration)
+        ranked = sorted(grouped.items(), key=lambda item: sum(item[1]), reverse=True)
+        return {
+            "count": len(self.statements),
+            "totalMs": round(sum(d for _, d in self.statements) * 1000, 3),
+            "statements": [
+                {
+                    "sql": sql[:_SQL_PREVIEW_CHARS],
+                    "count": len(durations),
+                    "totalMs": round(sum(durations) * 1000, 3),
+                    "maxMs": round(max(durations) * 1000, 3),
+                }
+                for sql, durations in ranked[:_MAX_STATEMENTS]
+            ],
+            "nPlusOne": [
+                {"sql": sql[:_SQL_PREVIEW_CHARS], "count": len(durations)}
+                for sql, durations in sorted(
+                    grouped.items(), key=lambda item: len(item[1]), reverse=True
+                )
+                if len(durations) >= N_PLUS_ONE_THRESHOLD
+            ],
+        }
+
+    def report(self) -> Dict[str, Any]:
+        """Return a JSON-serialisable report that fits in a log row."""
+
+        payload: Dict[str, Any] = {
+            "target": self.label,
+            "durationMs": round(self.duration * 1000, 3),
+            "sampleIntervalMs": self.interval * 1000,
+            "sampleCount": self.sample_count,
+            "queries": self.query_summary(),
+            "collapsed": "",
+            "collapsedTruncated": True,
+        }
+        remaining = _REPORT_BUDGET_BYTES - len(json.dumps(payload, ensure_ascii=False).encode())
+        payload["collapsed"] = self.collapsed(limit_bytes=max(remaining, 0))
+        payload["collapsedTruncated"] = len(payload["collapsed"].splitlines()) < len(self.stacks)
+        return payload
+
+
+def active_profile() -> Optional[ProfileSession]:
+    return _active_profile.get()
+
+
+# ---------------------------------------------------------------------------
+# SQLAlchemy cursor events
+# ---------------------------------------------------------------------------
+
+_STARTED_KEY = "profile_query_started"
+
+
+def before_cursor_execute(conn: Any, cursor: Any, statement: str, *args: Any) -> None:
+    if _active_profile.get() is None:
+        return
+    conn.info.setdefault(_STARTED_KEY, []).append(time.perf_counter())
+
+
+def after_cursor_execute(conn: Any, cursor: Any, statement: str, *args: Any) -> None:
+    profile = _active_profile.get()
+    if profile is None:
+        return
+    started = conn.info.get(_STARTED_KEY)
+    if not started:
+        return
+    profile.record_statement(statement, time.perf_counter() - started.pop())
+    profile.add_thread(threading.get_ident())
+
+
+def handle_db_error(exception_context: Any) -> None:
+    connection = getattr(exception_context, "connection", None)
+    started = connection.info.get(_STARTED_KEY) if connection is not None else None
+    if started:
+        started.pop()
+
+
+# ---------------------------------------------------------------------------
+# Celery task header
+# ---------------------------------------------------------------------------
+
+# ``apply_async(headers={PROFILE_TASK_HEADER: True})`` profiles that run.
+PROFILE_TASK_HEADER = "profile"
+
+_task_profiles: Dict[str, ProfileSession] = {}
+
+
+def _task_requests_profile(task: Any) -> bool:
+    request = getattr(task, "request", None)
+    if request is None:
+        return False
+    if getattr(request, PROFILE_TASK_HEADER, None):
+        return True
+    headers = getattr(request, "headers", None) or {}
+    return bool(isinstance(headers, dict) and headers.get(PROFILE_TASK_HEADER))
+
+
+def _on_task_prerun(task_id: Optional[str] = None, task: Any = None, **_: Any) -> None:
+    if task_id is None or task is None or not _task_requests_profile(task):
+        return
+    _task_profiles[task_id] = ProfileSession(f"task {task.name}").start()
+
+
+def _on_task_postrun(task_id: Optional[str] = None, task: Any = None, state: Any = None, **_: Any) -> None:
+    profile = _task_profiles.pop(task_id, None) if task_id else None
+    if profile is None:
+        return
+    profile.stop()
+    report = profile.report()
+    report.update({"message": "Task profile captured", "state": state, "taskId": task_id})
+    # ``celery.task`` carries the worker_log handler at INFO.
+    logging.getLogger("celery.task.profiling").info(
+        json.dumps(report, ensure_ascii=False, default=str),
+        extra={"event": "profile.task", "task_name": task.name, "task_uuid": task_id},
+    )
+
+
+def install_celery_profiling() -> None:
+    from celery import signals
+
+    signals.task_prerun.connect(_on_task_prerun, weak=False)
+    signals.task_postrun.connect(_on_task_postrun, weak=False)
+
+
+__all__ = [
+    "N_PLUS_ONE_THRESHOLD",
+    "PROFILE_TASK_HEADER",
+    "ProfileSession",
+    "active_profile",
+    "after_cursor_execute",
+    "before_cursor_execute",
+    "handle_db_error",
+    "install_celery_profiling",
+]
@@ -611,6 +611,84 @@ class ApplicationSettings:
         except (TypeError, ValueError):
             return 20
 
+    @property
+    def transcode_threads(self) -> int:
+        return max(0, self.get_int("TRANSCODE_THREADS", 0))
+
+    @property
+    def transcode_max_parallel_jobs(self) -> int:
+        return max(1, self.get_int("TRANSCODE_MAX_PARALLEL_JOBS", 2))
+
+    @property
+    def transcode_segment_threshold_seconds(self) -> int:
+        return max(0, self.get_int("TRANSCODE_SEGMENT_THRESHOLD_SECONDS", 600))
+
+    @property
+    def transcode_hls_enabled(self) -> bool:
+        return self.get_bool("TRANSCODE_HLS_ENABLED", False)
+
+    @property
+    def local_import_zip_streaming(self) -> bool:
+        return self.get_bool("LOCAL_IMPORT_ZIP_STREAMING", False)
+
+    @property
+    def local_import_zip_workers(self) -> int:
+        return max(1, self.get_int("LOCAL_IMPORT_ZIP_WORKERS", 2))
+
+    @property
+    def originals_blob_store_enabled(self) -> bool:
+        return self.get_bool("ORIGINALS_BLOB_STORE_ENABLED", False)
+
+    @property
+    def originals_blob_link_mode(self) -> str:
+        value = str(self._get("ORIGINALS_BLOB_LINK_MODE") or "hardlink").strip().lower()
+        return value if value in {"hardlink", "reflink"} else "hardlink"
+
+    @property
+    def file_hash_cache_enabled(self) -> bool:
+        return self.get_bool("FILE_HASH_CACHE_ENABLED", True)
+
+    @property
+    def file_hash_cache_path(self) -> Optional[Path]:
+        value = self._get("FILE_HASH_CACHE_PATH")
+        return Path(str(value)) if value else None
+
+    @property
+    def file_hash_buffer_bytes(self) -> int:
+        return max(0, self.get_int("FILE_HASH_BUFFER_BYTES", 0))
+
+    @property
+    def file_hash_use_mmap(self) -> bool:
+        return self.get_bool("FILE_HASH_USE_MMAP", False)
+
+    @property
+    def thumbnail_fast_path_enabled(self) -> bool:
+        return self.get_bool("THUMBNAIL_FAST_PATH_ENABLED", True)
+
+    @property
+    def thumbnail_fast_path_workers(self) -> int:
+        return max(1, self.get_int("THUMBNAIL_FAST_PATH_WORKERS", 2))
+
+    @property
+    def thumbnail_fast_path_max_pending(self) -> int:
+        return max(0, self.get_int("THUMBNAIL_FAST_PATH_MAX_PENDING", 8))
+
+    @property
+    def thumbnail_pack_enabled(self) -> bool:
+        return self.get_bool("THUMBNAIL_PACK_ENABLED", False)
+
+    @property
+    def thumbnail_pack_max_bytes(self) -> int:
+        return max(1, self.get_int("THUMBNAIL_PACK_MAX_BYTES", 256 * 1024 * 1024))
+
+    @property
+    def media_deletion_workers(self) -> int:
+        return max(1, self.get_int("MEDIA_DELETION_WORKERS", 4))
+
+    @property
+    def media_deletion_batch_size(self) -> int:
+        return max(1, self.get_int("MEDIA_DELETION_BATCH_SIZE", 100))
+
     # ------------------------------------------------------------------
     # API / web configuration
     # ------------------------------------------------------------------
@@ -713,6 +791,11 @@ class ApplicationSettings:
         value = self._get("REDIS_URL")
         return str(value) if value is not None else None
 
+    @property
+    def metrics_multiproc_dir(self) -> Optional[str]:
+        value = self._get("METRICS_MULTIPROC_DIR")
+        return str(value) if value else None
+
     @property
     def last_beat_at(self) -> Any:
         return self._get("LAST_BEAT_AT")
@@ -766,6 +849,19 @@ class ApplicationSettings:
     def media_playback_url_ttl_seconds(self) -> int:
         return self.get_int("MEDIA_PLAYBACK_URL_TTL_SECONDS", 600)
 
+    @property
+    def media_image_url_ttl_seconds(self) -> int:
+        return self.get_int("MEDIA_IMAGE_URL_TTL_SECONDS", 30 * 24 * 3600)
+
+    @property
+    def media_image_cache_directory(self) -> Optional[str]:
+        value = self._get("MEDIA_IMAGE_CACHE_DIRECTORY")
+        return str(value) if value else None
+
+    @property
+    def media_image_cache_max_bytes(self) -> int:
+        return max(0, self.get_int("MEDIA_IMAGE_CACHE_MAX_BYTES", 1024 * 1024 * 1024))
+
     # ------------------------------------------------------------------
     # Upload configuration
     # ------------------------------------------------------------------
@@ -773,6 +869,10 @@ class ApplicationSettings:
     def upload_max_size(self) -> int:
         return self.get_int("MEDIA_UPLOAD_MAX_SIZE_BYTES", 100 * 1024 * 1024)
 
+    @property
+    def upload_resumable_max_size(self) -> int:
+        return self.get_int("MEDIA_UPLOAD_RESUMABLE_MAX_SIZE_BYTES", 16 * 1024 * 1024 * 1024)
+
     # ------------------------------------------------------------------
     # Database configuration (extended)
     # ------------------------------------------------------------------
@@ -34,10 +34,16 @@ DEFAULT_APPLICATION_SETTINGS: dict[str, object] = {
     "MEDIA_THUMBNAIL_URL_TTL_SECONDS": 600,
     "MEDIA_PLAYBACK_URL_TTL_SECONDS": 600,
     "MEDIA_ORIGINAL_URL_TTL_SECONDS": 600,
+    # 画像派生（任意幅・形式）の署名付き URL の有効期間。URL ごとに内容が不変のため長めにする
+    "MEDIA_IMAGE_URL_TTL_SECONDS": 30 * 24 * 3600,
+    # 画像派生のディスクキャッシュの上限（バイト）。超えたら最終アクセスが古い順に消す
+    "MEDIA_IMAGE_CACHE_MAX_BYTES": 1024 * 1024 * 1024,
     "MEDIA_TEMP_DIRECTORY": "/tmp/fpv_tmp",
     "MEDIA_UPLOAD_TEMP_DIRECTORY": "/app/data/tmp/upload",
     "MEDIA_UPLOAD_DESTINATION_DIRECTORY": "/app/data/uploads",
     "MEDIA_UPLOAD_MAX_SIZE_BYTES": 100 * 1024 * 1024,
+    # 再開可能（チャンク）アップロード 1 ファイルあたりの上限
+    "MEDIA_UPLOAD_RESUMABLE_MAX_SIZE_BYTES": 16 * 1024 * 1024 * 1024,
     "MEDIA_LOCAL_IMPORT_DIRECTORY": "/app/data/media/local_import",
     "MEDIA_THUMBNAILS_DIRECTORY": "/app/data/media/thumbs",
     "MEDIA_PLAYBACK_DIRECTORY": "/app/data/media/playback",
@@ -53,6 +59,42 @@ DEFAULT_APPLICATION_SETTINGS: dict[str, object] = {
     "CELERY_RESULT_BACKEND": "redis://localhost:6379/0",
     "SERVICE_ACCOUNT_SIGNING_AUDIENCE": "",
     "TRANSCODE_CRF": 20,
+    # ffmpeg 1 プロセスあたりのスレッド数（0 ならホストのコア数と同時変換数から自動決定）
+    "TRANSCODE_THREADS": 0,
+    # 同一ホストで同時に走る変換ジョブ数の想定（worker の --concurrency と揃える）
+    "TRANSCODE_MAX_PARALLEL_JOBS": 2,
+    # この秒数以上の動画は空きコアがあれば区間分割して並列エンコードする（0 で無効）
+    "TRANSCODE_SEGMENT_THRESHOLD_SECONDS": 600,
+    # std1080p の MP4 に加えて HLS（fMP4 セグメント・複数画質）も生成する
+    "TRANSCODE_HLS_ENABLED": False,
+    # ZIP を _zip へ展開せず、メンバーを originals と同じファイルシステムへ直接書き出して取り込む
+    "LOCAL_IMPORT_ZIP_STREAMING": False,
+    # ストリーミング取り込みで同時に読み出す ZIP の数
+    "LOCAL_IMPORT_ZIP_WORKERS": 2,
+    # originals の内容を SHA-256 の blob（originals/.blobs）に 1 つだけ置き、論理パスはリンクにする
+    "ORIGINALS_BLOB_STORE_ENABLED": False,
+    # 論理パスの作り方（hardlink / reflink。reflink 非対応のファイルシステムでは hardlink）
+    "ORIGINALS_BLOB_LINK_MODE": "hardlink",
+    # stat (device, inode, size, mtime) が変わらないファイルの SHA-256 を再計算しない
+    "FILE_HASH_CACHE_ENABLED": True,
+    # キャッシュミス時の読み込みバッファ（バイト）。0 は hashlib.file_digest の既定
+    "FILE_HASH_BUFFER_BYTES": 0,
+    # キャッシュミス時にファイルを mmap してハッシュを計算する
+    "FILE_HASH_USE_MMAP": False,
+    # サムネイル API で 256/512 が無いとき、API プロセス内で同期生成する
+    "THUMBNAIL_FAST_PATH_ENABLED": True,
+    # 同期生成に使うスレッド数（API プロセスごと）
+    "THUMBNAIL_FAST_PATH_WORKERS": 2,
+    # 実行中に加えて待たせる生成数。超えた分は従来どおり非同期ジョブに回す
+    "THUMBNAIL_FAST_PATH_MAX_PENDING": 8,
+    # 新しく生成するサムネイルを日付ごとの追記専用パックファイルに格納する（個別ファイルを作らない）
+    "THUMBNAIL_PACK_ENABLED": False,
+    # パックファイル 1 個の上限（バイト）。超えたら次のパックに切り替える
+    "THUMBNAIL_PACK_MAX_BYTES": 256 * 1024 * 1024,
+    # メディア削除後のファイル削除で並列に unlink するスレッド数
+    "MEDIA_DELETION_WORKERS": 4,
+    # ファイル削除タスク 1 回で処理するメディア数
+    "MEDIA_DELETION_BATCH_SIZE": 100,
     "WEBAUTHN_RP_ID": "localhost",
     "WEBAUTHN_ORIGIN": "http://localhost:5000",
     "WEBAUTHN_RP_NAME": "Nolumia",
@@ -0,0 +1,4 @@
+"""性能ベンチマークスイート（合成ライブラリ生成 + ホットパス計測）。
+
+``python -m tests.benchmarks --help`` で実行方法を表示する。詳細は README.md。
+"""
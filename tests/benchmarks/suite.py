@@ -0,0 +1,420 @@
+"""ホットパスのベンチマーク実行と JSON ベースラインの比較。
+
+計測対象:
+
+- ``media_list.*``: ``GET /api/media`` の先頭・中間・末尾ページ（OFFSET の深さ）
+- ``media_duplicates``: ``GET /api/media/duplicates``
+- ``phash``: ``calculate_perceptual_hash``（実 JPEG）
+- ``thumbs_generate``: ``thumbs_generate(force=True)``（実 JPEG → 全サイズ）
+- ``local_import.process``: ``LocalImportQueueProcessor.process``（inbox → originals）
+- ``rebuild_media_from_originals``: originals 全走査（既存はスキップ、未登録は新規登録）
+
+API は実アプリ（``create_app``）を ``TestClient`` 経由で呼ぶため、ミドルウェア・
+シリアライズを含めた応答時間になる。各計測では SQL 実行数も記録する。
+
+DB ログ（``log`` / ``worker_log`` への書き込み）は既定で外す。SQLite では計測対象の
+トランザクションとロックを取り合って待ちが混入し、結果が安定しないため。
+``db_logging=True`` で含めて計測できる（MariaDB 向け）。
+"""
+from __future__ import annotations
+
+import json
+import logging
+import math
+import os
+import platform
+import shutil
+import statistics
+import subprocess
+import time
+from contextlib import ExitStack, contextmanager
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Callable, Dict, Iterator, List, Optional
+
+import sqlalchemy as sa
+
+from tests.benchmarks.synthetic import LibraryConfig, SyntheticLibrary, generate_library
+
+SCHEMA_VERSION = 1
+PAGE_SIZE = 200
+
+_ROOT = Path(__file__).resolve().parents[2]
+
+
+@dataclass
+class SuiteConfig:
+    workdir: Path
+    database_uri: Optional[str] = None
+    library: LibraryConfig = field(default_factory=LibraryConfig)
+    repeat: int = 5
+    only: Optional[List[str]] = None
+    db_logging: bool = False
+
+
+class _QueryCounter:
+    """エンジン単位で SQL 実行数を数える。"""
+
+    def __init__(self, engine: sa.Engine) -> None:
+        self.count = 0
+        sa.event.listen(engine, "after_cursor_execute", self._on_execute)
+
+    def _on_execute(self, *_args) -> None:
+        self.count += 1
+
+
+def _summary(samples: List[float], *, items: int, queries: int) -> Dict[str, object]:
+    ordered = sorted(samples)
+    p95 = ordered[min(len(ordered) - 1, math.ceil(len(ordered) * 0.95) - 1)]
+    median = statistics.median(ordered)
+    payload: Dict[str, object] = {
+        "runs": len(ordered),
+        "items": items,
+        "minMs": round(ordered[0] * 1000, 3),
+        "medianMs": round(median * 1000, 3),
+        "p95Ms": round(p95 * 1000, 3),
+        "queriesPerRun": round(queries / len(ordered), 1),
+    }
+    if items > 1 and median > 0:
+        payload["itemsPerSecond"] = round(items / median, 2)
+    return payload
+
+
+def _measure(
+    counter: _QueryCounter, fn: Callable[[], object], *, repeat: int, items: int = 1
+) -> Dict[str, object]:
+    samples: List[float] = []
+    before = counter.count
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - started)
+    return _summary(samples, items=items, queries=counter.count - before)
+
+
+def _git_revision() -> Dict[str, object]:
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "HEAD"], cwd=_ROOT, capture_output=True, text=True, check=True
+        ).stdout.strip()
+        dirty = bool(
+            subprocess.run(
+                ["git", "status", "--porcelain", "--untracked-files=no"],
+                cwd=_ROOT, capture_output=True, text=True, check=True,
+            ).stdout.strip()
+        )
+    except (OSError, subprocess.CalledProcessError):
+        return {"commit": None, "dirty": None}
+    return {"commit": commit, "dirty": dirty}
+
+
+@contextmanager
+def _environment(workdir: Path, database_uri: str) -> Iterator[None]:
+    """計測用のディレクトリ・DB を環境変数で差し替える（終了時に復元）。"""
+
+    overrides = {
+        "DATABASE_URI": database_uri,
+        "MEDIA_ORIGINALS_DIRECTORY": str(workdir / "originals"),
+        "MEDIA_THUMBNAILS_DIRECTORY": str(workdir / "thumbs"),
+        "MEDIA_PLAYBACK_DIRECTORY": str(workdir / "playback"),
+        "MEDIA_LOCAL_IMPORT_DIRECTORY": str(workdir / "import"),
+        "MEDIA_TEMP_DIRECTORY": str(workdir / "tmp"),
+    }
+    saved = {key: os.environ.get(key) for key in overrides}
+    os.environ.update(overrides)
+    try:
+        yield
+    finally:
+        for key, value in saved.items():
+            if value is None:
+                os.environ.pop(key, None)
+            else:
+                os.environ[key] = value
+
+
+@contextmanager
+def _without_db_log_handlers() -> Iterator[None]:
+    """全ロガーから DB ログハンドラを外し、終了時に戻す。"""
+
+    from shared.kernel.logging.db_log_handler import DBLogHandler
+
+    loggers = [logging.getLogger()] + [
+        item for item in logging.Logger.manager.loggerDict.values()
+        if isinstance(item, logging.Logger)
+    ]
+    detached = []
+    for logger in loggers:
+        for handler in list(logger.handlers):
+            if isinstance(handler, DBLogHandler):
+                logger.removeHandler(handler)
+                detached.append((logger, handler))
+    try:
+        yield
+    finally:
+        for logger, handler in detached:
+            logger.addHandler(handler)
+
+
+def _prepare_database(database_uri: str) -> sa.Engine:
+    from shared.kernel.database.db import db
+
+    # create_all() の前に全モデルをメタデータへ登録する（tests/conftest.py と同じ）
+    import shared.infrastructure.models  # noqa: F401
+    import bounded_contexts.picker_import.infrastructure.picker_session  # noqa: F401
+    import bounded_contexts.photonest.infrastructure.photo_models  # noqa: F401
+    import bounded_contexts.wiki.infrastructure.wiki_models  # noqa: F401
+    import bounded_contexts.certs.infrastructure.models  # noqa: F401
+    import bounded_contexts.totp.infrastructure.totp_models  # noqa: F401
+
+    connect_args = {"check_same_thread": False} if database_uri.startswith("sqlite") else {}
+    engine = sa.create_engine(database_uri, connect_args=connect_args)
+    db.create_all(bind=engine)
+    with engine.connect() as conn:
+        existing = conn.execute(sa.text("SELECT COUNT(*) FROM media")).scalar()
+    if existing:
+        engine.dispose()
+        raise RuntimeError(
+            f"media テーブルが空ではありません（{existing} 行）。ベンチマーク専用の空の DB を指定してください。"
+        )
+    db.init_app_engine(engine)
+    return engine
+
+
+def _api_client(engine: sa.Engine):
+    from fastapi.testclient import TestClient
+    from sqlalchemy.orm import sessionmaker
+
+    from presentation.fastapi.app import create_app
+    from presentation.fastapi.dependencies.auth import get_current_principal
+    from shared.application.authenticated_principal import AuthenticatedPrincipal
+    from shared.kernel.database.session import get_db
+
+    factory = sessionmaker(bind=engine, autoflush=False, expire_on_commit=False)
+
+    def _get_db():
+        session = factory()
+        try:
+            yield session
+        finally:
+            session.close()
+
+    principal = AuthenticatedPrincipal(
+        subject_type="individual",
+        subject_id=1,
+        identifier="bench@example.com",
+        _permissions=frozenset({"media:view"}),
+    )
+    app = create_app()
+    app.dependency_overrides[get_db] = _get_db
+    app.dependency_overrides[get_current_principal] = lambda: principal
+    return TestClient(app)
+
+
+def _get_ok(client, url: str) -> None:
+    response = client.get(url)
+    if response.status_code != 200:
+        raise RuntimeError(f"GET {url} -> {response.status_code}: {response.text[:200]}")
+
+
+def _bench_api(client, counter, library: SyntheticLibrary, repeat: int) -> Dict[str, Dict]:
+    last_page = max(1, math.ceil(library.counts["media"] / PAGE_SIZE))
+    pages = {"first": 1, "middle": max(1, last_page // 2), "last": last_page}
+    results = {}
+    for name, page in pages.items():
+        url = f"/api/media?page={page}&pageSize={PAGE_SIZE}"
+        _get_ok(client, url)  # ウォームアップ
+        results[f"media_list.{name}"] = {
+            "page": page,
+            **_measure(counter, lambda url=url: _get_ok(client, url), repeat=repeat),
+        }
+    _get_ok(client, "/api/media/duplicates?limit=100")
+    results["media_duplicates"] = _measure(
+        counter, lambda: _get_ok(client, "/api/media/duplicates?limit=100"), repeat=repeat
+    )
+    return results
+
+
+def _bench_phash(counter, library: SyntheticLibrary, repeat: int) -> Dict[str, object]:
+    from bounded_contexts.photonest.domain.local_import.media_metadata import (
+        calculate_perceptual_hash,
+    )
+
+    def _run() -> None:
+        for path in library.image_paths:
+            calculate_perceptual_hash(str(path), is_video=False, duration_ms=None)
+
+    return _measure(counter, _run, repeat=repeat, items=len(library.image_paths))
+
+
+def _bench_thumbs(counter, library: SyntheticLibrary) -> Dict[str, object]:
+    from bounded_contexts.photonest.tasks.thumbs_generate import thumbs_generate
+
+    def _run() -> None:
+        for media_id in library.image_media_ids:
+            result = thumbs_generate(media_id=media_id, force=True)
+            if not result.get("ok"):
+                raise RuntimeError(f"thumbs_generate failed for media {media_id}: {result}")
+
+    # サムネイル生成は 1 回が重いため繰り返さない
+    return _measure(counter, _run, repeat=1, items=len(library.image_media_ids))
+
+
+def _bench_local_import(counter, library: SyntheticLibrary, workdir: Path) -> Dict[str, object]:
+    from bounded_contexts.photonest.domain.local_import.import_result import ImportTaskResult
+    from bounded_contexts.photonest.tasks.local_import import _queue_processor
+    from bounded_contexts.picker_import.infrastructure.picker_session import PickerSession
+    from shared.kernel.database.db import db
+
+    import_dir = workdir / "import"
+    if import_dir.exists():
+        shutil.rmtree(import_dir)
+    shutil.copytree(library.inbox_dir, import_dir)
+    files = sorted(str(path) for path in import_dir.iterdir())
+
+    session = PickerSession(status="processing", session_id="local_import_benchmark")
+    db.session.add(session)
+    db.session.commit()
+    _queue_processor.enqueue(
+        session, files, active_session_id=session.session_id, celery_task_id=None
+    )
+    result = ImportTaskResult(session_id=session.session_id)
+
+    summary = _measure(
+        counter,
+        lambda: _queue_processor.process(
+            session,
+            import_dir=str(import_dir),
+            originals_dir=str(library.originals_dir),
+            result=result,
+            active_session_id=session.session_id,
+            celery_task_id=None,
+        ),
+        repeat=1,
+        items=len(files),
+    )
+    summary["imported"] = result.success
+    summary["failed"] = result.failed
+    return summary
+
+
+def _bench_rebuild(counter, library: SyntheticLibrary) -> Dict[str, object]:
+    from bounded_contexts.photonest.tasks.local_import import rebuild_media_from_originals
+
+    stats: Dict[str, int] = {}
+
+    def _run() -> None:
+        stats.update(rebuild_media_from_originals(originals_dir=str(library.originals_dir)))
+
+    summary = _measure(counter, _run, repeat=1, items=library.config.orphans)
+    summary.update({key: stats.get(key, 0) for key in ("scanned", "created", "skipped", "errors")})
+    return summary
+
+
+def run_suite(config: SuiteConfig) -> Dict[str, object]:
+    """合成ライブラリを生成して全ベンチマークを実行し、結果を辞書で返す。"""
+
+    workdir = config.workdir
+    workdir.mkdir(parents=True, exist_ok=True)
+    database_uri = config.database_uri or f"sqlite:///{workdir / 'bench.db'}"
+
+    def _enabled(name: str) -> bool:
+        return not config.only or any(name.startswith(prefix) for prefix in config.only)
+
+    with _environment(workdir, database_uri):
+        engine = _prepare_database(database_uri)
+        try:
+            started = time.perf_counter()
+            library = generate_library(engine, workdir, config.library)
+            generation_seconds = time.perf_counter() - started
+
+            # モジュール読み込み時に装着されるログハンドラも外せるよう先に読み込む
+            import bounded_contexts.photonest.tasks.local_import  # noqa: F401
+            import bounded_contexts.photonest.tasks.thumbs_generate  # noqa: F401
+
+            client = _api_client(engine)
+            counter = _QueryCounter(engine)
+            benchmarks: Dict[str, object] = {}
+            with ExitStack() as stack:
+                if not config.db_logging:
+                    stack.enter_context(_without_db_log_handlers())
+                if _enabled("media_list") or _enabled("media_duplicates"):
+                    benchmarks.update(
+                        {
+                            name: value
+                            for name, value in _bench_api(client, counter, library, config.repeat).items()
+                            if _enabled(name)
+                        }
+                    )
+                if _enabled("phash"):
+                    benchmarks["phash"] = _bench_phash(counter, library, config.repeat)
+                if _enabled("thumbs_generate"):
+                    benchmarks["thumbs_generate"] = _bench_thumbs(counter, library)
+                if _enabled("local_import.process"):
+                    benchmarks["local_import.process"] = _bench_local_import(counter, library, workdir)
+                if _enabled("rebuild_media_from_originals"):
+                    benchmarks["rebuild_media_from_originals"] = _bench_rebuild(counter, library)
+        finally:
+            from shared.kernel.database.db import db
+
+            db.session.remove()
+            engine.dispose()
+
+    return {
+        "schema": SCHEMA_VERSION,
+        "createdAt": datetime.now(timezone.utc).isoformat().replace("+00:00", "Z"),
+        "git": _git_revision(),
+        "environment": {
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "machine": platform.machine(),
+            "cpuCount": os.cpu_count(),
+            "database": sa.engine.make_url(database_uri).get_backend_name(),
+            "dbLogging": config.db_logging,
+        },
+        "library": {**library.describe(), "generationSeconds": round(generation_seconds, 3)},
+        "repeat": config.repeat,
+        "benchmarks": benchmarks,
+    }
+
+
+@dataclass
+class Comparison:
+    name: str
+    baseline_ms: float
+    current_ms: float
+
+    @property
+    def ratio(self) -> float:
+        return self.current_ms / self.baseline_ms if self.baseline_ms else math.inf
+
+
+def compare(current: Dict, baseline: Dict) -> List[Comparison]:
+    """両方に存在するベンチマークの中央値を突き合わせる。"""
+
+    rows = []
+    for name, result in sorted(current.get("benchmarks", {}).items()):
+        base = baseline.get("benchmarks", {}).get(name)
+        if not base:
+            continue
+        rows.append(Comparison(name, float(base["medianMs"]), float(result["medianMs"])))
+    return rows
+
+
+def load_results(path: Path) -> Dict:
+    return json.loads(path.read_text(encoding="utf-8"))
+
+
+def write_results(path: Path, results: Dict) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps(results, ensure_ascii=False, indent=2) + "\n", encoding="utf-8")
+
+
+__all__ = [
+    "Comparison",
+    "SuiteConfig",
+    "compare",
+    "load_results",
+    "run_suite",
+    "write_results",
+]
@@ -0,0 +1,264 @@
+"""ベンチマーク用の合成ライブラリ生成。
+
+``seed`` が同じなら同じ行・同じファイルを生成する（再現性のある比較のため）。
+
+- DB: ``media`` を N 行（約 1 割が動画 + ``media_playback``）、タグ・アルバム・
+  完全重複（同一 sha256）と類似（同一 pHash）のグループを含めて一括 INSERT する。
+- ファイル: 先頭の写真 ``image_count`` 件に対応する実 JPEG を originals に置く
+  （サムネイル生成・pHash 計測用）。DB に行の無い originals ファイル
+  （``rebuild_media_from_originals`` の新規登録対象）と、取り込み inbox の
+  ファイル（``LocalImportQueueProcessor.process`` 用）も生成する。
+- 動画ファイルは ffmpeg がある場合のみ生成する。
+"""
+from __future__ import annotations
+
+import hashlib
+import random
+import shutil
+import subprocess
+from dataclasses import asdict, dataclass
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Dict, List
+
+import sqlalchemy as sa
+from PIL import Image, ImageDraw
+
+_INSERT_CHUNK = 1000
+_TAG_ATTRS = ("thing", "person", "place", "event", "scene", "activity")
+_CAMERAS = (("Apple", "iPhone 15"), ("SONY", "ILCE-7M4"), ("FUJIFILM", "X-T5"), (None, None))
+_EPOCH = datetime(2015, 1, 1)
+_SPAN_SECONDS = 10 * 365 * 24 * 3600
+
+ORPHAN_DIRNAME = "rebuild"
+
+
+@dataclass
+class LibraryConfig:
+    media: int = 2000
+    images: int = 20
+    videos: int = 2
+    orphans: int = 20
+    inbox: int = 10
+    tags: int = 50
+    seed: int = 42
+
+
+@dataclass
+class SyntheticLibrary:
+    config: LibraryConfig
+    originals_dir: Path
+    inbox_dir: Path
+    image_media_ids: List[int]
+    image_paths: List[Path]
+    video_files: int
+    counts: Dict[str, int]
+
+    def describe(self) -> Dict[str, object]:
+        return {**asdict(self.config), "videoFiles": self.video_files, "rows": self.counts}
+
+
+def _write_image(path: Path, rng: random.Random, size=(1600, 1200)) -> None:
+    """ランダムな図形を描いた JPEG（pHash が互いに異なる程度の内容）を書き出す。"""
+
+    path.parent.mkdir(parents=True, exist_ok=True)
+    image = Image.new("RGB", size, tuple(rng.randrange(256) for _ in range(3)))
+    draw = ImageDraw.Draw(image)
+    for _ in range(24):
+        x0, y0 = rng.randrange(size[0]), rng.randrange(size[1])
+        x1, y1 = x0 + rng.randrange(50, 600), y0 + rng.randrange(50, 600)
+        fill = tuple(rng.randrange(256) for _ in range(3))
+        if rng.random() < 0.5:
+            draw.rectangle((x0, y0, x1, y1), fill=fill)
+        else:
+            draw.ellipse((x0, y0, x1, y1), fill=fill)
+    image.save(path, "JPEG", quality=85)
+    image.close()
+
+
+def _write_video(path: Path, index: int) -> bool:
+    ffmpeg = shutil.which("ffmpeg")
+    if not ffmpeg:
+        return False
+    path.parent.mkdir(parents=True, exist_ok=True)
+    completed = subprocess.run(
+        [
+            ffmpeg, "-hide_banner", "-loglevel", "error", "-y",
+            "-f", "lavfi", "-i", f"testsrc=size=1280x720:rate=30:duration=3,hue=h={index * 37 % 360}",
+            "-c:v", "libx264", "-pix_fmt", "yuv420p", str(path),
+        ],
+        check=False,
+    )
+    return completed.returncode == 0
+
+
+def _rel_path(shot_at: datetime, index: int, suffix: str) -> str:
+    return f"{shot_at:%Y/%m/%d}/{shot_at:%Y%m%d_%H%M%S}_bench_{index:07d}{suffix}"
+
+
+def _insert(conn, table, rows: List[dict]) -> None:
+    for start in range(0, len(rows), _INSERT_CHUNK):
+        conn.execute(table.insert(), rows[start:start + _INSERT_CHUNK])
+
+
+def generate_library(engine: sa.Engine, workdir: Path, config: LibraryConfig) -> SyntheticLibrary:
+    """合成ライブラリを ``engine`` の DB と ``workdir`` 配下に生成する。"""
+
+    from bounded_contexts.photonest.infrastructure.photo_models import (
+        Album,
+        Media,
+        MediaPlayback,
+        Tag,
+        album_item,
+        media_tag,
+    )
+
+    rng = random.Random(config.seed)
+    originals_dir = workdir / "originals"
+    inbox_dir = workdir / "inbox"
+    originals_dir.mkdir(parents=True, exist_ok=True)
+    inbox_dir.mkdir(parents=True, exist_ok=True)
+    now = datetime.now(timezone.utc)
+
+    media_rows: List[dict] = []
+    playback_rows: List[dict] = []
+    image_paths: List[Path] = []
+    image_ids: List[int] = []
+    video_files = 0
+    exact_source: List[tuple] = []
+    similar_source: List[str] = []
+
+    for index in range(1, config.media + 1):
+        shot_at = _EPOCH + timedelta(seconds=rng.randrange(_SPAN_SECONDS))
+        is_video = rng.random() < 0.1
+        make, model = rng.choice(_CAMERAS)
+        digest = hashlib.sha256(f"{config.seed}:{index}".encode()).hexdigest()
+        phash = f"{rng.getrandbits(64):016x}"
+        size = rng.randrange(500_000, 8_000_000)
+        # 約 2% を既存行の完全重複、約 3% を類似（同一 pHash）にする
+        roll = rng.random()
+        if exact_source and roll < 0.02:
+            digest, size = rng.choice(exact_source)
+        elif similar_source and roll < 0.05:
+            phash = rng.choice(similar_source)
+        if len(exact_source) < 500:
+            exact_source.append((digest, size))
+            similar_source.append(phash)
+
+        suffix = ".mp4" if is_video else ".jpg"
+        media_rows.append(
+            {
+                "id": index,
+                "source_type": "local",
+                "local_rel_path": _rel_path(shot_at, index, suffix),
+                "filename": f"bench_{index:07d}{suffix}",
+                "hash_sha256": digest,
+                "phash": phash,
+                "bytes": size,
+                "mime_type": "video/mp4" if is_video else "image/jpeg",
+                "width": 1920 if is_video else 4032,
+                "height": 1080 if is_video else 3024,
+                "duration_ms": rng.randrange(2_000, 120_000) if is_video else None,
+                "is_video": is_video,
+                "shot_at": shot_at,
+                "camera_make": make,
+                "camera_model": model,
+                "imported_at": now,
+                "is_deleted": rng.random() < 0.01,
+                "has_playback": is_video,
+                "created_at": now,
+                "updated_at": now,
+            }
+        )
+        if is_video:
+            playback_rows.append(
+                {
+                    "media_id": index,
+                    "preset": "std1080p",
+                    "rel_path": _rel_path(shot_at, index, ".mp4"),
+                    "poster_rel_path": _rel_path(shot_at, index, ".jpg"),
+                    "status": "done",
+                    "created_at": now,
+                    "updated_at": now,
+                }
+            )
+            if video_files < config.videos and _write_video(
+                originals_dir / media_rows[-1]["local_rel_path"], index
+            ):
+                video_files += 1
+        elif len(image_paths) < config.images and not media_rows[-1]["is_deleted"]:
+            path = originals_dir / media_rows[-1]["local_rel_path"]
+            _write_image(path, rng)
+            image_paths.append(path)
+            image_ids.append(index)
+
+    tag_rows = [
+        {
+            "id": tag_id,
+            "name": f"tag-{tag_id:03d}",
+            "attr": _TAG_ATTRS[tag_id % len(_TAG_ATTRS)],
+            "created_at": now,
+            "updated_at": now,
+        }
+        for tag_id in range(1, config.tags + 1)
+    ]
+    media_tag_rows = [
+        {"media_id": row["id"], "tag_id": tag_id}
+        for row in media_rows
+        for tag_id in rng.sample(range(1, config.tags + 1), k=min(config.tags, rng.randrange(4)))
+    ]
+
+    album_count = max(3, config.media // 500)
+    album_rows = [
+        {
+            "id": album_id,
+            "name": f"Album {album_id}",
+            "visibility": "private",
+            "display_order": album_id,
+            "created_at": now,
+            "updated_at": now,
+        }
+        for album_id in range(1, album_count + 1)
+    ]
+    album_item_rows = []
+    for album in album_rows:
+        members = rng.sample(range(1, config.media + 1), k=min(config.media, 200))
+        album_item_rows.extend(
+            {"album_id": album["id"], "media_id": media_id, "sort_index": position}
+            for position, media_id in enumerate(members)
+        )
+        album["media_count"] = len(members)
+        album["cover_media_id"] = members[0] if members else None
+
+    with engine.begin() as conn:
+        _insert(conn, Media.__table__, media_rows)
+        _insert(conn, MediaPlayback.__table__, playback_rows)
+        _insert(conn, Tag.__table__, tag_rows)
+        _insert(conn, media_tag, media_tag_rows)
+        _insert(conn, Album.__table__, album_rows)
+        _insert(conn, album_item, album_item_rows)
+
+    for index in range(config.orphans):
+        _write_image(originals_dir / ORPHAN_DIRNAME / f"orphan_{index:05d}.jpg", rng, size=(1024, 768))
+    for index in range(config.inbox):
+        _write_image(inbox_dir / f"inbox_{index:05d}.jpg", rng, size=(1024, 768))
+
+    return SyntheticLibrary(
+        config=config,
+        originals_dir=originals_dir,
+        inbox_dir=inbox_dir,
+        image_media_ids=image_ids,
+        image_paths=image_paths,
+        video_files=video_files,
+        counts={
+            "media": len(media_rows),
+            "playbacks": len(playback_rows),
+            "tags": len(tag_rows),
+            "mediaTags": len(media_tag_rows),
+            "albums": len(album_rows),
+            "albumItems": len(album_item_rows),
+        },
+    )
+
+
+__all__ = ["LibraryConfig", "SyntheticLibrary", "generate_library", "ORPHAN_DIRNAME"]
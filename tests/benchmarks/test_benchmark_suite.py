@@ -0,0 +1,71 @@
+"""ベンチマークスイートが最小構成で最後まで動くことの確認（計測値は検証しない）。
+
+スイートはグローバルな DB セッションや環境変数を差し替えるため、別プロセスで実行する。
+"""
+
+from __future__ import annotations
+
+import json
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+pytestmark = pytest.mark.integration
+
+ROOT = Path(__file__).resolve().parents[2]
+
+EXPECTED_BENCHMARKS = {
+    "media_list.first",
+    "media_list.middle",
+    "media_list.last",
+    "media_duplicates",
+    "phash",
+    "thumbs_generate",
+    "local_import.process",
+    "rebuild_media_from_originals",
+}
+
+
+def _run(tmp_path: Path, *extra: str) -> subprocess.CompletedProcess:
+    return subprocess.run(
+        [
+            sys.executable, "-m", "tests.benchmarks",
+            "--media", "450", "--images", "1", "--videos", "0",
+            "--orphans", "2", "--inbox", "1", "--repeat", "1",
+            "--workdir", str(tmp_path / "work"),
+            *extra,
+        ],
+        cwd=ROOT,
+        capture_output=True,
+        text=True,
+        timeout=300,
+    )
+
+
+def test_suite_writes_results_and_compares_with_baseline(tmp_path):
+    output = tmp_path / "results.json"
+    completed = _run(tmp_path, "--output", str(output))
+    assert completed.returncode == 0, completed.stderr[-2000:]
+
+    results = json.loads(output.read_text())
+    assert set(results["benchmarks"]) == EXPECTED_BENCHMARKS
+    assert results["library"]["rows"]["media"] == 450
+    assert results["benchmarks"]["media_list.last"]["page"] == 3
+    assert results["benchmarks"]["local_import.process"]["imported"] == 1
+    rebuild = results["benchmarks"]["rebuild_media_from_originals"]
+    assert rebuild["created"] == 2 and rebuild["errors"] == 0
+
+    # 桁違いに速いベースラインとの比較は回帰として失敗する
+    baseline = dict(results)
+    baseline["benchmarks"] = {
+        "media_duplicates": {**results["benchmarks"]["media_duplicates"], "medianMs": 0.001}
+    }
+    baseline_path = tmp_path / "baseline.json"
+    baseline_path.write_text(json.dumps(baseline))
+    compared = _run(
+        tmp_path / "second", "--only", "media_duplicates", "--compare", str(baseline_path)
+    )
+    assert compared.returncode == 1, compared.stderr[-2000:]
+    assert "REGRESSION" in compared.stdout
@@ -52,7 +52,8 @@ def logs_client(tmp_path, monkeypatch) -> TestClient:
             sa.text(
                 "INSERT INTO log (level, event, message, trace, path, request_id, created_at) "
                 "VALUES (:level, :event, :message, :trace, :path, :request_id, :created_at)"
-            ),
+                # アプリと同じ DateTime 型で保存する（キーセットの比較が文字列で行われるため）
+            ).bindparams(sa.bindparam("created_at", type_=sa.DateTime())),
             [
                 {
                     "level": "INFO",
@@ -192,6 +193,65 @@ def test_logs_filter_by_message_and_trace_id(logs_client: TestClient) -> None:
     assert [log["event"] for log in resp.json()["logs"]] == ["auth.denied"]
 
 
+@pytest.mark.integration
+def test_logs_event_prefix_and_multi_word_search(logs_client: TestClient) -> None:
+    headers = _admin_headers(logs_client)
+
+    def _events(**params) -> list[str]:
+        resp = logs_client.get("/api/admin/logs", headers=headers, params=params)
+        assert resp.status_code == 200, resp.text
+        return [log["event"] for log in resp.json()["logs"]]
+
+    # イベント名は前方一致（途中一致はしない・LIKE のワイルドカードは文字として扱う）
+    assert _events(event="request.") == ["request.failed", "request.completed"]
+    assert _events(event="failed") == []
+    assert _events(event="request%") == []
+    # 本文検索は空白区切りの語をすべて含むもの（イベント名・パスも対象）
+    assert _events(q="boom failure") == ["request.failed"]
+    assert _events(q="permission /api/admin") == ["auth.denied"]
+    assert _events(q="boom denied") == []
+
+
+@pytest.mark.integration
+def test_logs_keyset_pagination_with_cursor(logs_client: TestClient) -> None:
+    headers = _admin_headers(logs_client)
+
+    first = logs_client.get("/api/admin/logs", headers=headers, params={"pageSize": 2}).json()
+    assert [log["event"] for log in first["logs"]] == ["auth.denied", "request.failed"]
+    cursor = first["pagination"]["nextCursor"]
+    assert cursor
+
+    second = logs_client.get(
+        "/api/admin/logs", headers=headers, params={"pageSize": 2, "cursor": cursor}
+    ).json()
+    assert [log["event"] for log in second["logs"]] == ["request.completed"]
+    assert second["pagination"]["hasNext"] is False
+    assert second["pagination"]["nextCursor"] is None
+
+    resp = logs_client.get("/api/admin/logs", headers=headers, params={"cursor": "!!"})
+    assert resp.status_code == 400
+    assert resp.json()["detail"]["error"] == "invalid_cursor"
+
+
+@pytest.mark.integration
+def test_logs_relevance_sort_falls_back_to_newest_without_fulltext(
+    logs_client: TestClient,
+) -> None:
+    headers = _admin_headers(logs_client)
+    resp = logs_client.get(
+        "/api/admin/logs", headers=headers, params={"q": "api", "sort": "relevance"}
+    )
+    assert resp.status_code == 200, resp.text
+    assert [log["event"] for log in resp.json()["logs"]] == [
+        "auth.denied",
+        "request.failed",
+        "request.completed",
+    ]
+
+    resp = logs_client.get("/api/admin/logs", headers=headers, params={"sort": "oldest"})
+    assert resp.status_code == 400
+
+
 @pytest.mark.integration
 def test_worker_logs_source_and_task_uuid_filter(logs_client: TestClient) -> None:
     headers = _admin_headers(logs_client)
@@ -303,6 +363,124 @@ def test_export_worker_source(logs_client: TestClient) -> None:
     assert body["logs"][0]["taskName"] == "transcode.video"
 
 
+@pytest.mark.integration
+def test_export_ndjson_streams_every_row_and_resumes_from_cursor(
+    logs_client: TestClient, monkeypatch
+) -> None:
+    import json
+
+    from presentation.fastapi.routers.admin import logs as logs_router
+
+    # バッチ境界をまたぐキーセットの読み進めも確認する
+    monkeypatch.setattr(logs_router, "_EXPORT_BATCH", 2)
+    monkeypatch.setattr(logs_router, "_EXPORT_YIELD_PER", 1)
+    headers = _admin_headers(logs_client)
+    resp = logs_client.get(
+        "/api/admin/logs/export", headers=headers, params={"format": "ndjson"}
+    )
+    assert resp.status_code == 200, resp.text
+    assert resp.headers["content-type"].startswith("application/x-ndjson")
+    assert ".ndjson" in resp.headers["content-disposition"]
+    lines = [json.loads(line) for line in resp.text.splitlines()]
+    assert [line["event"] for line in lines] == [
+        "auth.denied",
+        "request.failed",
+        "request.completed",
+    ]
+    assert lines[1]["trace"].startswith("Traceback")
+
+    # 途中で切れた場合は受信済みの最終行の cursor から再開する
+    resumed = logs_client.get(
+        "/api/admin/logs/export",
+        headers=headers,
+        params={"format": "ndjson", "cursor": lines[0]["cursor"]},
+    )
+    assert [json.loads(line)["event"] for line in resumed.text.splitlines()] == [
+        "request.failed",
+        "request.completed",
+    ]
+
+
+@pytest.mark.integration
+def test_export_ndjson_does_not_use_the_request_session(logs_client: TestClient) -> None:
+    """リクエストのセッションを返してから流し、その後処理とも干渉しない。"""
+    import asyncio
+    import json
+    import os
+
+    from sqlalchemy.orm import Session
+
+    from presentation.fastapi.routers.admin import logs as logs_router
+    from shared.application.authenticated_principal import AuthenticatedPrincipal
+
+    principal = AuthenticatedPrincipal(
+        subject_type="individual",
+        subject_id=1,
+        identifier="admin@example.com",
+        _permissions=frozenset({"admin:system-settings"}),
+    )
+    engine = sa.create_engine(os.environ["DATABASE_URI"])
+    request_db = Session(bind=engine)
+    # 認証（get_current_principal）が同じセッションで接続を使った状態
+    request_db.execute(sa.text("SELECT 1"))
+
+    async def _export_then_teardown() -> list[str]:
+        resp = await logs_router.export_logs(
+            source="app", ids=None, level=None, event=None, q=None, traceId=None,
+            since=None, until=None, format="ndjson", gzip=False, cursor=None,
+            principal=principal, db=request_db,
+        )
+        # ストリームの間、リクエストのセッションは接続を握らない
+        assert not request_db.in_transaction()
+        # FastAPI 0.106–0.117 は yield 依存の後処理を本文の送出前に行う
+        request_db.close()
+
+        def _closed(*args, **kwargs):
+            raise AssertionError("request session used after teardown")
+
+        request_db.execute = _closed
+        return [chunk async for chunk in resp.body_iterator]
+
+    try:
+        chunks = asyncio.run(_export_then_teardown())
+    finally:
+        engine.dispose()
+
+    lines = [json.loads(line) for line in "".join(chunks).splitlines()]
+    assert [line["event"] for line in lines] == [
+        "auth.denied",
+        "request.failed",
+        "request.completed",
+    ]
+
+
+@pytest.mark.integration
+def test_export_ndjson_gzip_and_filters(logs_client: TestClient) -> None:
+    import gzip
+    import json
+
+    headers = _admin_headers(logs_client)
+    resp = logs_client.get(
+        "/api/admin/logs/export",
+        headers=headers,
+        params={"format": "ndjson", "gzip": "true", "source": "worker", "level": "error"},
+    )
+    assert resp.status_code == 200, resp.text
+    assert resp.headers["content-type"] == "application/gzip"
+    lines = gzip.decompress(resp.content).decode("utf-8").splitlines()
+    assert [json.loads(line)["taskName"] for line in lines] == ["transcode.video"]
+
+    empty = logs_client.get(
+        "/api/admin/logs/export", headers=headers, params={"format": "ndjson", "ids": "abc"}
+    )
+    assert empty.status_code == 200 and empty.text == ""
+
+    resp = logs_client.get(
+        "/api/admin/logs/export", headers=headers, params={"format": "csv"}
+    )
+    assert resp.status_code == 400
+
+
 @pytest.mark.integration
 def test_export_invalid_source_rejected(logs_client: TestClient) -> None:
     headers = _admin_headers(logs_client)
@@ -310,3 +488,54 @@ def test_export_invalid_source_rejected(logs_client: TestClient) -> None:
         "/api/admin/logs/export", headers=headers, params={"source": "nope"}
     )
     assert resp.status_code == 400
+
+
+@pytest.mark.integration
+def test_profile_flag_is_honoured_only_for_admins(logs_client: TestClient) -> None:
+    resp = logs_client.get("/api/admin/logs", headers={"X-Profile": "1"})
+    assert resp.status_code == 401
+    assert "X-Profile-Id" not in resp.headers
+
+    headers = _admin_headers(logs_client)
+    resp = logs_client.get("/api/admin/logs", headers=headers, params={"__profile": "1"})
+    assert resp.status_code == 200, resp.text
+    assert resp.headers["X-Profile-Id"] == resp.headers["X-Request-ID"]
+
+
+@pytest.mark.integration
+def test_profile_download_returns_collapsed_stacks(logs_client: TestClient) -> None:
+    import json
+    import os
+
+    headers = _admin_headers(logs_client)
+    message = json.dumps({"target": "GET /api/media", "collapsed": "a;b 3\na;c 1"})
+    engine = sa.create_engine(os.environ["DATABASE_URI"])
+    with engine.begin() as conn:
+        conn.execute(
+            sa.text(
+                "INSERT INTO log (level, event, message, path, request_id, created_at) "
+                "VALUES ('INFO', 'profile.request', :message, '/api/media', 'req-prof', :at)"
+            ),
+            {"message": message, "at": datetime(2026, 7, 4, 0, 0, 0)},
+        )
+    engine.dispose()
+
+    listed = logs_client.get(
+        "/api/admin/logs", headers=headers, params={"traceId": "req-prof"}
+    ).json()["logs"]
+    assert listed[0]["hasProfile"] is True
+    log_id = listed[0]["id"]
+
+    resp = logs_client.get(f"/api/admin/logs/app/{log_id}/profile", headers=headers)
+    assert resp.status_code == 200, resp.text
+    assert resp.text == "a;b 3\na;c 1\n"
+    assert "attachment" in resp.headers["Content-Disposition"]
+
+    other = logs_client.get(
+        "/api/admin/logs", headers=headers, params={"traceId": "req-aaa"}
+    ).json()["logs"][0]
+    assert other["hasProfile"] is False
+    assert (
+        logs_client.get(f"/api/admin/logs/app/{other['id']}/profile", headers=headers).status_code
+        == 404
+    )
@@ -231,3 +231,57 @@ def test_session_callback_marks_ready(picker_client: TestClient) -> None:
     status_resp = picker_client.get(f"/api/picker/session/{SESSION_UUID}", headers=headers)
     assert status_resp.status_code == 200
     assert status_resp.json()["mediaItemsSet"] is True
+
+
+@pytest.mark.integration
+def test_session_events_without_redis_sends_snapshot_and_retry(
+    picker_client: TestClient, monkeypatch
+) -> None:
+    """Redis 未設定時の SSE はスナップショット 1 件と再接続間隔を返して閉じる。"""
+    monkeypatch.delenv("REDIS_URL", raising=False)
+    headers = _auth_headers(picker_client)
+    resp = picker_client.get("/api/local-import/sessions/1/events", headers=headers)
+    assert resp.status_code == 200, resp.text
+    assert resp.headers["content-type"].startswith("text/event-stream")
+
+    lines = resp.text.splitlines()
+    assert lines[0].startswith("retry: ")
+    assert "event: progress" in lines
+    data = json.loads(next(line for line in lines if line.startswith("data: "))[6:])
+    assert data["session_id"] == 1
+    assert data["state"] == "processing"
+    assert data["counts"] == {"imported": 1, "dup": 1}
+
+
+@pytest.mark.integration
+def test_session_events_release_the_db_connection_before_streaming(
+    picker_client: TestClient, monkeypatch
+) -> None:
+    """SSE の本文を送る間は、リクエストの DB セッションが接続を握っていない。"""
+    from presentation.fastapi.routers import local_import_status
+    from sqlalchemy.orm import Session
+
+    monkeypatch.delenv("REDIS_URL", raising=False)
+    headers = _auth_headers(picker_client)
+    sessions: list[Session] = []
+    original_init = Session.__init__
+
+    def _tracking_init(self, *args, **kwargs):
+        original_init(self, *args, **kwargs)
+        sessions.append(self)
+
+    held: list[bool] = []
+    original_event = local_import_status._sse_event
+
+    def _recording_event(payload: dict) -> str:
+        held.extend(session.in_transaction() for session in sessions)
+        return original_event(payload)
+
+    monkeypatch.setattr(Session, "__init__", _tracking_init)
+    monkeypatch.setattr(local_import_status, "_sse_event", _recording_event)
+
+    resp = picker_client.get("/api/local-import/sessions/1/events", headers=headers)
+
+    assert resp.status_code == 200, resp.text
+    assert sessions and held
+    assert not any(held)
@@ -0,0 +1,145 @@
+"""再開可能（チャンク）アップロードのユニットテスト."""
+
+from __future__ import annotations
+
+import hashlib
+import json
+from pathlib import Path
+
+import pytest
+
+from shared.application import resumable_upload, upload_service
+from shared.application.resumable_upload import (
+    ResumableUploadNotFoundError,
+    UploadChecksumMismatchError,
+    UploadOffsetError,
+    create_resumable_upload,
+    get_resumable_upload,
+    open_chunk,
+)
+
+PAYLOAD = bytes(range(256)) * 40  # 10 KiB
+
+
+@pytest.fixture(autouse=True)
+def _tmp_upload_dir(tmp_path: Path, monkeypatch):
+    monkeypatch.setattr(upload_service, "_tmp_base_dir", lambda: tmp_path)
+    monkeypatch.setattr(resumable_upload, "_tmp_base_dir", lambda: tmp_path)
+    monkeypatch.setattr(resumable_upload, "_max_resumable_size", lambda: 1024 * 1024)
+    resumable_upload._hashers.clear()
+    return tmp_path
+
+
+def _send(upload_id: str, offset: int, data: bytes, *, owner_id: int = 1):
+    writer = open_chunk(upload_id, offset=offset, owner_id=owner_id)
+    for start in range(0, len(data), 1000):
+        writer.write(data[start:start + 1000])
+    return writer.commit()
+
+
+def test_out_of_order_chunks_complete_into_prepared_upload(tmp_path: Path) -> None:
+    upload = create_resumable_upload(
+        session_id="sess", owner_id=1, file_name="clip.mp4", length=len(PAYLOAD)
+    )
+
+    state = _send(upload.upload_id, 4096, PAYLOAD[4096:8192])
+    assert state.offset == 0
+    assert state.missing_ranges() == [(0, 4096), (8192, len(PAYLOAD))]
+
+    state = _send(upload.upload_id, 0, PAYLOAD[:4096])
+    assert state.offset == 8192
+    assert state.temp_file_id is None
+
+    state = _send(upload.upload_id, 8192, PAYLOAD[8192:])
+    digest = hashlib.sha256(PAYLOAD).hexdigest()
+    assert state.sha256 == digest
+    assert state.temp_file_id is not None
+
+    prepared = tmp_path / "sess" / state.temp_file_id
+    assert prepared.read_bytes() == PAYLOAD
+    metadata = json.loads((tmp_path / "sess" / f"{state.temp_file_id}.json").read_text())
+    assert metadata["hash_sha256"] == digest
+    assert metadata["file_size"] == len(PAYLOAD)
+
+
+def test_commit_reuses_hash_computed_during_upload(tmp_path: Path, monkeypatch) -> None:
+    upload = create_resumable_upload(
+        session_id="sess", owner_id=1, file_name="clip.mp4", length=len(PAYLOAD)
+    )
+    state = _send(upload.upload_id, 0, PAYLOAD)
+
+    def _fail(path):  # pragma: no cover - 呼ばれたらテスト失敗
+        raise AssertionError("hash should not be recomputed")
+
+    monkeypatch.setattr(upload_service, "_calculate_sha256", _fail)
+    results = upload_service.commit_uploads_to_directory(
+        "sess", [state.temp_file_id], tmp_path / "dest"
+    )
+
+    assert results[0]["status"] == "success"
+    assert results[0]["hashSha256"] == state.sha256
+
+
+def test_declared_hash_mismatch_discards_upload() -> None:
+    upload = create_resumable_upload(
+        session_id="sess",
+        owner_id=1,
+        file_name="photo.jpg",
+        length=len(PAYLOAD),
+        expected_sha256="0" * 64,
+    )
+
+    with pytest.raises(UploadChecksumMismatchError):
+        _send(upload.upload_id, 0, PAYLOAD)
+    with pytest.raises(ResumableUploadNotFoundError):
+        get_resumable_upload(upload.upload_id, owner_id=1)
+
+
+def test_chunk_beyond_length_and_foreign_owner_are_rejected() -> None:
+    upload = create_resumable_upload(
+        session_id="sess", owner_id=1, file_name="photo.jpg", length=10
+    )
+
+    writer = open_chunk(upload.upload_id, offset=5, owner_id=1)
+    with pytest.raises(UploadOffsetError):
+        writer.write(b"0123456789")
+    writer.close()
+
+    with pytest.raises(ResumableUploadNotFoundError):
+        open_chunk(upload.upload_id, offset=0, owner_id=2)
+
+
+def test_patch_endpoint_does_file_work_off_the_event_loop(monkeypatch) -> None:
+    import asyncio
+    from types import SimpleNamespace
+
+    from fastapi import Response
+
+    from presentation.fastapi.routers import upload as upload_router
+
+    calls: list[str] = []
+
+    async def _recording_threadpool(func, *args, **kwargs):
+        calls.append(func.__name__)
+        return func(*args, **kwargs)
+
+    async def _body():
+        for start in range(0, 4096, 1000):
+            yield PAYLOAD[start:min(start + 1000, 4096)]
+
+    monkeypatch.setattr(upload_router, "run_in_threadpool", _recording_threadpool)
+    monkeypatch.setattr(upload_router, "_RESUMABLE_WRITE_BUFFER", 2048)
+    upload = create_resumable_upload(
+        session_id="sess", owner_id=1, file_name="clip.mp4", length=len(PAYLOAD)
+    )
+    request = SimpleNamespace(headers={"Upload-Offset": "0"}, stream=_body)
+
+    result = asyncio.run(
+        upload_router.api_upload_resumable_patch(
+            upload.upload_id, request, Response(), principal=SimpleNamespace(id=1), db=None
+        )
+    )
+
+    assert result["offset"] == 4096
+    # 本文はまとめて書き込み、ファイル操作はすべてスレッドプールで行う
+    assert calls == ["open_chunk", "write", "write", "commit"]
@@ -52,6 +52,7 @@ class FakeAlbumRepository(AlbumRepository):
         self.committed = False
         self.rolled_back = False
         self.sort_index_calls: list[tuple[int, list[int]]] = []
+        self.refreshed: list[int] = []
         self.deleted: list[object] = []
         self._next_id = 1000
 
@@ -89,6 +90,9 @@ class FakeAlbumRepository(AlbumRepository):
     def update_sort_indexes(self, album_id, media_ids):
         self.sort_index_calls.append((album_id, list(media_ids)))
 
+    def refresh_stats(self, album_id):
+        self.refreshed.append(album_id)
+
     def flush(self):
         pass
 
@@ -120,6 +124,7 @@ class TestCreate:
         assert album.cover_media_id == 20
         assert [m.id for m in album.media] == [20, 10]
         assert repo.sort_index_calls == [(1, [20, 10])]
+        assert repo.refreshed == [1]
         assert repo.committed is True
 
     def test_blank_name_is_rejected(self):
@@ -213,6 +218,7 @@ class TestReorderMedia:
         )
         assert updated is True
         assert repo.sort_index_calls == [(1, [3, 1, 2])]
+        assert repo.refreshed == [1]
         assert repo.committed is True
 
     def test_same_order_is_noop(self):
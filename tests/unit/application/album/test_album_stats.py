@@ -0,0 +1,108 @@
+"""アルバムの集計列（件数・表紙・撮影日の範囲）の更新と一覧 API のテスト。"""
+from __future__ import annotations
+
+import asyncio
+from datetime import datetime
+from types import SimpleNamespace
+
+import pytest
+
+from bounded_contexts.photonest.application.album import (
+    CreateAlbumCommand,
+    UpdateAlbumCommand,
+)
+from bounded_contexts.photonest.infrastructure.photo_models import Album, Media, album_item
+from bounded_contexts.photonest.tasks.album_stats import repair_album_stats
+from presentation.fastapi.routers import albums as albums_router
+from presentation.fastapi.routers import media as media_router
+from shared.kernel.database.db import db
+
+pytestmark = pytest.mark.integration
+
+
+def _media(day: int) -> Media:
+    media = Media(
+        source_type="local",
+        local_rel_path=f"2024/{day:02d}.jpg",
+        shot_at=datetime(2024, 1, day, 9, 0),
+        bytes=1,
+    )
+    db.session.add(media)
+    db.session.commit()
+    return media
+
+
+def _create(media_ids: list[int], **fields) -> Album:
+    service = albums_router._album_service(db.session)
+    return service.create(CreateAlbumCommand(name="Trip", media_ids=media_ids, **fields))
+
+
+@pytest.mark.usefixtures("app_context")
+def test_album_service_maintains_stats() -> None:
+    first, second, third = _media(3), _media(1), _media(7)
+
+    album = _create([first.id, second.id])
+
+    assert album.media_count == 2 and album.cover_media_id == first.id
+    assert (album.shot_at_min, album.shot_at_max) == (second.shot_at, first.shot_at)
+
+    albums_router._album_service(db.session).update(
+        UpdateAlbumCommand(album_id=album.id, media_ids=[third.id])
+    )
+    album = db.session.get(Album, album.id)
+    assert album.media_count == 1 and album.cover_media_id == third.id
+    assert album.shot_at_min == album.shot_at_max == third.shot_at
+
+
+@pytest.mark.usefixtures("app_context")
+def test_soft_delete_updates_count_and_cover() -> None:
+    cover, other = _media(2), _media(5)
+    album = _create([cover.id, other.id])
+    untouched_at = album.updated_at
+
+    media_router._soft_delete_media(cover, db.session)
+    db.session.commit()
+
+    album = db.session.get(Album, album.id)
+    assert album.media_count == 1 and album.cover_media_id == other.id
+    assert album.shot_at_min == other.shot_at
+    assert album.updated_at != untouched_at
+
+    media_router._soft_delete_media(other, db.session)
+    db.session.commit()
+    album = db.session.get(Album, album.id)
+    assert (album.media_count, album.cover_media_id, album.shot_at_min) == (0, None, None)
+
+
+@pytest.mark.usefixtures("app_context")
+def test_repair_fixes_drift_and_list_reads_columns(monkeypatch) -> None:
+    media = _media(4)
+    album = _create([media.id])
+    # 集計列を経由しない変更（手作業の SQL など）で件数がずれた状態
+    db.session.execute(album_item.delete().where(album_item.c.album_id == album.id))
+    db.session.commit()
+    assert db.session.get(Album, album.id).media_count == 1
+
+    assert repair_album_stats(batch_size=1) == {"ok": True, "checked": 1, "repaired": 1}
+    assert repair_album_stats()["repaired"] == 0
+
+    async def _no_etag(request, principal):
+        return None
+
+    monkeypatch.setattr(albums_router, "library_etag", _no_etag)
+    result = asyncio.run(
+        albums_router.api_albums_list(
+            SimpleNamespace(headers={}),
+            SimpleNamespace(headers={}),
+            q="",
+            page=1,
+            pageSize=24,
+            order="desc",
+            cursor=None,
+            principal=None,
+            db=db.session,
+        )
+    )
+    assert result["total"] == 1
+    summary = result["items"][0]
+    assert (summary["mediaCount"], summary["coverMediaId"], summary["shotAtStart"]) == (0, None, None)
@@ -0,0 +1,139 @@
+"""増分走査（マニフェスト）付き ImportDirectoryScanner のテスト."""
+from __future__ import annotations
+
+import os
+from pathlib import Path
+from unittest.mock import MagicMock
+
+import pytest
+
+from bounded_contexts.photonest.application.local_import.scanner import ImportDirectoryScanner
+from bounded_contexts.photonest.infrastructure.local_import.scan_manifest import SqliteScanManifest
+from bounded_contexts.storage.infrastructure.filesystem import LocalFilesystemStorageService
+
+
+def _scanner(tmp_path: Path, *, rescan_after_seconds: int = 3600, zip_service=None):
+    logger = MagicMock()
+    manifest_dir = tmp_path / "manifests"
+    scanner = ImportDirectoryScanner(
+        logger=logger,
+        zip_service=zip_service or MagicMock(streaming_enabled=False),
+        supported_extensions={".jpg", ".mp4"},
+        storage_service=LocalFilesystemStorageService(),
+        manifest_factory=lambda import_dir: SqliteScanManifest.for_directory(
+            manifest_dir, import_dir, rescan_after_seconds=rescan_after_seconds
+        ),
+    )
+    return scanner, logger
+
+
+def _scan(scanner: ImportDirectoryScanner, import_dir: Path) -> list[str]:
+    """走査し、キュー登録を確定した扱いでマニフェストをコミットする."""
+
+    stream = scanner.stream(str(import_dir))
+    found = list(stream)
+    stream.commit_manifest()
+    return found
+
+
+def _summary(logger: MagicMock) -> dict:
+    calls = [c for c in logger.info.call_args_list if c.args[0] == "local_import.scan.summary"]
+    assert len(calls) == 1
+    return calls[0].kwargs
+
+
+@pytest.fixture
+def import_dir(tmp_path: Path) -> Path:
+    root = tmp_path / "import"
+    (root / "nested" / "deeper").mkdir(parents=True)
+    (root / "a.jpg").write_bytes(b"a")
+    (root / "nested" / "b.MP4").write_bytes(b"b")
+    (root / "nested" / "deeper" / "c.jpg").write_bytes(b"c")
+    (root / "notes.txt").write_text("skip me")
+    return root
+
+
+def test_stream_yields_supported_files_and_logs_one_summary(tmp_path: Path, import_dir: Path) -> None:
+    scanner, logger = _scanner(tmp_path)
+
+    stream = scanner.stream(str(import_dir))
+    found = sorted(os.path.relpath(p, import_dir) for p in stream)
+
+    assert found == ["a.jpg", os.path.join("nested", "b.MP4"), os.path.join("nested", "deeper", "c.jpg")]
+    summary = _summary(logger)
+    assert summary["total"] == 3
+    assert summary["unsupported"] == 1
+    assert summary["incremental"] is True
+    assert not [c for c in logger.info.call_args_list if c.args[0] == "local_import.scan.file_added"]
+
+
+def test_second_stream_skips_unchanged_files(tmp_path: Path, import_dir: Path) -> None:
+    scanner, _ = _scanner(tmp_path)
+    _scan(scanner, import_dir)
+
+    (import_dir / "a.jpg").write_bytes(b"changed content")
+    (import_dir / "d.jpg").write_bytes(b"new")
+    stream = scanner.stream(str(import_dir))
+    found = sorted(os.path.basename(p) for p in stream)
+
+    assert found == ["a.jpg", "d.jpg"]
+    assert stream.unchanged == 2
+
+
+def test_unchanged_files_are_retried_after_rescan_interval(tmp_path: Path, import_dir: Path) -> None:
+    scanner, _ = _scanner(tmp_path, rescan_after_seconds=0)
+    _scan(scanner, import_dir)
+
+    assert len(_scan(scanner, import_dir)) == 3
+
+
+def test_removed_files_are_pruned_from_manifest(tmp_path: Path, import_dir: Path) -> None:
+    scanner, _ = _scanner(tmp_path)
+    _scan(scanner, import_dir)
+    (import_dir / "a.jpg").unlink()
+    _scan(scanner, import_dir)
+
+    # 同じ名前・内容で再投入されたファイルは新規扱いになる
+    (import_dir / "a.jpg").write_bytes(b"a")
+    assert [os.path.basename(p) for p in scanner.stream(str(import_dir))] == ["a.jpg"]
+
+
+def test_unchanged_zip_is_not_extracted_again(tmp_path: Path, import_dir: Path) -> None:
+    zip_service = MagicMock(streaming_enabled=False)
+    zip_service.extract.return_value = ["/tmp/extracted/e.jpg"]
+    (import_dir / "bundle.zip").write_bytes(b"PK")
+    scanner, _ = _scanner(tmp_path, zip_service=zip_service)
+
+    first = _scan(scanner, import_dir)
+    second = _scan(scanner, import_dir)
+
+    assert "/tmp/extracted/e.jpg" in first
+    assert second == []
+    zip_service.extract.assert_called_once()
+
+
+def test_scan_ignores_manifest(tmp_path: Path, import_dir: Path) -> None:
+    scanner, _ = _scanner(tmp_path)
+    _scan(scanner, import_dir)
+
+    assert len(scanner.scan(str(import_dir))) == 3
+
+
+def test_interrupted_or_unconfirmed_scan_does_not_record_files(
+    tmp_path: Path, import_dir: Path
+) -> None:
+    scanner, _ = _scanner(tmp_path)
+
+    # キュー登録が途中で失敗した（反復が最後まで進まなかった）走査
+    stream = scanner.stream(str(import_dir))
+    next(iter(stream))
+    stream.discard_manifest()
+    assert len(_scan(scanner, import_dir)) == 3
+
+    (import_dir / "d.jpg").write_bytes(b"new")
+    # 最後まで走査したがキュー登録をコミットできなかった走査
+    stream = scanner.stream(str(import_dir))
+    assert [os.path.basename(p) for p in stream] == ["d.jpg"]
+    stream.discard_manifest()
+
+    assert [os.path.basename(p) for p in _scan(scanner, import_dir)] == ["d.jpg"]
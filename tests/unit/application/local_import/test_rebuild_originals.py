@@ -0,0 +1,128 @@
+"""originals 再構築（バッチ登録・チェックポイント再開・並列解析）のテスト。"""
+
+from __future__ import annotations
+
+from pathlib import Path
+
+import pytest
+from PIL import Image
+
+from shared.kernel.database.db import db
+
+pytestmark = pytest.mark.integration
+
+from bounded_contexts.photonest.infrastructure.local_import.originals_rebuild import (
+    SqliteRebuildCheckpoint,
+    iter_original_files,
+)
+from bounded_contexts.photonest.infrastructure.photo_models import Media
+from bounded_contexts.photonest.tasks import local_import
+
+
+def _write_jpeg(path: Path, color: tuple) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    Image.new("RGB", (32, 24), color).save(path, "JPEG")
+
+
+@pytest.fixture
+def originals(tmp_path: Path) -> Path:
+    root = tmp_path / "originals"
+    for index, rel_path in enumerate(
+        [
+            "2024/01/a.jpg",
+            "2024/01/b.jpg",
+            "2024/02/c.jpg",
+            "2024/10/d.jpg",
+            "2025/e.JPG",
+        ]
+    ):
+        _write_jpeg(root / rel_path, (index * 40, 10, 200 - index * 30))
+    (root / "2024" / "01" / "notes.txt").write_text("skip me")
+    _write_jpeg(root / ".zip_staging" / "staged.jpg", (1, 2, 3))
+    return root
+
+
+@pytest.fixture
+def checkpoints(tmp_path: Path, monkeypatch):
+    checkpoint_dir = tmp_path / "checkpoints"
+    monkeypatch.setattr(
+        local_import,
+        "_rebuild_checkpoint_for",
+        lambda originals_dir: SqliteRebuildCheckpoint.for_directory(checkpoint_dir, originals_dir),
+    )
+    return checkpoint_dir
+
+
+def _rel_paths() -> list:
+    return sorted(path for (path,) in db.session.query(Media.local_rel_path))
+
+
+def test_iter_original_files_streams_in_path_order_and_resumes(originals: Path) -> None:
+    found = [rel for rel, _ in iter_original_files(
+        originals, extensions={".jpg"}, excluded_dirnames={".zip_staging"}
+    )]
+    assert found == ["2024/01/a.jpg", "2024/01/b.jpg", "2024/02/c.jpg", "2024/10/d.jpg", "2025/e.JPG"]
+
+    resumed = [rel for rel, _ in iter_original_files(
+        originals, extensions={".jpg"}, excluded_dirnames={".zip_staging"}, resume_after="2024/02/c.jpg"
+    )]
+    assert resumed == ["2024/10/d.jpg", "2025/e.JPG"]
+
+
+@pytest.mark.usefixtures("app_context")
+def test_rebuild_commits_in_batches_and_is_idempotent(originals: Path, checkpoints: Path, monkeypatch) -> None:
+    commits = []
+    original_commit = db.session.commit
+    monkeypatch.setattr(db.session, "commit", lambda: (commits.append(1), original_commit())[1])
+
+    stats = local_import.rebuild_media_from_originals(originals_dir=str(originals), batch_size=2)
+
+    assert stats["scanned"] == 5 and stats["created"] == 5 and stats["errors"] == 0
+    assert stats["files_per_second"] > 0
+    assert len(commits) == 3
+    assert _rel_paths() == ["2024/01/a.jpg", "2024/01/b.jpg", "2024/02/c.jpg", "2024/10/d.jpg", "2025/e.JPG"]
+    assert not list(checkpoints.glob("*.sqlite3"))
+
+    again = local_import.rebuild_media_from_originals(originals_dir=str(originals), batch_size=2)
+    assert again["created"] == 0 and again["skipped"] == 5
+    assert db.session.query(Media).count() == 5
+
+
+@pytest.mark.usefixtures("app_context")
+def test_rebuild_resumes_after_checkpoint(originals: Path, checkpoints: Path) -> None:
+    SqliteRebuildCheckpoint.for_directory(checkpoints, str(originals)).save("2024/02/c.jpg")
+
+    stats = local_import.rebuild_media_from_originals(originals_dir=str(originals))
+
+    assert stats["scanned"] == 2 and stats["created"] == 2
+    assert _rel_paths() == ["2024/10/d.jpg", "2025/e.JPG"]
+    assert SqliteRebuildCheckpoint.for_directory(checkpoints, str(originals)).load() is None
+
+    full = local_import.rebuild_media_from_originals(originals_dir=str(originals), resume=False)
+    assert full["created"] == 3 and full["skipped"] == 2
+
+
+@pytest.mark.usefixtures("app_context")
+def test_failed_batch_is_retried_per_file(originals: Path, checkpoints: Path, monkeypatch) -> None:
+    build = local_import.build_media_from_analysis
+
+    def _build(analysis, *, google_media_id, relative_path):
+        if relative_path == "2024/01/b.jpg":
+            raise ValueError("broken")
+        return build(analysis, google_media_id=google_media_id, relative_path=relative_path)
+
+    monkeypatch.setattr(local_import, "build_media_from_analysis", _build)
+
+    stats = local_import.rebuild_media_from_originals(originals_dir=str(originals), batch_size=3)
+
+    assert stats["created"] == 4 and stats["errors"] == 1
+    assert "2024/01/b.jpg" not in _rel_paths()
+
+
+@pytest.mark.usefixtures("app_context")
+def test_rebuild_analyses_in_worker_processes(originals: Path, checkpoints: Path) -> None:
+    stats = local_import.rebuild_media_from_originals(originals_dir=str(originals), workers=2, batch_size=2)
+
+    assert stats["created"] == 5 and stats["errors"] == 0
+    hashes = {media.local_rel_path: media.hash_sha256 for media in db.session.query(Media)}
+    assert len(set(hashes.values())) == 5
@@ -0,0 +1,203 @@
+"""メディア削除時のファイル削除キュー（トゥームストーン）のテスト。"""
+from __future__ import annotations
+
+import hashlib
+import shutil
+from pathlib import Path
+from types import SimpleNamespace
+
+import pytest
+
+from bounded_contexts.photonest.infrastructure.local_import.storage.blob_store import (
+    ContentAddressedBlobStore,
+)
+from bounded_contexts.photonest.infrastructure.photo_models import (
+    Media,
+    MediaFileDeletion,
+    MediaPlayback,
+)
+from bounded_contexts.photonest.tasks import media_file_deletion as deletion_module
+from bounded_contexts.storage import StorageDomain
+from presentation.fastapi.routers import media as media_router
+from shared.kernel.database.db import db
+
+pytestmark = pytest.mark.integration
+
+
+class _FakeStorage:
+    def __init__(self, roots: dict, failing: set[str] = frozenset()) -> None:
+        self.roots = roots
+        self.failing = set(failing)
+
+    def for_domain(self, domain):
+        root = self.roots[domain]
+
+        def _resolve(*parts, intent=None):
+            path = root.joinpath(*parts)
+            return SimpleNamespace(absolute_path=str(path), exists=path.exists())
+
+        return SimpleNamespace(resolve=_resolve, first_existing=lambda: str(root))
+
+    def remove(self, path: str) -> None:
+        if Path(path).name in self.failing:
+            raise OSError("NAS unavailable")
+        Path(path).unlink()
+
+    def remove_tree(self, path: str) -> None:
+        shutil.rmtree(path)
+
+
+@pytest.fixture
+def storage(tmp_path: Path, monkeypatch) -> _FakeStorage:
+    roots = {
+        StorageDomain.MEDIA_ORIGINALS: tmp_path / "originals",
+        StorageDomain.MEDIA_PLAYBACK: tmp_path / "playback",
+        StorageDomain.MEDIA_THUMBNAILS: tmp_path / "thumbs",
+    }
+    fake = _FakeStorage(roots)
+    monkeypatch.setattr(deletion_module, "_storage_service", lambda: fake)
+    return fake
+
+
+def _write(path: Path, data: bytes = b"x") -> Path:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_bytes(data)
+    return path
+
+
+def _delete(media: Media) -> None:
+    media_router._soft_delete_media(media, db.session)
+    db.session.commit()
+
+
+@pytest.mark.usefixtures("app_context")
+def test_delete_records_tombstones_and_worker_removes_files(storage) -> None:
+    roots = storage.roots
+    original = _write(roots[StorageDomain.MEDIA_ORIGINALS] / "2024/clip.mov")
+    thumb = _write(roots[StorageDomain.MEDIA_THUMBNAILS] / "256/2024/clip.avif")
+    hls_dir = roots[StorageDomain.MEDIA_PLAYBACK] / "hls/1"
+    _write(hls_dir / "master.m3u8")
+    _write(hls_dir / "720p/seg0.ts")
+    poster = _write(roots[StorageDomain.MEDIA_PLAYBACK] / "posters/1.jpg")
+
+    media = Media(
+        source_type="local",
+        local_rel_path="2024/clip.mov",
+        is_video=True,
+        bytes=1,
+        thumbnail_manifest={"rel": "2024/clip.avif", "sizes": {"256": {"fmt": "avif", "bytes": 1}}},
+    )
+    db.session.add(media)
+    db.session.flush()
+    db.session.add(
+        MediaPlayback(
+            media_id=media.id,
+            preset="hls",
+            rel_path="hls/1/master.m3u8",
+            poster_rel_path="posters/1.jpg",
+            status="done",
+        )
+    )
+    db.session.commit()
+
+    _delete(media)
+
+    # 削除 API はファイルに触れずにトゥームストーンだけを記録する
+    assert original.exists() and thumb.exists() and hls_dir.exists()
+    rows = {(row.storage_domain, row.rel_path, row.kind) for row in MediaFileDeletion.query.all()}
+    assert rows == {
+        ("media_originals", "2024/clip.mov", "file"),
+        ("media_thumbnails", "256/2024/clip.avif", "file"),
+        ("media_playback", "hls/1", "tree"),
+        ("media_playback", "posters/1.jpg", "file"),
+    }
+    assert deletion_module.pending_media_file_deletions() == 4
+
+    result = deletion_module.process_media_file_deletions()
+
+    assert result["removed"] == 4 and result["remaining"] == 0
+    assert not original.exists() and not thumb.exists()
+    assert not hls_dir.exists() and not poster.exists()
+    assert MediaFileDeletion.query.count() == 0
+
+
+@pytest.mark.usefixtures("app_context")
+def test_failures_back_off_and_block_recovery(storage) -> None:
+    original = _write(storage.roots[StorageDomain.MEDIA_ORIGINALS] / "2024/a.jpg")
+    storage.failing.add("a.jpg")
+    media = Media(source_type="local", local_rel_path="2024/a.jpg", bytes=1)
+    db.session.add(media)
+    db.session.commit()
+    _delete(media)
+
+    result = deletion_module.process_media_file_deletions()
+
+    assert result["failed"] >= 1 and original.exists()
+    row = MediaFileDeletion.query.filter_by(rel_path="2024/a.jpg").one()
+    assert row.attempts == 1 and row.last_error == "NAS unavailable"
+    # バックオフ中の行は次のバッチで取り出されない
+    assert deletion_module.process_media_file_deletions()["removed"] == 0
+    # タスクが取得済みのメディアは復元できない
+    assert not deletion_module.restore_media_file_deletions(media.id, db.session)
+    assert deletion_module.pending_media_file_deletions() >= 1
+
+
+@pytest.mark.usefixtures("app_context")
+def test_recovered_media_keeps_its_files(storage) -> None:
+    original = _write(storage.roots[StorageDomain.MEDIA_ORIGINALS] / "2024/b.jpg")
+    media = Media(source_type="local", local_rel_path="2024/b.jpg", bytes=1)
+    db.session.add(media)
+    db.session.commit()
+    _delete(media)
+
+    assert deletion_module.restore_media_file_deletions(media.id, db.session)
+    media.is_deleted = False
+    db.session.commit()
+
+    assert MediaFileDeletion.query.count() == 0
+    deletion_module.process_media_file_deletions()
+    assert original.exists()
+
+
+@pytest.mark.usefixtures("app_context")
+def test_rows_of_undeleted_media_are_cancelled(storage) -> None:
+    original = _write(storage.roots[StorageDomain.MEDIA_ORIGINALS] / "2024/c.jpg")
+    media = Media(source_type="local", local_rel_path="2024/c.jpg", bytes=1)
+    db.session.add(media)
+    db.session.commit()
+    _delete(media)
+    media.is_deleted = False
+    db.session.commit()
+
+    result = deletion_module.process_media_file_deletions()
+
+    assert result["cancelled"] >= 1 and result["removed"] == 0
+    assert original.exists()
+
+
+@pytest.mark.usefixtures("app_context")
+def test_blob_is_released_only_when_unreferenced(storage, tmp_path: Path) -> None:
+    originals = storage.roots[StorageDomain.MEDIA_ORIGINALS]
+    blob_store = ContentAddressedBlobStore(originals)
+    source = _write(tmp_path / "inbox/a.jpg", b"to delete")
+    digest = hashlib.sha256(b"to delete").hexdigest()
+    for rel_path in ("2024/a.jpg", "2024/b.jpg"):
+        blob_store.place(source, originals / rel_path, digest)
+    source.unlink()
+
+    rows = [
+        Media(source_type="local", local_rel_path=rel_path, hash_sha256=digest, bytes=9)
+        for rel_path in ("2024/a.jpg", "2024/b.jpg")
+    ]
+    db.session.add_all(rows)
+    db.session.commit()
+
+    _delete(rows[0])
+    deletion_module.process_media_file_deletions()
+    assert not (originals / "2024/a.jpg").exists()
+    assert blob_store.blob_path(digest).exists()
+
+    _delete(rows[1])
+    deletion_module.process_media_file_deletions()
+    assert not blob_store.blob_path(digest).exists()
+    assert MediaFileDeletion.query.count() == 0
@@ -0,0 +1,69 @@
+"""``transcode_queue_scan`` のページ単位走査の回帰テスト。"""
+
+from __future__ import annotations
+
+from pathlib import Path
+
+import pytest
+
+from shared.kernel.database.db import db
+from bounded_contexts.photonest.infrastructure.photo_models import Media, MediaPlayback
+from bounded_contexts.photonest.tasks import transcode
+
+
+def _video(rel_path: str | None, **overrides) -> Media:
+    media = Media(
+        filename=Path(rel_path or "missing.mov").name,
+        local_rel_path=rel_path,
+        is_video=True,
+        **overrides,
+    )
+    db.session.add(media)
+    return media
+
+
+@pytest.mark.usefixtures("app_context")
+def test_queue_scan_pages_through_candidates(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(transcode, "_orig_dir", lambda: tmp_path)
+    for index in range(5):
+        (tmp_path / f"clip{index}.mov").write_bytes(b"x")
+        _video(f"clip{index}.mov")
+    _video("gone.mov")
+    _video(None)
+    _video("clip0.mov", is_deleted=True)
+    db.session.commit()
+
+    result = transcode.transcode_queue_scan(batch_size=2)
+
+    assert result["queued"] == 5
+    assert result["skipped"] == 2
+    assert result["scanned"] == 7
+    assert isinstance(result["elapsed_ms"], int)
+    rows = MediaPlayback.query.filter_by(preset="std1080p", status="pending").all()
+    assert sorted(row.rel_path for row in rows) == [f"clip{i}.mp4" for i in range(5)]
+
+
+@pytest.mark.usefixtures("app_context")
+def test_queue_scan_skips_active_and_requeues_failed_playbacks(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    monkeypatch.setattr(transcode, "_orig_dir", lambda: tmp_path)
+    (tmp_path / "a.mov").write_bytes(b"x")
+    (tmp_path / "b.mov").write_bytes(b"x")
+    running = _video("a.mov")
+    failed = _video("b.mov")
+    db.session.flush()
+    db.session.add_all(
+        [
+            MediaPlayback(media_id=running.id, preset="std1080p", status="processing"),
+            MediaPlayback(media_id=failed.id, preset="std1080p", status="error"),
+        ]
+    )
+    db.session.commit()
+
+    result = transcode.transcode_queue_scan()
+
+    assert (result["queued"], result["skipped"]) == (1, 1)
+    requeued = MediaPlayback.query.filter_by(media_id=failed.id).one()
+    assert requeued.status == "pending"
+    assert requeued.rel_path == "b.mp4"
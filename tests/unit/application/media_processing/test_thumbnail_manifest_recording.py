@@ -0,0 +1,120 @@
+"""サムネイルマニフェストの記録（thumbs_generate・バックフィル）と読み取りのテスト。"""
+from __future__ import annotations
+
+from pathlib import Path
+from types import SimpleNamespace
+
+import pytest
+from PIL import Image
+
+from bounded_contexts.photonest.infrastructure.photo_models import Media
+from bounded_contexts.photonest.tasks import thumbs_generate as thumbs_module
+from presentation.fastapi.routers import albums as albums_router
+from presentation.fastapi.routers import media as media_router
+from shared.kernel.database.db import db
+
+pytestmark = pytest.mark.integration
+
+
+@pytest.fixture
+def dirs(tmp_path: Path, monkeypatch):
+    originals = tmp_path / "originals"
+    thumbs = tmp_path / "thumbs"
+    thumbs.mkdir()
+    monkeypatch.setattr(thumbs_module, "_orig_dir", lambda: originals)
+    monkeypatch.setattr(thumbs_module, "_thumb_base_dir", lambda: thumbs)
+    return SimpleNamespace(originals=originals, thumbs=thumbs)
+
+
+def _media(rel_path: str) -> Media:
+    media = Media(source_type="local", local_rel_path=rel_path, mime_type="image/jpeg", bytes=1)
+    db.session.add(media)
+    db.session.commit()
+    return media
+
+
+@pytest.mark.usefixtures("app_context")
+def test_thumbs_generate_records_manifest(dirs) -> None:
+    source = dirs.originals / "2024/01/photo.jpg"
+    source.parent.mkdir(parents=True)
+    Image.new("RGB", (1200, 900), (10, 120, 200)).save(source, "JPEG")
+    media = _media("2024/01/photo.jpg")
+
+    result = thumbs_module.thumbs_generate(media_id=media.id)
+
+    assert result["ok"]
+    raw = db.session.get(Media, media.id).thumbnail_manifest
+    assert raw["rel"] == "2024/01/photo.avif"
+    assert sorted(raw["sizes"]) == ["1024", "2048", "256", "512"]
+    for size, entry in raw["sizes"].items():
+        assert entry["fmt"] == "avif"
+        assert entry["bytes"] == (dirs.thumbs / size / "2024/01/photo.avif").stat().st_size
+
+
+@pytest.mark.usefixtures("app_context")
+def test_backfill_records_existing_and_missing_thumbnails(dirs) -> None:
+    legacy = _media("2023/05/old.heic")
+    bare = _media("2023/05/none.jpg")
+    for size, payload in ((256, b"a" * 10), (1024, b"b" * 30)):
+        path = dirs.thumbs / str(size) / "2023/05/old.jpg"
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_bytes(payload)
+
+    first = thumbs_module.backfill_thumbnail_manifests(limit=1)
+    second = thumbs_module.backfill_thumbnail_manifests(limit=10)
+    third = thumbs_module.backfill_thumbnail_manifests(limit=10)
+
+    assert (first["processed"], first["remaining"]) == (1, True)
+    assert (second["processed"], second["remaining"]) == (1, False)
+    assert third["processed"] == 0
+    assert db.session.get(Media, legacy.id).thumbnail_manifest == {
+        "rel": "2023/05/old.jpg",
+        "sizes": {"256": {"fmt": "jpeg", "bytes": 10}, "1024": {"fmt": "jpeg", "bytes": 30}},
+    }
+    assert db.session.get(Media, bare.id).thumbnail_manifest == {"rel": None, "sizes": {}}
+
+
+def test_readers_use_manifest_without_touching_storage(monkeypatch) -> None:
+    def _no_storage(*args, **kwargs):
+        raise AssertionError("filesystem probed")
+
+    monkeypatch.setattr(media_router, "_resolve_storage_file", _no_storage)
+    monkeypatch.setattr(media_router, "_thumbnail_base_path", lambda: "/thumbs")
+    media = SimpleNamespace(
+        id=5,
+        local_rel_path="2024/a.jpg",
+        thumbnail_rel_path="2024/a.avif",
+        thumbnail_manifest={"rel": "2024/a.avif", "sizes": {"256": {"fmt": "avif", "bytes": 1},
+                                                            "1024": {"fmt": "avif", "bytes": 9}}},
+    )
+
+    assert media_router._find_thumbnail(media, 1024) == ("2024/a.avif", "/thumbs/1024/2024/a.avif")
+    assert media_router._find_thumbnail(media, 512) == (None, None)
+    assert albums_router._resolve_best_thumbnail_url(media, None) == "/api/media/5/thumbnail?size=1024"
+
+    media.thumbnail_manifest = None
+    assert albums_router._resolve_best_thumbnail_url(media, None) is None
+
+
+@pytest.mark.usefixtures("app_context")
+def test_placeholders_are_recorded_and_backfilled(dirs) -> None:
+    source = dirs.originals / "2024/02/new.jpg"
+    source.parent.mkdir(parents=True)
+    Image.new("RGB", (800, 600), (200, 30, 30)).save(source, "JPEG")
+    fresh = _media("2024/02/new.jpg")
+    thumbs_module.thumbs_generate(media_id=fresh.id)
+    assert len(db.session.get(Media, fresh.id).blurhash) == 28
+
+    legacy = _media("2023/05/old.jpg")
+    bare = _media("2023/05/none.jpg")
+    thumb = dirs.thumbs / "256" / "2023/05/old.jpg"
+    thumb.parent.mkdir(parents=True, exist_ok=True)
+    Image.new("RGB", (256, 192), (20, 90, 160)).save(thumb, "JPEG")
+    thumbs_module.backfill_thumbnail_manifests(limit=10)
+
+    result = thumbs_module.backfill_blurhashes(limit=10)
+
+    assert (result["processed"], result["with_placeholder"]) == (2, 1)
+    assert len(db.session.get(Media, legacy.id).blurhash) == 28
+    assert db.session.get(Media, bare.id).blurhash == ""
+    assert thumbs_module.backfill_blurhashes(limit=10)["processed"] == 0
@@ -0,0 +1,141 @@
+"""サムネイルのパックファイル格納（追記・範囲読み取り・配信・詰め直し）のテスト。"""
+from __future__ import annotations
+
+import asyncio
+from pathlib import Path
+from types import SimpleNamespace
+
+import pytest
+from PIL import Image
+
+from bounded_contexts.photonest.domain.media_processing import ThumbnailManifest
+from bounded_contexts.photonest.infrastructure.media_processing.thumbnail_packs import (
+    ThumbnailPackStore,
+    compact_thumbnail_packs,
+    pack_bucket_for,
+)
+from bounded_contexts.photonest.infrastructure.photo_models import Media
+from bounded_contexts.photonest.tasks import thumbs_generate as thumbs_module
+from presentation.fastapi.routers import media as media_router
+from shared.kernel.database.db import db
+
+
+def test_append_reads_back_and_rolls_over(tmp_path: Path) -> None:
+    store = ThumbnailPackStore(tmp_path, max_pack_bytes=10)
+
+    first = store.append("2024/01", b"abcdef")
+    second = store.append("2024/01", b"ghij")
+    third = store.append("2024/01", b"klm")
+
+    assert (first.pack, first.offset) == ("2024/01/000001.pack", 0)
+    assert (second.pack, second.offset) == ("2024/01/000001.pack", 6)
+    assert (third.pack, third.offset) == ("2024/01/000002.pack", 0)
+    assert store.read(second.pack, second.offset, second.length) == b"ghij"
+    assert store.read(first.pack, first.offset, first.length, start=2, end=3) == b"cd"
+    assert [(pack, active) for pack, _, active in store.packs()] == [
+        ("2024/01/000001.pack", False),
+        ("2024/01/000002.pack", True),
+    ]
+    with pytest.raises(ValueError):
+        store.read("../secret.pack", 0, 1)
+    with pytest.raises(FileNotFoundError):
+        store.read(third.pack, third.offset, 10)
+
+
+def test_bucket_is_date_directory() -> None:
+    assert pack_bucket_for("2024/01/15/photo.avif") == "2024/01"
+    assert pack_bucket_for("photo.avif") == "misc"
+
+
+@pytest.fixture
+def packed_dirs(tmp_path: Path, monkeypatch):
+    originals = tmp_path / "originals"
+    thumbs = tmp_path / "thumbs"
+    thumbs.mkdir()
+    monkeypatch.setenv("THUMBNAIL_PACK_ENABLED", "true")
+    monkeypatch.setattr(thumbs_module, "_orig_dir", lambda: originals)
+    monkeypatch.setattr(thumbs_module, "_thumb_base_dir", lambda: thumbs)
+    monkeypatch.setattr(media_router, "_thumbnail_base_path", lambda: str(thumbs))
+    return SimpleNamespace(originals=originals, thumbs=thumbs)
+
+
+def _generate(dirs, rel_path: str) -> Media:
+    source = dirs.originals / rel_path
+    source.parent.mkdir(parents=True, exist_ok=True)
+    Image.new("RGB", (800, 600), (200, 40, 40)).save(source, "JPEG")
+    media = Media(source_type="local", local_rel_path=rel_path, mime_type="image/jpeg", bytes=1)
+    db.session.add(media)
+    db.session.commit()
+    assert thumbs_module.thumbs_generate(media_id=media.id)["ok"]
+    return db.session.get(Media, media.id)
+
+
+@pytest.mark.integration
+@pytest.mark.usefixtures("app_context")
+def test_generated_thumbnails_are_packed_and_served(packed_dirs) -> None:
+    media = _generate(packed_dirs, "2024/01/photo.jpg")
+
+    manifest = ThumbnailManifest.from_raw(media.thumbnail_manifest)
+    variant = manifest.packed_variant(256)
+    assert variant is not None and variant.pack == "2024/01/000001.pack"
+    assert not (packed_dirs.thumbs / "256/2024/01/photo.avif").exists()
+    assert media.blurhash
+
+    # 再実行は既存のパック内エントリをそのまま使う
+    manifest_before = media.thumbnail_manifest
+    assert thumbs_module.thumbs_generate(media_id=media.id)["generated"] == []
+    assert db.session.get(Media, media.id).thumbnail_manifest == manifest_before
+
+    store = ThumbnailPackStore(packed_dirs.thumbs, max_pack_bytes=1 << 20)
+    data = store.read(variant.pack, variant.offset, variant.bytes)
+    principal = SimpleNamespace(id=1)
+
+    def _get(**headers):
+        request = SimpleNamespace(method="GET", headers=headers)
+        return asyncio.run(
+            media_router.api_media_thumbnail(
+                media.id, size=256, request=request, principal=principal, db=db.session
+            )
+        )
+
+    full = _get()
+    assert full.status_code == 200 and full.body == data
+    assert full.media_type == "image/avif"
+    partial = _get(Range="bytes=4-9")
+    assert partial.status_code == 206 and partial.body == data[4:10]
+    assert partial.headers["content-range"] == f"bytes 4-9/{variant.bytes}"
+    assert _get(Range=f"bytes={variant.bytes}-").status_code == 416
+
+
+@pytest.mark.integration
+@pytest.mark.usefixtures("app_context")
+def test_compaction_moves_live_entries_and_reclaims_space(packed_dirs) -> None:
+    store = ThumbnailPackStore(packed_dirs.thumbs, max_pack_bytes=1 << 20)
+    rows = []
+    for name, payload in (("kept", b"k" * 100), ("dropped", b"d" * 300)):
+        location = store.append("2024/02", payload)
+        manifest = ThumbnailManifest.empty().with_variant(
+            f"2024/02/{name}.avif", 256, location.length, pack=location.pack, offset=location.offset
+        )
+        rows.append(
+            Media(
+                source_type="local",
+                local_rel_path=f"2024/02/{name}.jpg",
+                bytes=1,
+                thumbnail_manifest=manifest.to_raw(),
+            )
+        )
+    rows[1].is_deleted = True
+    db.session.add_all(rows)
+    db.session.commit()
+    (store.root / "2024/02/000002.pack").write_bytes(b"")  # 000001 を追記中でなくする
+
+    result = compact_thumbnail_packs(min_dead_ratio=0.5)
+
+    assert result == {"ok": True, "compacted": 1, "reclaimed_bytes": 300}
+    kept = ThumbnailManifest.from_raw(db.session.get(Media, rows[0].id).thumbnail_manifest)
+    variant = kept.variants[256]
+    assert (variant.pack, variant.offset) == ("2024/02/000002.pack", 0)
+    assert store.read(variant.pack, variant.offset, variant.bytes) == b"k" * 100
+    assert [pack for pack, _, _ in store.packs()] == ["2024/02/000002.pack"]
+    assert compact_thumbnail_packs()["compacted"] == 0
@@ -0,0 +1,106 @@
+from __future__ import annotations
+
+import io
+
+from bounded_contexts.photonest.application.media_processing import (
+    TranscodeProgressTracker,
+    TranscodeScheduler,
+)
+from bounded_contexts.photonest.domain.media_processing import (
+    TranscodeBudgetPolicy,
+    TranscodeJobProfile,
+    TranscodePlan,
+)
+from bounded_contexts.photonest.infrastructure.media_processing import (
+    HostTranscodeSlotRegistry,
+    run_ffmpeg_with_progress,
+)
+
+
+def _scheduler(tmp_path, *, fixed_threads=None):
+    policy = TranscodeBudgetPolicy(host_cores=8, max_parallel_jobs=4, segment_threshold_ms=600_000)
+    return TranscodeScheduler(
+        policy=policy,
+        registry=HostTranscodeSlotRegistry(tmp_path / "slots"),
+        fixed_threads=fixed_threads,
+    )
+
+
+def test_concurrent_reservations_share_host_cores(tmp_path):
+    scheduler = _scheduler(tmp_path)
+    long_video = TranscodeJobProfile(duration_ms=1_800_000)
+
+    with scheduler.reserve(key="a", profile=long_video) as first:
+        with scheduler.reserve(key="b", profile=long_video) as second:
+            assert first.reserved_threads == 8
+            assert second.threads == 1
+            assert second.segments == 1
+
+    with scheduler.reserve(key="c", profile=long_video) as third:
+        assert third.reserved_threads == 8
+
+
+def test_fixed_threads_override_policy(tmp_path):
+    scheduler = _scheduler(tmp_path, fixed_threads=3)
+
+    with scheduler.reserve(key="a", profile=TranscodeJobProfile(duration_ms=1_800_000)) as plan:
+        assert plan.threads == 3
+        assert plan.segments == 1
+
+
+def test_progress_tracker_aggregates_segments_in_steps():
+    notified = []
+    tracker = TranscodeProgressTracker(
+        total_ms=1000,
+        segments=2,
+        notify=lambda percent, done_ms: notified.append((percent, done_ms)),
+        step_percent=25,
+    )
+
+    tracker.reporter(0)(100)
+    tracker.reporter(1)(200)
+    tracker.reporter(0)(300)
+    tracker.reporter(1)(500)
+
+    assert notified == [(25, 300), (50, 500), (75, 800)]
+
+
+class _FakeProcess:
+    def __init__(self, stdout: str, stderr: str, returncode: int) -> None:
+        self.stdout = io.StringIO(stdout)
+        self.stderr = io.StringIO(stderr)
+        self._returncode = returncode
+
+    def wait(self) -> int:
+        return self._returncode
+
+
+def test_run_ffmpeg_with_progress_parses_progress_blocks():
+    captured = {}
+    progress_output = (
+        "frame=10\nout_time_us=1500000\nprogress=continue\n"
+        "frame=20\nout_time_us=3000000\nprogress=end\n"
+    )
+
+    def fake_popen(cmd, **kwargs):
+        captured["cmd"] = cmd
+        return _FakeProcess(progress_output, "warning line\n", 0)
+
+    positions = []
+    result = run_ffmpeg_with_progress(
+        ["ffmpeg", "-i", "in.mov", "out.mp4"],
+        on_progress=positions.append,
+        popen=fake_popen,
+    )
+
+    assert captured["cmd"][:4] == ["ffmpeg", "-nostats", "-progress", "pipe:1"]
+    assert positions == [1500, 3000]
+    assert result.returncode == 0
+    assert result.out_time_ms == 3000
+    assert result.stderr == "warning line\n"
+
+
+def test_run_segments_preserves_order():
+    plan = TranscodePlan(threads=1, segments=3, segment_duration_ms=1000)
+
+    assert list(TranscodeScheduler.run_segments(plan, lambda index: index * 10)) == [0, 10, 20]
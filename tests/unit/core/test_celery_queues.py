@@ -0,0 +1,58 @@
+"""Unit tests for the Celery queue topology."""
+
+import pytest
+
+from cli.src.celery.worker import build_worker_argv
+from shared.kernel.celery_queues import (
+    QUEUE_BULK,
+    QUEUE_INTERACTIVE,
+    QUEUE_IO,
+    QUEUE_MAINTENANCE,
+    TASK_QUEUES,
+    WORKER_LANES,
+    TaskPriority,
+)
+
+
+class TestCeleryQueueTopology:
+    def test_celery_app_routes_tasks_to_lanes(self):
+        from cli.src.celery.celery_app import celery
+
+        routes = celery.conf.task_routes
+        assert routes["thumbs.generate"] == {"queue": QUEUE_INTERACTIVE}
+        assert routes["local_import.run"] == {"queue": QUEUE_BULK}
+        assert celery.conf.task_annotations["thumbs.generate"] == {"acks_late": True}
+        assert celery.conf.task_annotations["local_import.run"] == {"acks_late": False}
+        assert celery.conf.task_default_priority == TaskPriority.NORMAL
+        assert celery.conf.broker_transport_options["priority_steps"] == [0, 3, 6, 9]
+
+    def test_background_tasks_are_not_left_on_the_default_queue(self):
+        assert TASK_QUEUES["media_files.delete_pending"] == QUEUE_IO
+        assert TASK_QUEUES["thumbs.manifest_backfill"] == QUEUE_BULK
+        assert TASK_QUEUES["thumbs.blurhash_backfill"] == QUEUE_BULK
+        assert TASK_QUEUES["thumbs.pack_compact"] == QUEUE_MAINTENANCE
+        assert TASK_QUEUES["albums.repair_stats"] == QUEUE_MAINTENANCE
+
+    def test_every_routed_queue_is_consumed_by_the_all_lane(self):
+        all_queues = set(WORKER_LANES["all"].queues)
+        assert set(TASK_QUEUES.values()) <= all_queues
+
+    def test_routed_task_names_are_registered(self):
+        from cli.src.celery.tasks import celery
+
+        registered = set(celery.tasks.keys())
+        assert set(TASK_QUEUES) <= registered
+
+    def test_build_worker_argv_for_lane(self):
+        argv = build_worker_argv("bulk", concurrency=3)
+
+        assert argv[0] == "worker"
+        assert argv[argv.index("--queues") + 1] == "bulk"
+        assert argv[argv.index("--prefetch-multiplier") + 1] == "1"
+        assert argv[argv.index("--concurrency") + 1] == "3"
+        assert argv[argv.index("--hostname") + 1] == "bulk@%h"
+        assert "--max-tasks-per-child" in argv
+
+    def test_build_worker_argv_rejects_unknown_lane(self):
+        with pytest.raises(ValueError):
+            build_worker_argv("gpu")
@@ -0,0 +1,112 @@
+"""stat キーのファイルハッシュキャッシュのテスト。"""
+
+import hashlib
+import os
+import time
+
+import pytest
+
+from shared.kernel import file_hash
+
+
+@pytest.fixture
+def cache_path(tmp_path, monkeypatch):
+    path = tmp_path / "cache" / "hashes.sqlite3"
+    monkeypatch.setenv("FILE_HASH_CACHE_PATH", str(path))
+    monkeypatch.delenv("FILE_HASH_CACHE_ENABLED", raising=False)
+    return path
+
+
+@pytest.fixture
+def computed(monkeypatch):
+    calls = []
+    compute = file_hash._compute_sha256
+
+    def _counting(path, **kwargs):
+        calls.append(path)
+        return compute(path, **kwargs)
+
+    monkeypatch.setattr(file_hash, "_compute_sha256", _counting)
+    return calls
+
+
+def _write(path, data: bytes, *, age_seconds: int = 60) -> None:
+    path.write_bytes(data)
+    past = time.time() - age_seconds
+    os.utime(path, (past, past))
+
+
+def test_unchanged_file_is_hashed_once(tmp_path, cache_path, computed):
+    target = tmp_path / "video.mp4"
+    _write(target, b"a" * 4096)
+
+    first = file_hash.sha256_file(target)
+    second = file_hash.sha256_file(str(target))
+
+    assert first == second == hashlib.sha256(b"a" * 4096).hexdigest()
+    assert len(computed) == 1
+    assert cache_path.exists()
+
+
+def test_changed_stat_invalidates_entry(tmp_path, cache_path, computed):
+    target = tmp_path / "photo.jpg"
+    _write(target, b"before", age_seconds=120)
+    file_hash.sha256_file(target)
+
+    _write(target, b"after!", age_seconds=60)
+
+    assert file_hash.sha256_file(target) == hashlib.sha256(b"after!").hexdigest()
+    assert len(computed) == 2
+
+
+def test_recently_written_file_is_not_cached(tmp_path, cache_path, computed):
+    target = tmp_path / "fresh.jpg"
+    target.write_bytes(b"fresh")
+
+    file_hash.sha256_file(target)
+    file_hash.sha256_file(target)
+
+    assert len(computed) == 2
+
+
+def test_recorded_digest_is_reused_after_rename(tmp_path, cache_path, computed):
+    staged = tmp_path / "staged.jpg"
+    staged.write_bytes(b"streamed")
+    file_hash.record_sha256(staged, "f" * 64)
+
+    moved = tmp_path / "originals.jpg"
+    staged.rename(moved)
+
+    assert file_hash.sha256_file(moved) == "f" * 64
+    assert computed == []
+
+
+def test_disabled_cache_always_computes(tmp_path, cache_path, computed, monkeypatch):
+    monkeypatch.setenv("FILE_HASH_CACHE_ENABLED", "false")
+    target = tmp_path / "photo.jpg"
+    _write(target, b"data")
+
+    file_hash.sha256_file(target)
+    file_hash.sha256_file(target)
+
+    assert len(computed) == 2
+    assert not cache_path.exists()
+
+
+@pytest.mark.parametrize(
+    "options",
+    [
+        {"buffer_size": 0, "use_mmap": False},
+        {"buffer_size": 7, "use_mmap": False},
+        {"buffer_size": 0, "use_mmap": True},
+    ],
+)
+def test_read_modes_produce_the_same_digest(tmp_path, options):
+    target = tmp_path / "data.bin"
+    payload = os.urandom(100_003)
+    target.write_bytes(payload)
+    empty = tmp_path / "empty.bin"
+    empty.write_bytes(b"")
+
+    assert file_hash._compute_sha256(str(target), **options) == hashlib.sha256(payload).hexdigest()
+    assert file_hash._compute_sha256(str(empty), **options) == hashlib.sha256(b"").hexdigest()
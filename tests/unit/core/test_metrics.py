@@ -0,0 +1,106 @@
+"""Unit tests for the metrics registry and its HTTP/DB instrumentation."""
+
+import json
+import os
+import time
+
+import pytest
+import sqlalchemy as sa
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from shared.kernel.metrics import registry as metrics_registry
+from shared.kernel.metrics.registry import Counter, Gauge, Histogram, Registry
+
+
+def _sample(text: str, prefix: str) -> float:
+    for line in text.splitlines():
+        if line.startswith(prefix + " "):
+            return float(line.rsplit(" ", 1)[1])
+    raise AssertionError(f"{prefix} not found in:\n{text}")
+
+
+class TestRegistry:
+    def test_renders_cumulative_histogram_buckets(self):
+        registry = Registry()
+        histogram = Histogram(
+            "job_seconds", "Job time.", ("kind",), buckets=(0.1, 1.0), registry=registry
+        )
+        histogram.labels("a").observe(0.05)
+        histogram.labels("a").observe(0.5)
+        histogram.labels("a").observe(5)
+
+        text = registry.render()
+        assert "# TYPE job_seconds histogram" in text
+        assert _sample(text, 'job_seconds_bucket{kind="a",le="0.1"}') == 1
+        assert _sample(text, 'job_seconds_bucket{kind="a",le="1.0"}') == 2
+        assert _sample(text, 'job_seconds_bucket{kind="a",le="+Inf"}') == 3
+        assert _sample(text, 'job_seconds_count{kind="a"}') == 3
+
+    def test_label_values_are_escaped_and_validated(self):
+        registry = Registry()
+        counter = Counter("hits_total", "Hits.", ("path",), registry=registry)
+        counter.labels('a"b\\c').inc()
+
+        assert 'hits_total{path="a\\"b\\\\c"} 1' in registry.render()
+        with pytest.raises(ValueError):
+            counter.labels("x", "y")
+        with pytest.raises(ValueError):
+            counter.labels("x").inc(-1)
+
+    def test_merges_peer_processes_and_archives_stale_files(self, tmp_path, monkeypatch):
+        monkeypatch.setattr(metrics_registry, "FLUSH_INTERVAL_SECONDS", 3600)
+        registry = Registry()
+        counter = Counter("jobs_total", "Jobs.", registry=registry)
+        gauge = Gauge("busy", "Busy workers.", registry=registry)
+        registry.enable_multiprocess(tmp_path)
+        counter.inc(2)
+        gauge.set(1)
+
+        peer = {"pid": 1, "metrics": {"jobs_total": {"[]": 3.0}, "busy": {"[]": 4.0}}}
+        (tmp_path / "other_1_aaaa.json").write_text(json.dumps(peer))
+        dead = {"pid": 2, "metrics": {"jobs_total": {"[]": 5.0}, "busy": {"[]": 7.0}}}
+        dead_path = tmp_path / "other_2_bbbb.json"
+        dead_path.write_text(json.dumps(dead))
+        old = time.time() - metrics_registry.STALE_AFTER_SECONDS - 1
+        os.utime(dead_path, (old, old))
+
+        text = registry.render()
+        assert _sample(text, "jobs_total") == 10
+        assert _sample(text, "busy") == 5
+        assert not dead_path.exists()
+        # The archived counter keeps counting on the next scrape.
+        assert _sample(registry.render(), "jobs_total") == 10
+
+
+class TestHttpInstrumentation:
+    def test_requests_are_recorded_by_route_template_with_query_counts(self):
+        from presentation.fastapi.middleware.request_logging import RequestLoggingMiddleware
+        from presentation.fastapi.routers.metrics import router as metrics_router
+
+        engine = sa.create_engine("sqlite://")
+        app = FastAPI()
+        app.add_middleware(RequestLoggingMiddleware)
+        app.include_router(metrics_router)
+
+        @app.get("/api/things/{thing_id}")
+        def read_thing(thing_id: int):
+            with engine.connect() as conn:
+                conn.execute(sa.text("SELECT 1"))
+                conn.execute(sa.text("SELECT 2"))
+            return {"id": thing_id}
+
+        client = TestClient(app)
+        before = client.get("/metrics").text
+        route = 'route="/api/things/{thing_id}"'
+        prefix = f'http_requests_total{{method="GET",{route},status="200"}}'
+        start = _sample(before, prefix) if prefix in before else 0
+
+        assert client.get("/api/things/1").status_code == 200
+        assert client.get("/api/things/2").status_code == 200
+
+        text = client.get("/metrics").text
+        assert _sample(text, prefix) == start + 2
+        assert "/api/things/1" not in text
+        assert _sample(text, f'http_request_db_queries_bucket{{{route},le="2.0"}}') >= 2
+        assert 'db_query_duration_seconds_count{operation="select"}' in text
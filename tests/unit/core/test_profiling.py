@@ -0,0 +1,106 @@
+"""Unit tests for the on-demand profiler and its SQL capture."""
+
+import json
+import threading
+import time
+
+import sqlalchemy as sa
+
+import shared.kernel.database.db  # noqa: F401  (registers the engine listeners)
+from shared.kernel import profiling
+from shared.kernel.profiling import N_PLUS_ONE_THRESHOLD, ProfileSession
+
+
+def _busy_wait(seconds: float) -> None:
+    deadline = time.perf_counter() + seconds
+    while time.perf_counter() < deadline:
+        pass
+
+
+def test_samples_the_profiled_thread_as_collapsed_stacks():
+    with ProfileSession("test", interval=0.001) as profile:
+        _busy_wait(0.05)
+
+    assert profile.sample_count > 0
+    collapsed = profile.collapsed()
+    top_stack, count = collapsed.splitlines()[0].rsplit(" ", 1)
+    assert int(count) > 0
+    assert any("_busy_wait" in line for line in collapsed.splitlines())
+    assert "tests/unit/core/test_profiling.py" in top_stack
+    assert profiling.active_profile() is None
+
+
+def test_records_statements_and_flags_repeated_ones():
+    engine = sa.create_engine("sqlite://")
+    with engine.connect() as conn:
+        conn.execute(sa.text("SELECT 0"))  # outside the profile: not recorded
+        with ProfileSession("test") as profile:
+            for value in range(N_PLUS_ONE_THRESHOLD):
+                conn.execute(sa.text("SELECT :v"), {"v": value})
+            conn.execute(sa.text("SELECT 42"))
+
+    summary = profile.query_summary()
+    assert summary["count"] == N_PLUS_ONE_THRESHOLD + 1
+    assert summary["nPlusOne"] == [{"sql": "SELECT ?", "count": N_PLUS_ONE_THRESHOLD}]
+
+
+def test_queries_from_worker_threads_add_them_to_the_sampled_set():
+    engine = sa.create_engine("sqlite://", connect_args={"check_same_thread": False})
+    idents = []
+
+    def _work():
+        idents.append(threading.get_ident())
+        with engine.connect() as conn:
+            conn.execute(sa.text("SELECT 1"))
+
+    with ProfileSession("test") as profile:
+        import contextvars
+
+        thread = threading.Thread(target=contextvars.copy_context().run, args=(_work,))
+        thread.start()
+        thread.join()
+
+    assert idents[0] in profile._threads
+    assert profile.query_summary()["count"] == 1
+
+
+def test_report_stays_within_the_log_row_budget(monkeypatch):
+    monkeypatch.setattr(profiling, "_REPORT_BUDGET_BYTES", 2_000)
+    profile = ProfileSession("test")
+    for index in range(200):
+        profile.stacks[f"main;handler;frame_{index:04d}"] = 200 - index
+
+    report = profile.report()
+    assert len(json.dumps(report).encode()) <= 2_000
+    assert report["collapsedTruncated"] is True
+    assert report["collapsed"].splitlines()[0] == "main;handler;frame_0000 200"
+
+
+def test_celery_header_profiles_the_task_run(monkeypatch):
+    logged = []
+    monkeypatch.setattr(
+        profiling.logging.getLogger("celery.task.profiling"),
+        "info",
+        lambda message, **kwargs: logged.append((json.loads(message), kwargs["extra"])),
+    )
+
+    class _Request:
+        headers = {profiling.PROFILE_TASK_HEADER: True}
+
+    class _Task:
+        name = "thumbs.generate"
+        request = _Request()
+
+    profiling._on_task_prerun(task_id="t-1", task=_Task())
+    assert profiling.active_profile() is not None
+    profiling._on_task_postrun(task_id="t-1", task=_Task(), state="SUCCESS")
+
+    report, extra = logged[0]
+    assert extra["event"] == "profile.task"
+    assert report["target"] == "task thumbs.generate"
+    assert report["taskId"] == "t-1"
+    assert profiling.active_profile() is None
+
+    _Task.request = type("_Plain", (), {"headers": {}})()
+    profiling._on_task_prerun(task_id="t-2", task=_Task())
+    assert profiling.active_profile() is None
@@ -0,0 +1,84 @@
+"""ZipArchiveService のストリーミング展開のテスト."""
+
+from __future__ import annotations
+
+import hashlib
+import zipfile
+from pathlib import Path
+from unittest.mock import MagicMock
+
+import pytest
+
+pytestmark = pytest.mark.unit
+
+from bounded_contexts.photonest.domain.local_import.zip_archive import ZipArchiveService
+from bounded_contexts.storage.infrastructure.filesystem import LocalFilesystemStorageService
+
+
+def _service(staging: Path | None, *, workers: int = 2) -> ZipArchiveService:
+    return ZipArchiveService(
+        MagicMock(),
+        MagicMock(),
+        MagicMock(),
+        {".jpg", ".mp4"},
+        storage_service=LocalFilesystemStorageService(),
+        staging_directory_resolver=(lambda: str(staging)) if staging else None,
+        stream_workers_resolver=lambda: workers,
+    )
+
+
+def _write_zip(path: Path, members: dict[str, bytes]) -> Path:
+    with zipfile.ZipFile(path, "w") as archive:
+        for name, payload in members.items():
+            archive.writestr(name, payload)
+    return path
+
+
+def test_stream_extract_writes_members_once_with_hashes_and_tags(tmp_path: Path) -> None:
+    staging = tmp_path / "originals" / ".zip_staging"
+    first = _write_zip(
+        tmp_path / "first.zip",
+        {"Trip/Day1/a.jpg": b"alpha", "notes.txt": b"skip", "../evil.jpg": b"x"},
+    )
+    second = _write_zip(tmp_path / "second.zip", {"b.mp4": b"bravo", "Trip/c.jpg": b"charlie"})
+    service = _service(staging)
+
+    assert service.streaming_enabled is True
+    extracted = list(service.stream_extract([str(first), str(second)]))
+
+    assert sorted(Path(p).name for p in extracted) == ["a.jpg", "b.mp4", "c.jpg"]
+    for path in extracted:
+        assert Path(path).is_relative_to(staging)
+        payload = Path(path).read_bytes()
+        assert service.hash_for(path) == hashlib.sha256(payload).hexdigest()
+        assert service.is_streamed_member(path)
+    by_name = {Path(p).name: p for p in extracted}
+    assert service.tags_for(by_name["a.jpg"]) == ["Trip", "Day1"]
+    assert service.tags_for(by_name["b.mp4"]) == []
+    assert not first.exists() and not second.exists()
+
+    service.cleanup()
+    assert not any(staging.iterdir())
+    assert service.hash_for(by_name["a.jpg"]) is None
+
+
+def test_invalid_archive_is_logged_and_kept(tmp_path: Path) -> None:
+    broken = tmp_path / "broken.zip"
+    broken.write_bytes(b"not a zip")
+    service = _service(tmp_path / "staging")
+
+    assert list(service.stream_extract([str(broken)])) == []
+    assert broken.exists()
+    assert service._log_error.call_args.args[0] == "local_import.zip.invalid"
+
+
+def test_stream_extract_falls_back_to_extract_without_staging(tmp_path: Path) -> None:
+    archive = _write_zip(tmp_path / "one.zip", {"a.jpg": b"alpha"})
+    service = _service(None)
+    service._base_directory = tmp_path / "_zip"
+
+    assert service.streaming_enabled is False
+    extracted = list(service.stream_extract([str(archive)]))
+
+    assert [Path(p).name for p in extracted] == ["a.jpg"]
+    assert service.hash_for(extracted[0]) is None
@@ -0,0 +1,40 @@
+"""BlurHash エンコーダーのテスト。"""
+from __future__ import annotations
+
+import pytest
+
+from bounded_contexts.photonest.domain.media_processing import encode_blurhash
+
+
+def test_encodes_size_flag_and_average_colour() -> None:
+    pixels = bytes((255, 0, 0)) * (8 * 6)
+
+    encoded = encode_blurhash(pixels, 8, 6)
+
+    # 4×3 成分 → サイズフラグ "L"。DC は純色の赤 0xFF0000 の base83 4 桁
+    assert encoded[0] == "L"
+    assert encoded[2:6] == "TI:j"
+    assert len(encoded) == 28
+
+
+def test_gradient_is_deterministic_and_compact() -> None:
+    width, height = 32, 24
+    pixels = bytes(
+        channel
+        for y in range(height)
+        for x in range(width)
+        for channel in (x * 8, y * 10, 128)
+    )
+
+    first = encode_blurhash(pixels, width, height)
+
+    assert first == encode_blurhash(pixels, width, height)
+    assert len(first) == 28 and first[1] != "0"
+    assert len(encode_blurhash(pixels, width, height, components=(1, 1))) == 6
+
+
+def test_rejects_mismatched_input() -> None:
+    with pytest.raises(ValueError):
+        encode_blurhash(b"\x00" * 5, 2, 2)
+    with pytest.raises(ValueError):
+        encode_blurhash(b"\x00" * 12, 2, 2, components=(10, 1))
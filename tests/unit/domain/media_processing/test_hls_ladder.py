@@ -0,0 +1,36 @@
+from bounded_contexts.photonest.domain.media_processing import (
+    DEFAULT_HLS_LADDER,
+    HlsRendition,
+    select_hls_renditions,
+)
+
+
+def test_full_hd_source_uses_whole_ladder_highest_first():
+    renditions = select_hls_renditions(1080)
+
+    assert [r.name for r in renditions] == ["1080p", "720p", "480p"]
+
+
+def test_renditions_above_source_height_are_dropped():
+    renditions = select_hls_renditions(720)
+
+    assert [r.name for r in renditions] == ["720p", "480p"]
+
+
+def test_small_source_still_gets_two_renditions():
+    renditions = select_hls_renditions(360)
+
+    assert [r.name for r in renditions] == ["720p", "480p"]
+
+
+def test_unknown_height_returns_whole_ladder():
+    assert select_hls_renditions(None) == tuple(
+        sorted(DEFAULT_HLS_LADDER, key=lambda r: r.max_height, reverse=True)
+    )
+
+
+def test_rate_control_is_derived_from_average_bitrate():
+    rendition = HlsRendition(name="x", max_height=720, video_bitrate_kbps=2800)
+
+    assert rendition.max_bitrate_kbps == 2996
+    assert rendition.buffer_size_kbps == 5600
@@ -0,0 +1,42 @@
+from bounded_contexts.photonest.domain.media_processing import ThumbnailManifest
+
+
+def test_round_trips_through_raw_json():
+    manifest = ThumbnailManifest.from_sizes("2024/01/a.avif", {512: 2048, 256: 900})
+
+    raw = manifest.to_raw()
+
+    assert raw == {
+        "rel": "2024/01/a.avif",
+        "sizes": {"256": {"fmt": "avif", "bytes": 900}, "512": {"fmt": "avif", "bytes": 2048}},
+    }
+    assert ThumbnailManifest.from_raw(raw) == manifest
+
+
+def test_unrecorded_and_empty_manifests_are_distinct():
+    assert ThumbnailManifest.from_raw(None) is None
+    assert ThumbnailManifest.from_raw({"bogus": 1}) is None
+
+    empty = ThumbnailManifest.from_raw(ThumbnailManifest.empty().to_raw())
+    assert empty is not None
+    assert not empty.has(256)
+    assert empty.largest((2048, 1024, 512)) is None
+
+
+def test_largest_and_path_for_use_recorded_sizes_only():
+    manifest = ThumbnailManifest.from_sizes("a/b.jpg", {256: 1, 1024: 3})
+
+    assert manifest.largest((2048, 1024, 512)) == 1024
+    assert manifest.path_for(1024) == "1024/a/b.jpg"
+    assert manifest.path_for(2048) is None
+    assert manifest.variants[256].format == "jpeg"
+
+
+def test_with_variant_replaces_sizes_when_path_changes():
+    manifest = ThumbnailManifest.from_sizes("a/b.jpg", {256: 1, 512: 2})
+
+    same = manifest.with_variant("a/b.jpg", 1024, 3)
+    moved = manifest.with_variant("a/b.avif", 256, 4)
+
+    assert sorted(same.variants) == [256, 512, 1024]
+    assert moved.rel_path == "a/b.avif" and sorted(moved.variants) == [256]
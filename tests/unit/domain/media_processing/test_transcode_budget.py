@@ -0,0 +1,54 @@
+import pytest
+
+from bounded_contexts.photonest.domain.media_processing import (
+    TranscodeBudgetPolicy,
+    TranscodeJobProfile,
+)
+
+
+def _policy(**overrides):
+    options = dict(host_cores=8, max_parallel_jobs=4, segment_threshold_ms=600_000)
+    options.update(overrides)
+    return TranscodeBudgetPolicy(**options)
+
+
+def test_short_video_gets_fair_share_of_cores():
+    plan = _policy().plan(TranscodeJobProfile(duration_ms=30_000))
+
+    assert plan.threads == 2
+    assert plan.segments == 1
+
+
+def test_busy_host_still_runs_with_one_thread():
+    plan = _policy().plan(TranscodeJobProfile(duration_ms=30_000), reserved_by_others=8)
+
+    assert plan.threads == 1
+    assert plan.reserved_threads == 1
+
+
+def test_long_video_on_idle_host_is_split_into_segments():
+    plan = _policy().plan(TranscodeJobProfile(duration_ms=1_800_000))
+
+    assert plan.segments == 4
+    assert plan.threads == 2
+    assert plan.segment_duration_ms == 450_000
+    assert plan.reserved_threads == 8
+
+
+def test_long_video_uses_only_free_cores():
+    plan = _policy().plan(TranscodeJobProfile(duration_ms=1_800_000), reserved_by_others=4)
+
+    assert plan.segments == 2
+    assert plan.reserved_threads == 4
+
+
+def test_segmentation_disabled_when_threshold_is_zero():
+    plan = _policy(segment_threshold_ms=0).plan(TranscodeJobProfile(duration_ms=1_800_000))
+
+    assert plan.segments == 1
+    assert plan.threads == 2
+
+
+def test_plan_validates_negative_reservation():
+    with pytest.raises(ValueError):
+        _policy().plan(TranscodeJobProfile(), reserved_by_others=-1)
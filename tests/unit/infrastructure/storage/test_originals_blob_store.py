@@ -0,0 +1,87 @@
+"""originals のコンテンツアドレス blob ストアのテスト。"""
+
+from __future__ import annotations
+
+import hashlib
+import os
+from pathlib import Path
+
+from bounded_contexts.photonest.infrastructure.local_import.storage.blob_store import (
+    BLOB_DIRNAME,
+    ContentAddressedBlobStore,
+    blob_store_for,
+)
+
+
+def _source(tmp_path: Path, name: str, data: bytes) -> tuple[Path, str]:
+    path = tmp_path / "inbox" / name
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_bytes(data)
+    return path, hashlib.sha256(data).hexdigest()
+
+
+def test_same_content_is_stored_once_and_linked(tmp_path: Path) -> None:
+    originals = tmp_path / "originals"
+    store = ContentAddressedBlobStore(originals)
+    first, digest = _source(tmp_path, "a.jpg", b"same bytes")
+    second, _ = _source(tmp_path, "b.jpg", b"same bytes")
+
+    assert store.place(first, originals / "2024/01/01/a.jpg", digest) == "hardlink"
+    assert store.place(second, originals / "2025/02/02/b.jpg", digest) == "hardlink"
+
+    blob = store.blob_path(digest)
+    assert blob == originals / BLOB_DIRNAME / digest[:2] / digest[2:4] / digest
+    inodes = {
+        os.stat(path).st_ino
+        for path in (blob, originals / "2024/01/01/a.jpg", originals / "2025/02/02/b.jpg")
+    }
+    assert len(inodes) == 1
+    # 取り込み元は呼び出し側が消すまで残る
+    assert first.exists() and second.exists()
+    assert not list(originals.rglob("*.tmp"))
+
+
+def test_release_keeps_blob_while_links_or_rows_remain(tmp_path: Path) -> None:
+    originals = tmp_path / "originals"
+    store = ContentAddressedBlobStore(originals)
+    source, digest = _source(tmp_path, "a.jpg", b"payload")
+    a = originals / "2024/a.jpg"
+    b = originals / "2024/b.jpg"
+    store.place(source, a, digest)
+    store.place(source, b, digest)
+    source.unlink()
+
+    a.unlink()
+    assert store.release(digest, still_referenced=False) is False
+    b.unlink()
+    assert store.release(digest, still_referenced=True) is False
+    assert store.release(digest, still_referenced=False) is True
+
+    assert not store.blob_path(digest).exists()
+    assert not (originals / BLOB_DIRNAME / digest[:2]).exists()
+    assert store.release(digest, still_referenced=False) is False
+
+
+def test_released_blob_does_not_affect_remaining_copies(tmp_path: Path) -> None:
+    originals = tmp_path / "originals"
+    store = ContentAddressedBlobStore(originals, link_mode="reflink")
+    source, digest = _source(tmp_path, "a.jpg", b"cloned")
+    logical = originals / "2024/a.jpg"
+
+    assert store.place(source, logical, digest) in {"reflink", "hardlink"}
+    os.remove(store.blob_path(digest))
+
+    assert logical.read_bytes() == b"cloned"
+    # blob が消えていても次の配置で作り直す
+    assert store.place(source, originals / "2024/b.jpg", digest) in {"reflink", "hardlink"}
+    assert store.blob_path(digest).exists()
+
+
+def test_blob_store_is_opt_in(tmp_path: Path, monkeypatch) -> None:
+    monkeypatch.delenv("ORIGINALS_BLOB_STORE_ENABLED", raising=False)
+    assert blob_store_for(tmp_path) is None
+
+    monkeypatch.setenv("ORIGINALS_BLOB_STORE_ENABLED", "true")
+    store = blob_store_for(tmp_path)
+    assert store is not None and store.root == tmp_path / BLOB_DIRNAME
+
@@ -0,0 +1,113 @@
+"""ログテーブルの月次パーティション操作と保持期間削除のテスト."""
+
+from __future__ import annotations
+
+from datetime import date, datetime, timedelta, timezone
+from types import SimpleNamespace
+
+import pytest
+
+from shared.application.tasks import log_cleanup
+from shared.infrastructure import log_partitions
+from shared.infrastructure.models.log import Log
+from shared.infrastructure.models.worker_log import WorkerLog
+from shared.kernel.database.db import db
+
+
+def _to_days(value: date) -> str:
+    return str(value.toordinal() + 365)
+
+
+class _FakeMySQLSession:
+    """information_schema.PARTITIONS を返し、ALTER 文を記録する."""
+
+    def __init__(self, partitions: list[tuple[str, str]]) -> None:
+        self.partitions = partitions
+        self.statements: list[str] = []
+
+    def get_bind(self):
+        return SimpleNamespace(dialect=SimpleNamespace(name="mysql"))
+
+    def execute(self, statement, params=None):
+        sql = str(statement)
+        if "information_schema.PARTITIONS" in sql:
+            return SimpleNamespace(all=lambda: list(self.partitions))
+        self.statements.append(sql)
+        return None
+
+
+def test_to_days_round_trip_matches_mysql() -> None:
+    # MySQL: SELECT TO_DAYS('2026-08-01') = 740194
+    session = _FakeMySQLSession([("p202607", "740194"), ("p_future", "MAXVALUE")])
+
+    assert log_partitions.range_partitions(session, "log") == [
+        ("p202607", date(2026, 8, 1)),
+        ("p_future", None),
+    ]
+
+
+def test_future_partitions_are_split_off_p_future() -> None:
+    session = _FakeMySQLSession(
+        [("p202609", _to_days(date(2026, 10, 1))), ("p_future", "MAXVALUE")]
+    )
+
+    created = log_partitions.add_future_partitions(
+        session, "log", today=date(2026, 10, 18), months_ahead=2
+    )
+
+    assert created == ["p202610", "p202611", "p202612"]
+    assert session.statements == [
+        "ALTER TABLE log REORGANIZE PARTITION p_future INTO ("
+        "PARTITION p202610 VALUES LESS THAN (TO_DAYS('2026-11-01')), "
+        "PARTITION p202611 VALUES LESS THAN (TO_DAYS('2026-12-01')), "
+        "PARTITION p202612 VALUES LESS THAN (TO_DAYS('2027-01-01')), "
+        "PARTITION p_future VALUES LESS THAN MAXVALUE)"
+    ]
+    # 作成済みなら何もしない
+    session.partitions = [
+        ("p202612", _to_days(date(2027, 1, 1))),
+        ("p_future", "MAXVALUE"),
+    ]
+    assert log_partitions.add_future_partitions(
+        session, "log", today=date(2026, 10, 19), months_ahead=2
+    ) == []
+
+
+def test_only_fully_expired_partitions_are_dropped() -> None:
+    session = _FakeMySQLSession(
+        [
+            ("p202508", _to_days(date(2025, 9, 1))),
+            ("p202509", _to_days(date(2025, 10, 1))),
+            ("p202510", _to_days(date(2025, 11, 1))),
+            ("p_future", "MAXVALUE"),
+        ]
+    )
+
+    dropped = log_partitions.drop_partitions_before(
+        session, "worker_log", datetime(2025, 10, 18, tzinfo=timezone.utc)
+    )
+
+    # 2025-10 の区画は cutoff より新しい行を含むので残す
+    assert dropped == ["p202508", "p202509"]
+    assert session.statements == ["ALTER TABLE worker_log DROP PARTITION p202508, p202509"]
+
+
+@pytest.mark.usefixtures("app_context")
+def test_unpartitioned_tables_fall_back_to_row_delete() -> None:
+    old = datetime.now(timezone.utc).replace(tzinfo=None) - timedelta(days=40)
+    db.session.add_all(
+        [
+            Log(level="INFO", event="old", message="x", created_at=old),
+            Log(level="INFO", event="new", message="x"),
+            WorkerLog(level="INFO", event="old", message="x", created_at=old),
+        ]
+    )
+    db.session.commit()
+
+    result = log_cleanup.cleanup_old_logs(retention_days=30)
+
+    assert result["ok"] is True
+    assert result["deleted"]["log"] == 1 and result["deleted"]["worker_log"] == 1
+    assert result["dropped_partitions"] == {}
+    assert [row.event for row in db.session.query(Log).all()] == ["new"]
+    assert log_cleanup.maintain_log_partitions()["partitioned"] == []
@@ -0,0 +1,123 @@
+"""ログ本文検索のサイドカー（``log_search`` / ``worker_log_search``）のテスト.
+
+サイドカーは MySQL / MariaDB にだけ作るため、SQLite でも使えるように
+対象の方言を差し替えて書き込み・保持期間削除を確認する。
+"""
+
+from __future__ import annotations
+
+import logging
+from datetime import datetime, timedelta, timezone
+
+import pytest
+import sqlalchemy as sa
+from sqlalchemy.dialects import mysql
+from sqlalchemy.orm import Session
+
+from presentation.fastapi.routers.admin import logs as logs_router
+from shared.application.tasks import log_cleanup
+from shared.infrastructure import log_search
+from shared.infrastructure.models.log import Log
+from shared.infrastructure.models.worker_log import WorkerLog
+from shared.kernel.database.db import db
+from shared.kernel.logging.db_log_handler import DBLogHandler, WorkerDBLogHandler
+
+
+@pytest.fixture
+def sqlite_sidecar(monkeypatch: pytest.MonkeyPatch):
+    monkeypatch.setattr(log_search, "_SEARCH_DIALECTS", ("sqlite",))
+    monkeypatch.setattr(log_search, "_available", {})
+
+    def _create(engine) -> None:
+        log_search._metadata.create_all(bind=engine)
+
+    return _create
+
+
+def test_handler_writes_search_row_with_the_same_key(tmp_path, sqlite_sidecar) -> None:
+    engine = sa.create_engine(f"sqlite:///{tmp_path / 'logs.db'}")
+    sqlite_sidecar(engine)
+    logger = logging.getLogger("test.log_search.handler")
+    logger.propagate = False
+    logger.setLevel(logging.INFO)
+    app_handler = DBLogHandler(engine=engine)
+    worker_handler = WorkerDBLogHandler(engine=engine)
+    try:
+        logger.addHandler(app_handler)
+        logger.info("upload timeout", extra={"event": "upload.failed", "path": "/api/upload"})
+        logger.removeHandler(app_handler)
+        logger.addHandler(worker_handler)
+        logger.info("done", extra={"event": "task.done", "task_name": "thumbs.generate"})
+    finally:
+        logger.handlers.clear()
+
+    with engine.connect() as conn:
+        log_row = conn.execute(sa.select(Log.__table__)).one()
+        search_row = conn.execute(sa.select(log_search.log_search)).one()
+        worker_row = conn.execute(sa.select(WorkerLog.__table__)).one()
+        worker_search_row = conn.execute(sa.select(log_search.worker_log_search)).one()
+    engine.dispose()
+
+    assert (search_row.created_at, search_row.id) == (log_row.created_at, log_row.id)
+    assert (search_row.event, search_row.path) == ("upload.failed", "/api/upload")
+    assert search_row.message == log_row.message
+    assert (worker_search_row.created_at, worker_search_row.id) == (
+        worker_row.created_at,
+        worker_row.id,
+    )
+    assert worker_search_row.task_name == "thumbs.generate"
+
+
+def test_handler_skips_sidecar_when_absent(tmp_path) -> None:
+    engine = sa.create_engine(f"sqlite:///{tmp_path / 'logs.db'}")
+    handler = DBLogHandler(engine=engine)
+    handler.emit(logging.makeLogRecord({"msg": "plain", "levelname": "INFO", "event": "x"}))
+
+    with engine.connect() as conn:
+        assert conn.execute(sa.select(sa.func.count()).select_from(Log.__table__)).scalar() == 1
+        assert not sa.inspect(conn).has_table("log_search")
+    engine.dispose()
+
+
+@pytest.mark.usefixtures("app_context")
+def test_cleanup_trims_search_rows_to_the_cutoff(sqlite_sidecar) -> None:
+    sqlite_sidecar(db.session.get_bind())
+    now = datetime.now(timezone.utc).replace(tzinfo=None)
+    old = now - timedelta(days=40)
+    db.session.execute(
+        sa.insert(log_search.log_search),
+        [
+            {"created_at": old - timedelta(minutes=index), "id": index, "event": "e", "message": "m"}
+            for index in range(1, 6)
+        ]
+        + [{"created_at": now, "id": 6, "event": "e", "message": "m"}],
+    )
+    db.session.commit()
+
+    result = log_cleanup.cleanup_old_logs(retention_days=30)
+
+    assert result["deleted"]["log_search"] == 5
+    assert result["deleted"]["worker_log_search"] == 0
+    assert db.session.execute(sa.select(log_search.log_search.c.id)).scalars().all() == [6]
+
+
+def test_text_search_joins_the_sidecar_on_mysql() -> None:
+    query = logs_router._apply_log_filters(
+        Session().query(Log),
+        Log,
+        "app",
+        levels=[],
+        event=None,
+        q="timeout 日本語",
+        trace_id=None,
+        since_dt=None,
+        until_dt=None,
+        search=log_search.log_search,
+    )
+
+    sql = str(query.statement.compile(dialect=mysql.dialect()))
+
+    assert "JOIN log_search ON log_search.created_at = log.created_at AND log_search.id = log.id" in sql
+    assert "MATCH (log_search.event, log_search.message, log_search.path) AGAINST" in sql
+    # FULLTEXT で引けない語は元テーブルの部分一致に回す
+    assert "lower(log.message) LIKE lower(%s)" in sql
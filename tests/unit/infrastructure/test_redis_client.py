@@ -0,0 +1,48 @@
+"""遅延接続の共有 Redis クライアント（``LazyRedisClient``）のテスト."""
+
+from __future__ import annotations
+
+import pytest
+
+from shared.infrastructure import redis_client
+from shared.infrastructure.redis_client import LazyRedisClient
+
+
+def _client(connected: list) -> LazyRedisClient:
+    return LazyRedisClient("test redis is unavailable", event="test.redis", on_connect=connected.append)
+
+
+def test_no_client_without_redis_url(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.delenv("REDIS_URL", raising=False)
+    connected: list = []
+
+    assert _client(connected).client() is None
+    assert connected == []
+
+
+def test_client_is_shared_until_the_url_changes(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setenv("REDIS_URL", "redis://127.0.0.1:6399/0")
+    connected: list = []
+    shared = _client(connected)
+
+    first = shared.client()
+    assert first is not None and shared.client() is first
+    assert connected == [first]
+
+    monkeypatch.setenv("REDIS_URL", "redis://127.0.0.1:6399/1")
+    second = shared.client()
+    assert second is not first and connected == [first, second]
+
+
+def test_failure_pauses_the_client(monkeypatch: pytest.MonkeyPatch, caplog) -> None:
+    monkeypatch.setenv("REDIS_URL", "redis://127.0.0.1:6399/0")
+    now = [1000.0]
+    monkeypatch.setattr(redis_client.time, "monotonic", lambda: now[0])
+    shared = _client([])
+
+    shared.mark_unavailable(ConnectionError("refused"))
+
+    assert shared.client() is None
+    assert any(getattr(record, "event", None) == "test.redis" for record in caplog.records)
+    now[0] += redis_client.RETRY_AFTER_FAILURE_SECONDS
+    assert shared.client() is not None
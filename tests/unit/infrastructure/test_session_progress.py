@@ -0,0 +1,92 @@
+"""セッション進捗配信（コミット時フック）のユニットテスト."""
+
+from __future__ import annotations
+
+import pytest
+import sqlalchemy as sa
+from sqlalchemy.orm import sessionmaker
+
+from bounded_contexts.picker_import.infrastructure import session_progress
+
+
+@pytest.fixture()
+def db_session(tmp_path, monkeypatch):
+    from shared.kernel.database.db import db
+
+    import shared.infrastructure.models.google_account  # noqa: F401
+    import bounded_contexts.picker_import.infrastructure.picker_session  # noqa: F401
+    import bounded_contexts.photonest.infrastructure.photo_models  # noqa: F401
+    import bounded_contexts.certs.infrastructure.models  # noqa: F401
+
+    engine = sa.create_engine(f"sqlite:///{tmp_path / 'progress.db'}")
+    db.metadata.create_all(engine)
+    session = sessionmaker(bind=engine, expire_on_commit=False)()
+
+    published: list[dict] = []
+    monkeypatch.setattr(session_progress, "publishing_enabled", lambda: True)
+    monkeypatch.setattr(session_progress, "publish_session_progress", published.append)
+    monkeypatch.setattr(session_progress, "_last_counts_at", {})
+    session.info["published"] = published
+    yield session
+    session.close()
+    engine.dispose()
+
+
+def _make_session(db_session):
+    from bounded_contexts.picker_import.infrastructure.picker_session import PickerSession
+
+    picker_session = PickerSession(status="processing", session_id="local_import_test")
+    db_session.add(picker_session)
+    db_session.commit()
+    db_session.info["published"].clear()
+    return picker_session
+
+
+def test_selection_changes_publish_throttled_counts(db_session, monkeypatch) -> None:
+    from bounded_contexts.photonest.infrastructure.photo_models import PickerSelection
+
+    picker_session = _make_session(db_session)
+    published = db_session.info["published"]
+    monkeypatch.setattr(session_progress, "_COUNTS_MIN_INTERVAL", 3600.0)
+
+    selection = PickerSelection(session_id=picker_session.id, status="enqueued")
+    db_session.add(selection)
+    db_session.commit()
+    assert published[-1]["counts"] == {"enqueued": 1}
+
+    selection.status = "running"
+    db_session.commit()
+    assert len(published) == 1  # 間引かれる
+
+    session_progress._last_counts_at.clear()  # 集計間隔の経過
+    selection.status = "imported"
+    db_session.commit()
+    assert len(published) == 2
+    assert published[-1]["counts"] == {"imported": 1}
+    assert published[-1]["state"] == "processing"
+
+
+def test_session_state_change_is_always_published(db_session) -> None:
+    picker_session = _make_session(db_session)
+    published = db_session.info["published"]
+
+    picker_session.set_stats({"total": 3, "success": 1})
+    db_session.commit()
+    assert published[-1]["stats"] == {"total": 3, "success": 1}
+    assert "counts" not in published[-1]
+
+    picker_session.status = "imported"
+    db_session.commit()
+    assert published[-1]["state"] == "imported"
+    assert published[-1]["counts"] == {}
+
+
+def test_rolled_back_changes_are_not_published(db_session) -> None:
+    picker_session = _make_session(db_session)
+    published = db_session.info["published"]
+
+    picker_session.status = "failed"
+    db_session.flush()
+    db_session.rollback()
+
+    assert published == []
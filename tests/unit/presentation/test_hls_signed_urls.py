@@ -0,0 +1,188 @@
+"""署名付き HLS URL（``POST /api/media/{id}/hls-url``）と配信
+（``GET /api/dl/hls/{token}/{name}``）のテスト。
+
+HLS のトークンはディレクトリ単位で発行し、URL パス中のトークン配下で
+プレイリスト・init・セグメントを解決する。トークンの外に出る名前や、
+HLS 以外の用途で発行されたトークンでは配信しないことを確認する。
+"""
+from __future__ import annotations
+
+import base64
+import time
+from pathlib import Path
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from bounded_contexts.photonest.infrastructure.photo_models import Media, MediaPlayback
+from presentation.fastapi.dependencies.auth import get_current_principal
+from presentation.fastapi.routers import media as media_router
+from shared.application.authenticated_principal import AuthenticatedPrincipal
+from shared.kernel.database.db import db
+from shared.kernel.database.session import get_db
+
+_PLAYLIST = b"#EXTM3U\n#EXT-X-STREAM-INF:BANDWIDTH=800000\n720p/index.m3u8\n"
+_SEGMENT = b"\x00\x00\x00\x18ftypiso6segment-bytes"
+
+
+@pytest.fixture
+def playback_dir(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> Path:
+    play_dir = tmp_path / "playback"
+    hls_dir = play_dir / "hls" / "1"
+    (hls_dir / "720p").mkdir(parents=True)
+    (hls_dir / "master.m3u8").write_bytes(_PLAYLIST)
+    (hls_dir / "720p" / "seg0.m4s").write_bytes(_SEGMENT)
+    # トークン配下の外にあるファイル（../ で到達できてはならない）
+    (play_dir / "secret.mp4").write_bytes(b"secret")
+
+    monkeypatch.delenv("MEDIA_PLAYBACK_CONTAINER_DIRECTORY", raising=False)
+    monkeypatch.setenv("MEDIA_PLAYBACK_DIRECTORY", str(play_dir))
+    monkeypatch.setenv(
+        "MEDIA_DOWNLOAD_SIGNING_KEY", base64.urlsafe_b64encode(b"k" * 32).decode()
+    )
+    monkeypatch.delenv("MEDIA_ACCEL_REDIRECT_ENABLED", raising=False)
+    return play_dir
+
+
+@pytest.fixture
+def client(app_context, playback_dir: Path) -> TestClient:
+    app = FastAPI()
+    app.include_router(media_router.router, prefix="/api")
+    app.dependency_overrides[get_current_principal] = lambda: AuthenticatedPrincipal(
+        subject_type="individual",
+        subject_id=1,
+        identifier="user@example.com",
+    )
+    app.dependency_overrides[get_db] = lambda: db.session
+    yield TestClient(app)
+    app.dependency_overrides.clear()
+
+
+def _video_with_hls(status: str = "done") -> Media:
+    media = Media(source_type="local", local_rel_path="2024/clip.mov", is_video=True, bytes=1)
+    db.session.add(media)
+    db.session.flush()
+    db.session.add(
+        MediaPlayback(
+            media_id=media.id,
+            preset="hls",
+            rel_path="hls/1/master.m3u8",
+            status=status,
+        )
+    )
+    db.session.commit()
+    return media
+
+
+def _token(**overrides) -> str:
+    payload = {
+        "v": 1,
+        "typ": "hls",
+        "mid": 1,
+        "size": None,
+        "path": "playback/hls/1/",
+        "ct": "application/vnd.apple.mpegurl",
+        "exp": int(time.time()) + 600,
+    }
+    payload.update(overrides)
+    return media_router._sign_payload(payload)
+
+
+def test_issued_url_serves_playlist_and_segments(client: TestClient) -> None:
+    media = _video_with_hls()
+
+    resp = client.post(f"/api/media/{media.id}/hls-url")
+
+    assert resp.status_code == 200
+    body = resp.json()
+    assert body["url"].startswith("/api/dl/hls/")
+    assert body["url"].endswith("/master.m3u8")
+    assert body["cacheControl"].startswith("private, max-age=")
+
+    playlist = client.get(body["url"])
+    assert playlist.status_code == 200
+    assert playlist.content == _PLAYLIST
+    assert playlist.headers["content-type"].startswith("application/vnd.apple.mpegurl")
+
+    # プレイリスト内の相対 URI は同じトークン配下に解決される
+    base = body["url"].rsplit("/", 1)[0]
+    segment = client.get(f"{base}/720p/seg0.m4s")
+    assert segment.status_code == 200
+    assert segment.content == _SEGMENT
+    assert segment.headers["content-type"].startswith("video/iso.segment")
+    assert "x-accel-redirect" not in segment.headers
+
+
+def test_url_is_not_issued_until_hls_is_ready(client: TestClient) -> None:
+    media = _video_with_hls(status="processing")
+
+    resp = client.post(f"/api/media/{media.id}/hls-url")
+
+    assert resp.status_code == 409
+
+
+def test_traversal_outside_token_directory_is_rejected(client: TestClient) -> None:
+    token = _token()
+
+    # クライアントが URL を正規化しないよう区切りをエンコードして ``..`` を
+    # そのままハンドラーに届ける（ASGI の path ではデコードされる）
+    for name in ("..%2F..%2Fsecret.mp4", "720p%2F..%2F..%2F..%2Fsecret.mp4", ".%2Fmaster.m3u8"):
+        resp = client.get(f"/api/dl/hls/{token}/{name}")
+        assert resp.status_code == 404, name
+        assert resp.json()["detail"] == {"error": "not_found"}
+
+    # 正規化された ``../`` も HLS 配下の外へは出られない
+    resp = client.get(f"/api/dl/hls/{token}/../../secret.mp4")
+    assert resp.status_code in (403, 404)
+    assert resp.content != b"secret"
+
+
+@pytest.mark.parametrize(
+    "overrides",
+    [
+        {"typ": "playback"},
+        {"typ": "thumb"},
+        {"path": "originals/2024/"},
+        {"path": "playback/hls/../"},
+        {"path": "playback/hls/1"},
+    ],
+)
+def test_token_with_wrong_type_or_prefix_is_forbidden(client: TestClient, overrides) -> None:
+    resp = client.get(f"/api/dl/hls/{_token(**overrides)}/master.m3u8")
+
+    assert resp.status_code == 403
+    assert resp.json()["detail"] == {"error": "forbidden"}
+
+
+def test_tampered_token_is_forbidden(client: TestClient) -> None:
+    payload, _signature = _token().split(".", 1)
+    forged = media_router._sign_payload({"typ": "hls"}).split(".", 1)[1]
+
+    resp = client.get(f"/api/dl/hls/{payload}.{forged}/master.m3u8")
+
+    assert resp.status_code == 403
+    assert resp.json()["detail"] == {"error": "invalid_token"}
+
+
+def test_segments_are_delegated_to_nginx_when_accel_is_enabled(
+    client: TestClient, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    monkeypatch.setenv("MEDIA_ACCEL_REDIRECT_ENABLED", "true")
+    monkeypatch.setenv("MEDIA_ACCEL_PLAYBACK_LOCATION", "/_internal/playback")
+    token = _token()
+
+    segment = client.get(f"/api/dl/hls/{token}/720p/seg0.m4s")
+
+    assert segment.status_code == 200
+    assert segment.content == b""
+    assert segment.headers["x-accel-redirect"].startswith(
+        "/_internal/playback/hls/1/720p/seg0.m4s?token="
+    )
+    assert segment.headers["content-type"].startswith("video/iso.segment")
+
+    # プレイリストは小さいためアプリから直接返す
+    playlist = client.get(f"/api/dl/hls/{token}/master.m3u8")
+    assert playlist.status_code == 200
+    assert "x-accel-redirect" not in playlist.headers
+    assert playlist.content == _PLAYLIST
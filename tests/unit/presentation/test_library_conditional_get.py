@@ -0,0 +1,148 @@
+"""ライブラリ変更カウンタと一覧 API の条件付き GET のテスト。"""
+from __future__ import annotations
+
+import asyncio
+import threading
+
+import pytest
+from fastapi import Response
+from starlette.requests import Request
+
+from bounded_contexts.photonest.infrastructure import library_version
+from bounded_contexts.photonest.infrastructure.photo_models import (
+    Media,
+    MediaFileDeletion,
+    Tag,
+    media_tag,
+)
+from presentation.fastapi.dependencies.conditional import library_etag
+from presentation.fastapi.routers import tags as tags_router
+from shared.application.authenticated_principal import AuthenticatedPrincipal
+from shared.kernel.database.db import db
+
+pytestmark = pytest.mark.integration
+
+
+class _FakeRedis:
+    def __init__(self) -> None:
+        self.values: dict[str, int] = {}
+
+    def get(self, key: str):
+        return self.values.get(key)
+
+    def incr(self, key: str) -> int:
+        self.values[key] = self.values.get(key, 0) + 1
+        return self.values[key]
+
+
+@pytest.fixture
+def counter(monkeypatch) -> _FakeRedis:
+    fake = _FakeRedis()
+    monkeypatch.setattr(library_version._redis, "client", lambda: fake)
+    return fake
+
+
+def _principal(*permissions: str) -> AuthenticatedPrincipal:
+    return AuthenticatedPrincipal(
+        subject_type="individual", subject_id=1, identifier="user", scope=frozenset(permissions)
+    )
+
+
+def _request(query: str = "", etag: str | None = None) -> Request:
+    headers = [(b"if-none-match", etag.encode())] if etag else []
+    return Request(
+        {
+            "type": "http",
+            "method": "GET",
+            "path": "/api/tags",
+            "query_string": query.encode(),
+            "headers": headers,
+        }
+    )
+
+
+@pytest.mark.usefixtures("app_context")
+def test_commits_touching_the_library_bump_the_counter(counter) -> None:
+    media = Media(source_type="local", local_rel_path="2024/a.jpg", bytes=1)
+    db.session.add(media)
+    db.session.commit()
+    assert library_version.current_library_version() == 1
+
+    tag = Tag(name="sea", attr="place")
+    db.session.add(tag)
+    db.session.flush()
+    db.session.execute(media_tag.insert().values(media_id=media.id, tag_id=tag.id))
+    db.session.commit()
+    assert library_version.current_library_version() == 2
+
+    db.session.query(Media).filter(Media.id == media.id).update({"is_deleted": True})
+    db.session.rollback()
+    assert library_version.current_library_version() == 2
+
+    db.session.add(
+        MediaFileDeletion(media_id=media.id, storage_domain="media_originals", rel_path="x", kind="file")
+    )
+    db.session.commit()
+    assert library_version.current_library_version() == 2
+
+
+@pytest.mark.usefixtures("app_context")
+def test_tag_list_returns_304_until_the_library_changes(counter) -> None:
+    db.session.add(Tag(name="sea", attr="place"))
+    db.session.commit()
+    principal = _principal("media:view")
+
+    def _list(request: Request):
+        response = Response()
+        result = asyncio.run(
+            tags_router.api_tags_list(
+                request, response, q="", limit=20, principal=principal, db=db.session
+            )
+        )
+        return result, response
+
+    body, response = _list(_request("limit=20"))
+    etag = response.headers["etag"]
+    assert etag.startswith('W/"') and [item["name"] for item in body["items"]] == ["sea"]
+
+    cached, _ = _list(_request("limit=20", etag))
+    assert cached.status_code == 304 and cached.headers["etag"] == etag
+    # クエリや権限が違えば別の ETag
+    assert _list(_request("limit=5", etag))[1].headers["etag"] != etag
+
+    db.session.add(Tag(name="sky", attr="place"))
+    db.session.commit()
+    body, response = _list(_request("limit=20", etag))
+    assert response.headers["etag"] != etag and len(body["items"]) == 2
+
+
+@pytest.mark.usefixtures("app_context")
+def test_no_etag_without_shared_counter(monkeypatch) -> None:
+    monkeypatch.setattr(library_version._redis, "client", lambda: None)
+    response = Response()
+
+    asyncio.run(
+        tags_router.api_tags_list(
+            _request(etag='W/"x"'), response, q="", limit=20, principal=_principal(), db=db.session
+        )
+    )
+
+    assert "etag" not in response.headers
+
+
+def test_counter_is_read_off_the_event_loop(monkeypatch) -> None:
+    threads: list[int] = []
+
+    def _version() -> int:
+        threads.append(threading.get_ident())
+        return 3
+
+    monkeypatch.setattr(library_version, "current_library_version", _version)
+
+    async def _etag():
+        return threading.get_ident(), await library_etag(_request(), _principal())
+
+    loop_thread, etag = asyncio.run(_etag())
+
+    assert etag is not None and etag.startswith('W/"')
+    assert threads and threads[0] != loop_thread
@@ -0,0 +1,30 @@
+"""署名付きダウンロードの Range ヘッダー解釈の回帰テスト。"""
+from __future__ import annotations
+
+import pytest
+
+from presentation.fastapi.routers.media import _parse_range
+
+
+@pytest.mark.parametrize(
+    ("header", "expected"),
+    [
+        ("bytes=0-99", (0, 99)),
+        ("bytes=100-", (100, 999)),
+        ("bytes=900-5000", (900, 999)),
+        ("bytes=-200", (800, 999)),
+        ("bytes=-5000", (0, 999)),
+    ],
+)
+def test_satisfiable_ranges(header, expected):
+    assert _parse_range(header, 1000) == expected
+
+
+@pytest.mark.parametrize("header", ["bytes=1000-", "bytes=-0"])
+def test_unsatisfiable_ranges(header):
+    assert _parse_range(header, 1000) == (-1, -1)
+
+
+@pytest.mark.parametrize("header", ["bytes=-", "items=0-1", "bytes=0-1,5-9", "bytes=9-3"])
+def test_unsupported_ranges_fall_back_to_full_body(header):
+    assert _parse_range(header, 1000) is None
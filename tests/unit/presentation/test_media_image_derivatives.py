@@ -0,0 +1,167 @@
+"""派生画像（任意幅・形式）エンドポイントとディスク LRU キャッシュのテスト。"""
+from __future__ import annotations
+
+import asyncio
+import io
+import itertools
+from pathlib import Path
+from types import SimpleNamespace
+
+import pytest
+from fastapi import HTTPException
+from PIL import Image
+
+from bounded_contexts.photonest.infrastructure.media_processing import image_derivatives
+from bounded_contexts.photonest.infrastructure.media_processing.image_derivatives import (
+    DerivativeCache,
+    render_derivative,
+)
+from bounded_contexts.photonest.infrastructure.media_processing.thumbnail_fast_path import (
+    SingleFlightRenderPool,
+)
+from presentation.fastapi.routers import media as media_router
+
+
+def _write_image(path: Path, size: tuple[int, int]) -> Path:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    Image.new("RGB", size, (30, 160, 90)).save(path, "PNG")
+    return path
+
+
+def test_render_derivative_scales_down_only(tmp_path: Path) -> None:
+    source = _write_image(tmp_path / "512.png", (512, 384))
+
+    with Image.open(io.BytesIO(render_derivative(source, 384, "webp", 80))) as webp:
+        assert webp.format == "WEBP" and webp.size == (384, 288)
+    with Image.open(io.BytesIO(render_derivative(source, 1000, "jpeg", 85))) as jpeg:
+        assert jpeg.format == "JPEG" and jpeg.size == (512, 384)
+
+
+def test_cache_evicts_least_recently_used(tmp_path: Path, monkeypatch) -> None:
+    cache = DerivativeCache(tmp_path / "cache", max_bytes=250)
+    clock = itertools.count()
+    monkeypatch.setattr(image_derivatives.time, "time", lambda: float(next(clock)))
+
+    first = cache.put("aa01", b"x" * 100, ".jpg")
+    cache.put("bb02", b"y" * 100, ".jpg")
+    assert cache.get("aa01") == first  # bb02 が最も古くなる
+    cache.put("cc03", b"z" * 100, ".jpg")
+
+    assert cache.get("bb02") is None
+    assert cache.get("aa01") is not None and cache.get("cc03") is not None
+    assert cache.total_bytes() == 200
+
+    first.unlink()
+    assert cache.get("aa01") is None  # 索引だけ残った行は捨てる
+    assert cache.total_bytes() == 100
+
+
+@pytest.mark.parametrize(
+    ("accept", "expected"),
+    [
+        ("image/avif,image/webp,image/apng,image/*,*/*;q=0.8", "avif"),
+        ("image/webp,image/png,image/*;q=0.8", "webp"),
+        ("image/avif;q=0,image/webp", "webp"),
+        ("image/*,*/*", "jpeg"),
+        (None, "jpeg"),
+    ],
+)
+def test_format_negotiation(accept, expected) -> None:
+    assert media_router._negotiate_image_format(accept) == expected
+
+
+@pytest.fixture
+def thumbs(tmp_path: Path, monkeypatch) -> Path:
+    base = tmp_path / "thumbs"
+    for size in (256, 512, 1024):
+        _write_image(base / str(size) / "2024/photo.avif", (size, size * 3 // 4))
+    monkeypatch.setattr(media_router, "_thumbnail_base_path", lambda: str(base))
+    monkeypatch.setattr(
+        image_derivatives,
+        "get_derivative_cache",
+        lambda: DerivativeCache(tmp_path / "cache", max_bytes=10 * 1024 * 1024),
+    )
+    monkeypatch.setattr(
+        "bounded_contexts.photonest.infrastructure.media_processing.thumbnail_fast_path._pool",
+        SingleFlightRenderPool(max_workers=1, max_pending=1),
+    )
+    return base
+
+
+def _media():
+    manifest = {
+        "rel": "2024/photo.avif",
+        "sizes": {str(size): {"fmt": "avif", "bytes": size} for size in (256, 512, 1024)},
+    }
+    return SimpleNamespace(id=5, is_deleted=False, thumbnail_manifest=manifest)
+
+
+def test_source_is_nearest_larger_thumbnail(thumbs: Path) -> None:
+    media = _media()
+
+    assert media_router._derivative_source(media, 384)[0] == str(thumbs / "512/2024/photo.avif")
+    assert media_router._derivative_source(media, 512)[0] == str(thumbs / "512/2024/photo.avif")
+    assert media_router._derivative_source(media, 2000)[0] == str(thumbs / "1024/2024/photo.avif")
+
+
+def _image_token(media, width: int) -> str:
+    version = media_router._derivative_source(media, width)[1]
+    return media_router._sign_payload(
+        {
+            "v": 1,
+            "typ": "image",
+            "mid": media.id,
+            "w": width,
+            "ver": media_router._derivative_version_tag(version),
+            "exp": 4102444800,
+        }
+    )
+
+
+def test_signed_image_url_renders_and_caches(thumbs: Path) -> None:
+    media = _media()
+    db = SimpleNamespace(get=lambda _model, _id: media)
+    token = _image_token(media, 384)
+
+    def _get(accept: str, **headers):
+        request = SimpleNamespace(headers={"Accept": accept, **headers})
+        return asyncio.run(media_router.api_download_image(token, request, principal=None, db=db))
+
+    response = _get("image/webp,*/*")
+    assert response.media_type == "image/webp"
+    assert response.headers["vary"] == "Accept"
+    assert "immutable" in response.headers["cache-control"]
+    with Image.open(io.BytesIO(response.body)) as rendered:
+        assert rendered.size == (384, 288)
+
+    assert _get("image/webp,*/*").body == response.body
+    assert _get("*/*").media_type == "image/jpeg"
+    revalidated = _get("image/webp", **{"If-None-Match": response.headers["etag"]})
+    assert revalidated.status_code == 304
+
+    forged = token[:-2] + ("AA" if not token.endswith("AA") else "BB")
+    with pytest.raises(HTTPException) as excinfo:
+        asyncio.run(
+            media_router.api_download_image(
+                forged, SimpleNamespace(headers={}), principal=None, db=db
+            )
+        )
+    assert excinfo.value.status_code == 403
+
+
+def test_token_for_a_replaced_thumbnail_is_rejected(thumbs: Path) -> None:
+    media = _media()
+    db = SimpleNamespace(get=lambda _model, _id: media)
+    token = _image_token(media, 384)
+    # 発行後に元サムネイルが作り直された
+    media.thumbnail_manifest["sizes"]["512"]["bytes"] = 999
+
+    with pytest.raises(HTTPException) as excinfo:
+        asyncio.run(
+            media_router.api_download_image(
+                token, SimpleNamespace(headers={"Accept": "*/*"}), principal=None, db=db
+            )
+        )
+
+    assert excinfo.value.status_code == 403
+    assert excinfo.value.detail == {"error": "stale"}
@@ -0,0 +1,185 @@
+"""サムネイル API の同期生成（ファストパス）のテスト。"""
+from __future__ import annotations
+
+import asyncio
+import threading
+from pathlib import Path
+from types import SimpleNamespace
+
+import pytest
+from PIL import Image
+
+from bounded_contexts.photonest.infrastructure.media_processing.thumbnail_fast_path import (
+    SingleFlightRenderPool,
+    render_thumbnail,
+)
+from bounded_contexts.photonest.infrastructure.photo_models import Media
+from bounded_contexts.storage import StorageDomain
+from presentation.fastapi.routers import media as media_router
+from shared.kernel.database.db import db
+
+
+def _write_jpeg(path: Path, size: tuple[int, int]) -> Path:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    Image.new("RGB", size, (200, 40, 90)).save(path, "JPEG")
+    return path
+
+
+def test_render_thumbnail_scales_long_side(tmp_path: Path) -> None:
+    source = _write_jpeg(tmp_path / "orig.jpg", (1200, 800))
+
+    dest = render_thumbnail(source, tmp_path / "thumbs" / "256" / "orig.avif", 256)
+
+    with Image.open(dest) as rendered:
+        assert max(rendered.size) == 256
+    assert [p.name for p in dest.parent.iterdir()] == ["orig.avif"]
+
+
+def test_pool_coalesces_same_key_and_rejects_when_full() -> None:
+    pool = SingleFlightRenderPool(max_workers=1, max_pending=1)
+    release = threading.Event()
+    calls = []
+
+    def _work(label):
+        calls.append(label)
+        release.wait(5)
+        return label
+
+    try:
+        first = pool.submit(("m", 256), _work, "a")
+        assert pool.submit(("m", 256), _work, "b") is first
+        assert pool.submit(("m", 512), _work, "c") is not None
+        assert pool.submit(("n", 256), _work, "d") is None
+
+        release.set()
+        assert first.result(5) == "a"
+    finally:
+        release.set()
+        pool.shutdown()
+    assert "b" not in calls and "d" not in calls
+
+
+def _media(**overrides):
+    values = dict(
+        id=7,
+        is_video=False,
+        local_rel_path="2024/01/photo.jpg",
+        thumbnail_rel_path=None,
+        playbacks=[],
+        thumbnail_manifest=None,
+    )
+    values.update(overrides)
+    return SimpleNamespace(**values)
+
+
+def _patch_storage(monkeypatch, tmp_path: Path) -> dict:
+    roots = {
+        StorageDomain.MEDIA_ORIGINALS: tmp_path / "originals",
+        StorageDomain.MEDIA_PLAYBACK: tmp_path / "playback",
+        StorageDomain.MEDIA_THUMBNAILS: tmp_path / "thumbs",
+    }
+
+    def _resolve(domain, *parts, intent=None):
+        path = roots[domain].joinpath(*parts)
+        return SimpleNamespace(absolute_path=str(path), exists=path.exists(), base_path=str(roots[domain]))
+
+    monkeypatch.setattr(media_router, "_resolve_storage_file", _resolve)
+    monkeypatch.setattr(media_router, "_thumbnail_base_path", lambda: str(roots[StorageDomain.MEDIA_THUMBNAILS]))
+    monkeypatch.setattr(
+        "bounded_contexts.photonest.infrastructure.media_processing.thumbnail_fast_path._pool",
+        SingleFlightRenderPool(max_workers=2, max_pending=2),
+    )
+    return roots
+
+
+def test_missing_photo_thumbnail_is_rendered_on_request(tmp_path: Path, monkeypatch) -> None:
+    roots = _patch_storage(monkeypatch, tmp_path)
+    _write_jpeg(roots[StorageDomain.MEDIA_ORIGINALS] / "2024/01/photo.jpg", (2000, 1000))
+    media = _media()
+
+    async def _concurrent():
+        return await asyncio.gather(
+            *(media_router._render_thumbnail_fast_path(media, 512) for _ in range(4))
+        )
+
+    paths = asyncio.run(_concurrent())
+
+    expected = roots[StorageDomain.MEDIA_THUMBNAILS] / "512" / "2024/01/photo.avif"
+    assert set(paths) == {str(expected)}
+    with Image.open(expected) as rendered:
+        assert rendered.size == (512, 256)
+    # マニフェストはリクエストのオブジェクト上では書き換えない（記録は読み直してから）
+    assert media.thumbnail_manifest is None
+
+
+def test_large_sizes_and_unready_videos_fall_back(tmp_path: Path, monkeypatch) -> None:
+    roots = _patch_storage(monkeypatch, tmp_path)
+    _write_jpeg(roots[StorageDomain.MEDIA_ORIGINALS] / "2024/01/photo.jpg", (2000, 1000))
+    pending = SimpleNamespace(status="processing", preset="std1080p", poster_rel_path="v.jpg",
+                              updated_at=None, created_at=None, id=1)
+
+    assert asyncio.run(media_router._render_thumbnail_fast_path(_media(), 1024)) is None
+    video = _media(is_video=True, local_rel_path="2024/01/clip.mov", playbacks=[pending])
+    assert asyncio.run(media_router._render_thumbnail_fast_path(video, 256)) is None
+
+    _write_jpeg(roots[StorageDomain.MEDIA_PLAYBACK] / "v.jpg", (1280, 720))
+    pending.status = "done"
+    rendered = asyncio.run(media_router._render_thumbnail_fast_path(video, 256))
+    assert rendered == str(roots[StorageDomain.MEDIA_THUMBNAILS] / "256" / "2024/01/clip.avif")
+
+
+def _stored_media(manifest) -> Media:
+    media = Media(
+        source_type="local",
+        local_rel_path="2024/01/photo.jpg",
+        is_video=False,
+        bytes=1,
+        thumbnail_manifest=manifest,
+    )
+    db.session.add(media)
+    db.session.commit()
+    return media
+
+
+@pytest.mark.usefixtures("app_context")
+def test_fast_path_leaves_unrecorded_manifest_for_backfill(tmp_path: Path, monkeypatch) -> None:
+    roots = _patch_storage(monkeypatch, tmp_path)
+    media = _stored_media(None)
+    rendered = roots[StorageDomain.MEDIA_THUMBNAILS] / "512" / "2024/01/photo.avif"
+    _write_jpeg(rendered, (512, 256))
+
+    media_router._record_fast_path_thumbnail(db.session, media, 512, str(rendered))
+
+    # 1 サイズだけのマニフェストにすると他のサイズを探さなくなる
+    assert db.session.get(Media, media.id).thumbnail_manifest is None
+
+
+@pytest.mark.usefixtures("app_context")
+def test_fast_path_merges_into_the_manifest_recorded_meanwhile(tmp_path: Path, monkeypatch) -> None:
+    roots = _patch_storage(monkeypatch, tmp_path)
+    recorded = {"rel": "2024/01/photo.avif", "sizes": {"256": {"fmt": "avif", "bytes": 10}}}
+    media = _stored_media(recorded)
+    rendered = roots[StorageDomain.MEDIA_THUMBNAILS] / "512" / "2024/01/photo.avif"
+    _write_jpeg(rendered, (512, 256))
+
+    # リクエストが読んだ後に thumbs.generate が 1024 を記録した
+    with db.engine.begin() as conn:
+        conn.execute(
+            Media.__table__.update()
+            .where(Media.__table__.c.id == media.id)
+            .values(
+                thumbnail_manifest={
+                    "rel": "2024/01/photo.avif",
+                    "sizes": {"256": {"fmt": "avif", "bytes": 10}, "1024": {"fmt": "avif", "bytes": 30}},
+                }
+            )
+        )
+
+    media_router._record_fast_path_thumbnail(db.session, media, 512, str(rendered))
+
+    sizes = db.session.get(Media, media.id).thumbnail_manifest["sizes"]
+    assert sizes == {
+        "256": {"fmt": "avif", "bytes": 10},
+        "512": {"fmt": "avif", "bytes": rendered.stat().st_size},
+        "1024": {"fmt": "avif", "bytes": 30},
+    }